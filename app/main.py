@@ -1,8 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
+import os
+import socket
+from contextlib import asynccontextmanager
 
 from .routes import router
+from src.application import WorkflowApplication, WorkflowTaskRegistry, WorkflowAdmissionController
+from src.infrastructure.task_store import SQLiteTaskStore
+from src.nodes.llm.llm_client import LLMClient
 
 # 配置日志
 logging.basicConfig(
@@ -11,6 +18,48 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 设置 TASK_STORE_PATH 后，已结束任务的结果和报告会写入该 SQLite 数据库，重启后仍可查询。
+# 多个工作进程使用同一个数据库时，任何一个工作进程都可以查询和取消其他工作进程运行的任务
+TASK_STORE_PATH = os.environ.get("TASK_STORE_PATH")
+
+# 任务存储中记录的保留秒数，默认 7 天，超过保留时间的记录会被删除
+TASK_STORE_RETENTION_SECONDS = float(os.environ.get("TASK_STORE_RETENTION_SECONDS", 7 * 24 * 3600))
+
+# 每个工作进程同时运行的工作流数上限、排队等待的提交数上限和最长排队秒数
+MAX_RUNNING_TASKS = int(os.environ.get("MAX_RUNNING_TASKS", WorkflowAdmissionController.DEFAULT_MAX_IN_FLIGHT))
+MAX_QUEUED_TASKS = int(os.environ.get("MAX_QUEUED_TASKS", WorkflowAdmissionController.DEFAULT_MAX_QUEUED))
+MAX_QUEUE_WAIT_SECONDS = float(os.environ.get("MAX_QUEUE_WAIT_SECONDS", WorkflowAdmissionController.DEFAULT_MAX_WAIT_SECONDS))
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """
+    配置任务准入，打开任务存储并定期发送工作进程的心跳，在服务关闭时关闭共享的 LLM HTTP 客户端并写入尚未写入的记录
+    """
+    WorkflowApplication.instance().admission = WorkflowAdmissionController(
+        max_in_flight=MAX_RUNNING_TASKS,
+        max_queued=MAX_QUEUED_TASKS,
+        max_wait_seconds=MAX_QUEUE_WAIT_SECONDS,
+    )
+    store = None
+    heartbeat = None
+    if TASK_STORE_PATH:
+        store = SQLiteTaskStore(TASK_STORE_PATH, retention_seconds=TASK_STORE_RETENTION_SECONDS)
+        worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        tasks = WorkflowTaskRegistry(store=store, worker_id=worker_id)
+        WorkflowApplication.instance().tasks = tasks
+        heartbeat = asyncio.create_task(tasks.serve())
+        logger.info(f"Task store: {TASK_STORE_PATH}, retention {TASK_STORE_RETENTION_SECONDS:.0f}s, worker {worker_id}")
+    try:
+        yield
+    finally:
+        await LLMClient.aclose_pooled()
+        if heartbeat is not None:
+            heartbeat.cancel()
+        if store is not None:
+            await asyncio.get_running_loop().run_in_executor(None, store.close)
+
+
 # 创建 FastAPI 应用实例
 app = FastAPI(
     title="Runtime-py-core API",
@@ -19,6 +68,7 @@ app = FastAPI(
     docs_url="/docs",  # Swagger UI 路径
     redoc_url="/redoc",  # ReDoc 路径
     openapi_url="/openapi.json",  # OpenAPI 规范路径
+    lifespan=lifespan,
 )
 
 # 配置 CORS
@@ -33,6 +83,7 @@ app.add_middleware(
 # 注册路由
 app.include_router(router)
 
+
 # 健康检查端点
 @app.get("/health", tags=["health"])
 async def health_check():
@@ -23,10 +23,11 @@ class WorkflowSnapshot(BaseModel):
     """工作流快照"""
     id: str
     nodeID: str
-    inputs: Dict[str, Any]
+    inputs: Optional[Dict[str, Any]] = None
     outputs: Optional[Dict[str, Any]] = None
-    data: Dict[str, Any]
+    data: Optional[Dict[str, Any]] = None
     branch: Optional[str] = None
+    usage: Optional[Dict[str, int]] = None
 
 
 class WorkflowStatus(BaseModel):
@@ -41,33 +42,67 @@ class WorkflowStatus(BaseModel):
 class NodeReport(BaseModel):
     """节点报告"""
     id: str
-    status: str
-    terminated: bool
-    startTime: int
+    # 查询报告时只包含选中的字段
+    status: Optional[str] = None
+    terminated: Optional[bool] = None
+    startTime: Optional[int] = None
     endTime: Optional[int] = None
-    timeCost: int
-    snapshots: List[WorkflowSnapshot]
+    timeCost: Optional[int] = None
+    snapshots: Optional[List[WorkflowSnapshot]] = None
+    usage: Optional[Dict[str, int]] = None
+    snapshotCount: Optional[int] = Field(None, description="查询报告中该节点的快照总数")
+    nextCursor: Optional[str] = Field(None, description="查询报告中该节点下一页快照的游标")
+    removedSnapshots: Optional[List[str]] = Field(None, description="增量报告中自 since 版本以来被移除的快照 ID")
+    snapshotsReset: Optional[bool] = Field(None, description="增量报告中 snapshots 为该节点的全部快照，应替换已有快照")
 
 
 class Report(BaseModel):
     """工作流报告"""
     id: str
-    inputs: Dict[str, Any]
+    version: int = Field(0, description="报告版本，状态或快照每次变化时递增")
+    since: Optional[int] = Field(None, description="增量报告的起始版本，完整报告为空")
+    inputs: Optional[Dict[str, Any]] = None
     outputs: Dict[str, Any]
     workflowStatus: WorkflowStatus
     reports: Dict[str, NodeReport]
+    usage: Optional[Dict[str, Any]] = None
+    nodeConfigs: Optional[Dict[str, Dict[str, Any]]] = None
 
 
 # API 请求和响应模型
+class SnapshotOptions(BaseModel):
+    """快照选项"""
+    mode: Optional[str] = Field(None, pattern="^(off|metadata|full|sampled)$", description="full 记录每次节点运行（默认），metadata 只记录元数据，sampled 采样记录，off 不记录")
+    sampleEvery: Optional[int] = Field(None, ge=0, description="采样模式下每 N 次运行记录一次")
+    sampleFirst: Optional[int] = Field(None, ge=0, description="采样模式下记录每个节点的前 K 次运行")
+    sampleLast: Optional[int] = Field(None, ge=0, description="采样模式下保留每个节点的最后 K 次运行")
+    maxPayloadBytes: Optional[int] = Field(None, ge=0, description="估算大小超过该字节数的输入和输出值会被截断")
+    offload: Optional[bool] = Field(None, description="记录快照时将其追加写入临时文件中的日志，任务结束后内存中只保留偏移索引，仅对整个工作流生效")
+    nodes: Optional[Dict[str, "SnapshotOptions"]] = Field(None, description="按节点 ID 覆盖的快照选项")
+
+
+class TaskRunOptions(BaseModel):
+    """任务运行选项"""
+    tokenBudget: Optional[int] = Field(None, ge=0, description="任务的 token 预算，超出后中止执行")
+    retainOutputs: Optional[bool] = Field(None, description="保留所有节点输出直到任务释放，而不是在最后一个使用者执行后释放")
+    compactArrays: Optional[bool] = Field(None, description="将整数、浮点数或字符串组成的输入列表存储为紧凑的类型数组")
+    spillThresholdBytes: Optional[int] = Field(None, ge=0, description="估算大小超过该字节数的输入会被转存到内存映射的临时文件")
+    snapshot: Optional[SnapshotOptions] = Field(None, description="记录哪些节点运行的快照，以及记录多少内容")
+
+
 class TaskRunInput(BaseModel):
     """任务运行请求"""
     inputs: Dict[str, Any]
     schema: str
+    options: Optional[TaskRunOptions] = None
 
 
 class TaskRunOutput(BaseModel):
     """任务运行响应"""
     taskID: str
+    terminated: Optional[bool] = Field(None, description="同步运行时，任务是否在等待时间内结束")
+    status: Optional[str] = Field(None, description="同步运行且任务已结束时的工作流状态")
+    outputs: Optional[Dict[str, Any]] = Field(None, description="同步运行且任务已结束时的工作流输出")
 
 
 class TaskResultInput(BaseModel):
@@ -88,3 +123,73 @@ class TaskCancelInput(BaseModel):
 class TaskCancelOutput(BaseModel):
     """任务取消响应"""
     success: bool
+
+
+class LLMModelMetrics(BaseModel):
+    """单个模型和服务地址的 LLM 用量"""
+    model: str
+    host: str
+    requests: int
+    promptTokens: int
+    completionTokens: int
+    totalTokens: int
+
+
+class LLMMetricsOutput(BaseModel):
+    """LLM 用量指标响应"""
+    models: List[LLMModelMetrics]
+
+
+class TaskEvictionMetrics(BaseModel):
+    """按淘汰原因统计的已结束任务记录数"""
+    ttl: int = Field(..., description="超过 TTL 未被读取而淘汰的记录数")
+    maxTasks: int = Field(..., description="任务总数超过上限而淘汰的记录数")
+    maxBytes: int = Field(..., description="记录总大小超过字节预算而淘汰的记录数")
+
+
+class TaskStoreMetrics(BaseModel):
+    """任务存储指标"""
+    written: int = Field(..., description="已写入的记录数")
+    claimed: int = Field(..., description="已写入的运行中任务归属数")
+    batches: int = Field(..., description="已提交的批次数")
+    pending: int = Field(..., description="等待写入的记录数")
+    errors: int = Field(..., description="写入失败的批次数")
+
+
+class TaskRejectionMetrics(BaseModel):
+    """按拒绝原因统计的任务提交数"""
+    queueFull: int = Field(..., description="排队已满而拒绝的提交数")
+    timeout: int = Field(..., description="排队超时而拒绝的提交数")
+
+
+class TaskAdmissionMetrics(BaseModel):
+    """任务准入指标"""
+    inFlight: int = Field(..., description="正在运行的工作流数")
+    queued: int = Field(..., description="排队等待运行的提交数")
+    maxInFlight: int = Field(..., description="同时运行的工作流数上限")
+    maxQueued: int = Field(..., description="排队等待的提交数上限")
+    maxWaitSeconds: Optional[float] = Field(None, description="提交最长排队的秒数，为空表示不限")
+    admitted: int = Field(..., description="已准入的提交数")
+    rejections: TaskRejectionMetrics
+    averageWaitMs: float = Field(..., description="已准入提交的平均排队毫秒数")
+    maxWaitMs: float = Field(..., description="已准入提交的最长排队毫秒数")
+    averageRunMs: Optional[float] = Field(None, description="工作流的平均运行毫秒数（指数滑动平均），尚无结束的工作流时为空")
+
+
+class TaskMetricsOutput(BaseModel):
+    """任务注册表指标响应"""
+    running: int = Field(..., description="尚未结束的任务数")
+    finished: int = Field(..., description="保留的已结束任务记录数")
+    bytes: int = Field(..., description="已结束任务记录的总字节数")
+    compacted: int = Field(..., description="进程启动以来压缩为记录的任务数")
+    loaded: int = Field(..., description="从任务存储加载回内存的记录数")
+    evictions: TaskEvictionMetrics
+    evictedBytes: int = Field(..., description="已淘汰记录的总字节数")
+    ttlSeconds: Optional[float] = Field(None, description="记录未被读取后保留的秒数，为空表示不限")
+    maxTasks: Optional[int] = Field(None, description="保留的任务数上限，为空表示不限")
+    maxBytes: Optional[int] = Field(None, description="记录总大小上限，为空表示不限")
+    workerID: Optional[str] = Field(None, description="当前工作进程在共享任务存储中的 ID，未共享时为空")
+    cancelRequests: int = Field(0, description="请求其他工作进程取消任务的次数")
+    remoteCancels: int = Field(0, description="应其他工作进程的请求取消的任务数")
+    store: Optional[TaskStoreMetrics] = Field(None, description="任务存储指标，未配置任务存储时为空")
+    admission: Optional[TaskAdmissionMetrics] = Field(None, description="任务准入指标")
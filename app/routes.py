@@ -1,67 +1,213 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from typing import Optional, Dict, Any, List
+import asyncio
+
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Optional, Dict, Any, List, AsyncIterator
 
 from .models import (
     TaskRunInput, TaskRunOutput,
     TaskResultInput, TaskReportInput,
     TaskCancelInput, TaskCancelOutput,
-    WorkflowIO, Report
+    WorkflowIO, Report, LLMMetricsOutput, TaskMetricsOutput
 )
 
 # 导入 runtime-py-core 库
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.api import TaskRunAPI, TaskResultAPI, TaskReportAPI, TaskCancelAPI
+from src.api import TaskRunAPI, TaskResultAPI, TaskReportAPI, TaskCancelAPI, TaskEventsAPI, LLMMetricsAPI, TaskMetricsAPI
+from src.application import WorkflowAdmissionError
 
 # 创建路由器
 router = APIRouter(prefix="/api", tags=["task"])
 
 
-@router.post("/task/run", response_model=TaskRunOutput)
-async def run_task(input_data: TaskRunInput):
+# 长轮询和同步运行最长等待的毫秒数，避免请求长时间占用连接或被代理超时断开
+MAX_WAIT_MS = 60000
+
+
+@router.post("/task/run", response_model=TaskRunOutput, response_model_exclude_none=True)
+async def run_task(
+    input_data: TaskRunInput,
+    sync: bool = Query(False, description="是否等待任务结束，并直接返回工作流输出"),
+    wait: Optional[int] = Query(None, ge=0, le=MAX_WAIT_MS, description="同步运行时最多等待的毫秒数，默认 30000")
+):
     """
     运行工作流任务
     
-    接收工作流模式和输入，启动任务执行，返回任务ID
+    接收工作流模式和输入，启动任务执行，返回任务ID。
+    sync 为 true 时等待任务结束，在等待时间内结束则同时返回工作流状态和输出。
+    同时运行的工作流已满时任务排队等待，排队已满时返回 429，排队超时返回 503，并带有 Retry-After
     """
     try:
-        result = await TaskRunAPI(input_data.dict())
+        result = await TaskRunAPI({**input_data.dict(), "sync": sync, "wait": wait})
         return result
+    except WorkflowAdmissionError as e:
+        status_code = 429 if e.reason == "queueFull" else 503
+        raise HTTPException(
+            status_code=status_code,
+            detail=f"任务暂时无法运行: {str(e)}",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"任务运行失败: {str(e)}")
 
 
 @router.get("/task/result", response_model=Optional[Dict[str, Any]])
-async def get_task_result(taskID: str = Query(..., description="任务ID")):
+async def get_task_result(
+    taskID: str = Query(..., description="任务ID"),
+    wait: Optional[int] = Query(None, ge=0, le=MAX_WAIT_MS, description="任务未结束时最多等待的毫秒数")
+):
     """
     获取任务结果
     
-    根据任务ID获取工作流执行的结果
+    根据任务ID获取工作流执行的结果。传入 wait 时，任务未结束则等待其结束后再返回，
+    超过等待时间仍未结束时返回空结果
     """
     try:
-        result = await TaskResultAPI({"taskID": taskID})
+        result = await TaskResultAPI({"taskID": taskID, "wait": wait})
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取任务结果失败: {str(e)}")
 
 
-@router.get("/task/report", response_model=Report)
-async def get_task_report(taskID: str = Query(..., description="任务ID")):
+def _report_etag(task_id: str, version: int) -> str:
+    """生成报告版本的弱 ETag"""
+    return f'W/"{task_id}-{version}"'
+
+
+def _parse_report_etag(task_id: str, if_none_match: Optional[str]) -> Optional[int]:
+    """从 If-None-Match 请求头中解析该任务的报告版本，无法解析时返回 None"""
+    prefix = f'W/"{task_id}-'
+    for etag in (if_none_match or "").split(","):
+        etag = etag.strip()
+        if etag.startswith(prefix) and etag.endswith('"') and etag[len(prefix):-1].isdigit():
+            return int(etag[len(prefix):-1])
+    return None
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    """将逗号分隔的查询参数拆分为列表"""
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+@router.get("/task/report", response_model=Report, response_model_exclude_unset=True)
+async def get_task_report(
+    request: Request,
+    response: Response,
+    taskID: str = Query(..., description="任务ID"),
+    since: Optional[int] = Query(None, ge=0, description="只返回该版本之后的变化"),
+    nodeIDs: Optional[str] = Query(None, description="只返回这些节点，逗号分隔"),
+    statuses: Optional[str] = Query(None, description="只返回这些状态的节点，逗号分隔，例如 failed,processing"),
+    types: Optional[str] = Query(None, description="只返回这些类型的节点，逗号分隔，例如 llm"),
+    fields: Optional[str] = Query(None, description="节点报告包含的字段，逗号分隔，例如 status,timeCost"),
+    snapshotFields: Optional[str] = Query(None, description="快照包含的字段，逗号分隔，例如 branch,usage"),
+    cursor: Optional[str] = Query(None, description="从该快照 ID 之后开始返回快照，即上一页的 nextCursor"),
+    limit: Optional[int] = Query(None, ge=1, description="每个节点最多返回的快照数量")
+):
     """
     获取任务报告
     
-    根据任务ID获取工作流执行的详细报告
+    根据任务ID获取工作流执行的详细报告。传入 since 时只返回该版本之后变化的节点；
+    携带上次响应的 ETag 作为 If-None-Match 时，报告未变化则返回 304。
+    传入 nodeIDs、statuses、types 时只返回匹配的节点，fields 和 snapshotFields 选择返回的字段，
+    limit 和 cursor 分页返回每个节点的快照
     """
     try:
         # TaskReportAPI 现在总是返回一个字典，不再返回 None
-        report = await TaskReportAPI({"taskID": taskID})
-        
-        # 直接返回报告字典，它已经符合 Report 模型的结构
-        return report
+        report = await TaskReportAPI({
+            "taskID": taskID,
+            "since": since,
+            "ifNoneMatch": _parse_report_etag(taskID, request.headers.get("if-none-match")),
+            "nodeIDs": _split(nodeIDs),
+            "statuses": _split(statuses),
+            "types": _split(types),
+            "fields": _split(fields),
+            "snapshotFields": _split(snapshotFields),
+            "cursor": cursor,
+            "limit": limit
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"报告查询参数无效: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取任务报告失败: {str(e)}")
 
+    etag = _report_etag(taskID, report.get("version", 0))
+    if report.get("notModified"):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    # 直接返回报告字典，它已经符合 Report 模型的结构
+    return report
+
+
+# 事件流在没有事件时发送保活注释的间隔（秒），防止代理断开空闲连接
+SSE_KEEPALIVE_SECONDS = 15
+
+
+async def _sse_stream(subscription) -> AsyncIterator[str]:
+    """将订阅的事件编码为 Server-Sent Events，以报告版本作为事件 ID"""
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.__anext__(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            except StopAsyncIteration:
+                return
+            yield f"id: {event.data.get('version', 0)}\nevent: {event.type}\ndata: {event.json}\n\n"
+    finally:
+        subscription.close()
+
+
+@router.get("/task/events")
+async def stream_task_events(
+    taskID: str = Query(..., description="任务ID"),
+    bufferSize: Optional[int] = Query(None, ge=1, description="为该订阅缓存的最大事件数，超出时丢弃最早的事件")
+):
+    """
+    订阅任务事件（Server-Sent Events）
+    
+    推送节点开始、成功、失败、取消以及工作流开始、结束的事件，工作流结束且任务释放后关闭连接。
+    每个事件携带变化后的报告版本，可作为 since 参数获取报告中变化的部分
+    """
+    subscription = await TaskEventsAPI({"taskID": taskID, "bufferSize": bufferSize})
+    if subscription is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {taskID}")
+    return StreamingResponse(
+        _sse_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/task/events/ws")
+async def stream_task_events_ws(
+    websocket: WebSocket,
+    taskID: str = Query(..., description="任务ID"),
+    bufferSize: Optional[int] = Query(None, ge=1, description="为该订阅缓存的最大事件数，超出时丢弃最早的事件")
+):
+    """
+    订阅任务事件（WebSocket）
+    
+    以 JSON 文本消息推送与 /api/task/events 相同的事件，任务结束后由服务端关闭连接
+    """
+    subscription = await TaskEventsAPI({"taskID": taskID, "bufferSize": bufferSize})
+    if subscription is None:
+        await websocket.close(code=4404, reason="任务不存在")
+        return
+    await websocket.accept()
+    try:
+        async for event in subscription:
+            await websocket.send_text(event.json)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
+
 
 @router.put("/task/cancel", response_model=TaskCancelOutput)
 async def cancel_task(input_data: TaskCancelInput):
@@ -75,3 +221,24 @@ async def cancel_task(input_data: TaskCancelInput):
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"取消任务失败: {str(e)}")
+
+
+
+@router.get("/metrics/llm", response_model=LLMMetricsOutput, tags=["metrics"])
+async def get_llm_metrics():
+    """
+    获取 LLM 用量指标
+    
+    返回进程启动以来各模型和服务地址的累计请求数和 token 用量
+    """
+    return await LLMMetricsAPI()
+
+
+@router.get("/metrics/tasks", response_model=TaskMetricsOutput, tags=["metrics"])
+async def get_task_metrics():
+    """
+    获取任务注册表指标
+    
+    返回运行中和已结束的任务数、已结束任务记录的大小，以及按原因统计的淘汰数
+    """
+    return await TaskMetricsAPI()
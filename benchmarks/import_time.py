@@ -0,0 +1,89 @@
+"""
+Import-time benchmark for the runtime and the API server.
+
+Runs `python -X importtime` for each module in a fresh interpreter, takes the
+median cumulative import time over several runs and compares it with a
+budget. Also checks that LangChain is not imported at startup.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--src-budget-ms 400] [--app-budget-ms 1500]
+
+Exits with a non-zero status if a budget is exceeded.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be loaded when the runtime starts
+FORBIDDEN_PREFIXES = ("langchain", "langchain_core", "langchain_openai")
+
+
+def measure_import(module: str) -> Dict[str, object]:
+    """
+    Measure the cumulative import time of a module in a fresh interpreter.
+
+    Args:
+        module: The module to import.
+
+    Returns:
+        A dictionary with the cumulative time in milliseconds and the imported module names.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = 0
+    modules: List[str] = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)", line)
+        if not match:
+            continue
+        modules.append(match.group(4))
+        if match.group(4) == module:
+            cumulative_us = int(match.group(2))
+    return {"ms": cumulative_us / 1000, "modules": modules}
+
+
+def main() -> int:
+    """
+    Run the benchmark.
+
+    Returns:
+        The process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Import-time budget check")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--src-budget-ms", type=float, default=400)
+    parser.add_argument("--app-budget-ms", type=float, default=1500)
+    args = parser.parse_args()
+
+    budgets = {"src": args.src_budget_ms, "app.main": args.app_budget_ms}
+    failed = False
+    for module, budget in budgets.items():
+        samples = [measure_import(module) for _ in range(args.runs)]
+        median_ms = statistics.median(sample["ms"] for sample in samples)
+        forbidden = sorted({
+            name for name in samples[0]["modules"]
+            if name.split(".")[0] in FORBIDDEN_PREFIXES
+        })
+        status = "ok" if median_ms <= budget and not forbidden else "FAIL"
+        print(f"{module:10s} median {median_ms:8.1f} ms  budget {budget:8.1f} ms  {status}")
+        if forbidden:
+            print(f"  forbidden modules imported: {', '.join(forbidden[:5])}")
+        if status != "ok":
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Throughput and tail-latency benchmark for LLM-heavy workflows.
+
+Starts the mock LLM server (src/nodes/llm/mock_llm_server.py) in the
+background, runs many loop workflows whose LLM nodes target it, and reports
+workflow throughput and latency percentiles for the workflows and for the
+individual LLM node runs.
+
+Usage:
+    python benchmarks/llm_workflow_throughput.py [--tasks 50] [--items 10] [--concurrency 1]
+        [--latency lognormal] [--median-ms 50] [--sigma 0.5] [--error-rate 0.0]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domain.container import WorkflowRuntimeContainer
+from src.interface import IEngine
+from src.nodes.llm.mock_llm_server import LatencyDistribution, MockLLMServer, MockLLMServerConfig
+
+
+def build_schema(api_host: str, concurrency: int) -> Dict[str, Any]:
+    """
+    Build a start -> loop(llm) -> end workflow schema.
+
+    Args:
+        api_host: The API host of the LLM nodes.
+        concurrency: The number of loop iterations run at the same time.
+
+    Returns:
+        The workflow schema.
+    """
+    def constant(value: Any) -> Dict[str, Any]:
+        return {"type": "constant", "content": value}
+
+    return {
+        "nodes": [
+            {"id": "start_0", "type": "start", "data": {"outputs": {"type": "object", "properties": {}}}},
+            {
+                "id": "loop_0",
+                "type": "loop",
+                "data": {"batchFor": {"type": "ref", "content": ["start_0", "tasks"]}, "concurrency": concurrency},
+                "blocks": [{
+                    "id": "llm_0",
+                    "type": "llm",
+                    "data": {
+                        "inputsValues": {
+                            "modelName": constant("mock-model"),
+                            "apiKey": constant("sk-benchmark"),
+                            "apiHost": constant(api_host),
+                            "temperature": constant(0.5),
+                            "prompt": {"type": "ref", "content": ["loop_0_locals", "item"]},
+                        },
+                        "outputs": {"type": "object", "properties": {"result": {"type": "string"}}},
+                    },
+                }],
+            },
+            {"id": "end_0", "type": "end", "data": {"inputsValues": {}}},
+        ],
+        "edges": [
+            {"sourceNodeID": "start_0", "targetNodeID": "loop_0"},
+            {"sourceNodeID": "loop_0", "targetNodeID": "end_0"},
+        ],
+    }
+
+
+def percentiles(samples: List[float]) -> str:
+    """
+    Format p50/p95/p99/max of latency samples in milliseconds.
+
+    Args:
+        samples: The samples in milliseconds.
+
+    Returns:
+        The formatted percentiles.
+    """
+    if not samples:
+        return "no samples"
+    ordered = sorted(samples)
+
+    def pick(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    return (
+        f"p50 {pick(50):8.1f}  p95 {pick(95):8.1f}  p99 {pick(99):8.1f}  "
+        f"max {ordered[-1]:8.1f}  mean {statistics.mean(ordered):8.1f}"
+    )
+
+
+async def run_benchmark(args: argparse.Namespace, api_host: str) -> None:
+    """
+    Run the workflows and print the results.
+
+    Args:
+        args: The command line arguments.
+        api_host: The API host of the mock LLM server.
+    """
+    engine = WorkflowRuntimeContainer.instance().get(IEngine)
+    inputs = {"tasks": [f"classify item {i}" for i in range(args.items)]}
+
+    async def run_one() -> Dict[str, Any]:
+        started_at = time.perf_counter()
+        task = engine.invoke({"schema": build_schema(api_host, args.concurrency), "inputs": inputs})
+        while not task.context.status_center.workflow.terminated:
+            await asyncio.sleep(0.001)
+        return {"ms": (time.perf_counter() - started_at) * 1000, "task": task}
+
+    started_at = time.perf_counter()
+    runs = await asyncio.gather(*[run_one() for _ in range(args.tasks)])
+    elapsed = time.perf_counter() - started_at
+
+    node_samples: List[float] = []
+    failed_nodes = 0
+    for run in runs:
+        for snapshot in run["task"].context.snapshot_center.export_all():
+            if snapshot.get("nodeID") == "llm_0" and "error" in snapshot:
+                failed_nodes += 1
+        node_status = run["task"].context.status_center.export_node_status().get("llm_0")
+        if node_status:
+            node_samples.append(node_status["timeCost"])
+
+    llm_calls = args.tasks * args.items
+    print(f"workflows  {args.tasks}  items/workflow {args.items}  loop concurrency {args.concurrency}")
+    print(f"elapsed    {elapsed:.2f} s  ->  {args.tasks / elapsed:.1f} workflows/s, {llm_calls / elapsed:.1f} LLM calls/s")
+    print(f"workflow   {percentiles([run['ms'] for run in runs])}  (ms)")
+    print(f"last llm   {percentiles(node_samples)}  (ms)")
+    print(f"failed llm node runs: {failed_nodes}")
+
+
+def main() -> None:
+    """
+    Run the benchmark from the command line.
+    """
+    parser = argparse.ArgumentParser(description="LLM workflow throughput benchmark")
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency", choices=LatencyDistribution.KINDS, default="lognormal")
+    parser.add_argument("--median-ms", type=float, default=50)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--ms", type=float, default=50)
+    parser.add_argument("--mean-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    params = {
+        "fixed": {"ms": args.ms},
+        "uniform": {"min_ms": 0, "max_ms": 2 * args.mean_ms},
+        "normal": {"mean_ms": args.mean_ms, "stddev_ms": args.mean_ms / 4},
+        "lognormal": {"median_ms": args.median_ms, "sigma": args.sigma},
+        "exponential": {"mean_ms": args.mean_ms},
+    }[args.latency]
+    config = MockLLMServerConfig(
+        latency=LatencyDistribution(args.latency, **params),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        tokens_per_second=args.tokens_per_second,
+        seed=args.seed,
+    )
+    with MockLLMServer(config) as server:
+        asyncio.run(run_benchmark(args, server.api_host))
+        print(f"server     {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
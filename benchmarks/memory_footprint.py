@@ -0,0 +1,152 @@
+"""
+Memory benchmark for the runtime data structures.
+
+Measures, with tracemalloc, the bytes allocated per node when a large document
+is initialized, and the bytes allocated per snapshot and per node status when a
+run records them. The schema and the snapshot payloads are built before the
+measurement starts, so only the runtime's own objects are counted.
+
+Usage:
+    python benchmarks/memory_footprint.py [--nodes 20000] [--snapshots 200000]
+        [--max-bytes-per-node N] [--max-bytes-per-snapshot N]
+
+When a budget is given and exceeded, the script exits with a non-zero status.
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domain.document import WorkflowRuntimeDocument
+from src.domain.snapshot import WorkflowRuntimeSnapshotCenter
+from src.domain.status import WorkflowRuntimeStatusCenter
+
+
+def build_schema(node_count: int) -> Dict[str, Any]:
+    """
+    Build a chain of LLM-shaped nodes between a start and an end node.
+
+    Args:
+        node_count: The number of nodes between the start and the end node.
+
+    Returns:
+        The workflow schema.
+    """
+    string_schema = {"type": "object", "properties": {"prompt": {"type": "string"}}}
+    nodes = [{
+        "id": "start_0",
+        "type": "start",
+        "data": {"outputs": {"type": "object", "properties": {"query": {"type": "string"}}}},
+    }]
+    edges = []
+    previous_id = "start_0"
+    for index in range(node_count):
+        node_id = f"llm_{index}"
+        nodes.append({
+            "id": node_id,
+            "type": "llm",
+            "data": {
+                "inputsValues": {
+                    "modelName": {"type": "constant", "content": "mock-model"},
+                    "prompt": {"type": "ref", "content": [previous_id, "result" if index else "query"]},
+                },
+                "inputs": string_schema,
+                "outputs": {"type": "object", "properties": {"result": {"type": "string"}}},
+            },
+        })
+        edges.append({"sourceNodeID": previous_id, "targetNodeID": node_id})
+        previous_id = node_id
+    nodes.append({
+        "id": "end_0",
+        "type": "end",
+        "data": {"inputsValues": {"result": {"type": "ref", "content": [previous_id, "result"]}}},
+    })
+    edges.append({"sourceNodeID": previous_id, "targetNodeID": "end_0"})
+    return {"nodes": nodes, "edges": edges}
+
+
+def measure(func: Callable[[], Any]) -> int:
+    """
+    Measure the bytes still allocated by a call when it returns.
+
+    Args:
+        func: The call to measure. Its result is kept alive during the measurement.
+
+    Returns:
+        The number of bytes allocated and not freed.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--snapshots", type=int, default=200000)
+    parser.add_argument("--max-bytes-per-node", type=float, default=None)
+    parser.add_argument("--max-bytes-per-snapshot", type=float, default=None)
+    args = parser.parse_args()
+
+    schema = build_schema(args.nodes)
+    node_count = len(schema["nodes"])
+
+    def init_document() -> WorkflowRuntimeDocument:
+        document = WorkflowRuntimeDocument()
+        document.init(schema)
+        return document
+
+    document = init_document()
+    node_ids = [node["id"] for node in schema["nodes"]]
+    payloads: List[Dict[str, Any]] = [
+        {"node_id": node_ids[i % node_count], "inputs": {}, "data": {}} for i in range(args.snapshots)
+    ]
+
+    def create_snapshots() -> WorkflowRuntimeSnapshotCenter:
+        snapshot_center = WorkflowRuntimeSnapshotCenter()
+        for payload in payloads:
+            snapshot_center.create(payload)
+        return snapshot_center
+
+    def track_statuses() -> WorkflowRuntimeStatusCenter:
+        status_center = WorkflowRuntimeStatusCenter()
+        status_center.init(document)
+        for node_id in node_ids:
+            node_status = status_center.node_status(node_id)
+            node_status.process()
+            node_status.success()
+        return status_center
+
+    bytes_per_node = measure(init_document) / node_count
+    bytes_per_snapshot = measure(create_snapshots) / args.snapshots
+    bytes_per_status = measure(track_statuses) / node_count
+
+    print(f"document   {node_count:>8} nodes      {bytes_per_node:>8.0f} bytes/node")
+    print(f"snapshots  {args.snapshots:>8} snapshots  {bytes_per_snapshot:>8.0f} bytes/snapshot")
+    print(f"statuses   {node_count:>8} nodes      {bytes_per_status:>8.0f} bytes/node")
+
+    failed = False
+    if args.max_bytes_per_node is not None and bytes_per_node > args.max_bytes_per_node:
+        print(f"FAIL: {bytes_per_node:.0f} bytes/node exceeds the budget of {args.max_bytes_per_node:.0f}")
+        failed = True
+    if args.max_bytes_per_snapshot is not None and bytes_per_snapshot > args.max_bytes_per_snapshot:
+        print(f"FAIL: {bytes_per_snapshot:.0f} bytes/snapshot exceeds the budget of {args.max_bytes_per_snapshot:.0f}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark for polling the task report while a loop-heavy workflow runs.
+
+Runs the loop test workflow with the mock LLM while a poller fetches the report
+at a fixed interval, the way the playground polls `/api/task/report`. Compares
+rebuilding and serializing the full report on every poll, as reports were
+served before, with fetching only the changes since the last seen version.
+Reports the number of polls, the time spent polling and the bytes serialized.
+
+Usage:
+    python benchmarks/report_polling.py [--items 5000] [--interval-ms 5]
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import sys
+import time
+from typing import Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domain.__tests__.schemas.loop import loop_schema
+from src.domain.container import WorkflowRuntimeContainer
+from src.infrastructure.utils import to_jsonable
+from src.interface import IEngine
+
+
+async def run(items: int, interval_s: float, delta: bool) -> Tuple[int, float, int]:
+    """
+    Run the loop workflow while polling its report.
+
+    Args:
+        items: The number of loop items.
+        interval_s: The polling interval in seconds.
+        delta: Whether to fetch the changes since the last version instead of the full report.
+
+    Returns:
+        The number of polls, the time spent polling in seconds and the bytes serialized.
+    """
+    engine = WorkflowRuntimeContainer.instance().get(IEngine)
+    task = engine.invoke({
+        "schema": copy.deepcopy(loop_schema),
+        "inputs": {
+            "prompt": "How are you?",
+            "system_prompt": "You are a helpful AI assistant.",
+            "tasks": [f"TASK - {i}" for i in range(items)],
+        },
+    })
+    reporter = task.context.reporter
+    polls, poll_s, serialized_bytes, version = 0, 0.0, 0, 0
+    while True:
+        terminated = task.context.status_center.workflow.terminated
+        started_at = time.perf_counter()
+        if delta:
+            report = reporter.export_since(version)
+            version = report["version"]
+        else:
+            report = vars(reporter.export())
+            # Rebuild the report on every poll
+            reporter._report = None
+        serialized_bytes += len(json.dumps(to_jsonable(report), default=str))
+        poll_s += time.perf_counter() - started_at
+        polls += 1
+        if terminated:
+            return polls, poll_s, serialized_bytes
+        await asyncio.sleep(interval_s)
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--interval-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':>6}  {'polls':>6}  {'poll ms':>9}  {'ms/poll':>8}  {'MiB sent':>9}")
+    for name, delta in (("full", False), ("delta", True)):
+        polls, poll_s, serialized_bytes = asyncio.run(run(args.items, args.interval_ms / 1000, delta))
+        print(
+            f"{name:>6}  {polls:>6}  {poll_s * 1000:>9.1f}  {poll_s * 1000 / polls:>8.2f}"
+            f"  {serialized_bytes / 1024 / 1024:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark for the size of the task report on a loop-heavy workflow.
+
+Runs the loop test workflow with the mock LLM and serializes its report in two
+layouts: with the node configuration embedded in every snapshot, as reports
+were built before, and with the snapshots referring to the shared
+`nodeConfigs` table. Reports the JSON size and the serialization time of both.
+
+Usage:
+    python benchmarks/report_size.py [--items 10000]
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import sys
+import timeit
+from typing import Any, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domain.__tests__.schemas.loop import loop_schema
+from src.domain.container import WorkflowRuntimeContainer
+from src.infrastructure.utils import to_jsonable
+from src.interface import IEngine
+
+
+async def run(items: int) -> Any:
+    """
+    Run the loop workflow.
+
+    Args:
+        items: The number of loop items.
+
+    Returns:
+        The context of the finished task.
+    """
+    engine = WorkflowRuntimeContainer.instance().get(IEngine)
+    task = engine.invoke({
+        "schema": copy.deepcopy(loop_schema),
+        "inputs": {
+            "prompt": "How are you?",
+            "system_prompt": "You are a helpful AI assistant.",
+            "tasks": [f"TASK - {i}" for i in range(items)],
+        },
+    })
+    while not task.context.status_center.workflow.terminated:
+        await asyncio.sleep(0.001)
+    return task.context
+
+
+def build_report(context: Any, inline_configs: bool) -> Dict[str, Any]:
+    """
+    Build the report of a task.
+
+    Args:
+        context: The context of the task.
+        inline_configs: Whether to embed the node configuration in every snapshot.
+
+    Returns:
+        The report as a dictionary.
+    """
+    report = context.reporter.export()
+    reports = report.reports
+    node_configs = report.nodeConfigs
+    if inline_configs:
+        reports = {
+            node_id: {**node_report, "snapshots": [
+                {**snapshot, "data": node_configs.get(node_id)} for snapshot in node_report["snapshots"]
+            ]}
+            for node_id, node_report in reports.items()
+        }
+        node_configs = None
+    result = {
+        "id": report.id,
+        "inputs": report.inputs,
+        "outputs": report.outputs,
+        "workflowStatus": report.workflowStatus,
+        "reports": reports,
+        "usage": report.usage,
+    }
+    if node_configs is not None:
+        result["nodeConfigs"] = node_configs
+    return result
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10000)
+    args = parser.parse_args()
+
+    context = asyncio.run(run(args.items))
+    print(f"{'layout':>14}  {'JSON MiB':>9}  {'serialize ms':>12}")
+    for name, inline_configs in (("inline config", True), ("nodeConfigs", False)):
+        report = build_report(context, inline_configs)
+        serialize = lambda: json.dumps(to_jsonable(report), default=str)
+        size = len(serialize())
+        serialize_ms = min(timeit.repeat(serialize, number=1, repeat=5)) * 1000
+        print(f"{name:>14}  {size / 1024 / 1024:>9.2f}  {serialize_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
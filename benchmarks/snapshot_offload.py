@@ -0,0 +1,100 @@
+"""
+Memory benchmark for offloading the snapshots of finished tasks.
+
+Runs the loop test workflow with the mock LLM several times, keeping the context
+of every finished task the way the application keeps its tasks, with the
+snapshots held in memory and offloaded to spill logs. Reports the Python heap
+retained per finished task and the time to export the report of one task.
+
+Usage:
+    python benchmarks/snapshot_offload.py [--items 2000] [--tasks 5]
+"""
+import argparse
+import asyncio
+import copy
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domain.__tests__.schemas.loop import loop_schema
+from src.domain.container import WorkflowRuntimeContainer
+from src.interface import IEngine
+
+
+async def run(items: int, offload: bool) -> Any:
+    """
+    Run the loop workflow until its context is disposed.
+
+    Args:
+        items: The number of loop items.
+        offload: Whether the snapshots are offloaded when the task is disposed.
+
+    Returns:
+        The context of the finished task.
+    """
+    engine = WorkflowRuntimeContainer.instance().get(IEngine)
+    task = engine.invoke({
+        "schema": copy.deepcopy(loop_schema),
+        "inputs": {
+            "prompt": "How are you?",
+            "system_prompt": "You are a helpful AI assistant.",
+            "tasks": [f"TASK - {i}" for i in range(items)],
+        },
+        "options": {"snapshot": {"offload": offload}},
+    })
+    while not task.context.status_center.workflow.terminated:
+        await asyncio.sleep(0.001)
+    # Let the engine dispose the context
+    await asyncio.sleep(0.01)
+    return task.context
+
+
+def measure(items: int, tasks: int, offload: bool) -> Tuple[float, float]:
+    """
+    Measure the memory retained by finished tasks.
+
+    Args:
+        items: The number of loop items per task.
+        tasks: The number of tasks.
+        offload: Whether the snapshots are offloaded.
+
+    Returns:
+        The retained memory per task in KiB and the report export time in milliseconds.
+    """
+    gc.collect()
+    tracemalloc.start()
+    contexts: List[Any] = []
+    for _ in range(tasks):
+        contexts.append(asyncio.run(run(items, offload)))
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    started_at = time.perf_counter()
+    contexts[-1].reporter.export()
+    export_ms = (time.perf_counter() - started_at) * 1000
+    return retained / tasks / 1024, export_ms
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'snapshots':>9}  {'KiB/task':>9}  {'export ms':>9}")
+    for name, offload in (("memory", False), ("offload", True)):
+        retained_kb, export_ms = measure(args.items, args.tasks, offload)
+        print(f"{name:>9}  {retained_kb:>9.1f}  {export_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
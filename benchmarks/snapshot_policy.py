@@ -0,0 +1,92 @@
+"""
+Benchmark for the snapshot policies on a loop-heavy workflow.
+
+Runs the loop test workflow with the mock LLM for every snapshot mode and
+reports the number of snapshots kept, the memory they retain, the run time and
+the size of the serialized snapshots.
+
+Usage:
+    python benchmarks/snapshot_policy.py [--items 2000]
+"""
+import argparse
+import asyncio
+import copy
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domain.__tests__.schemas.loop import loop_schema
+from src.domain.container import WorkflowRuntimeContainer
+from src.infrastructure.utils import to_jsonable
+from src.interface import IEngine
+
+POLICIES: Tuple[Tuple[str, Optional[Dict[str, Any]]], ...] = (
+    ("full", None),
+    ("truncated", {"maxPayloadBytes": 64}),
+    ("metadata", {"mode": "metadata"}),
+    ("sampled", {"mode": "sampled", "sampleFirst": 5, "sampleEvery": 100, "sampleLast": 5}),
+    ("off", {"mode": "off"}),
+)
+
+
+async def run(items: int, snapshot: Optional[Dict[str, Any]]) -> Any:
+    """
+    Run the loop workflow.
+
+    Args:
+        items: The number of loop items.
+        snapshot: The snapshot options.
+
+    Returns:
+        The context of the finished task.
+    """
+    engine = WorkflowRuntimeContainer.instance().get(IEngine)
+    task = engine.invoke({
+        "schema": copy.deepcopy(loop_schema),
+        "inputs": {
+            "prompt": "How are you?",
+            "system_prompt": "You are a helpful AI assistant.",
+            "tasks": [f"TASK - {i}" for i in range(items)],
+        },
+        "options": {"snapshot": snapshot} if snapshot else {},
+    })
+    while not task.context.status_center.workflow.terminated:
+        await asyncio.sleep(0.001)
+    return task.context
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'policy':>10}  {'snapshots':>9}  {'retained KiB':>12}  {'run s':>6}  {'JSON KiB':>9}")
+    for name, snapshot in POLICIES:
+        # Time the run without tracing, which slows allocations down
+        started_at = time.perf_counter()
+        asyncio.run(run(args.items, snapshot))
+        run_s = time.perf_counter() - started_at
+
+        gc.collect()
+        tracemalloc.start()
+        context = asyncio.run(run(args.items, snapshot))
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        snapshots = context.snapshot_center.export_all()
+        json_size = len(json.dumps(to_jsonable(snapshots), default=str))
+        print(f"{name:>10}  {len(snapshots):>9}  {retained / 1024:>12.0f}  {run_s:>6.2f}  {json_size / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark for spilling large workflow inputs out of memory.
+
+Builds a large list of records, like a big input passed to `start_0`, and
+compares keeping it as Python objects with spilling it to a memory-mapped
+scratch file. Reports the Python heap still held after the original list is
+dropped, the time to spill, and the time to iterate and to index the records.
+Mapped pages are not part of the Python heap and can be evicted by the kernel.
+
+Usage:
+    python benchmarks/spill_inputs.py [--records 500000] [--threshold-mb 16]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.infrastructure.spill import SpillStore
+
+
+def build_records(count: int) -> List[Dict[str, Any]]:
+    """
+    Build a list of records.
+
+    Args:
+        count: The number of records.
+
+    Returns:
+        The records.
+    """
+    return [{"id": i, "name": f"record {i}", "score": i * 0.5, "tags": ["a", "b"]} for i in range(count)]
+
+
+def measure(count: int, threshold_bytes: Any) -> Dict[str, float]:
+    """
+    Spill the records and measure the retained heap and access times.
+
+    Args:
+        count: The number of records.
+        threshold_bytes: The spill threshold, or None to keep the records in memory.
+
+    Returns:
+        The measurements.
+    """
+    # Time the spill without tracing, which slows allocations down
+    records = build_records(count)
+    started_at = time.perf_counter()
+    SpillStore(threshold_bytes).spill(records)
+    spill_s = time.perf_counter() - started_at
+    del records
+
+    gc.collect()
+    tracemalloc.start()
+    records = build_records(count)
+    value = SpillStore(threshold_bytes).spill(records)
+    del records
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    started_at = time.perf_counter()
+    total = sum(record["id"] for record in value)
+    iterate_s = time.perf_counter() - started_at
+    assert total == count * (count - 1) // 2
+
+    started_at = time.perf_counter()
+    for index in range(0, count, max(1, count // 10000)):
+        value[index]
+    index_us = (time.perf_counter() - started_at) / min(count, 10000) * 1e6
+    return {"retained_mb": retained / 1024 / 1024, "spill_s": spill_s, "iterate_s": iterate_s, "index_us": index_us}
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=500000)
+    parser.add_argument("--threshold-mb", type=float, default=16)
+    args = parser.parse_args()
+
+    print(f"{'mode':>10}  {'heap MiB':>9}  {'spill s':>8}  {'iterate s':>9}  {'index us':>8}")
+    for mode, threshold in (("in-memory", None), ("spilled", int(args.threshold_mb * 1024 * 1024))):
+        result = measure(args.records, threshold)
+        print(
+            f"{mode:>10}  {result['retained_mb']:>9.1f}  {result['spill_s']:>8.2f}  "
+            f"{result['iterate_s']:>9.2f}  {result['index_us']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Throughput benchmark for the SQLite task store.
+
+Runs the loop test workflow with the mock LLM once to get the record of a
+realistic finished task, then puts copies of it under new task IDs into a
+SQLite task store as fast as possible, or at a fixed rate, for several batch
+sizes. Reports the sustained number of tasks written per second, the time `put`
+blocks the event loop and the size of the database per task.
+
+Usage:
+    python benchmarks/task_store_throughput.py [--tasks 20000] [--items 20] [--batch-sizes 1 32 256] [--rate 0]
+"""
+import argparse
+import asyncio
+import copy
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.application import WorkflowTaskRegistry
+from src.domain.__tests__.schemas.loop import loop_schema
+from src.domain.container import WorkflowRuntimeContainer
+from src.infrastructure.task_store import SQLiteTaskStore
+from src.interface import IEngine, TaskStoreEntry
+
+
+async def finished_entry(items: int) -> TaskStoreEntry:
+    """
+    Run the loop workflow and get the store entry of the finished task.
+
+    Args:
+        items: The number of loop items.
+
+    Returns:
+        The store entry of the task.
+    """
+    registry = WorkflowTaskRegistry()
+    engine = WorkflowRuntimeContainer.instance().get(IEngine)
+    task = engine.invoke({
+        "schema": copy.deepcopy(loop_schema),
+        "inputs": {
+            "prompt": "How are you?",
+            "system_prompt": "You are a helpful AI assistant.",
+            "tasks": [f"TASK - {i}" for i in range(items)],
+        },
+    })
+    registry.add(task)
+    await task.wait()
+    return (await registry.lookup(task.id)).to_entry()
+
+
+async def measure(entry: TaskStoreEntry, tasks: int, batch_size: int, rate: float) -> Tuple[float, List[float], int]:
+    """
+    Put records into a new store and wait until they are written.
+
+    Args:
+        entry: The store entry to copy.
+        tasks: The number of records.
+        batch_size: The batch size of the store.
+        rate: The number of records put per second, or 0 for as fast as possible.
+
+    Returns:
+        The tasks written per second, the duration of every put in microseconds,
+        and the size of the database in bytes.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.db")
+        store = SQLiteTaskStore(path, batch_size=batch_size)
+        put_us = []
+        started_at = time.perf_counter()
+        for i in range(tasks):
+            record = {**entry, "taskID": f"task-{i}", "finishedAt": time.time()}
+            put_started_at = time.perf_counter()
+            store.put(record)
+            put_us.append((time.perf_counter() - put_started_at) * 1e6)
+            if rate:
+                await asyncio.sleep(max(0.0, started_at + (i + 1) / rate - time.perf_counter()))
+            elif i % 1000 == 999:
+                # Yield like a busy server would between requests
+                await asyncio.sleep(0)
+        await store.flush()
+        elapsed = time.perf_counter() - started_at
+        store.close()
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+    return tasks / elapsed, put_us, size
+
+
+async def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 256])
+    parser.add_argument("--rate", type=float, default=0, help="records put per second, 0 for as fast as possible")
+    args = parser.parse_args()
+
+    entry = await finished_entry(args.items)
+    print(f"report {len(entry['report'])} bytes compressed, {args.tasks} tasks")
+    print(f"{'batch':>6}  {'tasks/s':>9}  {'put p50 us':>10}  {'put p99 us':>10}  {'put max us':>10}  {'db B/task':>9}")
+    for batch_size in args.batch_sizes:
+        tasks_per_second, put_us, size = await measure(entry, args.tasks, batch_size, args.rate)
+        put_us.sort()
+        print(
+            f"{batch_size:>6}  {tasks_per_second:>9.0f}  {statistics.median(put_us):>10.1f}  "
+            f"{put_us[int(len(put_us) * 0.99)]:>10.1f}  {put_us[-1]:>10.1f}  {size / args.tasks:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Microbenchmark for variable lookups through nested scopes.
+
+Builds a chain of variable stores, like the sub-contexts of nested loops, and
+measures the cost of resolving a reference at scope depths 1, 3 and 10. The
+variable is either defined in the innermost scope (a loop local) or in the
+root scope (a workflow input read from inside the loop body).
+
+Usage:
+    python benchmarks/variable_lookup.py [--iterations 200000] [--depths 1 3 10]
+"""
+import argparse
+import os
+import sys
+import timeit
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domain.state import WorkflowRuntimeState
+from src.domain.variable import WorkflowRuntimeVariableStore
+
+
+def build_chain(depth: int) -> List[WorkflowRuntimeVariableStore]:
+    """
+    Build a chain of variable stores.
+
+    Args:
+        depth: The number of scopes, including the root scope.
+
+    Returns:
+        The stores from the root to the innermost scope.
+    """
+    stores = [WorkflowRuntimeVariableStore()]
+    stores[0].init()
+    stores[0].set_variable({"nodeID": "start_0", "key": "query", "value": "hello", "type": "string"})
+    for level in range(1, depth):
+        store = WorkflowRuntimeVariableStore()
+        store.set_parent(stores[-1])
+        store.init()
+        # Every scope holds a few locals of its own, like a loop iteration
+        store.set_variable({"nodeID": f"loop_{level}_locals", "key": "item", "value": level, "type": "integer"})
+        store.set_variable({"nodeID": f"loop_{level}_locals", "key": "index", "value": level, "type": "integer"})
+        stores.append(store)
+    stores[-1].set_variable({"nodeID": "inner_locals", "key": "item", "value": "local", "type": "string"})
+    return stores
+
+
+def measure(func: Callable[[], object], iterations: int) -> float:
+    """
+    Measure the mean cost of a call.
+
+    Args:
+        func: The call to measure.
+        iterations: The number of calls per run.
+
+    Returns:
+        The best mean cost over several runs, in nanoseconds.
+    """
+    return min(timeit.repeat(func, number=iterations, repeat=5)) / iterations * 1e9
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 3, 10])
+    args = parser.parse_args()
+
+    print(f"{'depth':>5}  {'variable':>8}  {'lookup':>10}  {'has+get':>10}  {'parse_ref':>10}  (ns/op)")
+    for depth in args.depths:
+        store = build_chain(depth)[-1]
+        state = WorkflowRuntimeState(store)
+        for label, node_id, key in (("inner", "inner_locals", "item"), ("root", "start_0", "query")):
+            ref = {"type": "ref", "content": [node_id, key]}
+            lookup_ns = measure(lambda: store.lookup(key, node_id), args.iterations)
+            has_get_ns = measure(
+                lambda: store.has_variable(key, node_id) and store.get_variable(key, node_id),
+                args.iterations
+            )
+            parse_ref_ns = measure(lambda: state.parse_ref(ref), args.iterations)
+            print(f"{depth:>5}  {label:>8}  {lookup_ns:>10.0f}  {has_get_ns:>10.0f}  {parse_ref_ns:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import logging
 import os
 import sys
 import asyncio
+import tempfile
 
 # 添加当前目录到 Python 路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -16,17 +17,30 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 def main():
+    # 工作进程数，多个工作进程通过任务存储共享任务
+    workers = int(os.environ.get("WORKERS", "1"))
+    if workers > 1 and not os.environ.get("TASK_STORE_PATH"):
+        # 默认的任务存储只在本次运行中共享，启动时删除上次运行留下的数据库
+        path = os.path.join(tempfile.gettempdir(), "flowgram-tasks.db")
+        for stale in (path, f"{path}-wal", f"{path}-shm"):
+            if os.path.exists(stale):
+                os.remove(stale)
+        os.environ["TASK_STORE_PATH"] = path
+    
     logger.info("FlowGram Python Runtime")
     logger.info("API server: http://0.0.0.0:4000")
     logger.info("Swagger UI: http://0.0.0.0:4000/docs")
     logger.info("ReDoc: http://0.0.0.0:4000/redoc")
+    if workers > 1:
+        logger.info(f"Workers: {workers}, task store: {os.environ['TASK_STORE_PATH']}")
     
     # 启动 uvicorn 服务器
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",  # 监听所有网络接口
         port=4000,       # 在端口 4000 上运行
-        reload=True,     # 启用热重载（开发模式）
+        reload=workers == 1,  # 单进程时启用热重载（开发模式），热重载不支持多个工作进程
+        workers=workers,
         log_level="info",
     )
 
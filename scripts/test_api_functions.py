@@ -4,12 +4,12 @@ Test API functions with a complete workflow.
 import asyncio
 import json
 import logging
-import time
 from typing import Dict, Any, Optional
 
 from src.api.task_run_api import TaskRunAPI
 from src.api.task_result_api import TaskResultAPI
 from src.api.task_report_api import TaskReportAPI
+from src.api.task_events_api import TaskEventsAPI
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s:%(filename)s:%(lineno)d %(message)s')
@@ -194,30 +194,28 @@ async def test_task_result_api(task_id: str):
         return False
 
 async def wait_for_workflow_completion(task_id: str, timeout: int = 30):
-    """等待工作流执行完成"""
-    start_time = time.time()
-    
-    while time.time() - start_time < timeout:
-        input_data = {"taskID": task_id}
-        report = await TaskReportAPI(input_data)
-        
-        if not report:
-            await asyncio.sleep(1)
-            continue
-            
-        workflow_status = report.get("workflowStatus", {})
-        status = workflow_status.get("status")
-        terminated = workflow_status.get("terminated")
-        
-        if terminated:
-            logger.info(f"工作流执行完成，状态: {status}")
-            return True
-            
-        logger.info(f"工作流正在执行中，状态: {status}，继续等待...")
-        await asyncio.sleep(1)
-    
-    logger.error(f"等待工作流执行超时，已等待{timeout}秒")
-    return False
+    """等待工作流执行完成，订阅任务事件而不是轮询报告"""
+    subscription = await TaskEventsAPI({"taskID": task_id})
+    if subscription is None:
+        logger.error(f"任务不存在: {task_id}")
+        return False
+
+    async def wait_terminated():
+        async for event in subscription:
+            if event.type == "workflow_terminated":
+                return event.data["status"]
+            logger.info(f"工作流事件: {event.type} {event.data.get('nodeID', '')}")
+        return None
+
+    try:
+        status = await asyncio.wait_for(wait_terminated(), timeout)
+    except asyncio.TimeoutError:
+        logger.error(f"等待工作流执行超时，已等待{timeout}秒")
+        return False
+    finally:
+        subscription.close()
+    logger.info(f"工作流执行完成，状态: {status}")
+    return True
 
 async def main():
     """主函数"""
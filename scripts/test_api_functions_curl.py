@@ -4,11 +4,11 @@ Test API functions with curl-like requests.
 import asyncio
 import json
 import logging
-import time
 from typing import Dict, Any, Optional
 
 from src.api.task_run_api import TaskRunAPI
 from src.api.task_report_api import TaskReportAPI
+from src.api.task_events_api import TaskEventsAPI
 from src.api.task_result_api import TaskResultAPI
 from src.api.task_cancel_api import TaskCancelAPI
 
@@ -52,7 +52,11 @@ async def test_task_report_api(task_id: str):
     
     try:
         # Wait for the task to complete
-        await asyncio.sleep(5)
+        subscription = await TaskEventsAPI({"taskID": task_id})
+        async for event in subscription:
+            if event.type == "workflow_terminated":
+                break
+        subscription.close()
         
         result = await TaskReportAPI(input_data)
         logger.info(f"TaskReportAPI 响应: {json.dumps(result, indent=2)}")
@@ -4,11 +4,11 @@ Test API functions with the fixed TaskReport API.
 import asyncio
 import json
 import logging
-import time
 from typing import Dict, Any, Optional
 
 from src.api.task_run_api import TaskRunAPI
 from src.api.task_report_api import TaskReportAPI
+from src.api.task_events_api import TaskEventsAPI
 from src.api.task_result_api import TaskResultAPI
 
 # Configure logging
@@ -41,7 +41,11 @@ async def test_api_functions():
         
         # Wait for the workflow to complete
         logger.info("等待工作流执行完成...")
-        await asyncio.sleep(5)
+        subscription = await TaskEventsAPI({"taskID": task_id})
+        async for event in subscription:
+            if event.type == "workflow_terminated":
+                break
+        subscription.close()
         
         # Test TaskReportAPI
         logger.info(f"测试 TaskReportAPI, taskID: {task_id}...")
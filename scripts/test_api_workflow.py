@@ -5,12 +5,12 @@ This script tests the TaskRun, TaskReport, and TaskResult API functions.
 import asyncio
 import json
 import logging
-import time
 from typing import Dict, Any
 
 from src.application.workflow_application import WorkflowApplication
 from src.api.task_run_api import TaskRunAPI
 from src.api.task_report_api import TaskReportAPI
+from src.api.task_events_api import TaskEventsAPI
 from src.api.task_result_api import TaskResultAPI
 
 # Configure logging
@@ -121,7 +121,11 @@ async def test_workflow_api():
     
     # Step 2: Wait a bit for the workflow to complete
     logger.info("Step 2: Waiting for workflow to complete...")
-    await asyncio.sleep(5)  # Wait 5 seconds for the workflow to complete
+    subscription = await TaskEventsAPI({"taskID": task_id})
+    async for event in subscription:
+        if event.type == "workflow_terminated":
+            break
+    subscription.close()
     
     # Step 3: Get the workflow report using TaskReportAPI
     logger.info("Step 3: Getting workflow report using TaskReportAPI...")
@@ -5,10 +5,19 @@ import json
 import asyncio
 from runtime_py_core.src.interface import WorkflowStatus
 from runtime_py_core.src.application import WorkflowApplication
+from runtime_py_core.src.api import TaskEventsAPI
 
 def print_section(title):
     print(f"\n{'='*10} {title} {'='*10}")
 
+async def wait_terminated(task_id):
+    """等待任务的 workflow_terminated 事件"""
+    subscription = await TaskEventsAPI({"taskID": task_id})
+    async for event in subscription:
+        if event.type == "workflow_terminated":
+            break
+    subscription.close()
+
 async def main():
     # 定义一个简单的工作流，包含条件节点和数组类型
     schema = {
@@ -161,7 +170,7 @@ async def main():
     })
     
     # 等待任务完成
-    await asyncio.sleep(1)
+    await wait_terminated(task_id_empty)
     
     # 获取报告
     report_empty = app.report(task_id_empty)
@@ -178,7 +187,7 @@ async def main():
     })
     
     # 等待任务完成
-    await asyncio.sleep(1)
+    await wait_terminated(task_id_not_empty)
     
     # 获取报告
     report_not_empty = app.report(task_id_not_empty)
@@ -328,7 +337,7 @@ async def main():
     })
     
     # 等待任务完成
-    await asyncio.sleep(1)
+    await wait_terminated(task_id_complex_empty)
     
     # 获取报告
     report_complex_empty = app.report(task_id_complex_empty)
@@ -353,7 +362,7 @@ async def main():
     })
     
     # 等待任务完成
-    await asyncio.sleep(1)
+    await wait_terminated(task_id_complex_not_empty)
     
     # 获取报告
     report_complex_not_empty = app.report(task_id_complex_not_empty)
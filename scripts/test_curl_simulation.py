@@ -4,9 +4,9 @@
 import asyncio
 import json
 import logging
-import time
 from src.api.task_run_api import TaskRunAPI
 from src.api.task_report_api import TaskReportAPI
+from src.api.task_events_api import TaskEventsAPI
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -137,9 +137,13 @@ async def test_curl_scenario():
     task_id = task_run_result["taskID"]
     logger.info(f"TaskRunAPI 执行成功，taskID: {task_id}")
     
-    # 步骤2：等待5秒，让工作流有时间执行
-    logger.info("等待5秒...")
-    await asyncio.sleep(5)
+    # 步骤2：订阅任务事件，等待工作流执行结束，相当于curl --no-buffer 'http://localhost:4000/api/task/events?taskID=xxx'
+    logger.info("等待工作流执行结束...")
+    subscription = await TaskEventsAPI({"taskID": task_id})
+    async for event in subscription:
+        if event.type == "workflow_terminated":
+            break
+    subscription.close()
     
     # 步骤3：执行TaskReportAPI，相当于curl --location 'http://localhost:4000/api/task/report?taskID=xxx'
     task_report_input = {
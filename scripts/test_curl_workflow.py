@@ -4,11 +4,11 @@ Test script to simulate the curl workflow and verify the TaskReport API response
 import json
 import asyncio
 import logging
-import time
 from typing import Dict, Any
 
 from src.api.task_run_api import TaskRunAPI
 from src.api.task_report_api import TaskReportAPI
+from src.api.task_events_api import TaskEventsAPI
 from src.api.task_result_api import TaskResultAPI
 
 # Configure logging
@@ -35,9 +35,13 @@ async def run_workflow_test():
         task_id = task_run_result["taskID"]
         logger.info(f"Task started with ID: {task_id}")
         
-        # Step 2: Wait for 5 seconds (as per requirements)
-        logger.info("Waiting for 5 seconds...")
-        await asyncio.sleep(5)
+        # Step 2: Wait for the workflow to terminate
+        logger.info("Waiting for the workflow to terminate...")
+        subscription = await TaskEventsAPI({"taskID": task_id})
+        async for event in subscription:
+            if event.type == "workflow_terminated":
+                break
+        subscription.close()
         
         # Step 3: Get the task report
         logger.info(f"Getting task report for task ID: {task_id}")
@@ -9,8 +9,9 @@ sys.path.append(current_dir)
 
 # 导入 WorkflowApplication
 from src.application.workflow_application import WorkflowApplication
+from src.api.task_events_api import TaskEventsAPI
 
-def test_workflow_application():
+async def test_workflow_application():
     """直接测试 WorkflowApplication"""
     print("测试 WorkflowApplication...")
     
@@ -37,10 +38,13 @@ def test_workflow_application():
         })
         print(f"任务ID: {task_id}")
         
-        # 等待一段时间，让任务有时间执行
+        # 等待任务结束
         print("等待任务执行...")
-        import time
-        time.sleep(2)
+        subscription = await TaskEventsAPI({"taskID": task_id})
+        async for event in subscription:
+            if event.type == "workflow_terminated":
+                break
+        subscription.close()
         
         # 获取任务结果
         result = app.result(task_id)
@@ -60,11 +64,5 @@ def test_workflow_application():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    # 确保有事件循环可用
-    try:
-        asyncio.get_event_loop()
-    except RuntimeError:
-        asyncio.set_event_loop(asyncio.new_event_loop())
-    
     # 运行测试
-    test_workflow_application()
\ No newline at end of file
+    asyncio.run(test_workflow_application())
\ No newline at end of file
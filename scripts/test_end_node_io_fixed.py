@@ -82,10 +82,13 @@ async def test_end_node_io():
     logger.info(f"Task ID: {task.id}")
     logger.info(f"Initial workflow status: {context.status_center.workflow.status}")
 
-    # Wait for the workflow to complete
-    while not context.status_center.workflow.terminated:
-        logger.info("Waiting for workflow to complete...")
-        await asyncio.sleep(0.1)
+    # Wait for the workflow_terminated event
+    subscription = context.event_bus.subscribe()
+    async for event in subscription:
+        if event.type == "workflow_terminated":
+            break
+        logger.info(f"Workflow event: {event.type} {event.data.get('nodeID', '')}")
+    subscription.close()
 
     # Log the final status
     logger.info(f"Final workflow status: {context.status_center.workflow.status}")
@@ -4,7 +4,6 @@
 import os
 import sys
 import json
-import time
 import asyncio
 import requests
 from typing import Dict, Any, Optional
@@ -15,6 +14,7 @@ sys.path.append(os.path.abspath('runtime-py-core'))
 # 直接使用API函数进行测试
 from src.api.task_run_api import TaskRunAPI
 from src.api.task_report_api import TaskReportAPI
+from src.api.task_events_api import TaskEventsAPI
 from src.api.task_result_api import TaskResultAPI
 
 # 测试数据 - 与curl命令中使用的相同
@@ -43,22 +43,28 @@ async def test_direct_api_calls():
     initial_status = initial_report.get("workflowStatus", {}).get("status", "unknown")
     print(f"初始状态: {initial_status}")
     
-    # 等待工作流执行完成
+    # 订阅任务事件，等待工作流结束事件而不是轮询报告
     print("等待工作流执行完成...")
-    max_attempts = 10
     final_status = None
-    
-    for i in range(max_attempts):
-        await asyncio.sleep(1)  # 等待1秒
+    subscription = await TaskEventsAPI({"taskID": task_id})
+    try:
+        async def wait_terminated():
+            async for event in subscription:
+                print(f"事件: {event.type} {event.data.get('nodeID', '')}")
+                if event.type == "workflow_terminated":
+                    return event.data["status"]
+            return None
+
+        final_status = await asyncio.wait_for(wait_terminated(), 10)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        subscription.close()
+
+    if final_status:
         report = await TaskReportAPI({"taskID": task_id})
-        status = report.get("workflowStatus", {}).get("status", "unknown")
-        print(f"检查 #{i+1}: 状态 = {status}")
-        
-        if status in ["succeeded", "failed", "cancelled", "Success", "Failed", "Cancelled", "Succeeded"]:
-            final_status = status
-            print(f"工作流已完成，最终状态: {final_status}")
-            print(f"完整报告: {json.dumps(report, indent=2)}")
-            break
+        print(f"工作流已完成，最终状态: {final_status}")
+        print(f"完整报告: {json.dumps(report, indent=2)}")
     
     # 验证状态是否已更新
     if final_status:
@@ -102,24 +108,23 @@ def simulate_curl_requests():
     task_id = task_run_result["taskID"]
     print(f"工作流任务已启动，taskID: {task_id}")
     
-    # 等待工作流执行完成
-    max_attempts = 10
+    # 订阅任务事件流（Server-Sent Events），等待工作流结束事件
     final_status = None
-    
-    for i in range(max_attempts):
-        time.sleep(1)  # 等待1秒
-        
+    with requests.get(f'http://localhost:4000/api/task/events?taskID={task_id}', stream=True, timeout=10) as events_response:
+        event_type = None
+        for line in events_response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event_type = line[len("event: "):]
+            elif line.startswith("data: ") and event_type == "workflow_terminated":
+                final_status = json.loads(line[len("data: "):])["status"]
+                break
+
+    if final_status:
         # TaskReport请求
         report_response = requests.get(f'http://localhost:4000/api/task/report?taskID={task_id}')
         report = report_response.json()
-        status = report.get("workflowStatus", {}).get("status", "unknown")
-        print(f"检查 #{i+1}: 状态 = {status}")
-        
-        if status in ["succeeded", "failed", "cancelled", "Success", "Failed", "Cancelled", "Succeeded"]:
-            final_status = status
-            print(f"工作流已完成，最终状态: {final_status}")
-            print(f"完整报告: {json.dumps(report, indent=2)}")
-            break
+        print(f"工作流已完成，最终状态: {final_status}")
+        print(f"完整报告: {json.dumps(report, indent=2)}")
     
     # 验证状态是否已更新
     if final_status:
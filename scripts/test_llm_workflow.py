@@ -4,7 +4,6 @@ Test script to verify that the LLM node in the workflow actually makes API calls
 import asyncio
 import json
 import logging
-import time
 from typing import Dict, Any
 
 from src.domain.container import WorkflowRuntimeContainer
@@ -109,17 +108,23 @@ async def run_workflow():
     logger.info(f"Initial workflow status: {context.status_center.workflow.status}")
     
     # Monitor the workflow execution
-    start_time = time.time()
     timeout = 30  # 30 seconds timeout
     
-    while not context.status_center.workflow.terminated:
-        await asyncio.sleep(1)
-        logger.info(f"Current workflow status: {context.status_center.workflow.status}")
-        
-        # Check for timeout
-        if time.time() - start_time > timeout:
-            logger.error("Workflow execution timed out")
-            return
+    subscription = context.event_bus.subscribe()
+
+    async def wait_terminated():
+        async for event in subscription:
+            logger.info(f"Workflow event: {event.type} {event.data.get('nodeID', '')}")
+            if event.type == "workflow_terminated":
+                return
+
+    try:
+        await asyncio.wait_for(wait_terminated(), timeout)
+    except asyncio.TimeoutError:
+        logger.error("Workflow execution timed out")
+        return
+    finally:
+        subscription.close()
     
     # Wait for the processing to complete
     result = await task.processing
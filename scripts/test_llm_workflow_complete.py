@@ -4,7 +4,6 @@ Test script for the complete LLM workflow execution.
 import asyncio
 import json
 import logging
-import time
 from typing import Dict, Any
 
 from src.domain.container import WorkflowRuntimeContainer
@@ -123,15 +122,20 @@ async def test_llm_workflow():
     
     # Wait for the workflow to complete
     logger.info("Waiting for workflow to complete...")
-    start_time = time.time()
     timeout = 30  # seconds
-    
-    while not task.context.status_center.workflow.terminated:
-        await asyncio.sleep(0.5)
-        elapsed = time.time() - start_time
-        if elapsed > timeout:
-            logger.error(f"Workflow execution timed out after {timeout} seconds")
-            break
+    subscription = task.context.event_bus.subscribe()
+
+    async def wait_terminated():
+        async for event in subscription:
+            if event.type == "workflow_terminated":
+                return
+
+    try:
+        await asyncio.wait_for(wait_terminated(), timeout)
+    except asyncio.TimeoutError:
+        logger.error(f"Workflow execution timed out after {timeout} seconds")
+    finally:
+        subscription.close()
             
     # Get the workflow status
     status = task.context.status_center.workflow.status
@@ -6,6 +6,7 @@ import json
 import uuid
 from src.api.task_report_api import TaskReportAPI
 from src.api.task_run_api import TaskRunAPI
+from src.api.task_events_api import TaskEventsAPI
 
 async def test_task_report():
     """Test the TaskReport API functionality."""
@@ -31,8 +32,12 @@ async def test_task_report():
     task_id = task_run_output["taskID"]
     print(f"Task ID: {task_id}")
     
-    # Wait a bit for the task to process
-    await asyncio.sleep(1)
+    # Wait for the task to terminate
+    subscription = await TaskEventsAPI({"taskID": task_id})
+    async for event in subscription:
+        if event.type == "workflow_terminated":
+            break
+    subscription.close()
     
     # Get the task report
     task_report_input = {
@@ -4,7 +4,6 @@ Test script for TaskReportAPI
 import asyncio
 import json
 import logging
-import time
 import uuid
 from typing import Dict, Any
 
@@ -12,7 +11,7 @@ from typing import Dict, Any
 logging.basicConfig(level=logging.INFO)
 
 # 导入必要的模块
-from src.api import TaskRunAPI, TaskReportAPI
+from src.api import TaskRunAPI, TaskReportAPI, TaskEventsAPI
 from src.domain.report.workflow_runtime_reporter import WorkflowRuntimeReport
 from src.application.workflow_application import WorkflowApplication
 
@@ -107,7 +106,11 @@ async def test_task_report_api():
     
     # 等待任务执行
     print("等待任务执行...")
-    await asyncio.sleep(1)
+    subscription = await TaskEventsAPI({"taskID": task_id})
+    async for event in subscription:
+        if event.type == "workflow_terminated":
+            break
+    subscription.close()
     
     # 获取任务报告
     print("获取任务报告...")
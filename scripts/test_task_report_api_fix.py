@@ -4,6 +4,7 @@ import logging
 import sys
 from src.api.task_run_api import TaskRunAPI
 from src.api.task_report_api import TaskReportAPI
+from src.api.task_events_api import TaskEventsAPI
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -31,11 +32,15 @@ async def test_task_report_api():
     report_output = await TaskReportAPI(report_input)
     print(f"TaskReportAPI 响应: {json.dumps(report_output, indent=4, ensure_ascii=False)}")
     
-    # 等待一段时间后再次测试 TaskReportAPI
-    print("等待3秒后再次测试 TaskReportAPI...")
-    await asyncio.sleep(3)
+    # 工作流结束后再次测试 TaskReportAPI
+    print("等待工作流结束后再次测试 TaskReportAPI...")
+    subscription = await TaskEventsAPI({"taskID": task_id})
+    async for event in subscription:
+        if event.type == "workflow_terminated":
+            break
+    subscription.close()
     report_output = await TaskReportAPI(report_input)
-    print(f"3秒后 TaskReportAPI 响应: {json.dumps(report_output, indent=4, ensure_ascii=False)}")
+    print(f"工作流结束后 TaskReportAPI 响应: {json.dumps(report_output, indent=4, ensure_ascii=False)}")
 
 if __name__ == "__main__":
     asyncio.run(test_task_report_api())
\ No newline at end of file
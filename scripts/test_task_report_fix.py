@@ -1,7 +1,6 @@
 import os
 import sys
 import json
-import time
 import asyncio
 from typing import Dict, Any
 
@@ -10,6 +9,7 @@ sys.path.append(os.path.abspath('runtime-py-core'))
 
 from src.api.task_run_api import TaskRunAPI
 from src.api.task_report_api import TaskReportAPI
+from src.api.task_events_api import TaskEventsAPI
 from src.interface.schema import WorkflowStatus
 
 async def test_task_report_status_update():
@@ -39,23 +39,28 @@ async def test_task_report_status_update():
     initial_status = initial_report.get("workflowStatus", {}).get("status", "unknown")
     print(f"初始状态: {initial_status}")
     
-    # 等待一段时间让工作流执行完成
+    # 订阅任务事件，等待工作流结束事件而不是轮询报告
     print("等待工作流执行完成...")
-    max_attempts = 10
     final_status = None
-    
-    for i in range(max_attempts):
-        await asyncio.sleep(1)  # 等待1秒
+    subscription = await TaskEventsAPI({"taskID": task_id})
+    try:
+        async def wait_terminated():
+            async for event in subscription:
+                print(f"事件: {event.type} {event.data.get('nodeID', '')}")
+                if event.type == "workflow_terminated":
+                    return event.data["status"]
+            return None
+
+        final_status = await asyncio.wait_for(wait_terminated(), 10)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        subscription.close()
+
+    if final_status:
         report = await TaskReportAPI({"taskID": task_id})
-        status = report.get("workflowStatus", {}).get("status", "unknown")
-        print(f"检查 #{i+1}: 状态 = {status}")
-        print(f"报告内容: {json.dumps(report, indent=2)}")
-        
-        if status in ["succeeded", "failed", "cancelled", "Success", "Failed", "Cancelled", "Succeeded"]:
-            final_status = status
-            print(f"工作流已完成，最终状态: {final_status}")
-            print(f"完整报告: {json.dumps(report, indent=2)}")
-            break
+        print(f"工作流已完成，最终状态: {final_status}")
+        print(f"完整报告: {json.dumps(report, indent=2)}")
     
     # 验证状态是否已更新
     if final_status:
@@ -4,9 +4,9 @@ Test script for TaskReport API functionality with longer wait times.
 import asyncio
 import json
 import uuid
-import time
 from src.api.task_report_api import TaskReportAPI
 from src.api.task_run_api import TaskRunAPI
+from src.api.task_events_api import TaskEventsAPI
 
 async def test_task_report():
     """Test the TaskReport API functionality with longer wait times."""
@@ -32,34 +32,28 @@ async def test_task_report():
     task_id = task_run_output["taskID"]
     print(f"任务 ID: {task_id}")
     
-    # Wait longer for the task to process (5 seconds)
+    # Wait for the task to terminate
     print("等待任务处理完成...")
-    await asyncio.sleep(5)
+    subscription = await TaskEventsAPI({"taskID": task_id})
+    async for event in subscription:
+        if event.type == "workflow_terminated":
+            break
+    subscription.close()
     
     # Get the task report
     task_report_input = {
         "taskID": task_id
     }
     
-    # Try multiple times to get a complete report
-    max_attempts = 3
-    for attempt in range(max_attempts):
-        print(f"尝试获取报告 (尝试 {attempt+1}/{max_attempts})...")
-        report = await TaskReportAPI(task_report_input)
-        
-        # Print the report in a formatted way
-        print("\n任务报告:")
-        print(json.dumps(report, indent=2))
-        
-        # Check if we have node reports
-        if report and report.get("reports") and len(report["reports"]) > 0:
-            print(f"找到 {len(report['reports'])} 个节点报告")
-            break
-        
-        # If not, wait and try again
-        if attempt < max_attempts - 1:
-            print("报告中没有节点信息，等待更长时间...")
-            await asyncio.sleep(3)
+    # The task has terminated, so its report is complete
+    report = await TaskReportAPI(task_report_input)
+    
+    # Print the report in a formatted way
+    print("\n任务报告:")
+    print(json.dumps(report, indent=2))
+    
+    if report and report.get("reports"):
+        print(f"找到 {len(report['reports'])} 个节点报告")
     
     # Verify the report structure
     if report:
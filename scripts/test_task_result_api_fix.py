@@ -3,12 +3,12 @@ Test script to verify and fix the TaskResultAPI issue.
 """
 import asyncio
 import logging
-import time
 from typing import Dict, Any
 
 from src.api.task_run_api import TaskRunAPI
 from src.api.task_result_api import TaskResultAPI
 from src.api.task_report_api import TaskReportAPI
+from src.api.task_events_api import TaskEventsAPI
 from src.domain.task.workflow_runtime_task import WorkflowRuntimeTask
 from src.interface.schema import WorkflowStatus
 
@@ -107,26 +107,24 @@ async def test_task_result_api():
     task_id = task_run_output["taskID"]
     logger.info(f"TaskRunAPI succeeded, taskID: {task_id}")
     
-    # Step 2: Wait for the workflow to complete (with timeout)
+    # Step 2: Wait for the workflow_terminated event (with timeout)
     max_wait_time = 30  # seconds
-    wait_interval = 0.5  # seconds
-    total_waited = 0
-    
-    while total_waited < max_wait_time:
-        # Check task status using TaskReportAPI
-        task_report_input = {"taskID": task_id}
-        report = await TaskReportAPI(task_report_input)
-        
-        if report and report.get("workflowStatus", {}).get("terminated", False):
-            logger.info(f"Workflow terminated with status: {report.get('workflowStatus', {}).get('status', 'unknown')}")
-            break
-            
-        logger.info(f"Waiting for workflow to complete... ({total_waited}s)")
-        await asyncio.sleep(wait_interval)
-        total_waited += wait_interval
-    
-    if total_waited >= max_wait_time:
+    subscription = await TaskEventsAPI({"taskID": task_id})
+
+    async def wait_terminated():
+        async for event in subscription:
+            if event.type == "workflow_terminated":
+                logger.info(f"Workflow terminated with status: {event.data['status']}")
+                return
+            logger.info(f"Workflow event: {event.type} {event.data.get('nodeID', '')}")
+
+    try:
+        await asyncio.wait_for(wait_terminated(), max_wait_time)
+    except asyncio.TimeoutError:
         logger.warning("Timeout waiting for workflow to complete")
+    finally:
+        subscription.close()
+    task_report_input = {"taskID": task_id}
     
     # Step 3: Get the task result using TaskResultAPI
     task_result_input = {"taskID": task_id}
@@ -4,12 +4,12 @@ Debug the TaskResultAPI issue.
 import asyncio
 import json
 import logging
-import time
 from typing import Dict, Any, Optional
 
 from src.api.task_run_api import TaskRunAPI
 from src.api.task_report_api import TaskReportAPI
 from src.api.task_result_api import TaskResultAPI
+from src.api.task_events_api import TaskEventsAPI
 from src.application.workflow_application import WorkflowApplication
 from src.interface.engine import IEngine
 from src.domain.container import WorkflowRuntimeContainer
@@ -47,13 +47,22 @@ async def test_task_result_debug():
         task = app.tasks.get(task_id)
         
         if task:
-            # Wait for the workflow to complete
+            # Wait for the workflow_terminated event
             logger.info("等待工作流执行完成...")
-            start_time = time.time()
             timeout = 10  # 10 seconds timeout
+            subscription = await TaskEventsAPI({"taskID": task_id})
             
-            while not task.context.status_center.workflow.terminated and time.time() - start_time < timeout:
-                await asyncio.sleep(0.1)
+            async def wait_terminated():
+                async for event in subscription:
+                    if event.type == "workflow_terminated":
+                        return
+            
+            try:
+                await asyncio.wait_for(wait_terminated(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                subscription.close()
             
             # Check if workflow is terminated
             if task.context.status_center.workflow.terminated:
@@ -3,8 +3,8 @@ Test script to verify the fix for the TaskReport API always returning 'processin
 """
 import asyncio
 import json
-import time
 from src.application.workflow_application import WorkflowApplication
+from src.api.task_events_api import TaskEventsAPI
 from src.interface.schema import WorkflowStatus
 
 # Test workflow schema - a simple workflow with start and end nodes
@@ -64,8 +64,12 @@ async def test_task_status_update():
     
     print(f"Task created with ID: {task_id}")
     
-    # Wait a bit for the workflow to complete
-    await asyncio.sleep(0.5)
+    # Wait for the workflow_terminated event
+    subscription = await TaskEventsAPI({"taskID": task_id})
+    async for event in subscription:
+        if event.type == "workflow_terminated":
+            break
+    subscription.close()
     
     # Get the task report
     report = app.report(task_id)
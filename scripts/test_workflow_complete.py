@@ -12,6 +12,7 @@ from src.application.workflow_application import WorkflowApplication
 from src.api.task_run_api import TaskRunAPI
 from src.api.task_result_api import TaskResultAPI
 from src.api.task_report_api import TaskReportAPI
+from src.api.task_events_api import TaskEventsAPI
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -123,24 +124,22 @@ async def test_workflow_execution():
     # Wait for the task to complete
     logger.info("Waiting for task to complete...")
     max_wait_seconds = 10
-    wait_interval_seconds = 0.5
-    elapsed_seconds = 0
-    
-    while elapsed_seconds < max_wait_seconds:
-        # Check task report
-        task_report_input = {"taskID": task_id}
-        report = await TaskReportAPI(task_report_input)
-        
-        if report and "workflowStatus" in report:
-            status = report["workflowStatus"].get("status")
-            logger.info(f"Current workflow status: {status}")
-            
-            if status in [WorkflowStatus.Success, WorkflowStatus.Failed, WorkflowStatus.Cancelled]:
+    subscription = await TaskEventsAPI({"taskID": task_id})
+
+    async def wait_terminated():
+        async for event in subscription:
+            logger.info(f"Workflow event: {event.type} {event.data.get('nodeID', '')}")
+            if event.type == "workflow_terminated":
                 logger.info("Task completed")
-                break
-        
-        await asyncio.sleep(wait_interval_seconds)
-        elapsed_seconds += wait_interval_seconds
+                return
+
+    try:
+        await asyncio.wait_for(wait_terminated(), max_wait_seconds)
+    except asyncio.TimeoutError:
+        logger.warning("Timeout waiting for task to complete")
+    finally:
+        subscription.close()
+    task_report_input = {"taskID": task_id}
     
     # Get task result
     logger.info("Getting task result...")
@@ -76,9 +76,9 @@ async def test_workflow_task_async():
     logger.info(f"Initial task status: {task.status}")
     logger.info(f"Initial workflow status: {context.status_center.workflow.status}")
     
-    # Wait a bit to allow processing to complete
+    # Wait for processing to complete
     logger.info("Waiting for processing to complete...")
-    await asyncio.sleep(2)
+    await task.wait(5)
     
     # Check final status
     logger.info(f"Final task status: {task.status}")
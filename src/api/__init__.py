@@ -9,8 +9,11 @@ from .task_run_api import TaskRunAPI
 from .task_result_api import TaskResultAPI
 from .task_report_api import TaskReportAPI
 from .task_cancel_api import TaskCancelAPI
+from .task_events_api import TaskEventsAPI
+from .llm_metrics_api import LLMMetricsAPI
+from .task_metrics_api import TaskMetricsAPI
 
-__all__ = ['TaskRunAPI', 'TaskResultAPI', 'TaskReportAPI', 'TaskCancelAPI', 'WorkflowRuntimeAPIs']
+__all__ = ['TaskRunAPI', 'TaskResultAPI', 'TaskReportAPI', 'TaskCancelAPI', 'TaskEventsAPI', 'LLMMetricsAPI', 'TaskMetricsAPI', 'WorkflowRuntimeAPIs']
 
 # Dictionary mapping API names to API functions
 WorkflowRuntimeAPIs: Dict[FlowGramAPIName, Callable[[Any], Any]] = {
@@ -18,6 +21,9 @@ WorkflowRuntimeAPIs: Dict[FlowGramAPIName, Callable[[Any], Any]] = {
     FlowGramAPIName.TaskReport: TaskReportAPI,
     FlowGramAPIName.TaskResult: TaskResultAPI,
     FlowGramAPIName.TaskCancel: TaskCancelAPI,
+    FlowGramAPIName.TaskEvents: TaskEventsAPI,
+    FlowGramAPIName.LLMMetrics: LLMMetricsAPI,
+    FlowGramAPIName.TaskMetrics: TaskMetricsAPI,
     FlowGramAPIName.ServerInfo: lambda _: None,  # TODO
     FlowGramAPIName.Validation: lambda _: None,  # TODO
 }
\ No newline at end of file
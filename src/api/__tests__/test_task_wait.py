@@ -0,0 +1,153 @@
+"""
+Tests for waiting on tasks in the API functions.
+This module contains tests for the long-polling task result API, the
+synchronous task run API and the admission of submitted workflows.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from ...domain.__tests__.schemas.basic import basic_schema
+from ...nodes.llm.mock_llm import MockChatOpenAI
+from ...application.workflow_application import WorkflowApplication
+from ...application.admission_controller import WorkflowAdmissionController, WorkflowAdmissionError
+from ...application.task_registry import WorkflowTaskRegistry
+from ...infrastructure.task_store import SQLiteTaskStore
+from ..task_run_api import TaskRunAPI
+from ..task_result_api import TaskResultAPI
+
+RUN_INPUT = {
+    "schema": json.dumps(basic_schema),
+    "inputs": {
+        "model_name": "ai-model",
+        "llm_settings": {"temperature": 0.5},
+        "prompt": "How are you?",
+    },
+}
+
+
+class TestTaskWait(unittest.IsolatedAsyncioTestCase):
+    """Test cases for waiting on tasks."""
+
+    async def asyncSetUp(self):
+        """Hold every mock LLM call until the test releases it."""
+        self.release = asyncio.Event()
+        ainvoke = MockChatOpenAI.ainvoke
+        release = self.release
+
+        async def gated_ainvoke(model, messages):
+            await release.wait()
+            return await ainvoke(model, messages)
+
+        patcher = patch.object(MockChatOpenAI, "ainvoke", gated_ainvoke)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def workflow(self, task_id):
+        """Get the workflow status of a task."""
+        return WorkflowApplication.instance().tasks[task_id].context.status_center.workflow
+
+    async def test_result_waits_for_task(self):
+        """Test that the result API with wait returns once the task has terminated."""
+        task_id = (await TaskRunAPI(RUN_INPUT))["taskID"]
+        asyncio.get_running_loop().call_later(0.05, self.release.set)
+
+        result = await TaskResultAPI({"taskID": task_id, "wait": 5000})
+        # The finished task has been compacted into its record
+        self.assertEqual(WorkflowApplication.instance().tasks.record(task_id).status, "succeeded")
+        self.assertEqual(result["llm_prompt"], "How are you?")
+
+    async def test_result_wait_times_out(self):
+        """Test that the result API returns an empty result when the wait expires."""
+        task_id = (await TaskRunAPI(RUN_INPUT))["taskID"]
+
+        self.assertEqual(await TaskResultAPI({"taskID": task_id, "wait": 20}), {})
+        self.assertFalse(self.workflow(task_id).terminated)
+        self.release.set()
+        self.assertTrue(await WorkflowApplication.instance().tasks[task_id].wait(5))
+
+    async def test_sync_run_returns_outputs(self):
+        """Test that a synchronous run returns the status and outputs of the terminated task."""
+        self.release.set()
+        output = await TaskRunAPI({**RUN_INPUT, "sync": True})
+
+        self.assertTrue(output["terminated"])
+        self.assertEqual(output["status"], "succeeded")
+        self.assertEqual(output["outputs"]["llm_prompt"], "How are you?")
+
+    async def test_sync_run_deadline(self):
+        """Test that a synchronous run returns the task ID alone when the deadline expires."""
+        output = await TaskRunAPI({**RUN_INPUT, "sync": True, "wait": 20})
+
+        self.assertEqual(set(output), {"taskID", "terminated"})
+        self.assertFalse(output["terminated"])
+        self.release.set()
+        self.assertTrue(await WorkflowApplication.instance().tasks[output["taskID"]].wait(5))
+
+    async def test_run_is_queued_and_rejected(self):
+        """Test that runs beyond the in-flight limit wait in the queue and are rejected once it is full."""
+        app = WorkflowApplication.instance()
+        admission = app.admission
+        self.addCleanup(setattr, app, "admission", admission)
+        app.admission = WorkflowAdmissionController(max_in_flight=1, max_queued=1)
+
+        first = (await TaskRunAPI(RUN_INPUT))["taskID"]
+        queued = asyncio.create_task(TaskRunAPI(RUN_INPUT))
+        await asyncio.sleep(0)
+        with self.assertRaises(WorkflowAdmissionError) as rejected:
+            await TaskRunAPI(RUN_INPUT)
+        self.assertEqual(rejected.exception.reason, "queueFull")
+        self.assertGreaterEqual(rejected.exception.retry_after, 1)
+        self.assertEqual(app.admission.metrics()["queued"], 1)
+
+        self.release.set()
+        second = (await queued)["taskID"]
+        self.assertTrue(await app.tasks.wait_record(first, 5))
+        self.assertTrue(await app.tasks.wait_record(second, 5))
+        metrics = app.admission.metrics()
+        self.assertEqual(metrics["inFlight"], 0)
+        self.assertEqual(metrics["admitted"], 2)
+        self.assertEqual(metrics["rejections"], {"queueFull": 1, "timeout": 0})
+        self.assertGreater(metrics["maxWaitMs"], 0)
+
+
+    async def test_run_returns_when_the_store_is_locked(self):
+        """Test that a run returns its task ID when the shared store stays locked."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "tasks.db")
+
+        class LockedStore(SQLiteTaskStore):
+            BUSY_TIMEOUT_MS = 10
+            RETRY_BACKOFF_SECONDS = 0.01
+
+        store = LockedStore(path)
+        blocker = sqlite3.connect(path, isolation_level=None)
+        blocker.execute("BEGIN EXCLUSIVE")
+        app = WorkflowApplication.instance()
+        tasks = app.tasks
+        self.addCleanup(setattr, app, "tasks", tasks)
+        app.tasks = WorkflowTaskRegistry(store=store, worker_id="worker-a")
+        app.tasks.PUBLISH_TIMEOUT_SECONDS = 0.1
+
+        started_at = time.perf_counter()
+        task_id = (await TaskRunAPI(RUN_INPUT))["taskID"]
+        self.assertLess(time.perf_counter() - started_at, 2)
+        self.assertGreater(store.metrics()["errors"], 0)
+
+        # The claim is written once the lock is released
+        blocker.execute("ROLLBACK")
+        blocker.close()
+        self.assertTrue(await app.tasks.publish())
+        self.assertEqual(await app.tasks.owner(task_id), "worker-a")
+        self.release.set()
+        self.assertIsNotNone(await app.tasks.wait_record(task_id, 5))
+        store.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+"""
+LLM metrics API implementation.
+This module provides the LLMMetricsAPI function for getting the running LLM usage aggregates.
+"""
+from typing import Any, Dict
+
+from ..nodes.llm.llm_client import LLMClient
+
+
+async def LLMMetricsAPI(input_data: Any = None) -> Dict[str, Any]:
+    """
+    Get the running token usage aggregates of the LLM services.
+    
+    Args:
+        input_data: Unused, kept for a uniform API signature.
+        
+    Returns:
+        The number of requests and tokens used, per model and host.
+    """
+    return {
+        "models": LLMClient.usage_metrics(),
+    }
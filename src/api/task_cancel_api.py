@@ -1,6 +1,9 @@
 """
 Task cancel API implementation.
 This module provides the TaskCancelAPI function for cancelling workflow tasks.
+
+A task running on another worker is cancelled by that worker, which is asked
+through the shared task store and cancels it with its next heartbeat.
 """
 from typing import Dict, Any
 
@@ -23,6 +26,8 @@ async def TaskCancelAPI(input_data: TaskCancelInput) -> Dict[str, bool]:
     
     # Cancel the task
     success = app.cancel(task_id)
+    if not success:
+        success = await app.tasks.request_cancel(task_id)
     
     # Create the output with the success flag
     output = {
@@ -0,0 +1,42 @@
+"""
+Task events API implementation.
+This module provides the TaskEventsAPI function for subscribing to the events of workflow tasks.
+
+Subscribers receive the status changes of a task as they happen instead of
+polling its report. Each event carries the report version after the change,
+which can be passed to the task report API as `since` to fetch the details.
+Subscribers to a task running on another worker receive its final event only.
+"""
+from typing import Optional
+
+from ..interface.schema import TaskEventsInput
+from ..interface.context import IEventSubscription
+from ..application.workflow_application import WorkflowApplication
+from ..application.task_registry import WorkflowRemoteTaskSubscription
+
+
+async def TaskEventsAPI(input_data: TaskEventsInput) -> Optional[IEventSubscription]:
+    """
+    Subscribe to the events of a workflow task.
+    
+    Args:
+        input_data: The input data containing the task ID and an optional buffer size.
+        
+    Returns:
+        The subscription, which must be closed by the caller once it stops reading,
+        or None if the task does not exist or its worker died.
+        
+    Raises:
+        ValueError: If the buffer size is less than 1.
+    """
+    app = WorkflowApplication.instance()
+    task = app.tasks.get(input_data["taskID"])
+    if task is not None:
+        return task.context.event_bus.subscribe(input_data.get("bufferSize"))
+    # A finished task still serves its workflow_terminated event from its record
+    record = await app.tasks.lookup(input_data["taskID"])
+    if record is not None:
+        return record.event_bus.subscribe(input_data.get("bufferSize"))
+    if await app.tasks.owner(input_data["taskID"]) is None:
+        return None
+    return WorkflowRemoteTaskSubscription(app.tasks, input_data["taskID"], input_data.get("bufferSize"))
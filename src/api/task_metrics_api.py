@@ -0,0 +1,23 @@
+"""
+Task metrics API implementation.
+This module provides the TaskMetricsAPI function for getting the metrics of the task registry.
+"""
+from typing import Any, Dict
+
+from ..application.workflow_application import WorkflowApplication
+
+
+async def TaskMetricsAPI(input_data: Any = None) -> Dict[str, Any]:
+    """
+    Get the metrics of the tasks retained by the workflow application.
+    
+    Args:
+        input_data: Unused, kept for a uniform API signature.
+        
+    Returns:
+        The numbers of running and finished tasks, the size of the finished task
+        records, the evictions by the limit they were made for, and the metrics
+        of the admission of submitted workflows.
+    """
+    app = WorkflowApplication.instance()
+    return {**app.tasks.metrics(), "admission": app.admission.metrics()}
@@ -1,14 +1,67 @@
 """
 Task report API implementation.
 This module provides the TaskReportAPI function for getting workflow task reports.
+
+Reports are versioned. Callers that poll pass the version they have as
+`ifNoneMatch` to skip unchanged reports, or as `since` to get only the changes.
+Large reports can be filtered by node, with selected fields and paged snapshots.
+Finished tasks are served from the frozen reporter of their compacted record.
 """
-import json
 import logging
 from typing import Any, Dict, Optional
 
 from ..interface.schema import TaskReportInput
 from ..interface.context import IReport
 from ..application.workflow_application import WorkflowApplication
+from ..infrastructure.utils import to_jsonable
+
+# Node and workflow statuses as reported by the API
+_STATUS_NAMES = {
+    "Success": "succeeded",
+    "Succeeded": "succeeded",
+    "Failure": "failed",
+    "Failed": "failed",
+    "Cancel": "cancelled",
+    "Cancelled": "cancelled",
+}
+
+# Inputs of the task report API that turn the report into a query
+_QUERY_KEYS = ("nodeIDs", "statuses", "types", "fields", "snapshotFields", "cursor", "limit")
+
+
+def _normalize_node_reports(reports: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize the node statuses of node reports to lowercase.
+    
+    The node reports are shared with the cached report and are not modified.
+    
+    Args:
+        reports: The node reports by node ID.
+        
+    Returns:
+        The node reports, copied where a status was normalized.
+    """
+    normalized = {}
+    for node_id, node_report in reports.items():
+        status = _STATUS_NAMES.get(node_report.get("status"))
+        normalized[node_id] = node_report if status is None else {**node_report, "status": status}
+    return normalized
+
+
+def _normalize_workflow_status(workflow_status: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize the workflow status to lowercase.
+    
+    Args:
+        workflow_status: The exported workflow status, which is not modified.
+        
+    Returns:
+        The workflow status, copied if its status was normalized.
+    """
+    status = workflow_status.get("status")
+    # The reporter exports the status enum, whose name is the reported status
+    status = _STATUS_NAMES.get(getattr(status, "name", status))
+    return workflow_status if status is None else {**workflow_status, "status": status}
 
 
 async def TaskReportAPI(input_data: TaskReportInput) -> Dict[str, Any]:
@@ -16,16 +69,80 @@ async def TaskReportAPI(input_data: TaskReportInput) -> Dict[str, Any]:
     Get the report of a workflow task with the given input.
     
     Args:
-        input_data: The input data containing the task ID.
+        input_data: The input data containing the task ID, and optionally the
+            report version the caller already has or the query of the report.
         
     Returns:
-        The report of the workflow task as a dictionary.
+        The report of the workflow task as a dictionary. With `ifNoneMatch` set
+        to the current version, only the ID, the version and `notModified`. With
+        `since`, only the changes since that version. With query inputs, only
+        the matching nodes, fields and snapshots.
+        
+    Raises:
+        ValueError: If `since` is combined with query inputs, or a query input is invalid.
     """
     app = WorkflowApplication.instance()
     task_id = input_data["taskID"]
     
     # Get the task first to ensure we have access to the latest state
     task = app.tasks.get(task_id)
+    record = await app.tasks.lookup(task_id) if task is None else None
+    if record is not None:
+        reporter = record.reporter
+    else:
+        reporter = getattr(getattr(task, "context", None), "reporter", None)
+    
+    if reporter is not None:
+        if_none_match = input_data.get("ifNoneMatch")
+        if if_none_match is not None and if_none_match == reporter.version:
+            return {"id": task_id, "version": reporter.version, "notModified": True}
+        since = input_data.get("since")
+        is_query = any(input_data.get(key) is not None for key in _QUERY_KEYS)
+        if since is not None and is_query:
+            raise ValueError("A report delta cannot be combined with node filters, fields or pagination")
+        if is_query:
+            report = reporter.query(
+                node_ids=input_data.get("nodeIDs"),
+                statuses=input_data.get("statuses"),
+                node_types=input_data.get("types"),
+                fields=input_data.get("fields"),
+                snapshot_fields=input_data.get("snapshotFields"),
+                cursor=input_data.get("cursor"),
+                limit=input_data.get("limit")
+            )
+            report["id"] = task_id
+            report["reports"] = _normalize_node_reports(report["reports"])
+            report["workflowStatus"] = _normalize_workflow_status(report["workflowStatus"])
+            logging.info(f"> TaskReportAPI - task {task_id} query, {len(report['reports'])} nodes")
+            return to_jsonable(report)
+        if since is not None:
+            delta = reporter.export_since(since)
+            delta["id"] = task_id
+            delta["reports"] = _normalize_node_reports(delta["reports"])
+            delta["workflowStatus"] = _normalize_workflow_status(delta["workflowStatus"])
+            logging.info(
+                f"> TaskReportAPI - task {task_id} delta {since}..{delta['version']}, "
+                f"{len(delta['reports'])} nodes changed"
+            )
+            return to_jsonable(delta)
+    
+    if record is not None:
+        report_data = reporter.export()
+        report_dict = {
+            "id": task_id,
+            "inputs": report_data.inputs,
+            "outputs": report_data.outputs,
+            "workflowStatus": _normalize_workflow_status(report_data.workflowStatus),
+            "reports": _normalize_node_reports(report_data.reports),
+            "usage": report_data.usage,
+            "nodeConfigs": report_data.nodeConfigs,
+            "version": report_data.version
+        }
+        logging.info(
+            f"> TaskReportAPI - task {task_id} version {report_dict['version']} from its record, "
+            f"status {report_dict['workflowStatus'].get('status')}, {len(report_dict['reports'])} nodes"
+        )
+        return report_dict
     
     # Create a default report structure
     report_dict = {
@@ -39,7 +156,10 @@ async def TaskReportAPI(input_data: TaskReportInput) -> Dict[str, Any]:
             "endTime": 0,
             "timeCost": 0
         },
-        "reports": {}
+        "reports": {},
+        "usage": None,
+        "nodeConfigs": {},
+        "version": 0
     }
     
     # Get the report directly from the task context if available
@@ -75,17 +195,12 @@ async def TaskReportAPI(input_data: TaskReportInput) -> Dict[str, Any]:
         report_dict["outputs"] = getattr(report_data, "outputs", {}) or {}
         report_dict["workflowStatus"] = getattr(report_data, "workflowStatus", {}) or report_dict["workflowStatus"]
         report_dict["reports"] = getattr(report_data, "reports", {}) or {}
+        report_dict["usage"] = getattr(report_data, "usage", None)
+        report_dict["nodeConfigs"] = getattr(report_data, "nodeConfigs", {}) or {}
+        report_dict["version"] = getattr(report_data, "version", 0)
         
         # Normalize node status in reports to lowercase
-        for node_id, node_report in report_dict["reports"].items():
-            if "status" in node_report:
-                status = node_report["status"]
-                if status == "Success" or status == "Succeeded":
-                    node_report["status"] = "succeeded"
-                elif status == "Failure" or status == "Failed":
-                    node_report["status"] = "failed"
-                elif status == "Cancel" or status == "Cancelled":
-                    node_report["status"] = "cancelled"
+        report_dict["reports"] = _normalize_node_reports(report_dict["reports"])
         
         # Try to get additional data directly from the task if available
         try:
@@ -136,11 +251,13 @@ async def TaskReportAPI(input_data: TaskReportInput) -> Dict[str, Any]:
         except Exception as e:
             logging.error(f"Error getting additional data from task: {e}")
     
-    # Log the output for debugging
-    try:
-        logging.info(f"> TaskReportAPI - output: {json.dumps(report_dict)}")
-    except Exception as e:
-        logging.error(f"> TaskReportAPI - error: {str(e)}")
-        logging.info(f"> TaskReportAPI - output: {report_dict}")
+    # Spilled values are decoded only here, at the API boundary
+    report_dict = to_jsonable(report_dict)
+    
+    # Log a summary only, serializing the full report would cost as much as the response itself
+    logging.info(
+        f"> TaskReportAPI - task {task_id} version {report_dict['version']}, "
+        f"status {report_dict['workflowStatus'].get('status')}, {len(report_dict['reports'])} nodes"
+    )
     
     return report_dict
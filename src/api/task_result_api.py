@@ -1,12 +1,18 @@
 """
 Task result API implementation.
 This module provides the TaskResultAPI function for getting workflow task results.
+
+Callers can pass `wait` to long-poll: the API waits up to that many milliseconds
+for a running task to complete instead of returning an empty result at once.
+Finished tasks are served from their compacted record, and the wait for a
+task running on another worker ends once its record is in the shared store.
 """
 import logging
 from typing import Any, Dict, Optional
 
 from ..interface.schema import TaskResultInput, WorkflowOutputs
 from ..application.workflow_application import WorkflowApplication
+from ..infrastructure.utils import to_jsonable
 
 
 async def TaskResultAPI(input_data: TaskResultInput) -> WorkflowOutputs:
@@ -14,10 +20,11 @@ async def TaskResultAPI(input_data: TaskResultInput) -> WorkflowOutputs:
     Get the result of a workflow task with the given input.
     
     Args:
-        input_data: The input data containing the task ID.
+        input_data: The input data containing the task ID and the optional
+            number of milliseconds to wait for a running task.
         
     Returns:
-        The output data with the workflow results.
+        The output data with the workflow results, empty if the task is still running.
     """
     app = WorkflowApplication.instance()
     task_id = input_data["taskID"]
@@ -26,6 +33,18 @@ async def TaskResultAPI(input_data: TaskResultInput) -> WorkflowOutputs:
     task = app.tasks.get(task_id)
     output = {}
     
+    wait = input_data.get("wait")
+    if wait and task and not task.context.status_center.workflow.terminated:
+        # Block on the completion of the task instead of making the caller poll
+        await task.wait(wait / 1000)
+    elif wait and task is None:
+        await app.tasks.wait_record(task_id, wait / 1000)
+    
+    # A finished task has been compacted into a record holding its outputs
+    record = await app.tasks.lookup(task_id)
+    if record is not None:
+        return to_jsonable(record.outputs)
+    
     # Only proceed if task exists
     if task and hasattr(task, 'context'):
         # First check if the task is terminated (following JS implementation)
@@ -47,7 +66,7 @@ async def TaskResultAPI(input_data: TaskResultInput) -> WorkflowOutputs:
             if io_outputs and len(io_outputs) > 0:
                 logging.info(f"TaskResultAPI: Found outputs in io_center: {io_outputs}")
                 output = io_outputs
-                return output
+                return to_jsonable(output)
         
         # Strategy 2: Try to get from end node snapshot if io_center didn't have results
         if not output or len(output) == 0:
@@ -62,7 +81,7 @@ async def TaskResultAPI(input_data: TaskResultInput) -> WorkflowOutputs:
                     if "outputs" in last_snapshot and last_snapshot["outputs"]:
                         logging.info(f"TaskResultAPI: Found outputs in end node snapshot: {last_snapshot['outputs']}")
                         output = last_snapshot["outputs"]
-                        return output
+                        return to_jsonable(output)
         
         # Strategy 3: Fall back to app.result as last resort
         if not output or len(output) == 0:
@@ -70,9 +89,9 @@ async def TaskResultAPI(input_data: TaskResultInput) -> WorkflowOutputs:
             if app_result and len(app_result) > 0:
                 logging.info(f"TaskResultAPI: Found outputs from app.result: {app_result}")
                 output = app_result
-                return output
+                return to_jsonable(output)
     else:
         # If task doesn't exist, fall back to app.result
         output = app.result(task_id)
     
-    return output or {}
+    return to_jsonable(output or {})
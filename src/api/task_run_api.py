@@ -1,12 +1,23 @@
 """
 Task run API implementation.
 This module provides the TaskRunAPI function for running workflow tasks.
+
+Synchronous runs wait for short workflows to terminate and return their
+outputs in the same call, saving the caller the requests for the result.
+With a task store shared by several workers, the task ID is returned once the
+other workers can find the task, or once the registry stops waiting for a
+locked store. Workflows are admitted by the admission
+controller of the application, so a run may wait for a slot or be rejected.
 """
 import json
 from typing import Any, Dict
 
 from ..interface.schema import TaskRunInput, TaskRunOutput
 from ..application.workflow_application import WorkflowApplication
+from .task_result_api import TaskResultAPI
+
+# Milliseconds a synchronous run waits for the task to terminate by default
+DEFAULT_SYNC_WAIT_MS = 30000
 
 
 async def TaskRunAPI(input_data: TaskRunInput) -> TaskRunOutput:
@@ -14,10 +25,16 @@ async def TaskRunAPI(input_data: TaskRunInput) -> TaskRunOutput:
     Run a workflow task with the given input.
     
     Args:
-        input_data: The input data for running the task.
+        input_data: The input data for running the task. With sync, the API waits
+            up to wait milliseconds, DEFAULT_SYNC_WAIT_MS by default, for the task
+            to terminate.
         
     Returns:
-        The output data with the task ID.
+        The output data with the task ID. Synchronous runs also return whether the
+        task terminated in time and, if it did, its status and outputs.
+        
+    Raises:
+        WorkflowAdmissionError: If the workflow was not admitted.
     """
     app = WorkflowApplication.instance()
     schema_str = input_data["schema"]
@@ -27,14 +44,31 @@ async def TaskRunAPI(input_data: TaskRunInput) -> TaskRunOutput:
     schema = json.loads(schema_str)
     
     # Run the workflow with the schema and inputs
-    task_id = app.run({
+    task_id = await app.submit({
         "schema": schema,
         "inputs": inputs,
+        "options": input_data.get("options"),
     })
+    # Hold the task, it leaves the registry once it has finished
+    task = app.tasks[task_id]
+    # The next request for the task may be served by another worker
+    await app.tasks.publish()
     
     # Create the output with the task ID
     output: TaskRunOutput = {
         "taskID": task_id,
     }
+    if not input_data.get("sync"):
+        return output
+    
+    # Wait for the task and return its outputs if it terminates within the deadline
+    wait = input_data.get("wait")
+    await task.wait((DEFAULT_SYNC_WAIT_MS if wait is None else wait) / 1000)
+    workflow = task.context.status_center.workflow
+    output["terminated"] = workflow.terminated
+    if workflow.terminated:
+        output["status"] = getattr(workflow.status, "value", workflow.status)
+        # The context of a completed task is disposed, the result API knows where its outputs are kept
+        output["outputs"] = await TaskResultAPI({"taskID": task_id})
     
     return output
\ No newline at end of file
@@ -3,5 +3,10 @@ Application module for the workflow runtime.
 This module provides the main entry point for running workflows.
 """
 from .workflow_application import WorkflowApplication
+from .task_registry import WorkflowTaskRegistry, WorkflowTaskRecord, WorkflowRemoteTaskSubscription
+from .admission_controller import WorkflowAdmissionController, WorkflowAdmissionError
 
-__all__ = ['WorkflowApplication']
\ No newline at end of file
+__all__ = [
+    'WorkflowApplication', 'WorkflowTaskRegistry', 'WorkflowTaskRecord', 'WorkflowRemoteTaskSubscription',
+    'WorkflowAdmissionController', 'WorkflowAdmissionError'
+]
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Tests for the admission controller.
+This module contains tests for bounding the workflows running at once, queueing
+the submissions beyond the bound and rejecting them once the queue is full or
+their wait expires.
+"""
+import asyncio
+import unittest
+
+from ..admission_controller import WorkflowAdmissionController, WorkflowAdmissionError
+
+
+class FakeTask:
+    """A task that finishes when the test finishes it."""
+
+    def __init__(self):
+        self.id = "task"
+        self._callbacks = []
+
+    def on_complete(self, callback):
+        self._callbacks.append(callback)
+
+    def on_error(self, callback):
+        self._callbacks.append(callback)
+
+    def finish(self):
+        for callback in self._callbacks:
+            callback(None)
+
+
+class TestAdmissionController(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the admission controller."""
+
+    async def test_submissions_wait_for_a_slot_in_order(self):
+        """Test that the slot of a finished task is handed to the submission that waited longest."""
+        controller = WorkflowAdmissionController(max_in_flight=1, max_queued=2)
+        first = await controller.run(FakeTask)
+        admitted = []
+        waiting = [
+            asyncio.create_task(controller.run(lambda i=i: admitted.append(i) or FakeTask()))
+            for i in range(2)
+        ]
+        await asyncio.sleep(0)
+        self.assertEqual(controller.metrics()["queued"], 2)
+
+        first.finish()
+        second = await waiting[0]
+        self.assertEqual(admitted, [0])
+        self.assertFalse(waiting[1].done())
+        # Both callbacks of a task free its slot once
+        second.finish()
+        (await waiting[1]).finish()
+        metrics = controller.metrics()
+        self.assertEqual(metrics["inFlight"], 0)
+        self.assertEqual(metrics["queued"], 0)
+        self.assertEqual(metrics["admitted"], 3)
+        self.assertIsNotNone(metrics["averageRunMs"])
+
+    async def test_rejections(self):
+        """Test that submissions are rejected when the queue is full or their wait expires."""
+        controller = WorkflowAdmissionController(max_in_flight=1, max_queued=1, max_wait_seconds=0.01)
+        await controller.run(FakeTask)
+        waiting = asyncio.create_task(controller.run(FakeTask))
+        await asyncio.sleep(0)
+        with self.assertRaises(WorkflowAdmissionError) as full:
+            await controller.run(FakeTask)
+        self.assertEqual(full.exception.reason, "queueFull")
+        self.assertEqual(full.exception.retry_after, 1)
+
+        with self.assertRaises(WorkflowAdmissionError) as timeout:
+            await waiting
+        self.assertEqual(timeout.exception.reason, "timeout")
+        metrics = controller.metrics()
+        self.assertEqual(metrics["rejections"], {"queueFull": 1, "timeout": 1})
+        self.assertEqual(metrics["queued"], 0)
+        self.assertEqual(metrics["inFlight"], 1)
+
+    async def test_failed_start_frees_the_slot(self):
+        """Test that the slot is freed when the workflow cannot be started."""
+        controller = WorkflowAdmissionController(max_in_flight=1)
+
+        def fail():
+            raise RuntimeError("invalid schema")
+
+        with self.assertRaises(RuntimeError):
+            await controller.run(fail)
+        self.assertEqual(controller.metrics()["inFlight"], 0)
+
+    def test_invalid_limits(self):
+        """Test that invalid limits are rejected."""
+        with self.assertRaises(ValueError):
+            WorkflowAdmissionController(max_in_flight=0)
+        with self.assertRaises(ValueError):
+            WorkflowAdmissionController(max_queued=-1)
+        with self.assertRaises(ValueError):
+            WorkflowAdmissionController(max_wait_seconds=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
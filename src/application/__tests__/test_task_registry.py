@@ -0,0 +1,283 @@
+"""
+Tests for the task registry.
+This module contains tests for the compaction of finished tasks into records,
+the reports and events served from the records, the eviction of records
+beyond the TTL, the task limit and the byte budget, and the tasks of workers
+sharing a store.
+"""
+import asyncio
+import copy
+import gc
+import json
+import os
+import tempfile
+import unittest
+import weakref
+import zlib
+from types import SimpleNamespace
+
+from ...interface import IEngine
+from ...interface.schema import WorkflowEventType
+from ...domain.container import WorkflowRuntimeContainer
+from ...domain.__tests__.schemas.basic import basic_schema
+from ...domain.__tests__.schemas.loop import loop_schema
+from ...infrastructure.task_store import SQLiteTaskStore
+from ..task_registry import WorkflowTaskRegistry
+
+
+class FakeClock:
+    """A clock that only moves when the test advances it."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeTask:
+    """A task that keeps running until it is cancelled."""
+
+    def __init__(self, task_id):
+        self.id = task_id
+        self.context = SimpleNamespace(io_center=SimpleNamespace(inputs={}))
+        self.cancelled = False
+
+    def on_complete(self, callback):
+        pass
+
+    def on_error(self, callback):
+        pass
+
+    def cancel(self):
+        self.cancelled = True
+
+
+async def run_loop(registry, items=2):
+    """Run the loop workflow in a registry until it has finished."""
+    engine = WorkflowRuntimeContainer.instance().get(IEngine)
+    task = engine.invoke({
+        "schema": copy.deepcopy(loop_schema),
+        "inputs": {
+            "prompt": "How are you?",
+            "system_prompt": "You are a helpful AI assistant.",
+            "tasks": [f"TASK - {i}" for i in range(items)],
+        },
+    })
+    registry.add(task)
+    # Waits for the task to finish and to be compacted
+    await registry.wait_record(task.id, 5)
+    return task.id
+
+
+class TestTaskRegistry(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the task registry."""
+
+    async def test_finished_task_is_compacted(self):
+        """Test that a finished task is replaced by a record and its context is released."""
+        registry = WorkflowTaskRegistry()
+        engine = WorkflowRuntimeContainer.instance().get(IEngine)
+        task = engine.invoke({
+            "schema": copy.deepcopy(basic_schema),
+            "inputs": {"model_name": "ai-model", "llm_settings": {"temperature": 0.5}, "prompt": "How are you?"},
+        })
+        registry.add(task)
+        self.assertIs(registry[task.id], task)
+        context = weakref.ref(task.context)
+        task_id = task.id
+        await registry.wait_record(task_id, 5)
+        del task
+        gc.collect()
+
+        self.assertNotIn(task_id, registry)
+        self.assertIsNone(context())
+        record = registry.record(task_id)
+        self.assertEqual(record.status, "succeeded")
+        self.assertEqual(record.outputs["llm_prompt"], "How are you?")
+        report = record.reporter.export()
+        self.assertEqual(report.inputs["prompt"], "How are you?")
+        self.assertEqual(report.outputs, record.outputs)
+        self.assertEqual(report.workflowStatus["status"], "succeeded")
+        self.assertIn("llm_0", report.nodeConfigs)
+        self.assertEqual(registry.metrics()["compacted"], 1)
+
+    async def test_record_serves_deltas_queries_and_events(self):
+        """Test that the frozen reporter and event bus answer like the live ones."""
+        registry = WorkflowTaskRegistry()
+        record = registry.record(await run_loop(registry, items=3))
+        version = record.reporter.version
+
+        self.assertEqual(record.reporter.export_since(version)["reports"], {})
+        delta = record.reporter.export_since(0)
+        self.assertTrue(delta["reports"]["llm_0"]["snapshotsReset"])
+        self.assertEqual(len(delta["reports"]["llm_0"]["snapshots"]), 3)
+
+        page = record.reporter.query(node_types=["llm"], snapshot_fields=["outputs"], limit=2)
+        self.assertEqual(list(page["reports"]), ["llm_0"])
+        llm_report = page["reports"]["llm_0"]
+        self.assertEqual(llm_report["snapshotCount"], 3)
+        self.assertEqual(set(llm_report["snapshots"][0]), {"id", "nodeID", "outputs"})
+        rest = record.reporter.query(node_ids=["llm_0"], cursor=llm_report["nextCursor"], limit=2)
+        self.assertEqual(len(rest["reports"]["llm_0"]["snapshots"]), 1)
+        self.assertNotIn("nextCursor", rest["reports"]["llm_0"])
+        with self.assertRaises(ValueError):
+            record.reporter.query(fields=["inputs"])
+
+        events = [event async for event in record.event_bus.subscribe()]
+        self.assertEqual([event.type for event in events], [WorkflowEventType.WorkflowTerminated.value])
+        self.assertEqual(events[0].data["version"], version)
+
+    async def test_offloaded_snapshots_stay_in_the_spill_log(self):
+        """Test that the record of a task with offloaded snapshots refers to them instead of reading them back."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = SQLiteTaskStore(os.path.join(directory.name, "tasks.db"))
+        self.addCleanup(store.close)
+        registry = WorkflowTaskRegistry(store=store)
+        engine = WorkflowRuntimeContainer.instance().get(IEngine)
+        task = engine.invoke({
+            "schema": copy.deepcopy(loop_schema),
+            "inputs": {"prompt": "How are you?", "system_prompt": "You are a helpful AI assistant.",
+                       "tasks": [f"TASK - {i}" for i in range(3)]},
+            "options": {"snapshot": {"offload": True}},
+        })
+        registry.add(task)
+        record = await registry.wait_record(task.id, 5)
+
+        self.assertNotIn("snapshots", json.loads(zlib.decompress(record.reporter._data))["reports"]["llm_0"])
+        report = record.reporter.export()
+        self.assertEqual(
+            [s["inputs"]["prompt"] for s in report.reports["llm_0"]["snapshots"]], [f"TASK - {i}" for i in range(3)]
+        )
+        page = record.reporter.query(node_ids=["llm_0"], limit=2)["reports"]["llm_0"]
+        self.assertEqual(page["snapshots"], report.reports["llm_0"]["snapshots"][:2])
+        self.assertEqual(page["snapshotCount"], 3)
+        self.assertEqual(page["nextCursor"], page["snapshots"][-1]["id"])
+
+        # The store entry holds the whole report
+        await store.flush()
+        loaded = WorkflowTaskRegistry(store=store)
+        self.assertEqual((await loaded.lookup(task.id)).reporter.export().reports, report.reports)
+
+    async def test_task_limit_evicts_least_recently_used(self):
+        """Test that the oldest unread records are evicted beyond the task limit."""
+        registry = WorkflowTaskRegistry(max_tasks=2)
+        first = await run_loop(registry)
+        second = await run_loop(registry)
+        # Reading the first record makes the second the least recently used
+        self.assertIsNotNone(registry.record(first))
+        third = await run_loop(registry)
+
+        self.assertIsNotNone(registry.record(first))
+        self.assertIsNone(registry.record(second))
+        self.assertIsNotNone(registry.record(third))
+        metrics = registry.metrics()
+        self.assertEqual(metrics["finished"], 2)
+        self.assertEqual(metrics["evictions"], {"ttl": 0, "maxTasks": 1, "maxBytes": 0})
+
+    async def test_ttl_and_byte_budget(self):
+        """Test that records expire after the TTL and are evicted beyond the byte budget."""
+        clock = FakeClock()
+        registry = WorkflowTaskRegistry(ttl_seconds=60, clock=clock)
+        task_id = await run_loop(registry)
+        clock.now = 59
+        self.assertIsNotNone(registry.record(task_id))
+        clock.now = 118
+        self.assertIsNotNone(registry.record(task_id))
+        clock.now = 178
+        self.assertIsNone(registry.record(task_id))
+        self.assertEqual(registry.metrics()["evictions"]["ttl"], 1)
+
+        registry = WorkflowTaskRegistry(max_bytes=0)
+        task_id = await run_loop(registry)
+        self.assertIsNone(registry.record(task_id))
+        metrics = registry.metrics()
+        self.assertEqual(metrics["bytes"], 0)
+        self.assertEqual(metrics["evictions"]["maxBytes"], 1)
+        self.assertGreater(metrics["evictedBytes"], 0)
+
+    async def test_records_are_loaded_from_the_store(self):
+        """Test that evicted records and the records of a previous process are loaded from the store."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = SQLiteTaskStore(os.path.join(directory.name, "tasks.db"))
+        self.addCleanup(store.close)
+        registry = WorkflowTaskRegistry(max_bytes=0, store=store)
+        task_id = await run_loop(registry, items=3)
+        self.assertIsNone(registry.record(task_id))
+        # The evicted record is served from the store before it is written
+        self.assertEqual((await registry.lookup(task_id)).status, "succeeded")
+        await store.flush()
+        store.close()
+
+        store = SQLiteTaskStore(os.path.join(directory.name, "tasks.db"))
+        self.addCleanup(store.close)
+        restarted = WorkflowTaskRegistry(store=store)
+        record = await restarted.lookup(task_id)
+        self.assertEqual(record.status, "succeeded")
+        self.assertEqual(record.reporter.export().inputs["tasks"], ["TASK - 0", "TASK - 1", "TASK - 2"])
+        self.assertEqual(len(record.reporter.query(node_types=["llm"])["reports"]["llm_0"]["snapshots"]), 3)
+        events = [event async for event in record.event_bus.subscribe()]
+        self.assertEqual(events[0].data["version"], record.reporter.version)
+        self.assertIs(await restarted.lookup(task_id), record)
+        self.assertIsNone(await restarted.lookup("unknown"))
+        metrics = restarted.metrics()
+        self.assertEqual(metrics["loaded"], 1)
+        self.assertEqual(metrics["store"]["written"], 0)
+
+    async def test_workers_share_the_store(self):
+        """Test that a worker finds, waits for and cancels the tasks of another worker."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        workers = []
+        for worker_id in ("worker-a", "worker-b"):
+            store = SQLiteTaskStore(os.path.join(directory.name, "tasks.db"))
+            self.addCleanup(store.close)
+            workers.append(WorkflowTaskRegistry(store=store, worker_id=worker_id))
+        worker_a, worker_b = workers
+
+        running = FakeTask("running")
+        worker_a.add(running)
+        await worker_a.publish()
+        self.assertEqual(await worker_b.owner("running"), "worker-a")
+        self.assertTrue(await worker_b.request_cancel("running"))
+        self.assertFalse(running.cancelled)
+        await worker_a.heartbeat()
+        self.assertTrue(running.cancelled)
+        self.assertFalse(await worker_b.request_cancel("unknown"))
+
+        engine = WorkflowRuntimeContainer.instance().get(IEngine)
+        task = engine.invoke({
+            "schema": copy.deepcopy(loop_schema),
+            "inputs": {"prompt": "How are you?", "system_prompt": "You are a helpful AI assistant.", "tasks": ["TASK"]},
+        })
+        worker_a.add(task)
+        await worker_a.publish()
+        record = await worker_b.wait_record(task.id, 5)
+        self.assertEqual(record.status, "succeeded")
+        self.assertIsNone(await worker_b.owner(task.id))
+        self.assertEqual(worker_b.metrics()["cancelRequests"], 1)
+        self.assertEqual(worker_a.metrics()["remoteCancels"], 1)
+
+        # The tasks of a worker that stopped heartbeating are unknown
+        impatient = WorkflowTaskRegistry(store=worker_b.store, worker_id="worker-c", worker_timeout=0.01)
+        await asyncio.sleep(0.05)
+        self.assertIsNone(await impatient.owner("running"))
+        self.assertIsNone(await impatient.wait_record("running", 5))
+
+    def test_invalid_limits(self):
+        """Test that invalid limits are rejected."""
+        with self.assertRaises(ValueError):
+            WorkflowTaskRegistry(ttl_seconds=-1)
+        with self.assertRaises(ValueError):
+            WorkflowTaskRegistry(max_tasks=0)
+        with self.assertRaises(ValueError):
+            WorkflowTaskRegistry(max_bytes=-1)
+        with self.assertRaises(ValueError):
+            WorkflowTaskRegistry(worker_id="worker")
+        with self.assertRaises(ValueError):
+            WorkflowTaskRegistry(worker_timeout=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
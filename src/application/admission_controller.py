@@ -0,0 +1,237 @@
+"""
+Admission controller implementation.
+This module provides the WorkflowAdmissionController class which bounds the workflows the application runs at once.
+
+Every workflow started by the engine runs on the event loop from the moment it
+is invoked, so under a spike of submissions all of them slow down together and
+their contexts pile up in memory. The admission controller runs at most
+`max_in_flight` workflows at once. Further submissions wait in a queue of at
+most `max_queued` submissions, first in first out, for up to `max_wait_seconds`.
+A submission that finds the queue full, or is not admitted in time, is rejected
+with a `WorkflowAdmissionError` carrying the number of seconds after which a
+retry is likely to be admitted, estimated from the average run time.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from ..interface.task import ITask
+
+
+class WorkflowAdmissionError(Exception):
+    """
+    Raised when a workflow submission is rejected.
+    """
+
+    def __init__(self, reason: str, retry_after: int):
+        """
+        Initialize a new instance of the WorkflowAdmissionError class.
+
+        Args:
+            reason: The reason of the rejection, "queueFull" or "timeout".
+            retry_after: The number of seconds after which the caller should retry.
+        """
+        super().__init__(f"Workflow submission rejected ({reason}), retry after {retry_after} seconds")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class WorkflowAdmissionController:
+    """
+    Admission controller of the workflow application.
+
+    The controller hands the slot of a finished workflow directly to the
+    submission that waited longest, so a submission never overtakes a queued one.
+    """
+
+    DEFAULT_MAX_IN_FLIGHT = 64
+    DEFAULT_MAX_QUEUED = 256
+    DEFAULT_MAX_WAIT_SECONDS = 30.0
+
+    # Reasons a submission can be rejected for, as reported in the metrics
+    REJECTION_REASONS = ("queueFull", "timeout")
+
+    # Weight of the latest run time in the average run time
+    RUN_TIME_SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        max_wait_seconds: Optional[float] = DEFAULT_MAX_WAIT_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize a new instance of the WorkflowAdmissionController class.
+
+        Args:
+            max_in_flight: The maximum number of workflows running at once.
+            max_queued: The maximum number of submissions waiting to be admitted.
+            max_wait_seconds: The maximum number of seconds a submission waits, or
+                None to wait until it is admitted.
+            clock: The clock measuring wait and run times, in seconds.
+
+        Raises:
+            ValueError: If the in-flight limit is less than 1, the queue limit is
+                negative or the maximum wait is not positive.
+        """
+        if max_in_flight < 1:
+            raise ValueError(f"In-flight workflow limit must be at least 1, got {max_in_flight}")
+        if max_queued < 0:
+            raise ValueError(f"Queued submission limit must not be negative, got {max_queued}")
+        if max_wait_seconds is not None and max_wait_seconds <= 0:
+            raise ValueError(f"Maximum queue wait must be positive, got {max_wait_seconds}")
+        self._max_in_flight = max_in_flight
+        self._max_queued = max_queued
+        self._max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._in_flight = 0
+        # Submissions waiting for a slot, resolved when a slot is handed to them
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._admitted = 0
+        self._rejections = {reason: 0 for reason in self.REJECTION_REASONS}
+        self._wait_seconds = 0.0
+        self._max_waited_seconds = 0.0
+        self._run_seconds: Optional[float] = None
+
+    async def run(self, start: Callable[[], ITask]) -> ITask:
+        """
+        Wait for a slot and start a workflow in it.
+
+        The slot is freed once the task of the workflow completes or fails.
+
+        Args:
+            start: The function starting the workflow and returning its task.
+
+        Returns:
+            The task.
+
+        Raises:
+            WorkflowAdmissionError: If the queue is full or the submission was not admitted in time.
+        """
+        await self._acquire()
+        try:
+            task = start()
+        except BaseException:
+            self._release()
+            raise
+        started_at = self._clock()
+        released = False
+
+        def on_finished(_: Any) -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            self._observe_run(self._clock() - started_at)
+            self._release()
+
+        task.on_complete(on_finished)
+        task.on_error(on_finished)
+        return task
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get the metrics of the controller.
+
+        Returns:
+            The numbers of running workflows and of queued submissions, the limits,
+            the numbers of admitted and of rejected submissions by reason, the
+            average and maximum queue wait and the average run time.
+        """
+        return {
+            "inFlight": self._in_flight,
+            "queued": len(self._waiters),
+            "maxInFlight": self._max_in_flight,
+            "maxQueued": self._max_queued,
+            "maxWaitSeconds": self._max_wait_seconds,
+            "admitted": self._admitted,
+            "rejections": dict(self._rejections),
+            "averageWaitMs": self._wait_seconds / self._admitted * 1000 if self._admitted else 0.0,
+            "maxWaitMs": self._max_waited_seconds * 1000,
+            "averageRunMs": None if self._run_seconds is None else self._run_seconds * 1000,
+        }
+
+    async def _acquire(self) -> None:
+        """
+        Take a slot, waiting in the queue if every slot is taken.
+
+        Raises:
+            WorkflowAdmissionError: If the queue is full or no slot was handed over in time.
+        """
+        if self._in_flight < self._max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self._observe_wait(0.0)
+            return
+        if len(self._waiters) >= self._max_queued:
+            raise self._reject("queueFull")
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        queued_at = self._clock()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self._max_wait_seconds)
+        except BaseException as e:
+            timed_out = isinstance(e, asyncio.TimeoutError)
+            if not future.done():
+                future.cancel()
+                self._waiters.remove(future)
+                if timed_out:
+                    raise self._reject("timeout") from None
+                raise
+            # The slot was handed over as the wait ended
+            if not timed_out:
+                self._release()
+                raise
+        self._observe_wait(self._clock() - queued_at)
+
+    def _release(self) -> None:
+        """
+        Hand a slot to the submission that waited longest, or free it.
+        """
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _reject(self, reason: str) -> WorkflowAdmissionError:
+        """
+        Count a rejection and create its error.
+
+        Args:
+            reason: The reason of the rejection.
+
+        Returns:
+            The error, with the estimated number of seconds until a slot is free
+            for every submission queued now.
+        """
+        self._rejections[reason] += 1
+        run_seconds = self._run_seconds or 0.0
+        retry_after = math.ceil(run_seconds * (len(self._waiters) + 1) / self._max_in_flight)
+        return WorkflowAdmissionError(reason, max(1, retry_after))
+
+    def _observe_wait(self, seconds: float) -> None:
+        """
+        Count an admission and its queue wait.
+
+        Args:
+            seconds: The number of seconds the submission waited.
+        """
+        self._admitted += 1
+        self._wait_seconds += seconds
+        self._max_waited_seconds = max(self._max_waited_seconds, seconds)
+
+    def _observe_run(self, seconds: float) -> None:
+        """
+        Update the average run time with a finished workflow.
+
+        Args:
+            seconds: The number of seconds the workflow ran.
+        """
+        if self._run_seconds is None:
+            self._run_seconds = seconds
+        else:
+            self._run_seconds += self.RUN_TIME_SMOOTHING * (seconds - self._run_seconds)
@@ -0,0 +1,733 @@
+"""
+Task registry implementation.
+This module provides the WorkflowTaskRegistry class which keeps the tasks of the workflow application.
+
+A task keeps its whole context referenced, the document, the variable stores,
+the state, the sub-contexts and the snapshots, although a finished task is only
+ever asked for its result, its report and its final event. The registry compacts
+every task once it has finished into a `WorkflowTaskRecord` holding its outputs,
+its frozen report and its frozen event bus, and drops the task and its context.
+The report is frozen, and the store entry encoded, in the default executor of
+the event loop, so a large report does not block the loop. `lookup` and
+`wait_record` wait for the compaction of a task that has just finished.
+
+Records are retained within limits and evicted least recently used first:
+
+- records that were not read for `ttl_seconds` expire
+- no more than `max_tasks` tasks are kept, running and finished together
+- the records take no more than `max_bytes`
+
+Running tasks are never evicted. Expired records are evicted whenever the
+registry is used, or by calling `sweep`. `metrics` reports what is retained and
+how many records were evicted for which limit.
+
+With a task store, every record is also handed to the store when its task is
+compacted, and `lookup` loads the records of tasks that are no longer in memory,
+because they were evicted or the process was restarted, back from the store.
+
+Several worker processes share one store when their registries are given a
+worker ID. Each registry then claims the tasks it runs in the store and
+heartbeats while it is served, so any worker can answer for a task: the record
+of a finished task is loaded from the store, `wait_record` waits for a task
+running on another worker to finish, and `request_cancel` asks the worker that
+runs a task to cancel it with its next heartbeat. The tasks of a worker that
+stopped heartbeating for `worker_timeout` seconds are treated as unknown.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, MutableMapping, Optional
+
+from ..interface.context import IEvent, IEventSubscription
+from ..interface.task import ITask, ITaskStore, TaskStoreEntry
+from ..domain.event import WorkflowRuntimeEvent, WorkflowRuntimeFrozenEventBus
+from ..domain.report import WorkflowRuntimeFrozenReporter
+from ..infrastructure.spill import estimate_size
+from ..infrastructure.utils import to_jsonable
+
+
+class WorkflowTaskRecord:
+    """
+    The compacted record of a finished task.
+    """
+
+    __slots__ = ("id", "status", "outputs", "reporter", "event_bus", "finished_at", "nbytes", "accessed_at")
+
+    def __init__(
+        self,
+        task_id: str,
+        status: str,
+        outputs: Dict[str, Any],
+        reporter: WorkflowRuntimeFrozenReporter,
+        event_bus: WorkflowRuntimeFrozenEventBus,
+        finished_at: float,
+        accessed_at: float
+    ):
+        """
+        Initialize a new instance of the WorkflowTaskRecord class.
+
+        Args:
+            task_id: The ID of the task.
+            status: The final workflow status, such as "succeeded".
+            outputs: The workflow outputs, with JSON-compatible values.
+            reporter: The frozen reporter serving the final report.
+            event_bus: The frozen event bus serving the workflow_terminated event.
+            finished_at: The time the task finished, in seconds since the epoch.
+            accessed_at: The time the record was created, on the clock of the registry.
+        """
+        self.id = task_id
+        self.status = status
+        self.outputs = outputs
+        self.reporter = reporter
+        self.event_bus = event_bus
+        self.finished_at = finished_at
+        self.nbytes = reporter.nbytes + estimate_size(outputs)
+        self.accessed_at = accessed_at
+
+    def to_entry(self) -> TaskStoreEntry:
+        """
+        Convert the record into a task store entry.
+
+        Returns:
+            The entry.
+        """
+        terminal_event = self.event_bus.terminal_event
+        return {
+            "taskID": self.id,
+            "status": self.status,
+            "version": self.reporter.version,
+            "outputs": self.outputs,
+            "report": self.reporter.dump(),
+            "nodeTypes": self.reporter.node_types,
+            "terminalEvent": None if terminal_event is None else terminal_event.data,
+            "finishedAt": self.finished_at,
+        }
+
+    @classmethod
+    def from_entry(cls, entry: TaskStoreEntry, accessed_at: float) -> 'WorkflowTaskRecord':
+        """
+        Create a record from a task store entry.
+
+        Args:
+            entry: The entry.
+            accessed_at: The time the record is loaded, on the clock of the registry.
+
+        Returns:
+            The record.
+        """
+        terminal_event = entry["terminalEvent"]
+        return cls(
+            task_id=entry["taskID"],
+            status=entry["status"],
+            outputs=entry["outputs"],
+            reporter=WorkflowRuntimeFrozenReporter.load(entry["report"], entry["version"], entry["nodeTypes"]),
+            event_bus=WorkflowRuntimeFrozenEventBus(
+                None if terminal_event is None else WorkflowRuntimeEvent(terminal_event), entry["version"]
+            ),
+            finished_at=entry["finishedAt"],
+            accessed_at=accessed_at
+        )
+
+
+class WorkflowRemoteTaskSubscription(IEventSubscription):
+    """
+    A subscription to the events of a task running on another worker.
+
+    The status changes of the task are only published on its worker, so the
+    subscription waits for the record of the task and serves its final event.
+    """
+
+    def __init__(self, registry: 'WorkflowTaskRegistry', task_id: str, buffer_size: Optional[int] = None):
+        """
+        Initialize a new instance of the WorkflowRemoteTaskSubscription class.
+
+        Args:
+            registry: The registry to wait for the record in.
+            task_id: The ID of the task.
+            buffer_size: The number of events buffered for the subscriber, or None for the default.
+
+        Raises:
+            ValueError: If the buffer size is less than 1.
+        """
+        if buffer_size is not None and buffer_size < 1:
+            raise ValueError(f"Event buffer size must be at least 1, got {buffer_size}")
+        self._registry = registry
+        self._task_id = task_id
+        self._buffer_size = buffer_size
+        self._subscription: Optional[IEventSubscription] = None
+        self._closed = False
+
+    def __aiter__(self) -> 'WorkflowRemoteTaskSubscription':
+        """
+        Get the asynchronous iterator over the events.
+
+        Returns:
+            The subscription itself.
+        """
+        return self
+
+    async def __anext__(self) -> IEvent:
+        """
+        Wait for the next event.
+
+        Returns:
+            The workflow_terminated event, once the task has finished.
+
+        Raises:
+            StopAsyncIteration: If the subscription was closed, the worker of the task
+                died, or the final event was received.
+        """
+        if self._subscription is None:
+            if self._closed:
+                raise StopAsyncIteration
+            record = await self._registry.wait_record(self._task_id)
+            if record is None or self._closed:
+                self._closed = True
+                raise StopAsyncIteration
+            self._subscription = record.event_bus.subscribe(self._buffer_size)
+        return await self._subscription.__anext__()
+
+    def close(self) -> None:
+        """
+        Stop receiving events.
+        """
+        self._closed = True
+        if self._subscription is not None:
+            self._subscription.close()
+
+
+class WorkflowTaskRegistry(MutableMapping):
+    """
+    Registry of the tasks of the workflow application.
+
+    The registry maps the IDs of tasks that have not been compacted yet to the
+    tasks, so it can be used like the dictionary it replaces. Finished tasks are
+    looked up with `record` in memory, or with `lookup` in memory and the store.
+    """
+
+    DEFAULT_TTL_SECONDS = 3600.0
+    DEFAULT_MAX_TASKS = 10000
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    DEFAULT_WORKER_TIMEOUT_SECONDS = 10.0
+
+    # Seconds between the heartbeats of a worker
+    HEARTBEAT_SECONDS = 1.0
+
+    # Seconds between the lookups of a task running on another worker
+    REMOTE_POLL_SECONDS = 0.25
+
+    # Seconds `publish` waits for the store, which retries a locked database indefinitely
+    PUBLISH_TIMEOUT_SECONDS = 5.0
+
+    # Limits a record can be evicted for, as reported in the metrics
+    EVICTION_REASONS = ("ttl", "maxTasks", "maxBytes")
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_tasks: Optional[int] = DEFAULT_MAX_TASKS,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+        store: Optional[ITaskStore] = None,
+        worker_id: Optional[str] = None,
+        worker_timeout: float = DEFAULT_WORKER_TIMEOUT_SECONDS
+    ):
+        """
+        Initialize a new instance of the WorkflowTaskRegistry class.
+
+        Args:
+            ttl_seconds: The number of seconds a record is kept after it was last
+                read, or None to keep records until another limit is reached.
+            max_tasks: The maximum number of running and finished tasks, or None for no limit.
+            max_bytes: The maximum size of the records in bytes, or None for no limit.
+            clock: The clock measuring the TTL, in seconds.
+            store: The store persisting the records, or None to keep them in memory only.
+            worker_id: The ID of this worker in a store shared with other workers,
+                or None if the store is not shared.
+            worker_timeout: The number of seconds after its last heartbeat a worker
+                is considered dead.
+
+        Raises:
+            ValueError: If the TTL or the byte budget is negative, the task limit is
+                less than 1, the worker timeout is not positive, or a worker ID is
+                given without a store.
+        """
+        if ttl_seconds is not None and ttl_seconds < 0:
+            raise ValueError(f"Task TTL must not be negative, got {ttl_seconds}")
+        if max_tasks is not None and max_tasks < 1:
+            raise ValueError(f"Task limit must be at least 1, got {max_tasks}")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(f"Task byte budget must not be negative, got {max_bytes}")
+        if worker_timeout <= 0:
+            raise ValueError(f"Worker timeout must be positive, got {worker_timeout}")
+        if worker_id is not None and store is None:
+            raise ValueError("A worker ID requires a task store shared by the workers")
+        self._ttl_seconds = ttl_seconds
+        self._max_tasks = max_tasks
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._store = store
+        self._worker_id = worker_id
+        self._worker_timeout = worker_timeout
+        self._tasks: Dict[str, ITask] = {}
+        # Compactions of finished tasks waiting for the executor, by task ID
+        self._compactions: Dict[str, asyncio.Future] = {}
+        # Records in the order they were last read, least recently used first
+        self._records: 'OrderedDict[str, WorkflowTaskRecord]' = OrderedDict()
+        self._bytes = 0
+        self._compacted = 0
+        self._loaded = 0
+        self._evictions = {reason: 0 for reason in self.EVICTION_REASONS}
+        self._evicted_bytes = 0
+        self._cancel_requests = 0
+        self._remote_cancels = 0
+
+    def add(self, task: ITask) -> None:
+        """
+        Add a task, which is compacted once it has finished.
+
+        Args:
+            task: The task.
+        """
+        self[task.id] = task
+
+    def __setitem__(self, task_id: str, task: ITask) -> None:
+        """
+        Add a task under an ID.
+
+        Args:
+            task_id: The ID of the task.
+            task: The task.
+        """
+        self._records.pop(task_id, None)
+        self._tasks[task_id] = task
+        # The IO center forgets the inputs when the context is disposed, keep them for the report
+        inputs = task.context.io_center.inputs
+        task.on_complete(lambda _: self._compact(task_id, task, inputs))
+        task.on_error(lambda _: self._compact(task_id, task, inputs))
+        if self._worker_id is not None:
+            try:
+                self._store.claim(task_id, self._worker_id)
+            except Exception as e:
+                logging.error(f"Error claiming task {task_id}: {e}")
+        self._evict()
+
+    def __getitem__(self, task_id: str) -> ITask:
+        """
+        Get a task that has not been compacted.
+
+        Args:
+            task_id: The ID of the task.
+
+        Returns:
+            The task.
+
+        Raises:
+            KeyError: If there is no such task.
+        """
+        return self._tasks[task_id]
+
+    def __delitem__(self, task_id: str) -> None:
+        """
+        Remove a task that has not been compacted.
+
+        Args:
+            task_id: The ID of the task.
+
+        Raises:
+            KeyError: If there is no such task.
+        """
+        del self._tasks[task_id]
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterate over the IDs of the tasks that have not been compacted.
+
+        Returns:
+            An iterator over the task IDs.
+        """
+        return iter(list(self._tasks))
+
+    def __len__(self) -> int:
+        """
+        Get the number of tasks that have not been compacted.
+
+        Returns:
+            The number of tasks.
+        """
+        return len(self._tasks)
+
+    def record(self, task_id: str) -> Optional[WorkflowTaskRecord]:
+        """
+        Get the record of a finished task, which counts as a use of the record.
+
+        Args:
+            task_id: The ID of the task.
+
+        Returns:
+            The record, or None if the task has not finished, was evicted or never existed.
+        """
+        self._evict()
+        record = self._records.get(task_id)
+        if record is not None:
+            record.accessed_at = self._clock()
+            self._records.move_to_end(task_id)
+        return record
+
+    async def lookup(self, task_id: str) -> Optional[WorkflowTaskRecord]:
+        """
+        Get the record of a finished task, loading it from the store if it is not in memory.
+
+        Args:
+            task_id: The ID of the task.
+
+        Returns:
+            The record, or None if the task has not finished or is unknown to the store.
+        """
+        compaction = self._compactions.get(task_id)
+        if compaction is not None:
+            await asyncio.shield(compaction)
+        record = self.record(task_id)
+        if record is not None or self._store is None or task_id in self._tasks:
+            return record
+        entry = await self._store.get(task_id)
+        if entry is None:
+            return None
+        # Another lookup may have loaded the record while this one waited for the store
+        record = self.record(task_id)
+        if record is not None:
+            return record
+        record = WorkflowTaskRecord.from_entry(entry, self._clock())
+        self._records[task_id] = record
+        self._bytes += record.nbytes
+        self._loaded += 1
+        self._evict()
+        return record
+
+    async def owner(self, task_id: str) -> Optional[str]:
+        """
+        Get the worker running a task.
+
+        Args:
+            task_id: The ID of the task.
+
+        Returns:
+            The ID of the worker, or None if the task is not running on a live
+            worker or the store is not shared.
+        """
+        if self._worker_id is None:
+            return None
+        if task_id in self._tasks:
+            return self._worker_id
+        owner = await self._store.owner(task_id)
+        if owner is None or owner["heartbeatAt"] is None:
+            return None
+        if time.time() - owner["heartbeatAt"] > self._worker_timeout:
+            return None
+        return owner["workerID"]
+
+    async def wait_record(self, task_id: str, timeout: Optional[float] = None) -> Optional[WorkflowTaskRecord]:
+        """
+        Wait for a task to finish and get its record.
+
+        A task running in this registry is awaited, a task running on another
+        worker is looked up in the store until its record appears.
+
+        Args:
+            task_id: The ID of the task.
+            timeout: The maximum number of seconds to wait, or None to wait until the task finishes.
+
+        Returns:
+            The record, or None if the task did not finish in time or is not running.
+        """
+        task = self._tasks.get(task_id)
+        if task is not None:
+            await task.wait(timeout)
+            compaction = self._compactions.get(task_id)
+            if compaction is not None:
+                await asyncio.shield(compaction)
+            return self.record(task_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            record = await self.lookup(task_id)
+            if record is not None:
+                return record
+            if await self.owner(task_id) is None:
+                # The task may have finished since it was looked up, its record replaces its claim
+                return await self.lookup(task_id)
+            delay = self.REMOTE_POLL_SECONDS
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+                if delay <= 0:
+                    return None
+            await asyncio.sleep(delay)
+
+    async def request_cancel(self, task_id: str) -> bool:
+        """
+        Ask the worker running a task to cancel it.
+
+        Args:
+            task_id: The ID of the task, which is not running in this registry.
+
+        Returns:
+            True if the task is running on a live worker, which cancels it with its
+            next heartbeat, False otherwise.
+        """
+        if task_id in self._tasks or await self.owner(task_id) is None:
+            return False
+        if not await self._store.request_cancel(task_id):
+            return False
+        self._cancel_requests += 1
+        return True
+
+    async def heartbeat(self) -> None:
+        """
+        Record that this worker is alive and cancel the tasks other workers asked to cancel.
+        """
+        if self._worker_id is None:
+            return
+        for task_id in await self._store.heartbeat(self._worker_id):
+            task = self._tasks.get(task_id)
+            if task is not None:
+                logging.info(f"Cancelling task {task_id} at the request of another worker")
+                task.cancel()
+                self._remote_cancels += 1
+
+    async def serve(self) -> None:
+        """
+        Heartbeat every `HEARTBEAT_SECONDS` until cancelled.
+        """
+        while True:
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logging.error(f"Error sending the heartbeat of worker {self._worker_id}: {e}")
+            await asyncio.sleep(self.HEARTBEAT_SECONDS)
+
+    async def publish(self) -> bool:
+        """
+        Wait until the tasks added so far can be found by other workers.
+
+        The wait is limited to `PUBLISH_TIMEOUT_SECONDS`. The claims are still
+        written once the store gets through, so a timeout only means that other
+        workers may not find the tasks for a while.
+
+        Returns:
+            True if the tasks were published in time or the store is not shared,
+            False if the wait timed out.
+        """
+        if self._worker_id is None:
+            return True
+        try:
+            await asyncio.wait_for(self._store.flush(), self.PUBLISH_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logging.warning(
+                f"Tasks of worker {self._worker_id} not published within {self.PUBLISH_TIMEOUT_SECONDS}s, "
+                f"the task store may be locked"
+            )
+            return False
+        return True
+
+    @property
+    def worker_id(self) -> Optional[str]:
+        """
+        Get the ID of this worker in the shared store.
+
+        Returns:
+            The worker ID, or None if the store is not shared.
+        """
+        return self._worker_id
+
+    @property
+    def store(self) -> Optional[ITaskStore]:
+        """
+        Get the store persisting the records.
+
+        Returns:
+            The store, or None if the records are kept in memory only.
+        """
+        return self._store
+
+    def sweep(self) -> None:
+        """
+        Evict the records that expired or exceed the limits.
+        """
+        self._evict()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get the metrics of the registry.
+
+        Returns:
+            The numbers of running and finished tasks, the size of the records,
+            the numbers of compacted tasks and of records loaded from the store,
+            the number and size of the records evicted, by the limit they were
+            evicted for, the numbers of cancel requests sent to other workers and
+            received from them, and the metrics of the store.
+        """
+        self._evict()
+        return {
+            "running": len(self._tasks),
+            "finished": len(self._records),
+            "bytes": self._bytes,
+            "compacted": self._compacted,
+            "loaded": self._loaded,
+            "evictions": dict(self._evictions),
+            "evictedBytes": self._evicted_bytes,
+            "ttlSeconds": self._ttl_seconds,
+            "maxTasks": self._max_tasks,
+            "maxBytes": self._max_bytes,
+            "workerID": self._worker_id,
+            "cancelRequests": self._cancel_requests,
+            "remoteCancels": self._remote_cancels,
+            "store": None if self._store is None else self._store.metrics(),
+        }
+
+    def _compact(self, task_id: str, task: ITask, inputs: Dict[str, Any]) -> None:
+        """
+        Start replacing a finished task with its record.
+
+        Called back when the task completes, after its context was disposed.
+        The task stays in the registry until its report is frozen in the executor.
+        Without a running event loop, the task is compacted right away.
+
+        Args:
+            task_id: The ID of the task.
+            task: The task.
+            inputs: The workflow inputs of the task.
+        """
+        if self._tasks.get(task_id) is not task or task_id in self._compactions:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            record = self._freeze(task_id, task, inputs)
+            if record is not None:
+                self._keep(task_id, task, record, self._to_entry(task_id, record))
+            return
+        compaction = asyncio.ensure_future(self._compact_off_loop(task_id, task, inputs))
+        self._compactions[task_id] = compaction
+        compaction.add_done_callback(lambda _: self._compactions.pop(task_id, None))
+
+    async def _compact_off_loop(self, task_id: str, task: ITask, inputs: Dict[str, Any]) -> None:
+        """
+        Replace a finished task with its record, freezing and encoding it in the executor.
+
+        A task that cannot be compacted stays in the registry as it is.
+
+        Args:
+            task_id: The ID of the task.
+            task: The task.
+            inputs: The workflow inputs of the task.
+        """
+        loop = asyncio.get_running_loop()
+        record = await loop.run_in_executor(None, self._freeze, task_id, task, inputs)
+        if record is None:
+            return
+        entry = await loop.run_in_executor(None, self._to_entry, task_id, record)
+        self._keep(task_id, task, record, entry)
+
+    def _freeze(self, task_id: str, task: ITask, inputs: Dict[str, Any]) -> Optional[WorkflowTaskRecord]:
+        """
+        Freeze the report and the event bus of a finished task into a record.
+
+        Args:
+            task_id: The ID of the task.
+            task: The task.
+            inputs: The workflow inputs of the task.
+
+        Returns:
+            The record, or None if the task cannot be compacted.
+        """
+        try:
+            context = task.context
+            workflow = context.status_center.workflow
+            outputs = to_jsonable(task.processing) if isinstance(task.processing, dict) else {}
+            return WorkflowTaskRecord(
+                task_id=task_id,
+                status=getattr(workflow.status, "value", workflow.status),
+                outputs=outputs,
+                reporter=context.reporter.freeze(to_jsonable(inputs), outputs),
+                event_bus=context.event_bus.freeze(),
+                finished_at=time.time(),
+                accessed_at=self._clock()
+            )
+        except Exception as e:
+            logging.error(f"Error compacting task {task_id}: {e}")
+            return None
+
+    def _to_entry(self, task_id: str, record: WorkflowTaskRecord) -> Optional[TaskStoreEntry]:
+        """
+        Encode the store entry of a record.
+
+        Args:
+            task_id: The ID of the task.
+            record: The record of the task.
+
+        Returns:
+            The entry, or None if there is no store or the record cannot be encoded.
+        """
+        if self._store is None:
+            return None
+        try:
+            return record.to_entry()
+        except Exception as e:
+            logging.error(f"Error storing task {task_id}: {e}")
+            return None
+
+    def _keep(
+        self,
+        task_id: str,
+        task: ITask,
+        record: WorkflowTaskRecord,
+        entry: Optional[TaskStoreEntry]
+    ) -> None:
+        """
+        Replace a task with its record and hand the entry of the record to the store.
+
+        Args:
+            task_id: The ID of the task.
+            task: The task.
+            record: The record of the task.
+            entry: The store entry of the record, or None if it is not stored.
+        """
+        if self._tasks.get(task_id) is not task:
+            return
+        del self._tasks[task_id]
+        self._records[task_id] = record
+        self._bytes += record.nbytes
+        self._compacted += 1
+        if entry is not None:
+            try:
+                self._store.put(entry)
+            except Exception as e:
+                logging.error(f"Error storing task {task_id}: {e}")
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        Evict records, least recently used first, until all limits are met.
+        """
+        if self._ttl_seconds is not None:
+            expired_at = self._clock() - self._ttl_seconds
+            while self._records and next(iter(self._records.values())).accessed_at <= expired_at:
+                self._evict_oldest("ttl")
+        if self._max_tasks is not None:
+            while self._records and len(self._tasks) + len(self._records) > self._max_tasks:
+                self._evict_oldest("maxTasks")
+        if self._max_bytes is not None:
+            while self._records and self._bytes > self._max_bytes:
+                self._evict_oldest("maxBytes")
+
+    def _evict_oldest(self, reason: str) -> None:
+        """
+        Evict the least recently used record.
+
+        Args:
+            reason: The limit the record is evicted for.
+        """
+        _, record = self._records.popitem(last=False)
+        self._bytes -= record.nbytes
+        self._evictions[reason] += 1
+        self._evicted_bytes += record.nbytes
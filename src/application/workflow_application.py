@@ -1,15 +1,21 @@
 """
 Workflow application implementation.
 This module provides the WorkflowApplication class which is the main entry point for running workflows.
+
+Tasks are kept in a `WorkflowTaskRegistry`, which compacts finished tasks into
+records and evicts the records beyond its TTL, task limit and byte budget.
+Submitted workflows pass a `WorkflowAdmissionController`, which bounds the
+workflows running at once and queues or rejects the others.
 """
 import logging
-from typing import Dict, Optional, Any
+from typing import Optional, Any
 
 from ..interface.engine import IEngine
-from ..interface.task import ITask
 from ..interface.context import IReport
 from ..interface.schema import InvokeParams, WorkflowOutputs
 from ..domain.container import WorkflowRuntimeContainer
+from .task_registry import WorkflowTaskRegistry
+from .admission_controller import WorkflowAdmissionController
 
 
 class WorkflowApplication:
@@ -23,7 +29,8 @@ class WorkflowApplication:
     def __init__(self):
         """Initialize a new workflow application."""
         self.container = WorkflowRuntimeContainer.instance()
-        self.tasks: Dict[str, ITask] = {}
+        self.tasks = WorkflowTaskRegistry()
+        self.admission = WorkflowAdmissionController()
 
     def run(self, params: InvokeParams) -> str:
         """
@@ -37,7 +44,7 @@ class WorkflowApplication:
         """
         engine = self.container.get(IEngine)
         task = engine.invoke(params)
-        self.tasks[task.id] = task
+        self.tasks.add(task)
         logging.info(f"> POST TaskRun - taskID: {task.id}")
         logging.info(params.get("inputs"))
         
@@ -50,6 +57,22 @@ class WorkflowApplication:
         
         return task.id
 
+    async def submit(self, params: InvokeParams) -> str:
+        """
+        Run a workflow once the admission controller admits it.
+        
+        Args:
+            params: The parameters to invoke the workflow with.
+            
+        Returns:
+            The ID of the created task.
+            
+        Raises:
+            WorkflowAdmissionError: If the workflow was not admitted.
+        """
+        task = await self.admission.run(lambda: self.tasks[self.run(params)])
+        return task.id
+
     def cancel(self, task_id: str) -> bool:
         """
         Cancel a running task.
@@ -80,7 +103,8 @@ class WorkflowApplication:
         task = self.tasks.get(task_id)
         logging.info(f"> GET TaskReport - taskID: {task_id}")
         if not task:
-            return None
+            record = self.tasks.record(task_id)
+            return record.reporter.export() if record is not None else None
         return task.context.reporter.export()
 
     def result(self, task_id: str) -> Optional[WorkflowOutputs]:
@@ -96,7 +120,8 @@ class WorkflowApplication:
         logging.info(f"> GET TaskResult - taskID: {task_id}")
         task = self.tasks.get(task_id)
         if not task:
-            return None
+            record = self.tasks.record(task_id)
+            return record.outputs if record is not None else None
         if not task.context.status_center.workflow.terminated:
             return None
         return task.context.io_center.outputs
@@ -0,0 +1,63 @@
+"""
+Tests for compact array inputs.
+This module runs workflows whose input lists are stored as typed arrays.
+"""
+import asyncio
+import copy
+import unittest
+
+from ...interface import IEngine
+from ...interface.node import WorkflowStatus, WorkflowVariableType
+from ...domain.container import WorkflowRuntimeContainer
+from ...infrastructure.typed_array import StringArray, compact_array
+from ...infrastructure.utils import to_jsonable
+from ..state import WorkflowRuntimeState
+from ..variable import WorkflowRuntimeVariableStore
+from .schemas.loop import loop_schema
+
+
+class TestCompactInputs(unittest.IsolatedAsyncioTestCase):
+    """Test cases for workflows with compact array inputs."""
+
+    def test_parse_ref(self):
+        """Test that references to typed arrays carry the type of their items."""
+        variable_store = WorkflowRuntimeVariableStore()
+        variable_store.init()
+        variable_store.set_variable({
+            "nodeID": "start_0", "key": "scores", "value": compact_array([0.5, 1.5]), "type": "array"
+        })
+        state = WorkflowRuntimeState(variable_store)
+        state.init()
+
+        result = state.parse_ref({"type": "ref", "content": ["start_0", "scores"]})
+        self.assertEqual(result["type"], WorkflowVariableType.Array)
+        self.assertEqual(result["items_type"], WorkflowVariableType.Number)
+
+    async def test_loop_over_string_array(self):
+        """Test that a loop iterates a string array input and the snapshot converts back to a list."""
+        engine = WorkflowRuntimeContainer.instance().get(IEngine)
+        tasks = [f"TASK - {i}" for i in range(20)]
+        task = engine.invoke({
+            # The document removes the blocks from the schema it is given
+            "schema": copy.deepcopy(loop_schema),
+            "inputs": {
+                "prompt": "How are you?",
+                "system_prompt": "You are a helpful AI assistant.",
+                "tasks": tasks,
+            },
+            "options": {"compactArrays": True},
+        })
+        while not task.context.status_center.workflow.terminated:
+            await asyncio.sleep(0.01)
+
+        context = task.context
+        self.assertEqual(context.status_center.workflow.status, WorkflowStatus.Succeeded)
+        snapshots = context.snapshot_center.export_all()
+        self.assertEqual(len([s for s in snapshots if s["nodeID"] == "llm_0"]), len(tasks))
+        start_snapshot = next(s for s in snapshots if s["nodeID"] == "start_0")
+        self.assertIsInstance(start_snapshot["outputs"]["tasks"], StringArray)
+        self.assertEqual(to_jsonable(start_snapshot)["outputs"]["tasks"], tasks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -182,6 +182,19 @@ def test_context_disposal():
     print("Context disposal test passed.")
 
 
+def test_context_snapshot_ids():
+    """Test that snapshots get increasing IDs and no per-instance dict."""
+    context = WorkflowRuntimeContext.create()
+    first = context.snapshot_center.create({"node_id": "start_0", "inputs": {}})
+    second = context.snapshot_center.create({"node_id": "end_0", "inputs": {}})
+
+    assert int(second.id) > int(first.id)
+    assert first.export()["id"] == first.id
+    assert not hasattr(first, "__dict__")
+    
+    print("Context snapshot IDs test passed.")
+
+
 def main():
     """
     Main function to run all tests.
@@ -194,9 +207,10 @@ def main():
     test_context_variable_store()
     test_context_variable_store_inheritance()
     test_context_disposal()
+    test_context_snapshot_ids()
     
     print("All context tests passed.")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,70 @@
+"""
+Tests for the copy-on-write inputs handed to executors.
+This module runs a workflow whose end node mutates its inputs.
+"""
+import asyncio
+import unittest
+
+from ...interface.executor import INodeExecutor, ExecutionContext, ExecutionResult
+from ...interface.node import FlowGramNode, WorkflowStatus
+from ...nodes.start import StartExecutor
+from ..engine import WorkflowRuntimeEngine
+from ..executor import WorkflowRuntimeExecutor
+
+
+class MutatingEndExecutor(INodeExecutor):
+    """An end node executor that writes into its inputs before returning them."""
+
+    @property
+    def type(self) -> str:
+        """Get the node type that this executor can handle."""
+        return FlowGramNode.End
+
+    async def execute(self, context: ExecutionContext) -> ExecutionResult:
+        """Mutate the inputs and return them as the outputs."""
+        inputs = context.inputs
+        inputs["records"][0]["name"] = "changed"
+        inputs["records"].append({"name": "added"})
+        inputs["extra"] = True
+        return ExecutionResult(outputs=inputs)
+
+
+schema = {
+    "nodes": [
+        {"id": "start_0", "type": "start", "data": {}},
+        {"id": "end_0", "type": "end", "data": {"inputsValues": {
+            "records": {"type": "ref", "content": ["start_0", "records"]},
+        }}},
+    ],
+    "edges": [{"sourceNodeID": "start_0", "targetNodeID": "end_0"}],
+}
+
+
+class TestCopyOnWriteInputs(unittest.IsolatedAsyncioTestCase):
+    """Test cases for executors that mutate their inputs."""
+
+    async def test_mutations_do_not_reach_snapshots(self):
+        """Test that the snapshots keep the data as it was when the node ran."""
+        engine = WorkflowRuntimeEngine({"Executor": WorkflowRuntimeExecutor([StartExecutor, MutatingEndExecutor])})
+        records = [{"name": "first"}, {"name": "second"}]
+        task = engine.invoke({"schema": schema, "inputs": {"records": records}})
+        while not task.context.status_center.workflow.terminated:
+            await asyncio.sleep(0.01)
+
+        context = task.context
+        self.assertEqual(context.status_center.workflow.status, WorkflowStatus.Succeeded)
+        snapshots = {s["nodeID"]: s for s in context.snapshot_center.export_all()}
+        self.assertEqual(records, [{"name": "first"}, {"name": "second"}])
+        self.assertEqual(snapshots["start_0"]["outputs"]["records"], records)
+        self.assertEqual(snapshots["end_0"]["inputs"], {"records": records})
+
+        outputs = snapshots["end_0"]["outputs"]
+        self.assertIs(type(outputs), dict)
+        self.assertEqual(outputs["records"], [{"name": "changed"}, {"name": "second"}, {"name": "added"}])
+        self.assertTrue(outputs["extra"])
+        # The record that was not written is shared, not copied
+        self.assertIs(outputs["records"][1], records[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Tests for the workflow runtime event bus.
+This module contains tests for the events published while a workflow runs,
+their delivery to several subscribers and the bounded subscriber buffers.
+"""
+import asyncio
+import copy
+import unittest
+
+from ...interface import IEngine
+from ...interface.schema import WorkflowEventType
+from ...domain.container import WorkflowRuntimeContainer
+from .schemas.loop import loop_schema
+
+
+def invoke_loop(items):
+    """Invoke the loop workflow without waiting for it."""
+    engine = WorkflowRuntimeContainer.instance().get(IEngine)
+    return engine.invoke({
+        "schema": copy.deepcopy(loop_schema),
+        "inputs": {
+            "prompt": "How are you?",
+            "system_prompt": "You are a helpful AI assistant.",
+            "tasks": [f"TASK - {i}" for i in range(items)],
+        },
+    })
+
+
+async def receive_all(subscription):
+    """Receive the events of a subscription until it ends."""
+    return [event async for event in subscription]
+
+
+class TestEventBus(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the event bus."""
+
+    async def test_events_of_a_run(self):
+        """Test that a subscriber receives the node and workflow events until the task is disposed."""
+        task = invoke_loop(3)
+        events = await asyncio.wait_for(receive_all(task.context.event_bus.subscribe()), 5)
+        types = [event.type for event in events]
+
+        self.assertEqual(types[-1], WorkflowEventType.WorkflowTerminated.value)
+        self.assertEqual(events[-1].data["status"], "succeeded")
+        llm_events = [event.type for event in events if event.data.get("nodeID") == "llm_0"]
+        self.assertEqual(llm_events.count(WorkflowEventType.NodeStarted.value), 3)
+        self.assertEqual(llm_events.count(WorkflowEventType.NodeSucceeded.value), 3)
+        versions = [event.data["version"] for event in events]
+        self.assertEqual(versions, sorted(versions))
+        self.assertTrue(task.context.event_bus.closed)
+
+    async def test_subscribers_share_events(self):
+        """Test that every subscriber receives the same event objects."""
+        task = invoke_loop(2)
+        first, second = await asyncio.wait_for(asyncio.gather(
+            receive_all(task.context.event_bus.subscribe()),
+            receive_all(task.context.event_bus.subscribe()),
+        ), 5)
+
+        self.assertEqual(len(first), len(second))
+        self.assertTrue(all(a is b for a, b in zip(first, second)))
+        self.assertIs(first[0].json, second[0].json)
+
+    async def test_slow_subscriber_drops_oldest_events(self):
+        """Test that a full buffer drops the oldest events and reports how many were dropped."""
+        task = invoke_loop(5)
+        subscription = task.context.event_bus.subscribe(buffer_size=2)
+        while not task.context.event_bus.closed:
+            await asyncio.sleep(0.01)
+
+        events = await receive_all(subscription)
+        self.assertEqual([event.type for event in events][0], WorkflowEventType.EventsDropped.value)
+        self.assertGreater(events[0].data["count"], 0)
+        self.assertEqual(len(events), 3)
+        self.assertEqual(events[-1].type, WorkflowEventType.WorkflowTerminated.value)
+
+    async def test_late_subscriber_receives_terminal_event(self):
+        """Test that subscribing to a closed event bus returns the workflow_terminated event."""
+        task = invoke_loop(1)
+        while not task.context.event_bus.closed:
+            await asyncio.sleep(0.01)
+
+        events = await receive_all(task.context.event_bus.subscribe())
+        self.assertEqual([event.type for event in events], [WorkflowEventType.WorkflowTerminated.value])
+
+    async def test_closed_subscription_stops_receiving(self):
+        """Test that a closed subscription ends without receiving further events."""
+        task = invoke_loop(3)
+        subscription = task.context.event_bus.subscribe()
+        subscription.close()
+        self.assertEqual(await receive_all(subscription), [])
+
+        with self.assertRaises(ValueError):
+            task.context.event_bus.subscribe(buffer_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests for the workflow runtime input resolver.
+This module contains tests for compiling and resolving node inputs.
+"""
+import unittest
+
+from ..document.workflow_runtime_input_resolver import WorkflowRuntimeInputResolver
+from ..document.workflow_runtime_node_ordinals import WorkflowRuntimeNodeOrdinals
+from ..variable import WorkflowRuntimeVariableStore
+
+
+class TestInputResolver(unittest.TestCase):
+    """Test cases for the input resolver."""
+
+    def setUp(self):
+        """Set up a variable store with workflow inputs and loop locals."""
+        self.variable_store = WorkflowRuntimeVariableStore()
+        self.variable_store.init()
+        self.variable_store.set_variable({
+            "nodeID": "start_0", "key": "settings", "value": {"llm": {"temperature": 0.5}}, "type": "object"
+        })
+        self.variable_store.set_variable({"nodeID": "loop_0_locals", "key": "item", "value": "a", "type": "string"})
+        self.variable_store.set("legacy", "from default scope")
+
+    def resolve(self, inputs_values, node_outputs=None):
+        """Compile and resolve an input mapping."""
+        resolver = WorkflowRuntimeInputResolver.compile(inputs_values)
+        ordinals = WorkflowRuntimeNodeOrdinals()
+        slots = []
+        for node_id, outputs in (node_outputs or {}).items():
+            ordinals.ordinal(node_id)
+            slots.append(outputs)
+        return resolver.resolve(slots, self.variable_store, ordinals)
+
+    def test_constants_are_bound(self):
+        """Test that constants are resolved to their content."""
+        self.assertEqual(self.resolve({"prompt": {"type": "constant", "content": "hi"}}), {"prompt": "hi"})
+
+    def test_ref_sources(self):
+        """Test that refs read node outputs, then the variable store, then the default scope for start_0."""
+        inputs = self.resolve({
+            "result": {"type": "ref", "content": ["llm_0", "result"]},
+            "item": {"type": "ref", "content": ["loop_0_locals", "item"]},
+            "legacy": {"type": "ref", "content": ["start_0", "legacy"]},
+        }, node_outputs={"llm_0": {"result": "done"}})
+        self.assertEqual(inputs, {"result": "done", "item": "a", "legacy": "from default scope"})
+
+    def test_nested_path(self):
+        """Test that the path below a referenced value is followed."""
+        inputs = self.resolve({
+            "temperature": {"type": "ref", "content": ["start_0", "settings", "llm", "temperature"]},
+        })
+        self.assertEqual(inputs, {"temperature": 0.5})
+
+    def test_unresolved_refs_are_omitted(self):
+        """Test that unknown refs, missing paths and invalid entries produce no input."""
+        inputs = self.resolve({
+            "missing": {"type": "ref", "content": ["llm_9", "result"]},
+            "bad_path": {"type": "ref", "content": ["start_0", "settings", "unknown"]},
+            "short": {"type": "ref", "content": ["start_0"]},
+            "invalid": "not a flow value",
+        })
+        self.assertEqual(inputs, {})
+
+    def test_input_order(self):
+        """Test that inputs keep the order of the input mapping."""
+        inputs = self.resolve({
+            "b": {"type": "ref", "content": ["loop_0_locals", "item"]},
+            "a": {"type": "constant", "content": 1},
+        })
+        self.assertEqual(list(inputs), ["b", "a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
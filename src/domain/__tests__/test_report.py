@@ -0,0 +1,226 @@
+"""
+Tests for the workflow runtime reporter.
+This module contains tests for the node configurations shared by the snapshots,
+the versioned report deltas and the report queries.
+"""
+import asyncio
+import copy
+import unittest
+from unittest.mock import patch
+
+from ...interface import IEngine
+from ...interface.node import WorkflowStatus
+from ...domain.container import WorkflowRuntimeContainer
+from ...domain.report import WorkflowRuntimeReporter
+from ...domain.snapshot import WorkflowRuntimeSnapshot
+from .schemas.loop import loop_schema
+
+
+async def run_loop(items, options=None):
+    """Run the loop workflow and wait for it to terminate."""
+    engine = WorkflowRuntimeContainer.instance().get(IEngine)
+    task = engine.invoke({
+        "schema": copy.deepcopy(loop_schema),
+        "inputs": {
+            "prompt": "How are you?",
+            "system_prompt": "You are a helpful AI assistant.",
+            "tasks": [f"TASK - {i}" for i in range(items)],
+        },
+        "options": options,
+    })
+    while not task.context.status_center.workflow.terminated:
+        await asyncio.sleep(0.01)
+    return task.context
+
+
+class TestReportNodeConfigs(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the node configurations in the report."""
+
+    async def test_loop_snapshots_share_node_config(self):
+        """Test that loop iterations refer to one node configuration in the report."""
+        engine = WorkflowRuntimeContainer.instance().get(IEngine)
+        schema = copy.deepcopy(loop_schema)
+        task = engine.invoke({
+            # The document removes the blocks from the schema it is given
+            "schema": copy.deepcopy(schema),
+            "inputs": {
+                "prompt": "How are you?",
+                "system_prompt": "You are a helpful AI assistant.",
+                "tasks": [f"TASK - {i}" for i in range(5)],
+            },
+        })
+        while not task.context.status_center.workflow.terminated:
+            await asyncio.sleep(0.01)
+
+        context = task.context
+        self.assertEqual(context.status_center.workflow.status, WorkflowStatus.Succeeded)
+        report = context.reporter.export()
+        llm_snapshots = report.reports["llm_0"]["snapshots"]
+        self.assertEqual(len(llm_snapshots), 5)
+        self.assertTrue(all("data" not in snapshot for snapshot in llm_snapshots))
+
+        llm_schema = next(block for node in schema["nodes"] for block in node.get("blocks", []) if block["id"] == "llm_0")
+        self.assertEqual(report.nodeConfigs["llm_0"], llm_schema["data"])
+        self.assertEqual(set(report.nodeConfigs), set(report.reports) & set(context.snapshot_center.export()))
+
+
+class TestReportVersions(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the report versions and deltas."""
+
+    def apply(self, reports, delta):
+        """Apply a delta to node reports as a polling client would."""
+        for node_id, node_delta in delta["reports"].items():
+            snapshots = {} if node_delta.get("snapshotsReset") or node_id not in reports else {
+                snapshot["id"]: snapshot for snapshot in reports[node_id]["snapshots"]
+            }
+            for snapshot_id in node_delta.get("removedSnapshots", []):
+                snapshots.pop(snapshot_id, None)
+            snapshots.update((snapshot["id"], snapshot) for snapshot in node_delta["snapshots"])
+            reports[node_id] = {**node_delta, "snapshots": sorted(snapshots.values(), key=lambda s: int(s["id"]))}
+
+    async def test_export_is_cached_per_version(self):
+        """Test that the report is built once per version."""
+        context = await run_loop(3)
+        report = context.reporter.export()
+        self.assertEqual(report.version, context.reporter.version)
+        self.assertGreater(report.version, 0)
+        self.assertIs(context.reporter.export(), report)
+
+        context.status_center.workflow.success()
+        self.assertIsNot(context.reporter.export(), report)
+        self.assertEqual(context.reporter.export().version, report.version + 1)
+
+    async def test_export_reexports_only_changed_snapshots(self):
+        """Test that a new report exports again only the snapshots that changed."""
+        context = await run_loop(3)
+        report = context.reporter.export()
+        changed = context.snapshot_center._snapshots["llm_0"][1]
+
+        with patch.object(WorkflowRuntimeSnapshot, "export", autospec=True, side_effect=WorkflowRuntimeSnapshot.export) as export:
+            changed.add_data({"extra": "value"})
+            new_report = context.reporter.export()
+        self.assertEqual(export.call_count, 1)
+        self.assertEqual(new_report.reports["llm_0"]["snapshots"][1]["extra"], "value")
+        self.assertNotIn("extra", report.reports["llm_0"]["snapshots"][1])
+        # The snapshots of the other nodes are shared with the previous report
+        self.assertIs(new_report.reports["start_0"]["snapshots"], report.reports["start_0"]["snapshots"])
+
+    async def test_delta_since_current_version_is_empty(self):
+        """Test that a delta since the current version has no node reports."""
+        context = await run_loop(3)
+        delta = context.reporter.export_since(context.reporter.version)
+        self.assertEqual(delta["version"], context.reporter.version)
+        self.assertEqual(delta["reports"], {})
+        self.assertEqual(delta["nodeConfigs"], {})
+        self.assertTrue(delta["workflowStatus"]["terminated"])
+
+    async def test_delta_since_zero_matches_full_report(self):
+        """Test that a delta since version 0 holds every node and snapshot."""
+        context = await run_loop(4)
+        report = context.reporter.export()
+        delta = context.reporter.export_since(0)
+        self.assertEqual(set(delta["reports"]), set(report.reports))
+        for node_id, node_report in report.reports.items():
+            self.assertEqual(delta["reports"][node_id]["snapshots"], node_report["snapshots"])
+            self.assertEqual(delta["reports"][node_id]["status"], node_report["status"])
+        self.assertEqual(delta["nodeConfigs"], report.nodeConfigs)
+
+    async def test_deltas_rebuild_the_report(self):
+        """Test that applying deltas while the workflow runs yields the full report."""
+        engine = WorkflowRuntimeContainer.instance().get(IEngine)
+        task = engine.invoke({
+            "schema": copy.deepcopy(loop_schema),
+            "inputs": {
+                "prompt": "How are you?",
+                "system_prompt": "You are a helpful AI assistant.",
+                "tasks": [f"TASK - {i}" for i in range(6)],
+            },
+            # Evict old snapshots, so that deltas carry removals
+            "options": {"snapshot": {"nodes": {"llm_0": {"mode": "sampled", "sampleFirst": 1, "sampleLast": 2}}}},
+        })
+        reporter = task.context.reporter
+        reports, node_configs, version = {}, {}, 0
+        while True:
+            terminated = task.context.status_center.workflow.terminated
+            delta = reporter.export_since(version)
+            self.assertGreaterEqual(delta["version"], version)
+            self.apply(reports, delta)
+            node_configs.update(delta["nodeConfigs"])
+            version = delta["version"]
+            if terminated:
+                break
+            await asyncio.sleep(0)
+
+        report = reporter.export()
+        self.assertEqual(version, report.version)
+        self.assertEqual(set(reports), set(report.reports))
+        for node_id, node_report in report.reports.items():
+            self.assertEqual(reports[node_id]["snapshots"], node_report["snapshots"])
+            self.assertEqual(reports[node_id]["status"], node_report["status"])
+        self.assertEqual(len(reports["llm_0"]["snapshots"]), 3)
+        self.assertEqual(node_configs, report.nodeConfigs)
+
+    async def test_forgotten_removals_reset_snapshots(self):
+        """Test that a delta reaching past the remembered removals resets the snapshots."""
+        with patch.object(WorkflowRuntimeReporter, "MAX_REMOVALS", 2):
+            # Every iteration but the last evicts a snapshot of llm_0
+            context = await run_loop(5, {"snapshot": {"mode": "sampled", "sampleLast": 1}})
+        delta = context.reporter.export_since(0)
+        llm_report = delta["reports"]["llm_0"]
+        self.assertTrue(llm_report["snapshotsReset"])
+        self.assertNotIn("removedSnapshots", llm_report)
+        self.assertEqual(llm_report["snapshots"], context.snapshot_center.export()["llm_0"])
+        self.assertEqual(len(llm_report["snapshots"]), 1)
+
+class TestReportQuery(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the filtered and paged report queries."""
+
+    async def asyncSetUp(self):
+        """Run the loop workflow."""
+        self.context = await run_loop(5)
+        self.reporter = self.context.reporter
+
+    def test_query_without_filters_matches_full_report(self):
+        """Test that a query without filters has the node reports of the full report."""
+        report = self.reporter.export()
+        query = self.reporter.query()
+        for node_id, node_report in report.reports.items():
+            self.assertEqual(
+                {key: value for key, value in query["reports"][node_id].items() if key != "snapshotCount"},
+                node_report
+            )
+        self.assertEqual(query["nodeConfigs"], report.nodeConfigs)
+
+    def test_filters_and_fields(self):
+        """Test that nodes are filtered by ID, status and type, with selected fields."""
+        query = self.reporter.query(node_types=["llm"], fields=["status", "timeCost"])
+        self.assertEqual(query["reports"], {"llm_0": {
+            "id": "llm_0",
+            "status": "Succeeded",
+            "timeCost": self.context.status_center.node_status("llm_0").timeCost,
+        }})
+        self.assertEqual(query["nodeConfigs"], {})
+        self.assertEqual(set(self.reporter.query(statuses=["succeeded"])["reports"]), set(self.reporter.export().reports))
+        self.assertEqual(self.reporter.query(statuses=["failed"])["reports"], {})
+        self.assertEqual(list(self.reporter.query(node_ids=["end_0", "missing"])["reports"]), ["end_0"])
+        with self.assertRaises(ValueError):
+            self.reporter.query(fields=["inputs"])
+
+    def test_paged_snapshots(self):
+        """Test that snapshots are paged with cursors and selected fields."""
+        snapshots = self.reporter.export().reports["llm_0"]["snapshots"]
+        query = self.reporter.query(node_ids=["llm_0"], snapshot_fields=["branch"], limit=2)
+        llm_report = query["reports"]["llm_0"]
+        self.assertEqual(llm_report["snapshotCount"], 5)
+        self.assertEqual(llm_report["snapshots"], [
+            {"id": s["id"], "nodeID": "llm_0", "branch": s["branch"]} for s in snapshots[:2]
+        ])
+        self.assertEqual(llm_report["nextCursor"], snapshots[1]["id"])
+
+        query = self.reporter.query(node_ids=["llm_0"], cursor=llm_report["nextCursor"], limit=3)
+        self.assertEqual(query["reports"]["llm_0"]["snapshots"], snapshots[2:])
+        self.assertNotIn("nextCursor", query["reports"]["llm_0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
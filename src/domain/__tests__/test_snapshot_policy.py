@@ -0,0 +1,230 @@
+"""
+Tests for the snapshot policies.
+This module contains tests for the snapshot modes, sampling and truncation,
+for paging through the snapshots of a node and for offloading snapshots.
+"""
+import asyncio
+import copy
+import unittest
+
+from ...interface import IEngine
+from ...interface.node import WorkflowStatus
+from ...domain.container import WorkflowRuntimeContainer
+from ..snapshot import WorkflowRuntimeSnapshotCenter
+from .schemas.loop import loop_schema
+
+
+def record_runs(center: WorkflowRuntimeSnapshotCenter, node_id: str, runs: int) -> None:
+    """Record node runs the way the engine does."""
+    for run in range(runs):
+        snapshot = center.create({"node_id": node_id, "inputs": {"run": run}})
+        snapshot.add_data({"outputs": {"result": "x" * 100}, "branch": None})
+
+
+class TestSnapshotPolicy(unittest.TestCase):
+    """Test cases for the snapshot policies of the snapshot center."""
+
+    def test_full_by_default(self):
+        """Test that every run is recorded in full without options."""
+        center = WorkflowRuntimeSnapshotCenter()
+        center.init()
+        record_runs(center, "llm_0", 3)
+        snapshots = center.export_all()
+        self.assertEqual([s["inputs"]["run"] for s in snapshots], [0, 1, 2])
+        self.assertEqual(snapshots[0]["outputs"], {"result": "x" * 100})
+
+    def test_off_and_metadata(self):
+        """Test that off records nothing and metadata leaves out the payloads."""
+        center = WorkflowRuntimeSnapshotCenter()
+        center.init({"mode": "off", "nodes": {"llm_1": {"mode": "metadata"}}})
+        record_runs(center, "llm_0", 3)
+        record_runs(center, "llm_1", 2)
+        snapshots = center.export_all()
+        self.assertEqual([s["nodeID"] for s in snapshots], ["llm_1", "llm_1"])
+        self.assertEqual(set(snapshots[0]), {"id", "nodeID", "branch"})
+
+    def test_sampled(self):
+        """Test that sampling keeps the first, every N-th and last runs in order."""
+        center = WorkflowRuntimeSnapshotCenter()
+        center.init({"mode": "sampled", "sampleFirst": 2, "sampleEvery": 10, "sampleLast": 2})
+        record_runs(center, "llm_0", 25)
+        record_runs(center, "end_0", 1)
+        runs = [s["inputs"]["run"] for s in center.export_all()]
+        self.assertEqual(runs, [0, 1, 10, 20, 23, 24, 0])
+        self.assertEqual(center.export()["llm_0"][-1]["outputs"], {"result": "x" * 100})
+
+    def test_truncation(self):
+        """Test that large input and output values are replaced with a marker."""
+        center = WorkflowRuntimeSnapshotCenter()
+        center.init({"maxPayloadBytes": 10})
+        record_runs(center, "llm_0", 1)
+        snapshot = center.export_all()[0]
+        self.assertEqual(snapshot["inputs"], {"run": 0})
+        self.assertEqual(snapshot["outputs"]["result"], {"truncated": True, "bytes": 100, "preview": "x" * 10})
+
+    def test_invalid_options(self):
+        """Test that invalid options are rejected."""
+        center = WorkflowRuntimeSnapshotCenter()
+        with self.assertRaises(ValueError):
+            center.init({"mode": "verbose"})
+        with self.assertRaises(ValueError):
+            center.init({"mode": "sampled", "nodes": {"llm_0": {"sampleEvery": -1}}})
+
+
+class TestSnapshotPolicyWorkflow(unittest.IsolatedAsyncioTestCase):
+    """Test cases for workflows run with a snapshot policy."""
+
+    async def test_sampled_loop(self):
+        """Test that a loop body only records the sampled iterations."""
+        engine = WorkflowRuntimeContainer.instance().get(IEngine)
+        task = engine.invoke({
+            # The document removes the blocks from the schema it is given
+            "schema": copy.deepcopy(loop_schema),
+            "inputs": {
+                "prompt": "How are you?",
+                "system_prompt": "You are a helpful AI assistant.",
+                "tasks": [f"TASK - {i}" for i in range(20)],
+            },
+            "options": {"snapshot": {"mode": "sampled", "sampleFirst": 1, "sampleLast": 1, "nodes": {
+                "start_0": {"mode": "full"},
+            }}},
+        })
+        while not task.context.status_center.workflow.terminated:
+            await asyncio.sleep(0.01)
+
+        context = task.context
+        self.assertEqual(context.status_center.workflow.status, WorkflowStatus.Succeeded)
+        snapshots = context.snapshot_center.export()
+        self.assertEqual(len(snapshots["llm_0"]), 2)
+        self.assertEqual(len(snapshots["start_0"]), 1)
+
+
+class TestSnapshotPages(unittest.TestCase):
+    """Test cases for the snapshot pages of a node."""
+
+    def page_through(self, center, node_id, limit):
+        """Collect the runs of all pages of a node."""
+        runs, cursor = [], None
+        while True:
+            snapshots, cursor = center.export_node(node_id, cursor, limit)
+            self.assertLessEqual(len(snapshots), limit)
+            runs.extend(s["inputs"]["run"] for s in snapshots)
+            if cursor is None:
+                return runs
+
+    def test_pages(self):
+        """Test that pages of a node cover its snapshots once and in order."""
+        center = WorkflowRuntimeSnapshotCenter()
+        center.init()
+        record_runs(center, "llm_0", 7)
+        record_runs(center, "end_0", 1)
+        record_runs(center, "llm_0", 3)
+        self.assertEqual(self.page_through(center, "llm_0", 3), [*range(7), *range(3)])
+        self.assertEqual(center.count("llm_0"), 10)
+        self.assertEqual(center.node_ids(), ["llm_0", "end_0"])
+        snapshots, cursor = center.export_node("llm_0")
+        self.assertEqual(snapshots, center.export()["llm_0"])
+        self.assertIsNone(cursor)
+        self.assertEqual(center.export_node("missing", limit=5), ([], None))
+
+    def test_pages_with_last_runs(self):
+        """Test that pages merge the sampled runs with the last runs."""
+        center = WorkflowRuntimeSnapshotCenter()
+        center.init({"mode": "sampled", "sampleFirst": 2, "sampleEvery": 10, "sampleLast": 3})
+        record_runs(center, "llm_0", 25)
+        self.assertEqual(self.page_through(center, "llm_0", 2), [0, 1, 10, 20, 22, 23, 24])
+        self.assertEqual(center.count("llm_0"), 7)
+
+    def test_invalid_page(self):
+        """Test that invalid cursors and limits are rejected."""
+        center = WorkflowRuntimeSnapshotCenter()
+        center.init()
+        record_runs(center, "llm_0", 1)
+        with self.assertRaises(ValueError):
+            center.export_node("llm_0", "not-an-id")
+        with self.assertRaises(ValueError):
+            center.export_node("llm_0", limit=0)
+
+
+class TestSnapshotOffload(unittest.IsolatedAsyncioTestCase):
+    """Test cases for offloading snapshots to a scratch file."""
+
+    def test_offload_on_dispose(self):
+        """Test that disposing offloads the snapshots and keeps them readable."""
+        center = WorkflowRuntimeSnapshotCenter()
+        center.init({"offload": True, "nodes": {"llm_0": {"mode": "sampled", "sampleFirst": 1, "sampleLast": 2}}})
+        record_runs(center, "llm_0", 5)
+        record_runs(center, "end_0", 2)
+        exported = center.export()
+        pages = center.export_node("llm_0", limit=2)
+
+        center.dispose()
+        self.assertTrue(center.offloaded)
+        self.assertEqual(center.export(), exported)
+        self.assertEqual(center.export_all(), sorted(
+            [*exported["llm_0"], *exported["end_0"]], key=lambda s: int(s["id"])
+        ))
+        self.assertEqual(center.export_node("llm_0", limit=2), pages)
+        self.assertEqual(center.count("llm_0"), 3)
+        with self.assertRaises(RuntimeError):
+            center._snapshots["end_0"][0].add_data({"branch": "x"})
+
+        # Disposing again, as sub-contexts do, leaves the offloaded snapshots alone
+        center.dispose()
+        self.assertEqual(center.export(), exported)
+
+    def test_snapshots_are_logged_while_recording(self):
+        """Test that snapshots are appended to the spill log in batches before the task is disposed."""
+        center = WorkflowRuntimeSnapshotCenter()
+        center.init({"offload": True})
+        record_runs(center, "llm_0", center.LOG_BATCH_SIZE)
+        self.assertGreater(center._log.size, 0)
+        self.assertLess(len(center._unlogged), center.LOG_BATCH_SIZE)
+
+        # A snapshot that changes after it was logged is read with its latest data
+        first = center._snapshots["llm_0"][0]
+        self.assertIn(first._seq, center._log_offsets)
+        first.add_data({"branch": "late"})
+        exported = center.export()
+        center.dispose()
+        self.assertEqual(center.export(), exported)
+        self.assertEqual(center.export()["llm_0"][0]["branch"], "late")
+        self.assertIsNone(center._log)
+
+    def test_no_offload_by_default(self):
+        """Test that snapshots stay in memory without the offload option."""
+        center = WorkflowRuntimeSnapshotCenter()
+        center.init()
+        record_runs(center, "llm_0", 2)
+        center.dispose()
+        self.assertFalse(center.offloaded)
+        self.assertIs(type(center._snapshots["llm_0"]), list)
+
+    async def test_report_of_offloaded_task(self):
+        """Test that the report of a finished task is read from the offloaded snapshots."""
+        engine = WorkflowRuntimeContainer.instance().get(IEngine)
+        task = engine.invoke({
+            "schema": copy.deepcopy(loop_schema),
+            "inputs": {
+                "prompt": "How are you?",
+                "system_prompt": "You are a helpful AI assistant.",
+                "tasks": [f"TASK - {i}" for i in range(4)],
+            },
+            "options": {"snapshot": {"offload": True}},
+        })
+        context = task.context
+        while not context.snapshot_center.offloaded:
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(context.status_center.workflow.status, WorkflowStatus.Succeeded)
+        report = context.reporter.export()
+        llm_snapshots = report.reports["llm_0"]["snapshots"]
+        self.assertEqual([s["inputs"]["prompt"] for s in llm_snapshots], [f"TASK - {i}" for i in range(4)])
+        self.assertIsNot(context.reporter.export(), report)
+        delta = context.reporter.export_since(0)
+        self.assertEqual(delta["reports"]["llm_0"]["snapshots"], llm_snapshots)
+        self.assertTrue(delta["reports"]["llm_0"]["snapshotsReset"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Tests for spilled workflow inputs.
+This module runs workflows whose large inputs are spilled out of memory.
+"""
+import asyncio
+import copy
+import unittest
+
+from ...interface import IEngine
+from ...interface.node import WorkflowStatus
+from ...domain.container import WorkflowRuntimeContainer
+from ...infrastructure.spill import SpilledList
+from ...infrastructure.utils import to_jsonable
+from .schemas.loop import loop_schema
+
+
+class TestSpillInputs(unittest.IsolatedAsyncioTestCase):
+    """Test cases for workflows with spilled inputs."""
+
+    async def test_loop_over_spilled_input(self):
+        """Test that a loop iterates a spilled list and the report decodes it."""
+        engine = WorkflowRuntimeContainer.instance().get(IEngine)
+        tasks = [f"TASK - {i}" for i in range(200)]
+        task = engine.invoke({
+            # The document removes the blocks from the schema it is given
+            "schema": copy.deepcopy(loop_schema),
+            "inputs": {
+                "prompt": "How are you?",
+                "system_prompt": "You are a helpful AI assistant.",
+                "tasks": tasks,
+            },
+            "options": {"spillThresholdBytes": 512},
+        })
+        while not task.context.status_center.workflow.terminated:
+            await asyncio.sleep(0.01)
+
+        context = task.context
+        self.assertEqual(context.status_center.workflow.status, WorkflowStatus.Succeeded)
+        snapshots = context.snapshot_center.export_all()
+        llm_snapshots = [s for s in snapshots if s["nodeID"] == "llm_0"]
+        self.assertEqual(len(llm_snapshots), len(tasks))
+        start_snapshot = next(s for s in snapshots if s["nodeID"] == "start_0")
+        self.assertIsInstance(start_snapshot["outputs"]["tasks"], SpilledList)
+        self.assertEqual(start_snapshot["outputs"]["prompt"], "How are you?")
+        self.assertEqual(to_jsonable(start_snapshot)["outputs"]["tasks"], tasks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Tests for the ordinal-indexed workflow runtime state and status center.
+This module contains tests for the dense state layout and its exports.
+"""
+import unittest
+
+from ..document import WorkflowRuntimeDocument
+from ..state import WorkflowRuntimeState
+from ..status import WorkflowRuntimeStatusCenter
+from ..variable import WorkflowRuntimeVariableStore
+from ...interface.node import WorkflowStatus
+from .schemas.basic import basic_schema
+
+
+def build_chain_schema(node_count: int):
+    """Build a start node, a chain of nodes that each read the previous result, and an end node."""
+    nodes = [{"id": "start_0", "type": "start", "data": {}}]
+    previous_id, previous_key = "start_0", "query"
+    for index in range(node_count):
+        node_id = f"node_{index}"
+        nodes.append({"id": node_id, "type": "llm", "data": {"inputsValues": {
+            "prompt": {"type": "ref", "content": [previous_id, previous_key]},
+            "first": {"type": "ref", "content": ["node_0", "result"]},
+        }}})
+        previous_id, previous_key = node_id, "result"
+    nodes.append({"id": "end_0", "type": "end", "data": {"inputsValues": {
+        "result": {"type": "ref", "content": [previous_id, "result"]},
+    }}})
+    return {"nodes": nodes, "edges": []}
+
+
+class TestState(unittest.TestCase):
+    """Test cases for the state and the status center."""
+
+    def setUp(self):
+        """Set up a document with a state and a status center indexed by its ordinals."""
+        self.document = WorkflowRuntimeDocument()
+        self.document.init(basic_schema)
+        variable_store = WorkflowRuntimeVariableStore()
+        variable_store.init()
+        self.state = WorkflowRuntimeState(variable_store, self.document)
+        self.state.init()
+        self.status_center = WorkflowRuntimeStatusCenter()
+        self.status_center.init(self.document)
+
+    def test_document_assigns_ordinals_in_declaration_order(self):
+        """Test that every node of the document has a dense ordinal."""
+        ordinals = self.document.ordinals
+        node_ids = [node["id"] for node in basic_schema["nodes"]]
+        self.assertEqual([ordinals.ordinal(node_id) for node_id in node_ids], list(range(len(node_ids))))
+        self.assertEqual(ordinals.node_id(0), node_ids[0])
+
+    def test_document_objects_are_compact(self):
+        """Test that nodes, ports and edges have no per-instance dict and share interned IDs."""
+        node = self.document.get_node("llm_0")
+        port = next(iter(node.ports.outputs.values()))
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertFalse(hasattr(node.ports, "__dict__"))
+        self.assertFalse(hasattr(port, "__dict__"))
+        self.assertIs(port.node_id, node.id)
+
+    def test_executed_nodes_and_outputs(self):
+        """Test that executed flags and outputs are stored per node."""
+        start = self.document.start
+        self.assertFalse(self.state.is_executed_node(start))
+        self.state.set_node_outputs(start, {"query": "hello"})
+        self.state.add_executed_node(start)
+        self.assertTrue(self.state.is_executed_node(start))
+
+        end = self.document.get_node("end_0")
+        self.assertFalse(self.state.is_executed_node(end))
+
+    def test_nodes_outside_the_document(self):
+        """Test that nodes unknown to the document get ordinals on first use."""
+        node = self.document.get_node("end_0")
+        state = WorkflowRuntimeState(WorkflowRuntimeVariableStore())
+        state.init()
+        state.add_executed_node(node)
+        self.assertTrue(state.is_executed_node(node))
+
+    def run_chain(self, retain_outputs: bool):
+        """Run the chain schema through a state and return the state and document."""
+        document = WorkflowRuntimeDocument()
+        document.init(build_chain_schema(3))
+        state = WorkflowRuntimeState(WorkflowRuntimeVariableStore(), document)
+        state.init(retain_outputs)
+        for node in document.nodes:
+            state.get_node_inputs(node)
+            state.set_node_outputs(node, {"result": f"{node.id} result"})
+            state.add_executed_node(node)
+            state.release_inputs(node)
+        return state, document
+
+    def test_consumer_counts(self):
+        """Test that the document counts the consumers of each node's outputs."""
+        document = WorkflowRuntimeDocument()
+        document.init(build_chain_schema(3))
+        counts = {node_id: document.consumer_counts[document.ordinals.ordinal(node_id)]
+                  for node_id in ("start_0", "node_0", "node_1", "node_2", "end_0")}
+        self.assertEqual(counts, {"start_0": 1, "node_0": 3, "node_1": 1, "node_2": 1, "end_0": 0})
+
+    def test_outputs_released_after_last_consumer(self):
+        """Test that outputs are dropped once all their consumers have run."""
+        state, document = self.run_chain(retain_outputs=False)
+        node_1 = document.get_node("node_1")
+        end = document.get_node("end_0")
+        self.assertEqual(state.get_node_inputs(node_1), {})
+        self.assertEqual(state.get_node_inputs(end), {})
+        # Outputs without consumers are kept
+        self.assertIsNotNone(state._node_outputs[document.ordinals.ordinal("end_0")])
+
+    def test_outputs_retained(self):
+        """Test that retained outputs stay available after their consumers have run."""
+        state, document = self.run_chain(retain_outputs=True)
+        self.assertEqual(
+            state.get_node_inputs(document.get_node("node_1")),
+            {"prompt": "node_0 result", "first": "node_0 result"}
+        )
+
+    def test_node_status_export(self):
+        """Test that node statuses export in the report shape."""
+        node_status = self.status_center.node_status("llm_0")
+        self.assertEqual(node_status.status, WorkflowStatus.Idle)
+        node_status.process()
+        self.assertEqual(self.status_center.get_status_node_ids(WorkflowStatus.Processing), ["llm_0"])
+        node_status.success()
+
+        exported = self.status_center.export_node_status()
+        self.assertEqual(list(exported), ["llm_0"])
+        self.assertEqual(exported["llm_0"]["id"], "llm_0")
+        self.assertEqual(exported["llm_0"]["status"], WorkflowStatus.Succeeded.name)
+        self.assertTrue(exported["llm_0"]["terminated"])
+        self.assertGreater(exported["llm_0"]["endTime"], 0)
+        self.assertEqual(exported["llm_0"], self.status_center.node_status("llm_0").export())
+        self.assertEqual(self.status_center.get_status_node_ids(WorkflowStatus.Processing), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
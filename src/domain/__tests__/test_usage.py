@@ -0,0 +1,103 @@
+"""
+Tests for token usage accounting.
+This module contains tests for the usage center and the per-task token budget.
+"""
+import asyncio
+import unittest
+
+from ...interface import IEngine, IExecutor, WorkflowStatus
+from ...domain.container import WorkflowRuntimeContainer
+from ...nodes.llm import LLMExecutor
+from ...nodes.llm.mock_llm_server import MockLLMServer, MockLLMServerConfig
+from ..usage import WorkflowRuntimeUsageCenter
+from .schemas.basic_llm import basic_llm_schema
+
+
+class TestUsageCenter(unittest.TestCase):
+    """Test cases for the usage center."""
+
+    def test_accumulates_per_node_and_task(self):
+        """Test that usage is summed per node and for the whole task."""
+        usage_center = WorkflowRuntimeUsageCenter()
+        usage_center.init()
+        usage_center.add("llm_0", {"promptTokens": 3, "completionTokens": 4, "totalTokens": 7})
+        usage_center.add("llm_0", {"promptTokens": 1, "completionTokens": 1, "totalTokens": 2})
+        usage_center.add("llm_1", {"promptTokens": 5, "completionTokens": 5, "totalTokens": 10})
+
+        self.assertEqual(usage_center.node_usage("llm_0"), {"promptTokens": 4, "completionTokens": 5, "totalTokens": 9})
+        self.assertIsNone(usage_center.node_usage("start_0"))
+        self.assertEqual(usage_center.export(), {
+            "promptTokens": 9,
+            "completionTokens": 10,
+            "totalTokens": 19,
+            "budget": None,
+            "budgetExceeded": False,
+        })
+
+    def test_budget(self):
+        """Test that the budget is exceeded only once the total goes above it."""
+        usage_center = WorkflowRuntimeUsageCenter()
+        usage_center.init(10)
+        usage_center.add("llm_0", {"promptTokens": 5, "completionTokens": 5, "totalTokens": 10})
+        self.assertFalse(usage_center.exceeded)
+        usage_center.add("llm_0", {"promptTokens": 1, "completionTokens": 0, "totalTokens": 1})
+        self.assertTrue(usage_center.exceeded)
+
+    def test_negative_budget(self):
+        """Test that negative budgets are rejected."""
+        with self.assertRaises(ValueError):
+            WorkflowRuntimeUsageCenter().init(-1)
+
+
+class TestTokenBudget(unittest.IsolatedAsyncioTestCase):
+    """Test cases for usage reporting and budgets of running workflows."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.container = WorkflowRuntimeContainer.instance()
+        self.container.get(IExecutor).register(LLMExecutor())
+        self.server = MockLLMServer(MockLLMServerConfig())
+        self.server.start()
+
+    def tearDown(self):
+        """Stop the mock LLM server."""
+        self.server.stop()
+
+    async def run_workflow(self, options=None):
+        """Run the basic LLM workflow against the mock server and wait for it to terminate."""
+        task = self.container.get(IEngine).invoke({
+            "schema": basic_llm_schema,
+            "inputs": {
+                "model_name": "mock-model",
+                "api_key": "test-key",
+                "api_host": self.server.api_host,
+                "prompt": "How are you?",
+            },
+            "options": options,
+        })
+        while not task.context.status_center.workflow.terminated:
+            await asyncio.sleep(0.01)
+        return task.context.reporter.export()
+
+    async def test_usage_is_reported(self):
+        """Test that usage is recorded on the LLM snapshot and rolled up in the report."""
+        report = await self.run_workflow()
+        llm_report = report.reports["llm_0"]
+        node_usage = llm_report["usage"]
+
+        self.assertGreater(node_usage["totalTokens"], 0)
+        self.assertEqual(llm_report["snapshots"][0]["usage"], node_usage)
+        self.assertEqual(report.usage["totalTokens"], node_usage["totalTokens"])
+        self.assertNotIn("usage", report.reports["start_0"])
+
+    async def test_budget_aborts_workflow(self):
+        """Test that exceeding the token budget fails the workflow before the next nodes run."""
+        report = await self.run_workflow({"tokenBudget": 1})
+
+        self.assertEqual(report.workflowStatus["status"], WorkflowStatus.Failed)
+        self.assertTrue(report.usage["budgetExceeded"])
+        self.assertNotIn("end_0", report.reports)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests for the workflow runtime variable store.
+This module contains tests for lookups through the scope chain and for the
+runtime types cached by the store.
+"""
+import unittest
+from unittest import mock
+
+from ...infrastructure.utils import WorkflowRuntimeType
+from ...interface.node import WorkflowVariableType
+from ..variable import WorkflowRuntimeVariableStore
+
+
+def create_scope(parent=None) -> WorkflowRuntimeVariableStore:
+    """Create an initialized variable store, optionally nested in a parent scope."""
+    store = WorkflowRuntimeVariableStore()
+    if parent is not None:
+        store.set_parent(parent)
+    store.init()
+    return store
+
+
+class TestVariableStoreScopeChain(unittest.TestCase):
+    """Test cases for the variable store scope chain."""
+
+    def setUp(self):
+        """Set up a root scope with one workflow input."""
+        self.root = create_scope()
+        self.root.set_variable({"nodeID": "start_0", "key": "query", "value": "hello", "type": "string"})
+
+    def test_lookup_returns_value_and_type(self):
+        """Test that one lookup returns the value together with its type."""
+        variable = self.root.lookup("query", "start_0")
+        self.assertEqual(variable["value"], "hello")
+        self.assertEqual(variable["type"], "string")
+        self.assertIsNone(self.root.lookup("missing", "start_0"))
+
+    def test_nested_scopes(self):
+        """Test that nested scopes see their parents and only hold their own overrides."""
+        outer = create_scope(self.root)
+        outer.set_variable({"nodeID": "loop_0_locals", "key": "item", "value": 1, "type": "integer"})
+        inner = create_scope(outer)
+        inner.set_variable({"nodeID": "loop_0_locals", "key": "item", "value": 2, "type": "integer"})
+
+        self.assertEqual(inner.lookup("query", "start_0")["value"], "hello")
+        self.assertEqual(inner.get_variable("item", "loop_0_locals"), 2)
+        self.assertEqual(outer.get_variable("item", "loop_0_locals"), 1)
+        self.assertEqual(list(inner.store), ["loop_0_locals"])
+        self.assertFalse(self.root.has_variable("item", "loop_0_locals"))
+
+    def test_parent_changes_are_visible(self):
+        """Test that variables set on a parent after the child was created are visible."""
+        child = create_scope(self.root)
+        self.root.set_variable({"nodeID": "start_0", "key": "late", "value": True, "type": "boolean"})
+        self.assertTrue(child.get_variable("late", "start_0"))
+
+    def test_dispose_detaches_parent(self):
+        """Test that a disposed scope no longer resolves through its parent."""
+        child = create_scope(self.root)
+        child.dispose()
+        self.assertIsNone(child.lookup("query", "start_0"))
+
+
+class TestVariableStoreTypes(unittest.TestCase):
+    """Test cases for the runtime types cached by the variable store."""
+
+    def setUp(self):
+        """Set up a root scope with one object variable."""
+        self.root = create_scope()
+        self.root.set_variable({
+            "nodeID": "llm_0", "key": "result", "type": "object",
+            "value": {"items": [1, 2], "meta": {"name": "a"}, "empty": []},
+        })
+
+    def test_types_are_inferred_on_write(self):
+        """Test that reads return the inferred types without inspecting the value again."""
+        self.root.parse_variable("result", "llm_0", ["items"])
+        with mock.patch.object(WorkflowRuntimeType, "get_workflow_type", side_effect=AssertionError):
+            value, value_type, items_type = self.root.parse_variable("result", "llm_0", ["items"])
+            self.assertEqual(self.root.parse_variable("result", "llm_0")[1], WorkflowVariableType.Object)
+        self.assertEqual(value, [1, 2])
+        self.assertEqual(value_type, WorkflowVariableType.Array)
+        self.assertEqual(items_type, WorkflowVariableType.Integer)
+
+    def test_paths(self):
+        """Test nested paths, empty arrays and missing paths."""
+        self.assertEqual(self.root.parse_variable("result", "llm_0", ["meta", "name"])[1], WorkflowVariableType.String)
+        self.assertEqual(self.root.parse_variable("result", "llm_0", ["empty"])[2], WorkflowVariableType.String)
+        self.assertIsNone(self.root.parse_variable("result", "llm_0", ["missing"]))
+        self.assertIsNone(self.root.parse_variable("result", "llm_0", ["items", "0"]))
+        self.assertIsNone(self.root.parse_variable("missing", "llm_0"))
+
+    def test_set_value_invalidates_types(self):
+        """Test that writing a path replaces the memoized types of the variable."""
+        self.assertEqual(self.root.parse_variable("result", "llm_0", ["items"])[2], WorkflowVariableType.Integer)
+        self.root.set_value({"nodeID": "llm_0", "variableKey": "result", "variablePath": ["items"], "value": ["x"]})
+        self.assertEqual(self.root.parse_variable("result", "llm_0", ["items"])[2], WorkflowVariableType.String)
+        self.root.set_value({"nodeID": "llm_0", "variableKey": "result", "value": 3})
+        self.assertEqual(self.root.parse_variable("result", "llm_0"), (3, WorkflowVariableType.Integer, None))
+        self.assertIsNone(self.root.parse_variable("result", "llm_0", ["items"]))
+
+    def test_nested_scopes(self):
+        """Test that types resolve through the scope chain and overrides shadow their parents."""
+        child = create_scope(self.root)
+        self.assertEqual(child.parse_variable("result", "llm_0", ["items"])[0], [1, 2])
+        child.set_variable({"nodeID": "llm_0", "key": "result", "type": "string", "value": "local"})
+        self.assertEqual(child.parse_variable("result", "llm_0")[1], WorkflowVariableType.String)
+        self.assertEqual(self.root.parse_variable("result", "llm_0")[1], WorkflowVariableType.Object)
+        child.dispose()
+        self.assertIsNone(child.parse_variable("result", "llm_0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,9 +10,11 @@ It provides access to various components needed during workflow execution, such
 - Snapshot Center: Creates and manages snapshots of the workflow execution
 - Status Center: Manages the status of the workflow and nodes
 - Reporter: Generates reports of the workflow execution
+- Usage Center: Accumulates the token usage of the workflow
+- Event Bus: Pushes the status changes of the workflow to subscribers
 
 The context can also create sub-contexts, which inherit certain components from
-the parent context, such as the document and IO center, while having their own
+the parent context, such as the document, IO center, usage center and event bus, while having their own
 variable store and state.
 """
 from typing import List, Optional
@@ -26,9 +28,13 @@ from ...interface.context import (
     IStatusCenter,
     IReporter,
     IIOCenter,
+    IUsageCenter,
+    IEventBus,
     ContextData
 )
 from ...interface.schema import InvokeParams
+from ...infrastructure.spill import SpillStore
+from ...infrastructure.typed_array import compact_array
 from ...infrastructure.utils import uuid
 from ..variable import WorkflowRuntimeVariableStore
 from ..status import WorkflowRuntimeStatusCenter
@@ -37,6 +43,8 @@ from ..snapshot import WorkflowRuntimeSnapshotCenter
 from ..report import WorkflowRuntimeReporter
 from ..io_center import WorkflowRuntimeIOCenter
 from ..document import WorkflowRuntimeDocument
+from ..usage import WorkflowRuntimeUsageCenter
+from ..event import WorkflowRuntimeEventBus
 
 
 class WorkflowRuntimeContext(IContext):
@@ -61,6 +69,8 @@ class WorkflowRuntimeContext(IContext):
         self._snapshot_center: ISnapshotCenter = data.snapshot_center
         self._status_center: IStatusCenter = data.status_center
         self._reporter: IReporter = data.reporter
+        self._usage_center: IUsageCenter = data.usage_center
+        self._event_bus: IEventBus = data.event_bus
         self._sub_contexts: List[IContext] = []
 
     @property
@@ -132,23 +142,59 @@ class WorkflowRuntimeContext(IContext):
             The reporter.
         """
         return self._reporter
+    
+    @property
+    def usage_center(self) -> IUsageCenter:
+        """
+        Get the usage center.
+        
+        Returns:
+            The usage center.
+        """
+        return self._usage_center
+
+    @property
+    def event_bus(self) -> IEventBus:
+        """
+        Get the event bus.
+        
+        Returns:
+            The event bus.
+        """
+        return self._event_bus
 
     def init(self, params: InvokeParams) -> None:
         """
         Initialize the context with the provided parameters.
         
         Args:
-            params: The parameters used to initialize the context.
+            params: The parameters used to initialize the context. The optional
+                options may set a tokenBudget for the task, retainOutputs to
+                keep node outputs after their last consumer has run,
+                compactArrays to store homogeneous input lists as typed arrays,
+                spillThresholdBytes to spill larger inputs out of memory, and
+                snapshot to choose which node runs are recorded as snapshots.
         """
         schema = params["schema"]
+        options = params.get("options") or {}
         inputs = params["inputs"]
+        if options.get("compactArrays"):
+            # Homogeneous lists are stored in typed buffers instead of boxed Python objects
+            inputs = {
+                key: compact_array(value) if type(value) is list else value
+                for key, value in inputs.items()
+            }
+        # Large inputs are moved to memory-mapped scratch files before anything references them
+        inputs = SpillStore(options.get("spillThresholdBytes")).spill_all(inputs)
         self._document.init(schema)
         self._variable_store.init()
-        self._state.init()
+        self._state.init(bool(options.get("retainOutputs")))
         self._io_center.init(inputs)
-        self._snapshot_center.init()
-        self._status_center.init()
+        self._snapshot_center.init(options.get("snapshot"))
+        self._status_center.init(self._document)
         self._reporter.init()
+        self._usage_center.init(options.get("tokenBudget"))
+        self._event_bus.init()
         
         # Set inputs as outputs of start node
         start_nodes = self._document.get_nodes_by_type("start")
@@ -182,6 +228,8 @@ class WorkflowRuntimeContext(IContext):
         self._snapshot_center.dispose()
         self._status_center.dispose()
         self._reporter.dispose()
+        self._usage_center.dispose()
+        self._event_bus.dispose()
 
     def sub(self) -> IContext:
         """
@@ -192,7 +240,7 @@ class WorkflowRuntimeContext(IContext):
         """
         variable_store = WorkflowRuntimeVariableStore()
         variable_store.set_parent(self._variable_store)
-        state = WorkflowRuntimeState(variable_store)
+        state = WorkflowRuntimeState(variable_store, self._document)
         context_data = ContextData(
             document=self._document,
             variable_store=variable_store,
@@ -200,12 +248,14 @@ class WorkflowRuntimeContext(IContext):
             io_center=self._io_center,
             snapshot_center=self._snapshot_center,
             status_center=self._status_center,
-            reporter=self._reporter
+            reporter=self._reporter,
+            usage_center=self._usage_center,
+            event_bus=self._event_bus
         )
         sub_context = WorkflowRuntimeContext(context_data)
         self._sub_contexts.append(sub_context)
         sub_context.variable_store.init()
-        sub_context.state.init()
+        sub_context.state.init(self._state.retain_outputs)
         return sub_context
 
     @staticmethod
@@ -218,11 +268,14 @@ class WorkflowRuntimeContext(IContext):
         """
         document = WorkflowRuntimeDocument()
         variable_store = WorkflowRuntimeVariableStore()
-        state = WorkflowRuntimeState(variable_store)
+        state = WorkflowRuntimeState(variable_store, document)
         io_center = WorkflowRuntimeIOCenter()
         snapshot_center = WorkflowRuntimeSnapshotCenter()
         status_center = WorkflowRuntimeStatusCenter()
-        reporter = WorkflowRuntimeReporter(io_center, snapshot_center, status_center)
+        usage_center = WorkflowRuntimeUsageCenter()
+        reporter = WorkflowRuntimeReporter(io_center, snapshot_center, status_center, usage_center, document)
+        # Registered after the reporter, so that events carry the report version of their change
+        event_bus = WorkflowRuntimeEventBus(status_center, reporter)
         context_data = ContextData(
             document=document,
             variable_store=variable_store,
@@ -230,6 +283,8 @@ class WorkflowRuntimeContext(IContext):
             io_center=io_center,
             snapshot_center=snapshot_center,
             status_center=status_center,
-            reporter=reporter
+            reporter=reporter,
+            usage_center=usage_center,
+            event_bus=event_bus
         )
         return WorkflowRuntimeContext(context_data)
@@ -1,14 +1,34 @@
 """
 Implementation of workflow nodes, ports, and edges.
+
+The classes use `__slots__` and intern their IDs and keys, since large documents
+hold tens of thousands of them.
 """
+import sys
 from typing import Any, Dict, List, Optional, Set
 
 from ...interface.node import INode, IPort, IEdge, IPorts
+from .workflow_runtime_input_resolver import WorkflowRuntimeInputResolver
+
+
+def _intern(value: str) -> str:
+    """
+    Intern a string so that equal IDs and keys share one object.
+    
+    Args:
+        value: The string to intern. Enum members and other str subclasses are kept as they are.
+        
+    Returns:
+        The interned string.
+    """
+    return sys.intern(value) if type(value) is str else value
 
 
 class Port(IPort):
     """Implementation of the port interface."""
     
+    __slots__ = ("_id", "_type", "_node_id", "_key", "_edges")
+    
     def __init__(self, port_id: str, port_type: str, node_id: str, port_key: str):
         """
         Initialize a new instance of the Port class.
@@ -19,10 +39,10 @@ class Port(IPort):
             node_id: The ID of the node that this port belongs to.
             port_key: The key of the port.
         """
-        self._id = port_id
-        self._type = port_type
-        self._node_id = node_id
-        self._key = port_key
+        self._id = _intern(port_id)
+        self._type = _intern(port_type)
+        self._node_id = _intern(node_id)
+        self._key = _intern(port_key)
         self._edges: List[Edge] = []
     
     @property
@@ -63,6 +83,8 @@ class Port(IPort):
 class Edge(IEdge):
     """Implementation of the edge interface."""
     
+    __slots__ = ("_id", "_source_port_id", "_target_port_id", "_source_port", "_target_port")
+    
     def __init__(self, edge_id: str, source_port_id: str, target_port_id: str):
         """
         Initialize a new instance of the Edge class.
@@ -72,9 +94,9 @@ class Edge(IEdge):
             source_port_id: The ID of the source port.
             target_port_id: The ID of the target port.
         """
-        self._id = edge_id
-        self._source_port_id = source_port_id
-        self._target_port_id = target_port_id
+        self._id = _intern(edge_id)
+        self._source_port_id = _intern(source_port_id)
+        self._target_port_id = _intern(target_port_id)
         self._source_port: Optional[Port] = None
         self._target_port: Optional[Port] = None
     
@@ -127,6 +149,8 @@ class Edge(IEdge):
 class Ports(IPorts):
     """Implementation of the ports collection interface."""
     
+    __slots__ = ("_inputs", "_outputs")
+    
     def __init__(self):
         """Initialize a new instance of the Ports class."""
         self._inputs: Dict[str, Port] = {}
@@ -164,6 +188,8 @@ class Ports(IPorts):
 class Node(INode):
     """Implementation of the node interface."""
     
+    __slots__ = ("_id", "_type", "_data", "_prev", "_next", "_ports", "_input_resolver")
+    
     def __init__(self, node_id: str, node_type: str, node_data: Dict[str, Any]):
         """
         Initialize a new instance of the Node class.
@@ -173,12 +199,13 @@ class Node(INode):
             node_type: The type of the node.
             node_data: The data associated with the node.
         """
-        self._id = node_id
-        self._type = node_type
+        self._id = _intern(node_id)
+        self._type = _intern(node_type)
         self._data = node_data
         self._prev: List[Node] = []
         self._next: List[Node] = []
         self._ports = Ports()
+        self._input_resolver = WorkflowRuntimeInputResolver.compile(node_data.get("inputsValues"))
     
     @property
     def id(self) -> str:
@@ -210,6 +237,11 @@ class Node(INode):
         """Get the ports of the node."""
         return self._ports
     
+    @property
+    def input_resolver(self) -> WorkflowRuntimeInputResolver:
+        """Get the compiled resolver of the node inputs."""
+        return self._input_resolver
+    
     def add_prev(self, node: 'Node') -> None:
         """
         Add a previous node.
@@ -7,11 +7,13 @@ and edges of the workflow. The document is initialized with a schema that define
 the structure of the workflow, including the nodes, their configurations, and the
 connections between them.
 """
+from array import array
 from typing import Any, Dict, Optional, List, Set
 
 from ...interface.context import IDocument
 from ...interface.node import INode, FlowGramNode
 from .node import Node, Port, Edge
+from .workflow_runtime_node_ordinals import WorkflowRuntimeNodeOrdinals
 
 
 class WorkflowRuntimeDocument(IDocument):
@@ -26,6 +28,8 @@ class WorkflowRuntimeDocument(IDocument):
         """
         self._start_node: Optional[INode] = None
         self._schema: Optional[Dict[str, Any]] = None
+        self._ordinals = WorkflowRuntimeNodeOrdinals()
+        self._consumer_counts = array('I')
 
     @property
     def start(self) -> INode:
@@ -39,6 +43,26 @@ class WorkflowRuntimeDocument(IDocument):
             raise ValueError("Document is not initialized")
         return self._start_node
 
+    @property
+    def ordinals(self) -> WorkflowRuntimeNodeOrdinals:
+        """
+        Get the node ordinals of the document.
+        
+        Returns:
+            The node ordinals, assigned in the order the nodes are declared.
+        """
+        return self._ordinals
+
+    @property
+    def consumer_counts(self) -> array:
+        """
+        Get the number of consumers of each node's outputs.
+        
+        Returns:
+            For each node ordinal, the number of nodes whose inputs reference the node's outputs.
+        """
+        return self._consumer_counts
+
     def init(self, schema: Dict[str, Any]) -> None:
         """
         Initialize the document with the given schema.
@@ -50,6 +74,7 @@ class WorkflowRuntimeDocument(IDocument):
         self._nodes: Dict[str, Node] = {}
         self._edges: Dict[str, Edge] = {}
         self._node_blocks: Dict[str, List[str]] = {}
+        self._ordinals = WorkflowRuntimeNodeOrdinals()
         
         # Flatten the schema to include nested blocks
         flattened_schema = self._flatten_schema(schema)
@@ -61,6 +86,7 @@ class WorkflowRuntimeDocument(IDocument):
             node_data_obj = node_data.get("data", {})
             node = Node(node_id, node_type, node_data_obj)
             self._nodes[node_id] = node
+            self._ordinals.ordinal(node_id)
             
             # Set start node if this is a start node
             if node_type == FlowGramNode.Start:
@@ -84,6 +110,14 @@ class WorkflowRuntimeDocument(IDocument):
                         port = Port(port_id, "output", node_id, key)
                         node.ports.add_output(port)
         
+        # Resolve the sources of node inputs to ordinals and count the consumers of each node
+        self._consumer_counts = array('I', [0]) * len(self._ordinals)
+        for node in self._nodes.values():
+            node.input_resolver.bind(self._ordinals)
+            for source_ordinal in node.input_resolver.source_ordinals:
+                if source_ordinal < len(self._consumer_counts):
+                    self._consumer_counts[source_ordinal] += 1
+        
         # Parse edges and connect ports
         for edge_data in flattened_schema.get("edges", []):
             source_node_id = edge_data.get("sourceNodeID", "")
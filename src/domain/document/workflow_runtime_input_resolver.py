@@ -0,0 +1,165 @@
+"""
+Implementation of the workflow runtime input resolver.
+
+The input resolver is the compiled form of a node's `inputsValues`. The mapping
+is interpreted once, when the document is initialized: constants are bound to
+their values and references are reduced to the ordinal of the source node, the
+output key and the path below it. Resolving the inputs of a node execution then
+only reads the output slots and the variable store, without re-parsing the schema.
+"""
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ...interface.context import IVariableStore
+from ...infrastructure.spill import SpilledValue
+from .workflow_runtime_node_ordinals import WorkflowRuntimeNodeOrdinals
+
+# The source node ID of constant accessors
+_CONSTANT = None
+
+# The node whose references fall back to the workflow inputs in the default scope
+_START_NODE_ID = "start_0"
+
+# (input key, source node ID or None for constants, output key or constant value, path,
+#  falls back to default scope, ordinal of the source node or -1 while unbound)
+InputAccessor = Tuple[str, Optional[str], Any, Tuple[Any, ...], bool, int]
+
+
+class WorkflowRuntimeInputResolver:
+    """
+    Implementation of the input resolver.
+    This class resolves the inputs of a node from precompiled accessors.
+    """
+    
+    __slots__ = ("_accessors", "_ordinals", "_source_ordinals")
+
+    def __init__(self, accessors: List[InputAccessor]):
+        """
+        Initialize a new instance of the WorkflowRuntimeInputResolver class.
+        
+        Args:
+            accessors: The compiled accessors, in the order of the inputs.
+        """
+        self._accessors = accessors
+        self._ordinals: Optional[WorkflowRuntimeNodeOrdinals] = None
+        self._source_ordinals: Tuple[int, ...] = ()
+
+    @property
+    def accessors(self) -> List[InputAccessor]:
+        """
+        Get the compiled accessors.
+        
+        Returns:
+            The compiled accessors, in the order of the inputs.
+        """
+        return self._accessors
+
+    @property
+    def source_ordinals(self) -> Tuple[int, ...]:
+        """
+        Get the ordinals of the nodes whose outputs the inputs reference.
+        
+        Returns:
+            The distinct ordinals of the source nodes, empty while unbound.
+        """
+        return self._source_ordinals
+
+    def bind(self, ordinals: WorkflowRuntimeNodeOrdinals) -> None:
+        """
+        Bind the source nodes of the references to their ordinals.
+        
+        Args:
+            ordinals: The node ordinals used to index the output slots.
+        """
+        self._accessors = [
+            accessor if accessor[1] is _CONSTANT else accessor[:5] + (ordinals.ordinal(accessor[1]),)
+            for accessor in self._accessors
+        ]
+        self._ordinals = ordinals
+        self._source_ordinals = tuple(dict.fromkeys(
+            accessor[5] for accessor in self._accessors if accessor[1] is not _CONSTANT
+        ))
+
+    def resolve(
+        self,
+        node_outputs: Sequence[Optional[Mapping[str, Any]]],
+        variable_store: IVariableStore,
+        ordinals: WorkflowRuntimeNodeOrdinals
+    ) -> Dict[str, Any]:
+        """
+        Resolve the inputs of a node execution.
+        
+        A reference is read from the outputs of its source node, then from the
+        variable store, where `start_0` references also fall back to the
+        default scope. The path below the referenced value is followed through
+        nested objects. Inputs whose reference cannot be resolved are omitted.
+        
+        Args:
+            node_outputs: The output slots of the executed nodes, indexed by ordinal.
+            variable_store: The variable store of the current scope.
+            ordinals: The node ordinals that index the output slots.
+            
+        Returns:
+            The node inputs.
+        """
+        if self._ordinals is not ordinals:
+            self.bind(ordinals)
+        
+        inputs: Dict[str, Any] = {}
+        slot_count = len(node_outputs)
+        for key, node_id, source, path, fallback, ordinal in self._accessors:
+            if node_id is _CONSTANT:
+                inputs[key] = source
+                continue
+            
+            outputs = node_outputs[ordinal] if ordinal < slot_count else None
+            if outputs is not None and source in outputs:
+                value = outputs[source]
+            else:
+                variable = variable_store.lookup(source, node_id)
+                if variable is None and fallback:
+                    variable = variable_store.lookup(source)
+                if variable is None:
+                    continue
+                value = variable["value"]
+            if type(value) is SpilledValue:
+                value = value.resolve()
+            
+            for path_part in path:
+                if not isinstance(value, dict) or path_part not in value:
+                    break
+                value = value[path_part]
+            else:
+                inputs[key] = value
+        return inputs
+
+    @staticmethod
+    def compile(inputs_values: Optional[Mapping[str, Any]]) -> 'WorkflowRuntimeInputResolver':
+        """
+        Compile the `inputsValues` of a node.
+        
+        Args:
+            inputs_values: The input mapping from the node data.
+            
+        Returns:
+            The compiled input resolver.
+        """
+        accessors: List[InputAccessor] = []
+        for key, value_config in (inputs_values or {}).items():
+            if not isinstance(value_config, dict):
+                continue
+            value_type = value_config.get("type")
+            value_content = value_config.get("content")
+            
+            if value_type == "constant":
+                accessors.append((key, _CONSTANT, value_content, (), False, -1))
+            elif value_type == "ref" and isinstance(value_content, list) and len(value_content) >= 2:
+                node_id = value_content[0]
+                accessors.append((
+                    key,
+                    node_id,
+                    value_content[1],
+                    tuple(value_content[2:]),
+                    node_id == _START_NODE_ID,
+                    -1
+                ))
+        return WorkflowRuntimeInputResolver(accessors)
@@ -0,0 +1,61 @@
+"""
+Implementation of the workflow runtime node ordinals.
+
+Node ordinals are small dense integers assigned to node IDs, in the order the
+nodes are declared in the document. The state and the status center use them
+as indexes into flat arrays instead of keying dictionaries by node ID. IDs that
+are not declared in the document get the next free ordinal on first use.
+"""
+from typing import Dict, List
+
+
+class WorkflowRuntimeNodeOrdinals:
+    """
+    Implementation of the node ordinals.
+    This class maps node IDs to dense ordinals and back.
+    """
+
+    def __init__(self):
+        """
+        Initialize a new instance of the WorkflowRuntimeNodeOrdinals class.
+        """
+        self._ordinals: Dict[str, int] = {}
+        self._ids: List[str] = []
+
+    def __len__(self) -> int:
+        """
+        Get the number of assigned ordinals.
+        
+        Returns:
+            The number of assigned ordinals.
+        """
+        return len(self._ids)
+
+    def ordinal(self, node_id: str) -> int:
+        """
+        Get the ordinal of a node ID, assigning the next free one on first use.
+        
+        Args:
+            node_id: The node ID.
+            
+        Returns:
+            The ordinal of the node ID.
+        """
+        ordinal = self._ordinals.get(node_id)
+        if ordinal is None:
+            ordinal = len(self._ids)
+            self._ordinals[node_id] = ordinal
+            self._ids.append(node_id)
+        return ordinal
+
+    def node_id(self, ordinal: int) -> str:
+        """
+        Get the node ID of an ordinal.
+        
+        Args:
+            ordinal: The ordinal.
+            
+        Returns:
+            The node ID.
+        """
+        return self._ids[ordinal]
@@ -15,9 +15,11 @@ from ...interface import (
     InvokeParams,
     ITask,
     FlowGramNode,
-    ExecutionResult
+    ExecutionResult,
+    WorkflowStatus
 )
 
+from ...infrastructure.copy_on_write import CopyOnWriteDict, unwrap
 from ..task import WorkflowRuntimeTask
 from ..context import WorkflowRuntimeContext
 
@@ -112,48 +114,51 @@ class WorkflowRuntimeEngine(IEngine):
             logging.error(f"Error in _can_execute_node: {str(e)}")
             return
         
-        # Set node status to processing and record start time
-        import time
+        # Set node status to processing, which records the start time
         node_status = context.status_center.node_status(node.id)
         node_status.process()
-        node_status._start_time = int(time.time() * 1000)  # Set start time in milliseconds
         
         try:
             # Get node inputs and create snapshot
             inputs = context.state.get_node_inputs(node)
             
-            # Generate a unique ID for the snapshot
-            import uuid
-            snapshot_id = str(uuid.uuid4())
-            
-            # Create snapshot with more complete data
+            # Create the snapshot, which assigns its own ID. The node configuration is
+            # not copied into every snapshot, the report carries it once per node
             snapshot = context.snapshot_center.create({
-                "id": snapshot_id,
                 "node_id": node.id,
-                "data": node.data,
                 "inputs": inputs,
             })
             
             # Log snapshot creation
-            logging.info(f"Created snapshot for node {node.id}: {snapshot_id}")
+            logging.info(f"Created snapshot for node {node.id}: {snapshot.id}")
             
             # Import container here to avoid circular imports
             from ..container import WorkflowRuntimeContainer
             
             # Create a proper ExecutionContext object instead of a dictionary
             from ...interface.executor import ExecutionContext
+            # The executor gets a copy-on-write view, so its writes never reach the
+            # snapshot or the outputs of upstream nodes that the inputs share
+            inputs_view = CopyOnWriteDict(inputs)
             execution_context = ExecutionContext(
                 node=node,
-                inputs=inputs,
+                inputs=inputs_view,
                 runtime=context,
                 container=WorkflowRuntimeContainer.instance()
             )
             result = await self.executor.execute(execution_context)
             
+            # Record token usage even if the workflow was terminated meanwhile, the tokens are spent
+            if result.usage:
+                snapshot.add_data({"usage": result.usage})
+                context.usage_center.add(node.id, result.usage)
+            
             if context.status_center.workflow.terminated:
                 return
             
-            outputs = result.outputs
+            # Outputs may hold views of the inputs, only the written containers are copied,
+            # and the outputs are not walked if the executor read no nested input
+            outputs = unwrap(result.outputs, inputs_view)
             branch = result.branch
             
             # Add output data to snapshot
@@ -163,16 +168,18 @@ class WorkflowRuntimeEngine(IEngine):
             # Update state with node outputs and mark node as executed
             context.state.set_node_outputs(node, outputs)
             context.state.add_executed_node(node)
+            context.state.release_inputs(node)
             
-            # Set node status to success and record end time
-            import time
+            # Set node status to success, which records the end time
             node_status = context.status_center.node_status(node.id)
             node_status.success()
-            node_status._end_time = int(time.time() * 1000)  # Set end time in milliseconds
             
             # Log node execution success
             logging.info(f"Node {node.id} executed successfully, time cost: {node_status.timeCost}ms")
             
+            if self._abort_on_budget_exceeded(context):
+                return
+            
             try:
                 next_nodes = self._get_next_nodes({"node": node, "branch": branch, "context": context})
                 await self._execute_next({"node": node, "next_nodes": next_nodes, "context": context})
@@ -181,11 +188,9 @@ class WorkflowRuntimeEngine(IEngine):
                 return
         
         except Exception as e:
-            # Set node status to failed and record end time
-            import time
+            # Set node status to failed, which records the end time
             node_status = context.status_center.node_status(node.id)
             node_status.fail()
-            node_status._end_time = int(time.time() * 1000)  # Set end time in milliseconds
             
             # Log node execution failure with detailed error
             logging.error(f"Error executing node {node.id}: {str(e)}")
@@ -256,6 +261,31 @@ class WorkflowRuntimeEngine(IEngine):
             
             raise e
     
+    def _abort_on_budget_exceeded(self, context: IContext) -> bool:
+        """
+        Abort the workflow if its token budget has been exceeded.
+        
+        The workflow is marked as failed and all processing nodes are cancelled.
+        
+        Args:
+            context: The workflow context.
+            
+        Returns:
+            True if the workflow was aborted, False otherwise.
+        """
+        usage_center = context.usage_center
+        if not usage_center.exceeded or context.status_center.workflow.terminated:
+            return False
+        
+        logging.error(
+            f"Token budget exceeded: {usage_center.export()['totalTokens']} tokens used, "
+            f"budget is {usage_center.budget}. Aborting workflow."
+        )
+        context.status_center.workflow.fail()
+        for node_id in context.status_center.get_status_node_ids(WorkflowStatus.Processing):
+            context.status_center.node_status(node_id).cancel()
+        return True
+    
     def _can_execute_node(self, params: Dict[str, Any]) -> bool:
         """
         Check if a node can be executed.
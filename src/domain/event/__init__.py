@@ -0,0 +1,17 @@
+"""
+Event module for the workflow runtime.
+This module contains the implementation of the workflow event bus.
+"""
+from .workflow_runtime_event_bus import (
+    WorkflowRuntimeEventBus,
+    WorkflowRuntimeFrozenEventBus,
+    WorkflowRuntimeEventSubscription,
+    WorkflowRuntimeEvent
+)
+
+__all__ = [
+    'WorkflowRuntimeEventBus',
+    'WorkflowRuntimeFrozenEventBus',
+    'WorkflowRuntimeEventSubscription',
+    'WorkflowRuntimeEvent'
+]
@@ -0,0 +1,461 @@
+"""
+Implementation of the workflow runtime event bus.
+
+The event bus turns the status changes of a task into typed events and pushes
+them to its subscribers, so clients no longer poll the report to find out that
+something happened:
+
+- node_started, node_succeeded, node_failed and node_cancelled when a node
+  status changes
+- workflow_started and workflow_terminated when the workflow status changes
+
+Every event carries the report version after the change, so a subscriber can
+fetch the changed nodes and snapshots with the report `since` that version.
+
+Each event is built and serialized once and shared by all subscribers. Every
+subscriber has a bounded buffer: a subscriber that falls behind loses its oldest
+events and receives an events_dropped event with their count instead, so a slow
+consumer never holds up the workflow or the other subscribers.
+
+The event bus is closed when the context is disposed, which ends the
+subscriptions once their buffered events are received. A subscriber that joins
+after the workflow has terminated receives the workflow_terminated event.
+
+A finished task can be frozen into a `WorkflowRuntimeFrozenEventBus`, which keeps
+only the workflow_terminated event and the final report version, so its context
+can be released while late subscribers are still served.
+"""
+import asyncio
+import json
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Union
+
+from ...interface.context import IEvent, IEventBus, IEventSubscription, IReporter, IStatusCenter
+from ...interface.node import WorkflowStatus
+from ...interface.schema import WorkflowEventType
+
+# Event types of node status changes, idle nodes publish no event
+_NODE_EVENT_TYPES = {
+    WorkflowStatus.Processing: WorkflowEventType.NodeStarted.value,
+    WorkflowStatus.Succeeded: WorkflowEventType.NodeSucceeded.value,
+    WorkflowStatus.Failed: WorkflowEventType.NodeFailed.value,
+    WorkflowStatus.Cancelled: WorkflowEventType.NodeCancelled.value,
+}
+
+
+class WorkflowRuntimeEvent(IEvent):
+    """
+    An event of the event bus.
+    """
+
+    __slots__ = ("_data", "_json")
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Initialize a new instance of the WorkflowRuntimeEvent class.
+
+        Args:
+            data: The event data, with the event type under "type".
+        """
+        self._data = data
+        self._json: Optional[str] = None
+
+    @property
+    def type(self) -> str:
+        """
+        Get the type of the event.
+
+        Returns:
+            The event type.
+        """
+        return self._data["type"]
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """
+        Get the data of the event.
+
+        Returns:
+            The event data, which must not be modified.
+        """
+        return self._data
+
+    @property
+    def json(self) -> str:
+        """
+        Get the event data serialized as JSON.
+
+        Returns:
+            The JSON text, serialized on first use.
+        """
+        if self._json is None:
+            self._json = json.dumps(self._data, ensure_ascii=False, default=str)
+        return self._json
+
+
+class WorkflowRuntimeEventSubscription(IEventSubscription):
+    """
+    A subscription to the event bus with a bounded buffer.
+    """
+
+    def __init__(
+        self,
+        bus: Union['WorkflowRuntimeEventBus', 'WorkflowRuntimeFrozenEventBus'],
+        buffer_size: int
+    ):
+        """
+        Initialize a new instance of the WorkflowRuntimeEventSubscription class.
+
+        Args:
+            bus: The event bus.
+            buffer_size: The number of events buffered before the oldest are dropped.
+
+        Raises:
+            ValueError: If the buffer size is less than 1.
+        """
+        if buffer_size < 1:
+            raise ValueError(f"Event buffer size must be at least 1, got {buffer_size}")
+        self._bus = bus
+        self._buffer: Deque[IEvent] = deque(maxlen=buffer_size)
+        self._wakeup = asyncio.Event()
+        self._dropped = 0
+        self._closed = False
+
+    def push(self, event: IEvent) -> None:
+        """
+        Buffer an event, dropping the oldest event if the buffer is full.
+
+        Args:
+            event: The event.
+        """
+        if self._closed:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self._dropped += 1
+        self._buffer.append(event)
+        self._wakeup.set()
+
+    def end(self) -> None:
+        """
+        End the subscription once the buffered events are received.
+        """
+        self._closed = True
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """
+        Stop receiving events and discard the buffered events.
+        """
+        self._bus.unsubscribe(self)
+        self._buffer.clear()
+        self._dropped = 0
+        self.end()
+
+    def __aiter__(self) -> 'WorkflowRuntimeEventSubscription':
+        """
+        Get the asynchronous iterator over the events.
+
+        Returns:
+            The subscription itself.
+        """
+        return self
+
+    async def __anext__(self) -> IEvent:
+        """
+        Wait for the next event.
+
+        Returns:
+            The next event, or an events_dropped event if events were dropped before it.
+
+        Raises:
+            StopAsyncIteration: If the subscription has ended and all events were received.
+        """
+        while True:
+            if self._dropped:
+                count, self._dropped = self._dropped, 0
+                return WorkflowRuntimeEvent({
+                    "type": WorkflowEventType.EventsDropped.value,
+                    "count": count,
+                    "version": self._bus.version
+                })
+            if self._buffer:
+                return self._buffer.popleft()
+            if self._closed:
+                raise StopAsyncIteration
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+
+class WorkflowRuntimeEventBus(IEventBus):
+    """
+    Implementation of the event bus.
+    This class publishes the status changes of a task to its subscribers.
+    """
+
+    DEFAULT_BUFFER_SIZE = 1024
+
+    def __init__(self, status_center: IStatusCenter, reporter: IReporter):
+        """
+        Initialize a new instance of the WorkflowRuntimeEventBus class.
+
+        Args:
+            status_center: The status center whose changes are published.
+            reporter: The reporter whose version is attached to every event.
+        """
+        self._status_center = status_center
+        self._reporter = reporter
+        self._subscriptions: List[WorkflowRuntimeEventSubscription] = []
+        self._terminal_event: Optional[IEvent] = None
+        self._closed = False
+        status_center.add_listener(self._on_status_change)
+
+    @property
+    def version(self) -> int:
+        """
+        Get the current report version.
+
+        Returns:
+            The report version.
+        """
+        return self._reporter.version
+
+    @property
+    def closed(self) -> bool:
+        """
+        Check whether the event bus is closed.
+
+        Returns:
+            True if no more events will be published.
+        """
+        return self._closed
+
+    def init(self) -> None:
+        """
+        Initialize the event bus.
+        """
+        self._terminal_event = None
+        self._closed = False
+
+    def dispose(self) -> None:
+        """
+        Close the event bus and end all subscriptions.
+        """
+        self._closed = True
+        subscriptions, self._subscriptions = self._subscriptions, []
+        for subscription in subscriptions:
+            subscription.end()
+
+    def subscribe(self, buffer_size: Optional[int] = None) -> WorkflowRuntimeEventSubscription:
+        """
+        Subscribe to the events of the task.
+
+        Args:
+            buffer_size: The number of events buffered for the subscriber, or None for the default.
+
+        Returns:
+            The subscription, which starts with the workflow_terminated event if the
+            workflow has already terminated.
+
+        Raises:
+            ValueError: If the buffer size is less than 1.
+        """
+        subscription = WorkflowRuntimeEventSubscription(
+            self, self.DEFAULT_BUFFER_SIZE if buffer_size is None else buffer_size
+        )
+        if self._terminal_event is not None:
+            subscription.push(self._terminal_event)
+        if self._closed:
+            subscription.end()
+        else:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: WorkflowRuntimeEventSubscription) -> None:
+        """
+        Remove a subscription.
+
+        Args:
+            subscription: The subscription.
+        """
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def publish(self, data: Dict[str, Any]) -> None:
+        """
+        Publish an event to all subscribers.
+
+        Args:
+            data: The event data, with the event type under "type".
+        """
+        event = WorkflowRuntimeEvent(data)
+        for subscription in self._subscriptions:
+            subscription.push(event)
+
+    def _on_status_change(self, node_id: Optional[str]) -> None:
+        """
+        Publish the event of a status change.
+
+        Args:
+            node_id: The ID of the node whose status changed, or None for the workflow.
+        """
+        if self._closed:
+            return
+        if node_id is None:
+            self._on_workflow_change()
+            return
+        if not self._subscriptions:
+            return
+        status = self._status_center.node_status(node_id)
+        event_type = _NODE_EVENT_TYPES.get(status.status)
+        if event_type is None:
+            return
+        self.publish({
+            "type": event_type,
+            "nodeID": node_id,
+            "status": status.status.value,
+            "startTime": status.startTime,
+            "endTime": status.endTime,
+            "timeCost": status.timeCost,
+            "version": self._reporter.version
+        })
+
+    def _on_workflow_change(self) -> None:
+        """
+        Publish the event of a workflow status change.
+
+        The workflow_terminated event is kept for subscribers that join later.
+        """
+        workflow = self._status_center.workflow
+        if workflow.terminated:
+            event_type = WorkflowEventType.WorkflowTerminated.value
+        elif workflow.status == WorkflowStatus.Processing:
+            event_type = WorkflowEventType.WorkflowStarted.value
+        else:
+            return
+        event = WorkflowRuntimeEvent({
+            "type": event_type,
+            "status": getattr(workflow.status, "value", workflow.status),
+            "startTime": workflow.startTime,
+            "endTime": workflow.endTime,
+            "timeCost": workflow.timeCost,
+            "version": self._reporter.version
+        })
+        if workflow.terminated:
+            self._terminal_event = event
+        for subscription in self._subscriptions:
+            subscription.push(event)
+
+    def freeze(self) -> 'WorkflowRuntimeFrozenEventBus':
+        """
+        Freeze the event bus of a finished task.
+
+        Returns:
+            A closed event bus holding the workflow_terminated event and the report
+            version, without references to the context.
+        """
+        return WorkflowRuntimeFrozenEventBus(self._terminal_event, self._reporter.version)
+
+
+class WorkflowRuntimeFrozenEventBus(IEventBus):
+    """
+    The closed event bus of a finished task.
+    This class serves the workflow_terminated event to subscribers that join after the
+    context of the task was released.
+    """
+
+    def __init__(self, terminal_event: Optional[IEvent], version: int):
+        """
+        Initialize a new instance of the WorkflowRuntimeFrozenEventBus class.
+
+        Args:
+            terminal_event: The workflow_terminated event, or None if none was published.
+            version: The final report version.
+        """
+        self._terminal_event = terminal_event
+        self._version = version
+
+    @property
+    def terminal_event(self) -> Optional[IEvent]:
+        """
+        Get the workflow_terminated event.
+
+        Returns:
+            The event, or None if none was published.
+        """
+        return self._terminal_event
+
+    @property
+    def version(self) -> int:
+        """
+        Get the final report version.
+
+        Returns:
+            The report version.
+        """
+        return self._version
+
+    @property
+    def closed(self) -> bool:
+        """
+        Check whether the event bus is closed.
+
+        Returns:
+            Always True.
+        """
+        return True
+
+    def init(self) -> None:
+        """
+        Initialize the event bus, which has nothing to reset.
+        """
+
+    def dispose(self) -> None:
+        """
+        Dispose the event bus, which holds no subscriptions.
+        """
+
+    def subscribe(self, buffer_size: Optional[int] = None) -> WorkflowRuntimeEventSubscription:
+        """
+        Subscribe to the events of the finished task.
+
+        Args:
+            buffer_size: The number of events buffered for the subscriber, or None for the default.
+
+        Returns:
+            An ended subscription holding the workflow_terminated event.
+
+        Raises:
+            ValueError: If the buffer size is less than 1.
+        """
+        subscription = WorkflowRuntimeEventSubscription(
+            self, WorkflowRuntimeEventBus.DEFAULT_BUFFER_SIZE if buffer_size is None else buffer_size
+        )
+        if self._terminal_event is not None:
+            subscription.push(self._terminal_event)
+        subscription.end()
+        return subscription
+
+    def unsubscribe(self, subscription: WorkflowRuntimeEventSubscription) -> None:
+        """
+        Remove a subscription, which is never registered.
+
+        Args:
+            subscription: The subscription.
+        """
+
+    def publish(self, data: Dict[str, Any]) -> None:
+        """
+        Drop an event, since a finished task publishes no more events.
+
+        Args:
+            data: The event data.
+        """
+
+    def freeze(self) -> 'WorkflowRuntimeFrozenEventBus':
+        """
+        Freeze the event bus, which is already frozen.
+
+        Returns:
+            The event bus itself.
+        """
+        return self
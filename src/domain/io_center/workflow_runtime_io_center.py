@@ -12,6 +12,7 @@ values throughout the workflow execution.
 from typing import Any, Dict
 
 from ...interface.context import IIOCenter
+from ...infrastructure.copy_on_write import unwrap
 
 
 class WorkflowRuntimeIOCenter(IIOCenter):
@@ -62,9 +63,9 @@ class WorkflowRuntimeIOCenter(IIOCenter):
         Set the workflow outputs.
         
         Args:
-            outputs: The workflow outputs.
+            outputs: The workflow outputs, which may be copy-on-write views of node inputs.
         """
-        self._outputs = outputs
+        self._outputs = unwrap(outputs)
 
     def dispose(self) -> None:
         """
@@ -3,5 +3,6 @@ Report module for the workflow runtime.
 This module contains the implementation of the workflow reporter.
 """
 from .workflow_runtime_reporter import WorkflowRuntimeReporter, WorkflowRuntimeReport
+from .workflow_runtime_frozen_reporter import WorkflowRuntimeFrozenReporter
 
-__all__ = ['WorkflowRuntimeReporter', 'WorkflowRuntimeReport']
+__all__ = ['WorkflowRuntimeReporter', 'WorkflowRuntimeReport', 'WorkflowRuntimeFrozenReporter']
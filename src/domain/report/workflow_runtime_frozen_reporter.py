@@ -0,0 +1,330 @@
+"""
+Implementation of the frozen reporter of a finished task.
+
+Once a task has finished its report no longer changes, so the reporter can be
+frozen: the final report is serialized to compressed JSON and everything else the
+live reporter refers to, the document, the centers and their snapshots, can be
+released. The frozen reporter answers the same calls as the live reporter from
+that one record:
+
+- `export` decodes the final report
+- `export_since` returns an empty delta to callers that have the final version,
+  and the full report with `snapshotsReset` to callers that do not
+- `query` filters and pages the final report the way the live reporter does
+
+If the snapshots of the task were offloaded, they are not read back into the
+compressed report. The frozen reporter keeps the segments of the snapshot center
+instead, which hold only the IDs and log offsets of the snapshots, and decodes
+snapshots from the spill log when a report or a page of snapshots is exported.
+
+The compressed report can be dumped and loaded again, to persist it in a task
+store. Dumping a report with offloaded snapshots reads them back and encodes
+the whole report, so the task registry dumps off the event loop.
+"""
+import json
+import zlib
+from typing import Any, Dict, Optional, Sequence
+
+from ...interface.context import IReport, IReporter, ISnapshot
+from .workflow_runtime_reporter import WorkflowRuntimeReport, WorkflowRuntimeReporter
+
+# Compression level of frozen reports, favouring speed since most reports are read rarely
+_COMPRESS_LEVEL = 1
+
+# Size of the sequence number and log offset kept for an offloaded snapshot
+_INDEX_ENTRY_BYTES = 16
+
+
+class WorkflowRuntimeFrozenReporter(IReporter):
+    """
+    Implementation of the frozen reporter.
+    This class serves the final report of a finished task without its context.
+    """
+
+    def __init__(
+        self,
+        report_data: Dict[str, Any],
+        node_types: Dict[str, str],
+        snapshots: Optional[Dict[str, Sequence[ISnapshot]]] = None
+    ):
+        """
+        Initialize a new instance of the WorkflowRuntimeFrozenReporter class.
+
+        Args:
+            report_data: The final report data, with JSON-compatible values.
+            node_types: The types of the reported nodes by node ID, for queries by type.
+            snapshots: The offloaded snapshots by node ID, left out of the node
+                reports, or None if the node reports hold their snapshots.
+        """
+        self._version = report_data.get("version", 0)
+        self._node_types = node_types
+        self._snapshots = snapshots
+        self._data = _encode(report_data)
+
+    @property
+    def version(self) -> int:
+        """
+        Get the final version of the report.
+
+        Returns:
+            The version.
+        """
+        return self._version
+
+    @classmethod
+    def load(cls, data: bytes, version: int, node_types: Dict[str, str]) -> 'WorkflowRuntimeFrozenReporter':
+        """
+        Load a frozen reporter from a dumped report.
+
+        Args:
+            data: The compressed report, as returned by `dump`.
+            version: The final version of the report.
+            node_types: The types of the reported nodes by node ID.
+
+        Returns:
+            The frozen reporter.
+        """
+        reporter = cls.__new__(cls)
+        reporter._version = version
+        reporter._node_types = node_types
+        reporter._snapshots = None
+        reporter._data = data
+        return reporter
+
+    def dump(self) -> bytes:
+        """
+        Dump the frozen report.
+
+        Offloaded snapshots are read back and encoded with the report, which takes
+        as long as freezing a report held in memory.
+
+        Returns:
+            The report as compressed JSON, with the snapshots of every node.
+        """
+        if self._snapshots is None:
+            return self._data
+        return _encode(self._decode())
+
+    @property
+    def node_types(self) -> Dict[str, str]:
+        """
+        Get the types of the reported nodes.
+
+        Returns:
+            The node types by node ID.
+        """
+        return self._node_types
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Get the size of the frozen report.
+
+        Returns:
+            The size of the compressed report in bytes, and of the sequence numbers
+            and offsets of the offloaded snapshots.
+        """
+        if self._snapshots is None:
+            return len(self._data)
+        return len(self._data) + _INDEX_ENTRY_BYTES * sum(len(snapshots) for snapshots in self._snapshots.values())
+
+    def init(self) -> None:
+        """
+        Initialize the reporter, which has nothing to reset.
+        """
+
+    def dispose(self) -> None:
+        """
+        Dispose the reporter, which holds no resources besides the report.
+        """
+
+    def freeze(self, inputs: Dict[str, Any], outputs: Dict[str, Any]) -> IReporter:
+        """
+        Freeze the reporter, which is already frozen.
+
+        Args:
+            inputs: The workflow inputs, ignored.
+            outputs: The workflow outputs, ignored.
+
+        Returns:
+            The reporter itself.
+        """
+        return self
+
+    def export(self) -> IReport:
+        """
+        Export the final report.
+
+        Returns:
+            The report, decoded on every call so callers may modify it.
+        """
+        return WorkflowRuntimeReport(self._decode())
+
+    def export_since(self, since: int) -> Dict[str, Any]:
+        """
+        Export the changes of the report since a version.
+
+        The frozen reporter does not remember which nodes changed at which version,
+        so every node report is returned with all its snapshots and `snapshotsReset`.
+
+        Args:
+            since: The version the caller has seen.
+
+        Returns:
+            The report delta, without node reports if the caller has the final version.
+        """
+        report = self._decode()
+        delta: Dict[str, Any] = {
+            "id": report.get("id"),
+            "version": self._version,
+            "since": since,
+            "outputs": report.get("outputs", {}),
+            "workflowStatus": report.get("workflowStatus", {}),
+            "usage": report.get("usage"),
+            "reports": {},
+            "nodeConfigs": {}
+        }
+        if since >= self._version:
+            return delta
+        delta["reports"] = {
+            node_id: {**node_report, "snapshotsReset": True}
+            for node_id, node_report in report.get("reports", {}).items()
+        }
+        delta["nodeConfigs"] = report.get("nodeConfigs", {})
+        return delta
+
+    def query(
+        self,
+        node_ids: Optional[Sequence[str]] = None,
+        statuses: Optional[Sequence[str]] = None,
+        node_types: Optional[Sequence[str]] = None,
+        fields: Optional[Sequence[str]] = None,
+        snapshot_fields: Optional[Sequence[str]] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Export a filtered report.
+
+        Takes the same arguments and returns the same shape as
+        `WorkflowRuntimeReporter.query`.
+
+        Args:
+            node_ids: The IDs of the nodes to report, or None for all nodes.
+            statuses: The statuses of the nodes to report, in any case, or None for any.
+            node_types: The types of the nodes to report, or None for any.
+            fields: The node report fields to include, or None for all.
+            snapshot_fields: The snapshot fields to include, or None for all.
+            cursor: The ID of the snapshot to start each node's snapshots after.
+            limit: The maximum number of snapshots per node, or None for all.
+
+        Returns:
+            The report data, with the reports and configurations of the matching nodes.
+
+        Raises:
+            ValueError: If a field is unknown, the cursor is invalid or the limit is not positive.
+        """
+        known_fields = WorkflowRuntimeReporter.NODE_REPORT_FIELDS
+        if fields is not None:
+            unknown = set(fields) - set(known_fields)
+            if unknown:
+                raise ValueError(
+                    f"Unknown report fields {', '.join(sorted(unknown))}, "
+                    f"expected any of {', '.join(known_fields)}"
+                )
+        if limit is not None and limit < 1:
+            raise ValueError(f"Snapshot limit must be positive, got {limit}")
+        try:
+            after_seq = -1 if cursor is None else int(cursor)
+        except ValueError:
+            raise ValueError(f"Invalid snapshot cursor {cursor!r}") from None
+        selected = set(known_fields if fields is None else fields)
+        wanted_statuses = None if statuses is None else {status.lower() for status in statuses}
+        wanted_types = None if node_types is None else set(node_types)
+        kept_snapshot_fields = None if snapshot_fields is None else {"id", "nodeID", *snapshot_fields}
+
+        report = self._decode(snapshots=False)
+        node_reports = report.get("reports", {})
+        all_node_configs = report.get("nodeConfigs", {})
+        reports: Dict[str, Any] = {}
+        node_configs: Dict[str, Any] = {}
+        for node_id in (node_reports if node_ids is None else node_ids):
+            full_report = node_reports.get(node_id)
+            if full_report is None:
+                continue
+            if wanted_statuses is not None and str(full_report.get("status", "")).lower() not in wanted_statuses:
+                continue
+            if wanted_types is not None and self._node_types.get(node_id) not in wanted_types:
+                continue
+
+            node_report: Dict[str, Any] = {"id": node_id}
+            for field in ("status", "terminated", "startTime", "endTime", "timeCost"):
+                if field in selected:
+                    node_report[field] = full_report.get(field)
+            if "snapshots" in selected:
+                if self._snapshots is None:
+                    all_snapshots = full_report.get("snapshots", [])
+                    snapshots = [snapshot for snapshot in all_snapshots if int(snapshot["id"]) > after_seq]
+                else:
+                    # Only the snapshots of the page are decoded from the spill log
+                    all_snapshots = self._snapshots.get(node_id, ())
+                    snapshots = [snapshot for snapshot in all_snapshots if int(snapshot.id) > after_seq]
+                if limit is not None and len(snapshots) > limit:
+                    snapshots = snapshots[:limit]
+                    node_report["nextCursor"] = snapshots[-1]["id"] if self._snapshots is None else snapshots[-1].id
+                if self._snapshots is not None:
+                    snapshots = [snapshot.export() for snapshot in snapshots]
+                if kept_snapshot_fields is not None:
+                    snapshots = [
+                        {key: value for key, value in snapshot.items() if key in kept_snapshot_fields}
+                        for snapshot in snapshots
+                    ]
+                node_report["snapshots"] = snapshots
+                count = len(all_snapshots)
+                if count:
+                    node_report["snapshotCount"] = count
+                    if node_id in all_node_configs:
+                        node_configs[node_id] = all_node_configs[node_id]
+            if "usage" in selected and full_report.get("usage"):
+                node_report["usage"] = full_report["usage"]
+            reports[node_id] = node_report
+
+        return {
+            "id": report.get("id"),
+            "version": self._version,
+            "inputs": report.get("inputs", {}),
+            "outputs": report.get("outputs", {}),
+            "workflowStatus": report.get("workflowStatus", {}),
+            "reports": reports,
+            "usage": report.get("usage"),
+            "nodeConfigs": node_configs
+        }
+
+    def _decode(self, snapshots: bool = True) -> Dict[str, Any]:
+        """
+        Decode the frozen report.
+
+        Args:
+            snapshots: Whether to read the offloaded snapshots into the node reports.
+
+        Returns:
+            The report data.
+        """
+        report = json.loads(zlib.decompress(self._data))
+        if snapshots and self._snapshots is not None:
+            for node_id, node_report in report.get("reports", {}).items():
+                node_report["snapshots"] = [snapshot.export() for snapshot in self._snapshots.get(node_id, ())]
+        return report
+
+
+def _encode(report_data: Dict[str, Any]) -> bytes:
+    """
+    Encode report data as compressed JSON.
+
+    Args:
+        report_data: The report data, with JSON-compatible values.
+
+    Returns:
+        The compressed report.
+    """
+    return zlib.compress(json.dumps(report_data, ensure_ascii=False, default=str).encode("utf-8"), _COMPRESS_LEVEL)
@@ -5,11 +5,36 @@ This module contains the implementation of the reporter, which is responsible
 for generating reports about the workflow execution. It collects data from
 the workflow context and generates a report that can be used for debugging,
 monitoring, and analysis purposes.
+
+Snapshots do not embed the node configuration. The report carries it once per
+node in `nodeConfigs`, so a node that runs many times inside a loop does not
+repeat its prompts and schemas in every snapshot.
+
+The reporter listens to the status center and the snapshot center and bumps a
+version on every change, remembering which nodes and snapshots changed at which
+version. A client that polls the report passes the last version it has seen and
+gets only what changed since then.
+
+The same listeners keep the status of every node and the exports of its
+snapshots, so the full report is assembled from them once per version. Only the
+snapshots that changed since the previous report are exported again, and only
+the snapshot lists of the nodes they belong to are rebuilt.
+
+Large reports can also be queried: nodes filtered by ID, status and type, node
+report fields selected, and the snapshots of each node paged with a cursor,
+served from the node index of the snapshot center.
+
+Once the task has finished, the reporter can be frozen into a
+`WorkflowRuntimeFrozenReporter` holding only the final report, and the offloaded
+snapshots it refers to, so the context of the task can be released.
 """
-from typing import Dict, Any
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional, Sequence, Set, Tuple
 
-from ...interface.context import IReporter, IReport, IIOCenter, ISnapshotCenter, IStatusCenter
-from ...infrastructure.utils import uuid
+from ...interface.context import (
+    IDocument, IReporter, IReport, IIOCenter, ISnapshot, ISnapshotCenter, IStatusCenter, IUsageCenter
+)
+from ...infrastructure.utils import to_jsonable, uuid
 
 
 class WorkflowRuntimeReport(IReport):
@@ -30,6 +55,9 @@ class WorkflowRuntimeReport(IReport):
         self.outputs = data.get("outputs", {})
         self.workflowStatus = data.get("workflowStatus", {})
         self.reports = data.get("reports", {})
+        self.usage = data.get("usage")
+        self.nodeConfigs = data.get("nodeConfigs", {})
+        self.version = data.get("version", 0)
 
 
 class WorkflowRuntimeReporter(IReporter):
@@ -38,7 +66,20 @@ class WorkflowRuntimeReporter(IReporter):
     This class is responsible for generating reports about the workflow execution.
     """
 
-    def __init__(self, io_center: IIOCenter, snapshot_center: ISnapshotCenter, status_center: IStatusCenter):
+    # Number of snapshot removals remembered per node for delta queries
+    MAX_REMOVALS = 1024
+
+    # Fields of node reports that queries can select, besides the node ID
+    NODE_REPORT_FIELDS = ("status", "terminated", "startTime", "endTime", "timeCost", "snapshots", "usage")
+
+    def __init__(
+        self,
+        io_center: IIOCenter,
+        snapshot_center: ISnapshotCenter,
+        status_center: IStatusCenter,
+        usage_center: IUsageCenter,
+        document: Optional[IDocument] = None
+    ):
         """
         Initialize a new instance of the WorkflowRuntimeReporter class.
         
@@ -46,72 +87,499 @@ class WorkflowRuntimeReporter(IReporter):
             io_center: The IO center.
             snapshot_center: The snapshot center.
             status_center: The status center.
+            usage_center: The usage center.
+            document: The workflow document holding the node configurations.
         """
         self._io_center = io_center
         self._snapshot_center = snapshot_center
         self._status_center = status_center
+        self._usage_center = usage_center
+        self._document = document
+        self._reset()
+        status_center.add_listener(self._on_status_change)
+        snapshot_center.add_listener(self._on_snapshot_change)
 
     def init(self) -> None:
         """
         Initialize the reporter.
         """
-        pass
+        self._reset()
+
+    def _reset(self) -> None:
+        """
+        Forget all changes and start again at version 0.
+        """
+        self._version = 0
+        # Node IDs in the order of their last change, with the version of that change
+        self._node_versions: Dict[str, int] = {}
+        self._node_first_versions: Dict[str, int] = {}
+        # Snapshots of each node in the order of their last change, with its version
+        self._snapshot_versions: Dict[str, Dict[ISnapshot, int]] = {}
+        # The latest removals of snapshots of each node, as versions and snapshot IDs
+        self._removals: Dict[str, Deque[Tuple[int, str]]] = {}
+        # The version of the latest snapshot change of a node that is no longer remembered
+        self._forgotten_versions: Dict[str, int] = {}
+        # Exported status of each node, in the order the nodes were first reported
+        self._node_statuses: Dict[str, Dict[str, Any]] = {}
+        # Exports of the snapshots of each node in creation order, None until exported
+        self._snapshot_exports: Dict[str, Dict[ISnapshot, Optional[Dict[str, Any]]]] = {}
+        # Snapshots changed since their last export, with their node IDs
+        self._stale_snapshots: Dict[ISnapshot, str] = {}
+        # Snapshot exports of each node as reported, rebuilt for the nodes whose snapshots changed
+        self._snapshot_lists: Dict[str, List[Dict[str, Any]]] = {}
+        self._stale_nodes: Set[str] = set()
+        self._report: Optional[IReport] = None
+        self._report_version = -1
+
+    @property
+    def version(self) -> int:
+        """
+        Get the version of the report.
+        
+        Returns:
+            The version, which increases whenever a status or a snapshot changes.
+        """
+        return self._version
+
+    def _on_status_change(self, node_id: Optional[str]) -> None:
+        """
+        Record a change of the workflow status or of a node status.
+        
+        Args:
+            node_id: The ID of the node, or None for the workflow.
+        """
+        self._version += 1
+        if node_id is not None:
+            self._touch(node_id)
+            self._node_statuses[node_id] = self._status_center.node_status(node_id).export()
+
+    def _on_snapshot_change(self, node_id: str, snapshot: ISnapshot, removed: bool) -> None:
+        """
+        Record a snapshot that was recorded, updated or removed.
+        
+        Args:
+            node_id: The ID of the node.
+            snapshot: The snapshot.
+            removed: Whether the snapshot was removed.
+        """
+        self._version += 1
+        self._touch(node_id)
+        if node_id:
+            exports = self._snapshot_exports.get(node_id)
+            if exports is None:
+                exports = self._snapshot_exports[node_id] = {}
+            if removed:
+                exports.pop(snapshot, None)
+                self._stale_snapshots.pop(snapshot, None)
+            else:
+                # Assigning an existing key keeps the snapshot in its creation position
+                exports[snapshot] = None
+                self._stale_snapshots[snapshot] = node_id
+            self._stale_nodes.add(node_id)
+        snapshot_versions = self._snapshot_versions.get(node_id)
+        if snapshot_versions is None:
+            snapshot_versions = self._snapshot_versions[node_id] = {}
+        # Move the snapshot to the end, which keeps the dictionary ordered by version
+        snapshot_versions.pop(snapshot, None)
+        if not removed:
+            snapshot_versions[snapshot] = self._version
+            return
+        removals = self._removals.get(node_id)
+        if removals is None:
+            removals = self._removals[node_id] = deque(maxlen=self.MAX_REMOVALS)
+        if len(removals) == removals.maxlen:
+            self._forgotten_versions[node_id] = removals[0][0]
+        removals.append((self._version, snapshot.id))
+
+    def _touch(self, node_id: str) -> None:
+        """
+        Record that the report of a node changed at the current version.
+        
+        Args:
+            node_id: The ID of the node.
+        """
+        self._node_versions.pop(node_id, None)
+        self._node_versions[node_id] = self._version
+        if node_id not in self._node_first_versions:
+            self._node_first_versions[node_id] = self._version
 
     def dispose(self) -> None:
         """
         Dispose the reporter and release resources.
+        
+        If the snapshots of the task were offloaded, the reporter lets go of
+        them: deltas reaching back before now return all snapshots of the
+        changed nodes, and reports are no longer cached.
         """
-        pass
+        if not self._snapshot_center.offloaded:
+            return
+        for node_id in self._snapshot_versions:
+            self._forgotten_versions[node_id] = self._version
+        self._snapshot_versions = {}
+        self._removals = {}
+        self._snapshot_exports = {}
+        self._stale_snapshots = {}
+        self._snapshot_lists = {}
+        self._stale_nodes = set()
+        self._report = None
+        self._report_version = -1
 
     def export(self) -> IReport:
         """
         Export the report.
         
+        Unless the snapshots were offloaded, the report is built once per version
+        and shared until the next change, so callers must not modify it.
+        
         Returns:
             The exported report.
         """
-        # Get workflow status
-        workflow_status = self._status_center.workflow
+        if self._report_version == self._version and self._report is not None:
+            return self._report
+        if self._snapshot_center.offloaded:
+            snapshots_by_node = self._snapshot_center.export()
+        else:
+            snapshots_by_node = self._current_snapshot_lists()
+        
+        # Assemble the node reports from the statuses and snapshots kept by the listeners
+        reports = {}
+        for node_id, node_status in self._node_statuses.items():
+            node_report = dict(node_status)
+            node_report["snapshots"] = snapshots_by_node.get(node_id, [])
+            node_usage = self._usage_center.node_usage(node_id)
+            if node_usage:
+                node_report["usage"] = node_usage
+            reports[node_id] = node_report
         
-        # Get all node statuses
-        status_data = self._status_center.export()
-        node_statuses = status_data.get("nodes", {})
+        report_data = {
+            "id": self._task_id(),
+            "version": self._version,
+            "inputs": self._io_center.inputs,
+            "outputs": self._io_center.outputs,
+            "workflowStatus": self._export_workflow_status(self._status_center.workflow),
+            "reports": reports,
+            "usage": self._usage_center.export(),
+            "nodeConfigs": self._export_node_configs(snapshots_by_node)
+        }
         
-        # Get all snapshots
-        snapshots_by_node = self._snapshot_center.export()
+        report = WorkflowRuntimeReport(report_data)
+        # Caching a report of offloaded snapshots would load them all back into memory
+        if not self._snapshot_center.offloaded:
+            self._report = report
+            self._report_version = self._version
+        return report
+
+    def _current_snapshot_lists(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Export the snapshots that changed and rebuild the snapshot lists of their nodes.
         
-        # Create node reports
+        Returns:
+            The snapshot exports of the nodes that have snapshots, by node ID, in
+            the order the nodes were first recorded.
+        """
+        for snapshot, node_id in self._stale_snapshots.items():
+            self._snapshot_exports[node_id][snapshot] = snapshot.export()
+        self._stale_snapshots = {}
+        for node_id in self._stale_nodes:
+            # A new list, so reports exported before keep the snapshots they had
+            self._snapshot_lists[node_id] = list(self._snapshot_exports[node_id].values())
+        self._stale_nodes = set()
+        return {
+            node_id: self._snapshot_lists[node_id]
+            for node_id, exports in self._snapshot_exports.items() if exports
+        }
+
+    def freeze(self, inputs: Dict[str, Any], outputs: Dict[str, Any]) -> IReporter:
+        """
+        Freeze the final report of a finished task.
+        
+        The IO center forgets the inputs and outputs when the context is disposed,
+        so the caller passes the ones it kept.
+        
+        Offloaded snapshots are not read back: the frozen reporter refers to the
+        segments of the snapshot center, which keep only their offsets in memory.
+        Freezing does not touch the report cache, so a finished task can be frozen
+        off the event loop while its live report is still served.
+        
+        Args:
+            inputs: The workflow inputs.
+            outputs: The workflow outputs.
+            
+        Returns:
+            A frozen reporter serving the final report, without references to the context.
+        """
+        from .workflow_runtime_frozen_reporter import WorkflowRuntimeFrozenReporter
+        snapshot_center = self._snapshot_center
+        offloaded = snapshot_center.offloaded
+        snapshots = {node_id: snapshot_center.node_snapshots(node_id) for node_id in snapshot_center.node_ids()}
         reports = {}
-        for node_id, node_status in node_statuses.items():
-            node_snapshots = snapshots_by_node.get(node_id, [])
+        for node_id, node_status in self._node_statuses.items():
+            node_report = dict(node_status)
+            if not offloaded:
+                # Snapshots held in memory are compressed with the report
+                node_report["snapshots"] = [snapshot.export() for snapshot in snapshots.get(node_id, ())]
+            node_usage = self._usage_center.node_usage(node_id)
+            if node_usage:
+                node_report["usage"] = node_usage
+            reports[node_id] = node_report
+        report_data = {
+            "id": self._task_id(),
+            "version": self._version,
+            "inputs": inputs,
+            "outputs": outputs,
+            "workflowStatus": self._export_workflow_status(self._status_center.workflow),
+            "reports": reports,
+            "usage": self._usage_center.export(),
+            "nodeConfigs": self._export_node_configs(snapshots)
+        }
+        node_types = {}
+        if self._document is not None:
+            for node_id in reports:
+                node = self._document.get_node(node_id)
+                if node is not None:
+                    node_types[node_id] = node.type
+        return WorkflowRuntimeFrozenReporter(
+            to_jsonable(report_data), node_types, snapshots if offloaded else None
+        )
+
+    def export_since(self, since: int) -> Dict[str, Any]:
+        """
+        Export the changes of the report since a version.
+        
+        Node reports hold the status of the node, the snapshots recorded or
+        updated since the version in `snapshots` and the IDs of the snapshots
+        removed since the version in `removedSnapshots`. If the removals reach
+        back further than the reporter remembers, `snapshots` holds all snapshots
+        of the node instead and `snapshotsReset` is True. Node configurations are
+        only included for nodes that first appeared since the version.
+        
+        Args:
+            since: The version the caller has seen, for example the version of
+                a report it exported earlier.
             
-            reports[node_id] = {
+        Returns:
+            The report delta, with the current version, the workflow status,
+            outputs and usage, and the reports of the nodes that changed.
+        """
+        delta: Dict[str, Any] = {
+            "id": self._task_id(),
+            "version": self._version,
+            "since": since,
+            "outputs": self._io_center.outputs,
+            "workflowStatus": self._export_workflow_status(self._status_center.workflow),
+            "usage": self._usage_center.export(),
+            "reports": {},
+            "nodeConfigs": {}
+        }
+        if since >= self._version:
+            return delta
+
+        changed_node_ids = []
+        for node_id in reversed(self._node_versions):
+            if self._node_versions[node_id] <= since:
+                break
+            changed_node_ids.append(node_id)
+        changed_node_ids.reverse()
+
+        node_statuses = self._status_center.export().get("nodes", {})
+        for node_id in changed_node_ids:
+            node_status = node_statuses.get(node_id, {})
+            node_report: Dict[str, Any] = {
                 "id": node_id,
                 "status": node_status.get("status", "unknown"),
                 "terminated": node_status.get("terminated", False),
                 "startTime": node_status.get("startTime", 0),
                 "endTime": node_status.get("endTime", 0),
                 "timeCost": node_status.get("timeCost", 0),
-                "snapshots": node_snapshots
             }
+            snapshots, removed_ids, reset = self._snapshots_since(node_id, since)
+            node_report["snapshots"] = snapshots
+            if removed_ids:
+                node_report["removedSnapshots"] = removed_ids
+            if reset:
+                node_report["snapshotsReset"] = True
+            node_usage = self._usage_center.node_usage(node_id)
+            if node_usage:
+                node_report["usage"] = node_usage
+            delta["reports"][node_id] = node_report
+            if self._document is not None and self._node_first_versions.get(node_id, 0) > since:
+                node = self._document.get_node(node_id)
+                if node is not None:
+                    delta["nodeConfigs"][node_id] = node.data
+        return delta
+
+    def query(
+        self,
+        node_ids: Optional[Sequence[str]] = None,
+        statuses: Optional[Sequence[str]] = None,
+        node_types: Optional[Sequence[str]] = None,
+        fields: Optional[Sequence[str]] = None,
+        snapshot_fields: Optional[Sequence[str]] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Export a filtered report.
+        
+        Node reports have the shape of the full report, restricted to the selected
+        fields. Their snapshots are paged: with a limit, node reports with more
+        snapshots carry the cursor of the next page in `nextCursor`, and every
+        node report with snapshots carries the total in `snapshotCount`.
         
-        # Create the report data
+        Args:
+            node_ids: The IDs of the nodes to report, or None for all nodes.
+            statuses: The statuses of the nodes to report, in any case, or None for any.
+            node_types: The types of the nodes to report, or None for any.
+            fields: The node report fields to include, or None for all. The node ID
+                is always included.
+            snapshot_fields: The snapshot fields to include, or None for all. The
+                snapshot ID and node ID are always included.
+            cursor: The ID of the snapshot to start each node's snapshots after.
+            limit: The maximum number of snapshots per node, or None for all.
+            
+        Returns:
+            The report data, with the reports and configurations of the matching nodes.
+            
+        Raises:
+            ValueError: If a field is unknown, the cursor is invalid or the limit is not positive.
+        """
+        if fields is not None:
+            unknown = set(fields) - set(self.NODE_REPORT_FIELDS)
+            if unknown:
+                raise ValueError(
+                    f"Unknown report fields {', '.join(sorted(unknown))}, "
+                    f"expected any of {', '.join(self.NODE_REPORT_FIELDS)}"
+                )
+        selected = set(self.NODE_REPORT_FIELDS if fields is None else fields)
+        wanted_statuses = None if statuses is None else {status.lower() for status in statuses}
+        wanted_types = None if node_types is None else set(node_types)
+        kept_snapshot_fields = None if snapshot_fields is None else {"id", "nodeID", *snapshot_fields}
+
+        node_statuses = self._status_center.export().get("nodes", {})
+        reports: Dict[str, Any] = {}
+        node_configs: Dict[str, Any] = {}
+        for node_id in (node_statuses if node_ids is None else node_ids):
+            node_status = node_statuses.get(node_id)
+            if node_status is None:
+                continue
+            if wanted_statuses is not None and str(node_status.get("status", "")).lower() not in wanted_statuses:
+                continue
+            node = self._document.get_node(node_id) if self._document is not None else None
+            if wanted_types is not None and (node is None or node.type not in wanted_types):
+                continue
+
+            node_report: Dict[str, Any] = {"id": node_id}
+            for field in ("status", "terminated", "startTime", "endTime", "timeCost"):
+                if field in selected:
+                    node_report[field] = node_status.get(field)
+            if "snapshots" in selected:
+                snapshots, next_cursor = self._snapshot_center.export_node(node_id, cursor, limit)
+                if kept_snapshot_fields is not None:
+                    snapshots = [
+                        {key: value for key, value in snapshot.items() if key in kept_snapshot_fields}
+                        for snapshot in snapshots
+                    ]
+                node_report["snapshots"] = snapshots
+                count = self._snapshot_center.count(node_id)
+                if count:
+                    node_report["snapshotCount"] = count
+                    if node is not None:
+                        node_configs[node_id] = node.data
+                if next_cursor is not None:
+                    node_report["nextCursor"] = next_cursor
+            if "usage" in selected:
+                node_usage = self._usage_center.node_usage(node_id)
+                if node_usage:
+                    node_report["usage"] = node_usage
+            reports[node_id] = node_report
+
+        return {
+            "id": self._task_id(),
+            "version": self._version,
+            "inputs": self._io_center.inputs,
+            "outputs": self._io_center.outputs,
+            "workflowStatus": self._export_workflow_status(self._status_center.workflow),
+            "reports": reports,
+            "usage": self._usage_center.export(),
+            "nodeConfigs": node_configs
+        }
+
+    def _snapshots_since(self, node_id: str, since: int) -> Tuple[List[Dict[str, Any]], List[str], bool]:
+        """
+        Get the snapshots of a node that changed since a version.
+        
+        Args:
+            node_id: The ID of the node.
+            since: The version.
+            
+        Returns:
+            The exports of the snapshots recorded or updated since the version in
+            recording order, the IDs of the snapshots removed since the version,
+            and whether the changes are incomplete, in which case all snapshots
+            are returned.
+        """
+        snapshot_versions = self._snapshot_versions.get(node_id, {})
+        if self._forgotten_versions.get(node_id, 0) > since:
+            return self._snapshot_center.export_node(node_id)[0], [], True
+
+        snapshots = []
+        for snapshot in reversed(snapshot_versions):
+            if snapshot_versions[snapshot] <= since:
+                break
+            snapshots.append(snapshot)
+        snapshots.sort(key=lambda snapshot: snapshot._seq)
+        removed_ids = [
+            snapshot_id for version, snapshot_id in self._removals.get(node_id, ()) if version > since
+        ]
+        exports = self._snapshot_exports.get(node_id, {})
+        return [exports.get(snapshot) or snapshot.export() for snapshot in snapshots], removed_ids, False
+
+    def _task_id(self) -> str:
+        """
+        Get the ID of the task the report belongs to.
+        
+        Returns:
+            The task ID, or "workflow-report" if it is unknown.
+        """
         task_id = "workflow-report"
         if hasattr(self._io_center, '_context') and hasattr(self._io_center._context, '_task_id'):
             task_id = self._io_center._context._task_id
+        return task_id
+
+    @staticmethod
+    def _export_workflow_status(workflow_status: Any) -> Dict[str, Any]:
+        """
+        Export the workflow status for the report.
         
-        report_data = {
-            "id": task_id,
-            "inputs": self._io_center.inputs,
-            "outputs": self._io_center.outputs,
-            "workflowStatus": {
-                "status": workflow_status.status,
-                "terminated": workflow_status.terminated,
-                "startTime": workflow_status.startTime,
-                "endTime": workflow_status.endTime,
-                "timeCost": workflow_status.timeCost
-            },
-            "reports": reports
+        Args:
+            workflow_status: The workflow status.
+            
+        Returns:
+            The status, whether the workflow terminated and its times.
+        """
+        return {
+            "status": workflow_status.status,
+            "terminated": workflow_status.terminated,
+            "startTime": workflow_status.startTime,
+            "endTime": workflow_status.endTime,
+            "timeCost": workflow_status.timeCost
         }
+
+    def _export_node_configs(self, snapshots_by_node: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Export the configuration of the nodes that have snapshots.
         
-        return WorkflowRuntimeReport(report_data)
+        Args:
+            snapshots_by_node: The snapshots grouped by node ID.
+            
+        Returns:
+            A dictionary mapping node IDs to their node data.
+        """
+        if self._document is None:
+            return {}
+        node_configs = {}
+        for node_id in snapshots_by_node:
+            node = self._document.get_node(node_id)
+            if node is not None:
+                node_configs[node_id] = node.data
+        return node_configs
@@ -3,5 +3,6 @@ Snapshot module for the workflow runtime.
 This module contains the implementation of the workflow snapshot center.
 """
 from .workflow_runtime_snapshot_center import WorkflowRuntimeSnapshotCenter, WorkflowRuntimeSnapshot
+from .workflow_runtime_snapshot_policy import WorkflowRuntimeSnapshotPolicy
 
-__all__ = ['WorkflowRuntimeSnapshotCenter', 'WorkflowRuntimeSnapshot']
+__all__ = ['WorkflowRuntimeSnapshotCenter', 'WorkflowRuntimeSnapshot', 'WorkflowRuntimeSnapshotPolicy']
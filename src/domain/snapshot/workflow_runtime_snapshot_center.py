@@ -4,11 +4,60 @@ Implementation of the workflow runtime snapshot center.
 This module contains the implementation of the snapshot center, which is responsible
 for managing snapshots of the workflow execution. It provides methods to create,
 export, and manage snapshots.
+
+Which node runs are recorded, and how much of them, is decided by the snapshot
+policy of the workflow or of the node. Runs that are not recorded get a shared
+discarded snapshot, so they cost no allocation.
+
+Listeners are told about every snapshot that is recorded, updated or removed,
+which lets the reporter maintain its report incrementally.
+
+Snapshots are indexed by node ID in recording order, so the snapshots of one
+node can be paged through with a cursor without exporting all snapshots.
+
+With the `offload` option, every snapshot is appended to a spill log of the task
+in a scratch file as it is recorded and updated, in batches, and the latest
+record of a snapshot wins. When the task is disposed, only the last batch is
+written, the log is memory-mapped and only the IDs and log offsets of the
+snapshots stay in memory. Snapshots are decoded from the log when they are read.
 """
-from typing import Any, Dict, List
+import heapq
+from array import array
+from collections import deque
+from collections.abc import Sequence
+from operator import attrgetter
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
 
 from ...interface.context import ISnapshotCenter, ISnapshot
-from ...infrastructure.utils import uuid
+from ...interface.schema import SnapshotOptions
+from ...infrastructure.spill import SpillLog, SpilledRecords
+from ...infrastructure.utils import monotonic_id, uuid
+from .workflow_runtime_snapshot_policy import WorkflowRuntimeSnapshotPolicy
+
+_seq_of = attrgetter("_seq")
+
+
+def _bisect_seq(snapshots: Sequence, seq: int) -> int:
+    """
+    Find the position of the first snapshot created after a sequence number.
+    
+    `bisect_right` only takes a key function from Python 3.10 on.
+    
+    Args:
+        snapshots: The snapshots, in creation order.
+        seq: The sequence number.
+        
+    Returns:
+        The index of the first snapshot whose sequence number is greater.
+    """
+    low, high = 0, len(snapshots)
+    while low < high:
+        middle = (low + high) // 2
+        if snapshots[middle]._seq <= seq:
+            low = middle + 1
+        else:
+            high = middle
+    return low
 
 
 class WorkflowRuntimeSnapshot(ISnapshot):
@@ -16,16 +65,30 @@ class WorkflowRuntimeSnapshot(ISnapshot):
     Implementation of the workflow snapshot.
     This class represents a snapshot of a node execution.
     """
+    
+    __slots__ = ("_seq", "data", "_on_change")
 
-    def __init__(self, data: Dict[str, Any]):
+    def __init__(self, data: Dict[str, Any], on_change: Optional[Callable[['WorkflowRuntimeSnapshot'], None]] = None):
         """
         Initialize a new instance of the WorkflowRuntimeSnapshot class.
         
         Args:
             data: The snapshot data.
+            on_change: Called with the snapshot whenever data is added to it.
         """
-        self.id = uuid()
+        self._seq = monotonic_id()
         self.data = data
+        self._on_change = on_change
+
+    @property
+    def id(self) -> str:
+        """
+        Get the snapshot ID.
+        
+        Returns:
+            The snapshot ID, unique within the process.
+        """
+        return str(self._seq)
 
     def add_data(self, data: Dict[str, Any]) -> None:
         """
@@ -35,6 +98,8 @@ class WorkflowRuntimeSnapshot(ISnapshot):
             data: The data to add.
         """
         self.data.update(data)
+        if self._on_change is not None:
+            self._on_change(self)
 
     def validate(self) -> bool:
         """
@@ -43,7 +108,7 @@ class WorkflowRuntimeSnapshot(ISnapshot):
         Returns:
             True if the snapshot is valid, False otherwise.
         """
-        required = ['nodeID', 'inputs', 'outputs', 'data']
+        required = ['nodeID', 'inputs', 'outputs']
         return all(key in self.data for key in required)
 
     def export(self) -> Dict[str, Any]:
@@ -60,12 +125,16 @@ class WorkflowRuntimeSnapshot(ISnapshot):
         return snapshot
 
     @staticmethod
-    def create(params: Dict[str, Any]) -> ISnapshot:
+    def create(
+        params: Dict[str, Any],
+        on_change: Optional[Callable[['WorkflowRuntimeSnapshot'], None]] = None
+    ) -> ISnapshot:
         """
         Create a new snapshot.
         
         Args:
             params: The snapshot parameters.
+            on_change: Called with the snapshot whenever data is added to it.
             
         Returns:
             The created snapshot.
@@ -73,34 +142,344 @@ class WorkflowRuntimeSnapshot(ISnapshot):
         # Convert node_id to nodeID for consistency with JS version
         if 'node_id' in params:
             params['nodeID'] = params.pop('node_id')
-        return WorkflowRuntimeSnapshot(params)
+        return WorkflowRuntimeSnapshot(params, on_change)
+
+
+class WorkflowRuntimeFilteredSnapshot(WorkflowRuntimeSnapshot):
+    """
+    A snapshot whose data is filtered by a snapshot policy.
+    
+    Metadata snapshots leave out the inputs and outputs, and large
+    input and output values are truncated.
+    """
+    
+    __slots__ = ("_policy",)
+
+    def __init__(
+        self,
+        data: Dict[str, Any],
+        policy: WorkflowRuntimeSnapshotPolicy,
+        on_change: Optional[Callable[[WorkflowRuntimeSnapshot], None]] = None
+    ):
+        """
+        Initialize a new instance of the WorkflowRuntimeFilteredSnapshot class.
+        
+        Args:
+            data: The snapshot data.
+            policy: The snapshot policy.
+            on_change: Called with the snapshot whenever data is added to it.
+        """
+        super().__init__(policy.filter(data), on_change)
+        self._policy = policy
+
+    def add_data(self, data: Dict[str, Any]) -> None:
+        """
+        Add data to the snapshot, filtered by the policy.
+        
+        Args:
+            data: The data to add.
+        """
+        self.data.update(self._policy.filter(data))
+        if self._on_change is not None:
+            self._on_change(self)
+
+
+class WorkflowRuntimeDiscardedSnapshot(ISnapshot):
+    """
+    A snapshot of a node run that is not recorded.
+    
+    It ignores the data added to it, so a single instance serves all such runs.
+    """
+    
+    __slots__ = ()
+
+    @property
+    def id(self) -> str:
+        """
+        Get the snapshot ID.
+        
+        Returns:
+            An empty string, since the snapshot is not recorded.
+        """
+        return ""
+
+    def add_data(self, data: Dict[str, Any]) -> None:
+        """
+        Ignore data added to the snapshot.
+        
+        Args:
+            data: The data to add.
+        """
+        pass
+
+
+_DISCARDED = WorkflowRuntimeDiscardedSnapshot()
+
+
+class WorkflowRuntimeOffloadedSnapshot(ISnapshot):
+    """
+    A snapshot that was offloaded to a spill log.
+    
+    It is created when the snapshot is read and decodes the snapshot on export.
+    Offloaded snapshots are read-only.
+    """
+    
+    __slots__ = ("_seq", "_records", "_index")
+
+    def __init__(self, seq: int, records: SpilledRecords, index: int):
+        """
+        Initialize a new instance of the WorkflowRuntimeOffloadedSnapshot class.
+        
+        Args:
+            seq: The sequence number of the snapshot, which is its ID.
+            records: The logged exports of the snapshots of the node.
+            index: The index of the snapshot in the records.
+        """
+        self._seq = seq
+        self._records = records
+        self._index = index
+
+    @property
+    def id(self) -> str:
+        """
+        Get the snapshot ID.
+        
+        Returns:
+            The snapshot ID, unique within the process.
+        """
+        return str(self._seq)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """
+        Get the snapshot data.
+        
+        Returns:
+            The decoded snapshot data, without the snapshot ID.
+        """
+        data = self._records[self._index]
+        data.pop('id', None)
+        return data
+
+    def add_data(self, data: Dict[str, Any]) -> None:
+        """
+        Reject data added to the snapshot.
+        
+        Args:
+            data: The data to add.
+            
+        Raises:
+            RuntimeError: Always, since offloaded snapshots are read-only.
+        """
+        raise RuntimeError(f"Snapshot {self.id} was offloaded and cannot be modified")
+
+    def export(self) -> Dict[str, Any]:
+        """
+        Export the snapshot.
+        
+        Returns:
+            The decoded snapshot.
+        """
+        return self._records[self._index]
+
+
+class WorkflowRuntimeSnapshotSegment(Sequence):
+    """
+    The offloaded snapshots of a node.
+    
+    Holds the sequence numbers of the snapshots in a typed array and the log
+    records of their exports, and creates offloaded snapshots on access.
+    """
+    
+    __slots__ = ("_seqs", "_records")
+
+    def __init__(self, seqs: array, records: SpilledRecords):
+        """
+        Initialize a new instance of the WorkflowRuntimeSnapshotSegment class.
+        
+        Args:
+            seqs: The sequence numbers of the snapshots, in creation order.
+            records: The logged exports of the snapshots, in the same order.
+        """
+        self._seqs = seqs
+        self._records = records
+
+    def __len__(self) -> int:
+        """
+        Get the number of snapshots.
+        
+        Returns:
+            The number of snapshots.
+        """
+        return len(self._seqs)
+
+    def __getitem__(self, index: Any) -> Any:
+        """
+        Get a snapshot or a slice.
+        
+        Args:
+            index: The index of the snapshot, or a slice.
+            
+        Returns:
+            The offloaded snapshot, or a list of the sliced snapshots.
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self._seqs)
+        return WorkflowRuntimeOffloadedSnapshot(self._seqs[index], self._records, index)
 
 
 class WorkflowRuntimeSnapshotCenter(ISnapshotCenter):
     """
     Implementation of the snapshot center.
     This class manages snapshots of the workflow execution.
+    
+    Snapshots that are kept for good are stored per node in creation order. In
+    sampled mode, the last runs of each node are kept in a bounded queue instead,
+    which drops the oldest run once it is full.
     """
+    
+    # Number of changed snapshots appended to the spill log at once
+    LOG_BATCH_SIZE = 64
 
     def __init__(self):
         """
         Initialize a new instance of the WorkflowRuntimeSnapshotCenter class.
         """
         self.id = uuid()
-        self._snapshots: List[ISnapshot] = []
+        # Snapshots kept for good by node ID, in the order the nodes were first recorded.
+        # Offloaded snapshots are held in segments instead of lists
+        self._snapshots: Dict[str, Sequence] = {}
+        self._policy = WorkflowRuntimeSnapshotPolicy()
+        self._node_policies: Dict[str, WorkflowRuntimeSnapshotPolicy] = {}
+        self._runs: Dict[str, int] = {}
+        self._last_runs: Dict[str, Deque[ISnapshot]] = {}
+        self._listeners: List[Callable[[str, ISnapshot, bool], None]] = []
+        self._offload = False
+        self._offloaded = False
+        # Spill log of the snapshots when offloading, with the offset of the latest
+        # record of each snapshot by sequence number
+        self._log: Optional[SpillLog] = None
+        self._log_offsets: Dict[int, int] = {}
+        # Snapshots changed since they were last appended to the log
+        self._unlogged: Dict[ISnapshot, None] = {}
+        # Bound once, so that snapshots share it instead of each holding a new bound method
+        self._on_snapshot_change = self._notify
 
-    def init(self) -> None:
+    def init(self, options: Optional[SnapshotOptions] = None) -> None:
         """
         Initialize the snapshot center.
+        
+        Args:
+            options: The snapshot options of the task, or None to record every node run in full.
+            
+        Raises:
+            ValueError: If a snapshot option is invalid.
         """
-        self._snapshots = []
+        self._snapshots = {}
+        self._policy, self._node_policies = WorkflowRuntimeSnapshotPolicy.parse(options)
+        self._runs = {}
+        self._last_runs = {}
+        self._offload = bool((options or {}).get("offload"))
+        self._offloaded = False
+        self._log = SpillLog() if self._offload else None
+        self._log_offsets = {}
+        self._unlogged = {}
 
     def dispose(self) -> None:
         """
         Dispose the snapshot center and release resources.
+        
+        The snapshots are kept for the report. With the offload option, they are
+        read from the spill log from now on and released from memory.
         """
         # Because the data is not persisted, do not clear the execution result
-        pass
+        if self._offload:
+            self.offload()
+
+    @property
+    def offloaded(self) -> bool:
+        """
+        Check if snapshots were offloaded.
+        
+        Returns:
+            True if snapshots were offloaded to a spill log.
+        """
+        return self._offloaded
+
+    def offload(self) -> None:
+        """
+        Seal the spill log of the snapshots held in memory and release them.
+        
+        Snapshots that changed since they were last appended to the log, or that
+        were never appended because the offload option is off, are appended
+        first. Only the sequence numbers and log offsets of the snapshots are
+        kept. Snapshots that were offloaded before are left as they are.
+        """
+        pending = {
+            node_id: list(self._iter_node(node_id))
+            for node_id, snapshots in self._snapshots.items()
+            if type(snapshots) is list
+        }
+        if not pending:
+            self._log = None
+            return
+        if self._log is None:
+            self._log = SpillLog()
+        for snapshots in pending.values():
+            for snapshot in snapshots:
+                if snapshot._seq not in self._log_offsets:
+                    self._unlogged[snapshot] = None
+        self._append_unlogged()
+        buffer = self._log.seal()
+        for node_id, snapshots in pending.items():
+            seqs = array('q', (snapshot._seq for snapshot in snapshots))
+            offsets = array('Q', (self._log_offsets[seq] for seq in seqs))
+            self._snapshots[node_id] = WorkflowRuntimeSnapshotSegment(seqs, SpilledRecords(buffer, offsets))
+        self._log = None
+        self._log_offsets = {}
+        self._last_runs = {}
+        self._offloaded = True
+
+    def _append_unlogged(self) -> None:
+        """
+        Append the snapshots that changed since they were last logged to the spill log.
+        """
+        log = self._log
+        for snapshot in self._unlogged:
+            self._log_offsets[snapshot._seq] = log.append(snapshot.export())
+        self._unlogged = {}
+
+    def add_listener(self, listener: Callable[[str, ISnapshot, bool], None]) -> None:
+        """
+        Add a listener for snapshot changes.
+        
+        Args:
+            listener: Called with the node ID, the snapshot and whether the snapshot
+                was removed, whenever a snapshot is recorded, updated or removed.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, snapshot: ISnapshot, removed: bool = False) -> None:
+        """
+        Log a snapshot change and notify the listeners of it.
+        
+        Args:
+            snapshot: The snapshot that was recorded, updated or removed.
+            removed: Whether the snapshot was removed.
+        """
+        if self._log is not None:
+            if removed:
+                self._unlogged.pop(snapshot, None)
+                self._log_offsets.pop(snapshot._seq, None)
+            else:
+                self._unlogged[snapshot] = None
+                if len(self._unlogged) >= self.LOG_BATCH_SIZE:
+                    self._append_unlogged()
+        node_id = snapshot.data.get("nodeID")
+        for listener in self._listeners:
+            listener(node_id, snapshot, removed)
 
     def create(self, snapshot_data: Dict[str, Any]) -> ISnapshot:
         """
@@ -112,18 +491,172 @@ class WorkflowRuntimeSnapshotCenter(ISnapshotCenter):
         Returns:
             The created snapshot.
         """
-        snapshot = WorkflowRuntimeSnapshot.create(snapshot_data)
-        self._snapshots.append(snapshot)
+        node_id = snapshot_data.get("node_id", snapshot_data.get("nodeID"))
+        policy = self._node_policies.get(node_id, self._policy)
+        on_change = self._on_snapshot_change if self._listeners or self._log is not None else None
+        if policy.is_full:
+            snapshot = WorkflowRuntimeSnapshot.create(snapshot_data, on_change)
+            self._node_snapshots(node_id).append(snapshot)
+            if on_change is not None:
+                on_change(snapshot)
+            return snapshot
+        if policy.mode == "off":
+            return _DISCARDED
+        
+        sampled = True
+        if policy.mode == "sampled":
+            run = self._runs.get(node_id, 0)
+            self._runs[node_id] = run + 1
+            sampled = policy.samples(run)
+            if not sampled and not policy.sample_last:
+                return _DISCARDED
+        
+        if "node_id" in snapshot_data:
+            snapshot_data["nodeID"] = snapshot_data.pop("node_id")
+        snapshot = WorkflowRuntimeFilteredSnapshot(snapshot_data, policy, on_change)
+        evicted = None
+        node_snapshots = self._node_snapshots(node_id)
+        if sampled:
+            node_snapshots.append(snapshot)
+        else:
+            last_runs = self._last_runs.get(node_id)
+            if last_runs is None:
+                last_runs = self._last_runs[node_id] = deque(maxlen=policy.sample_last)
+            if len(last_runs) == last_runs.maxlen:
+                evicted = last_runs[0]
+            last_runs.append(snapshot)
+        if on_change is not None:
+            on_change(snapshot)
+            if evicted is not None:
+                on_change(evicted, True)
         return snapshot
 
+    def _node_snapshots(self, node_id: Optional[str]) -> List[ISnapshot]:
+        """
+        Get the list of the snapshots of a node kept for good, creating it if needed.
+        
+        Args:
+            node_id: The node ID.
+            
+        Returns:
+            The list of snapshots.
+        """
+        snapshots = self._snapshots.get(node_id)
+        if snapshots is None:
+            snapshots = self._snapshots[node_id] = []
+        return snapshots
+
+    def _iter_node(self, node_id: Optional[str]) -> Iterable[ISnapshot]:
+        """
+        Iterate over the snapshots of a node, including its last runs.
+        
+        Args:
+            node_id: The node ID.
+            
+        Returns:
+            An iterable of the snapshots in creation order.
+        """
+        snapshots = self._snapshots.get(node_id, [])
+        last_runs = self._last_runs.get(node_id)
+        if not last_runs:
+            return snapshots
+        return heapq.merge(snapshots, last_runs, key=_seq_of)
+
+    def node_ids(self) -> List[str]:
+        """
+        Get the IDs of the nodes that have snapshots.
+        
+        Returns:
+            The node IDs, in the order the nodes were first recorded.
+        """
+        return [
+            node_id for node_id, snapshots in self._snapshots.items()
+            if node_id and (snapshots or self._last_runs.get(node_id))
+        ]
+
+    def node_snapshots(self, node_id: str) -> Sequence:
+        """
+        Get the snapshots of a node.
+        
+        Args:
+            node_id: The node ID.
+            
+        Returns:
+            The snapshots of the node in creation order, including its last runs.
+            Once offloaded, the segment of the node, which holds no snapshot data.
+        """
+        if self._offloaded:
+            return self._snapshots.get(node_id, ())
+        return list(self._iter_node(node_id))
+
+    def count(self, node_id: str) -> int:
+        """
+        Count the snapshots of a node.
+        
+        Args:
+            node_id: The node ID.
+            
+        Returns:
+            The number of snapshots of the node, including its last runs.
+        """
+        return len(self._snapshots.get(node_id, ())) + len(self._last_runs.get(node_id, ()))
+
+    def export_node(
+        self,
+        node_id: str,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Export a page of the snapshots of a node.
+        
+        Snapshot IDs increase in creation order, so the ID of the last snapshot
+        of a page is the cursor of the next page. Pages are found by bisecting
+        the snapshots of the node, without touching the snapshots before them.
+        
+        Args:
+            node_id: The node ID.
+            after: The ID of the snapshot to start after, or None to start at the first.
+            limit: The maximum number of snapshots, or None for all.
+            
+        Returns:
+            The snapshot data in creation order, and the cursor of the next page,
+            or None if there are no more snapshots.
+            
+        Raises:
+            ValueError: If the cursor is not a snapshot ID or the limit is not positive.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError(f"Snapshot limit must be positive, got {limit}")
+        try:
+            after_seq = -1 if after is None else int(after)
+        except ValueError:
+            raise ValueError(f"Invalid snapshot cursor {after!r}") from None
+
+        snapshots = self._snapshots.get(node_id, [])
+        start = _bisect_seq(snapshots, after_seq)
+        stop = len(snapshots) if limit is None else min(len(snapshots), start + limit + 1)
+        page: List[ISnapshot] = snapshots[start:stop]
+        last_runs = self._last_runs.get(node_id)
+        if last_runs:
+            page = list(heapq.merge(page, (s for s in last_runs if s._seq > after_seq), key=_seq_of))
+        cursor = None
+        if limit is not None and len(page) > limit:
+            page = page[:limit]
+            cursor = page[-1].id
+        return [snapshot.export() for snapshot in page], cursor
+
     def export_all(self) -> List[Dict[str, Any]]:
         """
         Export all snapshots.
         
         Returns:
-            A list of all snapshots.
+            A list of all recorded snapshots, in creation order.
         """
-        return [snapshot.export() for snapshot in self._snapshots]
+        snapshots = heapq.merge(
+            *self._snapshots.values(), *self._last_runs.values(), key=_seq_of
+        )
+        return [snapshot.export() for snapshot in snapshots]
 
     def export(self) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -132,11 +665,7 @@ class WorkflowRuntimeSnapshotCenter(ISnapshotCenter):
         Returns:
             A dictionary mapping node IDs to lists of snapshot data.
         """
-        result: Dict[str, List[Dict[str, Any]]] = {}
-        for snapshot in self.export_all():
-            node_id = snapshot.get('nodeID', '')
-            if node_id:
-                if node_id not in result:
-                    result[node_id] = []
-                result[node_id].append(snapshot)
-        return result
+        return {
+            node_id: [snapshot.export() for snapshot in self._iter_node(node_id)]
+            for node_id in self.node_ids()
+        }
@@ -0,0 +1,190 @@
+"""
+Snapshot policies of the workflow runtime.
+
+A policy decides which node runs are recorded as snapshots and how much of
+them is kept:
+
+- `full` records every run with its inputs and outputs (default)
+- `metadata` records every run without inputs and outputs
+- `sampled` records the first K runs of a node, every N-th run after that and
+  the last K runs, with their inputs and outputs
+- `off` records nothing
+
+In any mode except `off`, top-level input and output values larger than
+`maxPayloadBytes` are replaced with a truncation marker.
+"""
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from ...interface.schema import SnapshotOptions
+from ...infrastructure.spill import estimate_size
+
+# Snapshot keys holding node payloads, which metadata snapshots leave out
+PAYLOAD_KEYS = ("inputs", "outputs")
+
+
+class WorkflowRuntimeSnapshotPolicy:
+    """
+    The snapshot policy of a workflow or of a single node.
+    """
+
+    __slots__ = ("mode", "sample_every", "sample_first", "sample_last", "max_payload_bytes")
+
+    MODES = ("off", "metadata", "full", "sampled")
+
+    def __init__(
+        self,
+        mode: str = "full",
+        sample_every: int = 0,
+        sample_first: int = 0,
+        sample_last: int = 0,
+        max_payload_bytes: Optional[int] = None
+    ):
+        """
+        Initialize a new instance of the WorkflowRuntimeSnapshotPolicy class.
+
+        Args:
+            mode: One of "off", "metadata", "full" or "sampled".
+            sample_every: In sampled mode, record every N-th run, or 0 for none.
+            sample_first: In sampled mode, record the first K runs.
+            sample_last: In sampled mode, keep the last K runs.
+            max_payload_bytes: The estimated size above which input and output values
+                are truncated, or None to keep them whole.
+
+        Raises:
+            ValueError: If the mode is unknown or a number is negative.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown snapshot mode {mode!r}, expected one of {', '.join(self.MODES)}")
+        for name, value in (
+            ("sampleEvery", sample_every),
+            ("sampleFirst", sample_first),
+            ("sampleLast", sample_last),
+            ("maxPayloadBytes", max_payload_bytes or 0),
+        ):
+            if value < 0:
+                raise ValueError(f"Snapshot option {name} must not be negative, got {value}")
+        self.mode = mode
+        self.sample_every = sample_every
+        self.sample_first = sample_first
+        self.sample_last = sample_last
+        self.max_payload_bytes = max_payload_bytes
+
+    @property
+    def is_full(self) -> bool:
+        """
+        Check if the policy records every run in full.
+
+        Returns:
+            True if snapshots are recorded without any filtering.
+        """
+        return self.mode == "full" and self.max_payload_bytes is None
+
+    def samples(self, run: int) -> bool:
+        """
+        Check if a run is sampled, without counting the last runs.
+
+        Args:
+            run: The index of the run of the node, starting at 0.
+
+        Returns:
+            True if the run is among the first runs or is an N-th run.
+        """
+        return run < self.sample_first or (self.sample_every > 0 and run % self.sample_every == 0)
+
+    def filter(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply the policy to snapshot data.
+
+        Args:
+            data: The snapshot data, which is not modified.
+
+        Returns:
+            The data without payloads in metadata mode, otherwise the data with
+            large values truncated, copied only if a value was truncated.
+        """
+        if self.mode == "metadata":
+            return {key: value for key, value in data.items() if key not in PAYLOAD_KEYS}
+        if self.max_payload_bytes is None:
+            return data
+        filtered = data
+        for key in ("inputs", "outputs"):
+            values = data.get(key)
+            if not isinstance(values, Mapping):
+                continue
+            truncated = None
+            for name, value in values.items():
+                truncated_value = self._truncate(value)
+                if truncated_value is not value:
+                    if truncated is None:
+                        truncated = dict(values)
+                    truncated[name] = truncated_value
+            if truncated is not None:
+                if filtered is data:
+                    filtered = dict(data)
+                filtered[key] = truncated
+        return filtered
+
+    def _truncate(self, value: Any) -> Any:
+        """
+        Truncate a value that is larger than the payload limit.
+
+        Args:
+            value: The value.
+
+        Returns:
+            The value itself, or a truncation marker with its estimated size and,
+            for strings, a prefix.
+        """
+        size = estimate_size(value)
+        if size <= self.max_payload_bytes:
+            return value
+        marker: Dict[str, Any] = {"truncated": True, "bytes": size}
+        if isinstance(value, str):
+            marker["preview"] = value[:self.max_payload_bytes]
+        return marker
+
+    @staticmethod
+    def parse(
+        options: Optional[SnapshotOptions]
+    ) -> Tuple['WorkflowRuntimeSnapshotPolicy', Dict[str, 'WorkflowRuntimeSnapshotPolicy']]:
+        """
+        Parse the snapshot options of a workflow.
+
+        Node options override the workflow options they leave unset. Unset or
+        None options fall back to their defaults.
+
+        Args:
+            options: The snapshot options, or None to record every run in full.
+
+        Returns:
+            The workflow policy and the policies of nodes with their own options.
+
+        Raises:
+            ValueError: If an option is invalid.
+        """
+        workflow_options = {key: value for key, value in (options or {}).items() if key != "nodes" and value is not None}
+        node_policies = {}
+        for node_id, node_options in ((options or {}).get("nodes") or {}).items():
+            merged = dict(workflow_options)
+            merged.update({key: value for key, value in (node_options or {}).items() if value is not None})
+            node_policies[node_id] = WorkflowRuntimeSnapshotPolicy._from_options(merged)
+        return WorkflowRuntimeSnapshotPolicy._from_options(workflow_options), node_policies
+
+    @staticmethod
+    def _from_options(options: Mapping[str, Any]) -> 'WorkflowRuntimeSnapshotPolicy':
+        """
+        Create a policy from options without node overrides.
+
+        Args:
+            options: The snapshot options.
+
+        Returns:
+            The policy.
+        """
+        return WorkflowRuntimeSnapshotPolicy(
+            mode=options.get("mode", "full"),
+            sample_every=int(options.get("sampleEvery", 0)),
+            sample_first=int(options.get("sampleFirst", 0)),
+            sample_last=int(options.get("sampleLast", 0)),
+            max_payload_bytes=options.get("maxPayloadBytes")
+        )
@@ -9,11 +9,21 @@ outputs in the workflow.
 
 The state works closely with the variable store to resolve references to variables
 and with the document to resolve references to node outputs.
+
+The state is laid out densely by node ordinal: executed flags are bytes of a
+bytearray and node outputs are slots of a list, both sized lazily to the number
+of ordinals of the document.
+
+Node outputs are released once every node that references them has run, using
+the consumer counts of the document, unless the state retains outputs. Outputs
+without consumers, such as those of the end node, are always kept.
 """
 from typing import Any, Dict, List, Optional
 
-from ...interface.context import IState, IVariableStore
+from ...interface.context import IDocument, IState, IVariableStore
 from ...interface.node import INode, WorkflowVariableType
+from ..document.workflow_runtime_input_resolver import WorkflowRuntimeInputResolver
+from ..document.workflow_runtime_node_ordinals import WorkflowRuntimeNodeOrdinals
 
 
 class WorkflowRuntimeState(IState):
@@ -22,90 +32,88 @@ class WorkflowRuntimeState(IState):
     This class manages the execution state of the workflow.
     """
 
-    def __init__(self, variable_store: IVariableStore):
+    def __init__(self, variable_store: IVariableStore, document: Optional[IDocument] = None):
         """
         Initialize a new instance of the WorkflowRuntimeState class.
         
         Args:
             variable_store: The variable store to use.
+            document: The workflow document whose node ordinals index the state.
+                Without a document, the state assigns its own ordinals.
         """
         self._variable_store = variable_store
-        self._executed_nodes: List[INode] = []
-        self._node_outputs: Dict[str, Dict[str, Any]] = {}
+        self._document = document
+        self._ordinals: WorkflowRuntimeNodeOrdinals = WorkflowRuntimeNodeOrdinals()
+        self._executed = bytearray()
+        self._node_outputs: List[Optional[Dict[str, Any]]] = []
+        self._retain_outputs = False
+        # Remaining consumers of the nodes whose outputs have been partly consumed
+        self._remaining_consumers: Dict[int, int] = {}
 
-    def init(self) -> None:
+    @property
+    def retain_outputs(self) -> bool:
+        """
+        Check whether node outputs are kept until the state is disposed.
+        
+        Returns:
+            True if node outputs are retained, False if they are released after their last consumer.
+        """
+        return self._retain_outputs
+
+    def init(self, retain_outputs: bool = False) -> None:
         """
         Initialize the state.
+        
+        Args:
+            retain_outputs: Whether node outputs are kept until the state is disposed,
+                instead of being released once all their consumers have run.
         """
-        self._executed_nodes = []
-        self._node_outputs = {}
+        ordinals = getattr(self._document, "ordinals", None)
+        self._ordinals = ordinals if ordinals is not None else WorkflowRuntimeNodeOrdinals()
+        self._executed = bytearray()
+        self._node_outputs = []
+        self._retain_outputs = retain_outputs
+        self._remaining_consumers = {}
 
     def dispose(self) -> None:
         """
         Dispose the state and release resources.
         """
-        self._executed_nodes = []
-        self._node_outputs = {}
+        self._executed = bytearray()
+        self._node_outputs = []
+        self._remaining_consumers = {}
+
+    def _grow(self, ordinal: int) -> None:
+        """
+        Grow the arrays to cover an ordinal and all ordinals assigned so far.
+        
+        Args:
+            ordinal: The ordinal to cover.
+        """
+        size = max(ordinal + 1, len(self._ordinals))
+        missing = size - len(self._executed)
+        if missing > 0:
+            self._executed.extend(bytes(missing))
+            self._node_outputs.extend([None] * missing)
 
     def get_node_inputs(self, node: INode) -> Dict[str, Any]:
         """
         Get the inputs for a node.
         
+        The inputs are resolved with the accessors compiled from the node's
+        `inputsValues` when the document was initialized.
+        
         Args:
             node: The node.
             
         Returns:
             The node inputs.
         """
-        inputs = {}
-        
-        # Get inputs from node data
-        if "inputsValues" in node.data:
-            input_values = node.data.get("inputsValues", {})
-            
-            for key, value_config in input_values.items():
-                value_type = value_config.get("type")
-                value_content = value_config.get("content")
-                
-                if value_type == "constant":
-                    # Constant value
-                    inputs[key] = value_content
-                elif value_type == "ref" and isinstance(value_content, list):
-                    # Reference to another node's output or variable
-                    if len(value_content) >= 2:
-                        node_id = value_content[0]
-                        output_key = value_content[1]
-                        
-                        # Get from node outputs
-                        if node_id in self._node_outputs and output_key in self._node_outputs[node_id]:
-                            inputs[key] = self._node_outputs[node_id][output_key]
-                        # Get from variable store with specific node_id (for loop locals or other node-specific variables)
-                        elif self._variable_store.has_variable(output_key, node_id=node_id):
-                            inputs[key] = self._variable_store.get_variable(output_key, node_id=node_id)
-                        # Get from workflow inputs (start node)
-                        elif node_id == "start_0" and self._variable_store.has_variable(output_key):
-                            inputs[key] = self._variable_store.get_variable(output_key)
-                        # Handle nested references (e.g., ["start_0", "llm_settings", "temperature"])
-                        elif len(value_content) > 2:
-                            # Try to get the parent object
-                            parent_key = output_key
-                            if self._variable_store.has_variable(parent_key, node_id=node_id):
-                                parent_value = self._variable_store.get_variable(parent_key, node_id=node_id)
-                                
-                                # Navigate through nested keys
-                                current_value = parent_value
-                                for i in range(2, len(value_content)):
-                                    nested_key = value_content[i]
-                                    if isinstance(current_value, dict) and nested_key in current_value:
-                                        current_value = current_value[nested_key]
-                                    else:
-                                        current_value = None
-                                        break
-                                
-                                if current_value is not None:
-                                    inputs[key] = current_value
-        
-        return inputs
+        resolver = getattr(node, "input_resolver", None)
+        if not isinstance(resolver, WorkflowRuntimeInputResolver):
+            # Nodes that do not come from a document are compiled on the fly
+            resolver = WorkflowRuntimeInputResolver.compile(node.data.get("inputsValues"))
+        return resolver.resolve(self._node_outputs, self._variable_store, self._ordinals)
 
     def set_node_outputs(self, node: INode, outputs: Dict[str, Any]) -> None:
         """
@@ -115,16 +123,49 @@ class WorkflowRuntimeState(IState):
             node: The node.
             outputs: The node outputs.
         """
-        self._node_outputs[node.id] = outputs
+        ordinal = self._ordinals.ordinal(node.id)
+        if ordinal >= len(self._node_outputs):
+            self._grow(ordinal)
+        self._node_outputs[ordinal] = outputs
+
+    def release_inputs(self, node: INode) -> None:
+        """
+        Release the outputs that a node consumed, if no other consumer still needs them.
+        
+        Args:
+            node: The node that has finished.
+        """
+        if self._retain_outputs:
+            return
+        consumer_counts = getattr(self._document, "consumer_counts", None)
+        resolver = getattr(node, "input_resolver", None)
+        if consumer_counts is None or not isinstance(resolver, WorkflowRuntimeInputResolver):
+            return
+        if self._ordinals is not self._document.ordinals:
+            # The document was initialized again after this state
+            return
+        
+        for source_ordinal in resolver.source_ordinals:
+            if source_ordinal >= len(consumer_counts) or source_ordinal >= len(self._node_outputs):
+                continue
+            remaining = self._remaining_consumers.get(source_ordinal, consumer_counts[source_ordinal]) - 1
+            if remaining > 0:
+                self._remaining_consumers[source_ordinal] = remaining
+                continue
+            self._remaining_consumers.pop(source_ordinal, None)
+            self._node_outputs[source_ordinal] = None
 
     def add_executed_node(self, node: INode) -> None:
         """
-        Add a node to the executed nodes list.
+        Mark a node as executed.
         
         Args:
             node: The node.
         """
-        self._executed_nodes.append(node)
+        ordinal = self._ordinals.ordinal(node.id)
+        if ordinal >= len(self._executed):
+            self._grow(ordinal)
+        self._executed[ordinal] = 1
 
     def is_executed_node(self, node: INode) -> bool:
         """
@@ -136,7 +177,8 @@ class WorkflowRuntimeState(IState):
         Returns:
             True if the node has been executed, False otherwise.
         """
-        return node in self._executed_nodes
+        ordinal = self._ordinals.ordinal(node.id)
+        return ordinal < len(self._executed) and self._executed[ordinal] == 1
 
     def parse_ref(self, ref: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -159,41 +201,20 @@ class WorkflowRuntimeState(IState):
         variable_key = content[1]
         variable_path = content[2:] if len(content) > 2 else []
         
-        # Get the value from variable store
-        if self._variable_store.has_variable(variable_key, node_id=node_id):
-            value = self._variable_store.get_variable(variable_key, node_id=node_id)
-            
-            # Navigate through path if provided
-            for path_item in variable_path:
-                if isinstance(value, dict) and path_item in value:
-                    value = value[path_item]
-                else:
-                    return None
-            
-            # Get the type of the value
-            from ...infrastructure.utils.runtime_type import WorkflowRuntimeType
-            value_type = WorkflowRuntimeType.get_workflow_type(value)
-            
-            if value_type:
-                result = {
-                    "value": value,
-                    "type": value_type
-                }
-                
-                # Add items_type for arrays
-                if value_type == WorkflowVariableType.Array and isinstance(value, list):
-                    # For empty arrays, set items_type to String by default
-                    if len(value) == 0:
-                        result["items_type"] = WorkflowVariableType.String
-                    else:
-                        first_item = value[0]
-                        items_type = WorkflowRuntimeType.get_workflow_type(first_item)
-                        if items_type:
-                            result["items_type"] = items_type
-                
-                return result
+        # Get the value and its type from the variable store, which infers types once per write
+        parsed = self._variable_store.parse_variable(variable_key, node_id, variable_path)
+        if parsed is None:
+            return None
         
-        return None
+        value, value_type, items_type = parsed
+        result = {
+            "value": value,
+            "type": value_type
+        }
+        # Add items_type for arrays, including spilled lists
+        if items_type:
+            result["items_type"] = items_type
+        return result
 
     def parse_value(self, flow_value: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
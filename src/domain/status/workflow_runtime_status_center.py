@@ -12,12 +12,20 @@ status can be one of the following:
 
 The status center is used by the workflow engine to track the progress of the
 workflow execution and to determine when the workflow has completed.
+
+Node statuses are kept densely by node ordinal, as small-int status codes with
+start and end times in typed arrays, and exported in the same shape as before.
+
+Listeners are called with the node ID whenever a node status changes, and with
+None when the workflow status changes.
 """
-from typing import Dict, List, Optional, Any
+from array import array
+from typing import Callable, Dict, List, Optional, Any
 import time
 
-from ...interface.context import IStatusCenter, IWorkflowStatus, INodeStatus
+from ...interface.context import IDocument, IStatusCenter, IWorkflowStatus, INodeStatus
 from ...interface.node import WorkflowStatus
+from ..document.workflow_runtime_node_ordinals import WorkflowRuntimeNodeOrdinals
 
 
 class WorkflowRuntimeWorkflowStatus(IWorkflowStatus):
@@ -26,13 +34,17 @@ class WorkflowRuntimeWorkflowStatus(IWorkflowStatus):
     This class manages the status of the workflow.
     """
 
-    def __init__(self):
+    def __init__(self, on_change: Optional[Callable[[], None]] = None):
         """
         Initialize a new instance of the WorkflowRuntimeWorkflowStatus class.
+        
+        Args:
+            on_change: Called whenever the status changes.
         """
         self._status = WorkflowStatus.Idle
         self._start_time = 0
         self._end_time = 0
+        self._on_change = on_change
 
     @property
     def status(self) -> str:
@@ -114,6 +126,8 @@ class WorkflowRuntimeWorkflowStatus(IWorkflowStatus):
         """
         self._status = WorkflowStatus.Processing
         self._start_time = int(time.time() * 1000)  # Current time in milliseconds
+        if self._on_change is not None:
+            self._on_change()
 
     def success(self) -> None:
         """
@@ -122,6 +136,8 @@ class WorkflowRuntimeWorkflowStatus(IWorkflowStatus):
         self._status = WorkflowStatus.Succeeded
         if self._end_time == 0:  # Only set end time if not already set
             self._end_time = int(time.time() * 1000)  # Current time in milliseconds
+        if self._on_change is not None:
+            self._on_change()
 
     def fail(self) -> None:
         """
@@ -130,6 +146,8 @@ class WorkflowRuntimeWorkflowStatus(IWorkflowStatus):
         self._status = WorkflowStatus.Failed
         if self._end_time == 0:  # Only set end time if not already set
             self._end_time = int(time.time() * 1000)  # Current time in milliseconds
+        if self._on_change is not None:
+            self._on_change()
 
     def cancel(self) -> None:
         """
@@ -138,26 +156,47 @@ class WorkflowRuntimeWorkflowStatus(IWorkflowStatus):
         self._status = WorkflowStatus.Cancelled
         if self._end_time == 0:  # Only set end time if not already set
             self._end_time = int(time.time() * 1000)  # Current time in milliseconds
+        if self._on_change is not None:
+            self._on_change()
+
+
+# Small-int codes of the node statuses. Code 0 marks nodes without a status
+_NODE_STATUSES = (
+    None,
+    WorkflowStatus.Idle,
+    WorkflowStatus.Processing,
+    WorkflowStatus.Succeeded,
+    WorkflowStatus.Failed,
+    WorkflowStatus.Cancelled,
+)
+_NODE_STATUS_CODES = {status.value: code for code, status in enumerate(_NODE_STATUSES) if status is not None}
+_IDLE = _NODE_STATUS_CODES[WorkflowStatus.Idle.value]
+_PROCESSING = _NODE_STATUS_CODES[WorkflowStatus.Processing.value]
+_SUCCEEDED = _NODE_STATUS_CODES[WorkflowStatus.Succeeded.value]
+_FAILED = _NODE_STATUS_CODES[WorkflowStatus.Failed.value]
+_CANCELLED = _NODE_STATUS_CODES[WorkflowStatus.Cancelled.value]
 
 
 class WorkflowRuntimeNodeStatus(INodeStatus):
     """
     Implementation of the node status.
-    This class manages the status of a node.
+    This class is a view of one node in the arrays of the status center.
     """
+    
+    __slots__ = ("_status_center", "_node_id", "_ordinal")
 
-    def __init__(self, node_id: str):
+    def __init__(self, status_center: 'WorkflowRuntimeStatusCenter', node_id: str, ordinal: int):
         """
         Initialize a new instance of the WorkflowRuntimeNodeStatus class.
         
         Args:
+            status_center: The status center holding the status arrays.
             node_id: The ID of the node.
+            ordinal: The ordinal of the node.
         """
+        self._status_center = status_center
         self._node_id = node_id
-        self._status = WorkflowStatus.Idle
-        self._start_time = 0
-        self._end_time = 0
-        self._start_time = int(time.time() * 1000)  # Current time in milliseconds
+        self._ordinal = ordinal
         
     @property
     def id(self) -> str:
@@ -177,7 +216,7 @@ class WorkflowRuntimeNodeStatus(INodeStatus):
         Returns:
             The current node status.
         """
-        return self._status
+        return _NODE_STATUSES[self._status_center._codes[self._ordinal]]
         
     @property
     def terminated(self) -> bool:
@@ -187,7 +226,7 @@ class WorkflowRuntimeNodeStatus(INodeStatus):
         Returns:
             True if the node is terminated, False otherwise.
         """
-        return self._status in [WorkflowStatus.Succeeded, WorkflowStatus.Failed, WorkflowStatus.Cancelled]
+        return self._status_center._codes[self._ordinal] >= _SUCCEEDED
         
     @property
     def startTime(self) -> int:
@@ -197,7 +236,7 @@ class WorkflowRuntimeNodeStatus(INodeStatus):
         Returns:
             The start time in milliseconds.
         """
-        return self._start_time
+        return self._status_center._start_times[self._ordinal]
         
     @property
     def endTime(self) -> int:
@@ -207,7 +246,7 @@ class WorkflowRuntimeNodeStatus(INodeStatus):
         Returns:
             The end time in milliseconds.
         """
-        return self._end_time
+        return self._status_center._end_times[self._ordinal]
         
     @property
     def timeCost(self) -> int:
@@ -217,9 +256,7 @@ class WorkflowRuntimeNodeStatus(INodeStatus):
         Returns:
             The time cost in milliseconds.
         """
-        if self._end_time > 0 and self._start_time > 0:
-            return self._end_time - self._start_time
-        return 0
+        return self._status_center._time_cost(self._ordinal)
         
     def export(self) -> Dict[str, Any]:
         """
@@ -228,64 +265,55 @@ class WorkflowRuntimeNodeStatus(INodeStatus):
         Returns:
             A dictionary containing the node status information.
         """
-        # Extract the status name from the enum
-        status_str = self._status
-        if hasattr(self._status, 'name'):
-            status_str = self._status.name
-        elif self._status and isinstance(self._status, str) and '.' in self._status:
-            status_str = self._status.split('.')[-1]
-            
-        return {
-            "id": self._node_id,
-            "status": status_str if self._status else "unknown",
-            "terminated": self.terminated,
-            "startTime": self._start_time,
-            "endTime": self._end_time,
-            "timeCost": self.timeCost
-        }
+        return self._status_center._export_node(self._ordinal)
 
     def process(self) -> None:
         """
         Set the node status to processing.
         """
-        self._status = WorkflowStatus.Processing
-        self._start_time = int(time.time() * 1000)  # Update start time
+        self._status_center._set(self._ordinal, _PROCESSING, start=True)
 
     def success(self) -> None:
         """
         Set the node status to succeeded.
         """
-        self._status = WorkflowStatus.Succeeded
-        self._end_time = int(time.time() * 1000)  # Set end time
+        self._status_center._set(self._ordinal, _SUCCEEDED)
 
     def fail(self) -> None:
         """
         Set the node status to failed.
         """
-        self._status = WorkflowStatus.Failed
-        self._end_time = int(time.time() * 1000)  # Set end time
+        self._status_center._set(self._ordinal, _FAILED)
 
     def cancel(self) -> None:
         """
         Set the node status to cancelled.
         """
-        self._status = WorkflowStatus.Cancelled
-        self._end_time = int(time.time() * 1000)  # Set end time
+        self._status_center._set(self._ordinal, _CANCELLED)
 
 
 class WorkflowRuntimeStatusCenter(IStatusCenter):
     """
     Implementation of the status center.
     This class manages the status of the workflow and nodes.
+    
+    Node statuses are stored as a struct of arrays indexed by node ordinal: a
+    bytearray of status codes and typed arrays of start and end times. Node
+    status objects are views on these arrays.
     """
 
     def __init__(self):
         """
         Initialize a new instance of the WorkflowRuntimeStatusCenter class.
         """
-        self._workflow_status: IWorkflowStatus = WorkflowRuntimeWorkflowStatus()
-        self._node_statuses: Dict[str, INodeStatus] = {}
-        import time
+        self._listeners: List[Callable[[Optional[str]], None]] = []
+        self._workflow_status: IWorkflowStatus = WorkflowRuntimeWorkflowStatus(self._notify_workflow)
+        self._ordinals = WorkflowRuntimeNodeOrdinals()
+        self._codes = bytearray()
+        self._start_times = array('q')
+        self._end_times = array('q')
+        # Ordinals in the order their status was first requested, which is the export order
+        self._tracked: List[int] = []
         self._workflow_status._start_time = int(time.time() * 1000)
 
     @property
@@ -298,12 +326,21 @@ class WorkflowRuntimeStatusCenter(IStatusCenter):
         """
         return self._workflow_status
 
-    def init(self) -> None:
+    def init(self, document: Optional[IDocument] = None) -> None:
         """
         Initialize the status center.
-        """
-        self._workflow_status = WorkflowRuntimeWorkflowStatus()
-        self._node_statuses = {}
+        
+        Args:
+            document: The workflow document whose node ordinals index the statuses.
+                Without a document, the status center assigns its own ordinals.
+        """
+        ordinals = getattr(document, "ordinals", None)
+        self._workflow_status = WorkflowRuntimeWorkflowStatus(self._notify_workflow)
+        self._ordinals = ordinals if ordinals is not None else WorkflowRuntimeNodeOrdinals()
+        self._codes = bytearray()
+        self._start_times = array('q')
+        self._end_times = array('q')
+        self._tracked = []
 
     def dispose(self) -> None:
         """
@@ -312,6 +349,92 @@ class WorkflowRuntimeStatusCenter(IStatusCenter):
         # Because the data is not persisted, do not clear the execution result
         pass
 
+    def add_listener(self, listener: Callable[[Optional[str]], None]) -> None:
+        """
+        Add a listener for status changes.
+        
+        Args:
+            listener: Called with the node ID when a node status changes, and with
+                None when the workflow status changes.
+        """
+        self._listeners.append(listener)
+
+    def _notify_workflow(self) -> None:
+        """
+        Notify the listeners of a workflow status change.
+        """
+        for listener in self._listeners:
+            listener(None)
+
+    def _grow(self, ordinal: int) -> None:
+        """
+        Grow the arrays to cover an ordinal and all ordinals assigned so far.
+        
+        Args:
+            ordinal: The ordinal to cover.
+        """
+        missing = max(ordinal + 1, len(self._ordinals)) - len(self._codes)
+        if missing > 0:
+            self._codes.extend(bytes(missing))
+            self._start_times.extend([0] * missing)
+            self._end_times.extend([0] * missing)
+
+    def _set(self, ordinal: int, code: int, start: bool = False) -> None:
+        """
+        Set the status code of a node and record the time.
+        
+        Args:
+            ordinal: The ordinal of the node.
+            code: The status code.
+            start: Whether the start time is recorded instead of the end time.
+        """
+        self._codes[ordinal] = code
+        now = int(time.time() * 1000)
+        if start:
+            self._start_times[ordinal] = now
+        else:
+            self._end_times[ordinal] = now
+        if self._listeners:
+            node_id = self._ordinals.node_id(ordinal)
+            for listener in self._listeners:
+                listener(node_id)
+
+    def _time_cost(self, ordinal: int) -> int:
+        """
+        Get the time cost of a node.
+        
+        Args:
+            ordinal: The ordinal of the node.
+            
+        Returns:
+            The time cost in milliseconds.
+        """
+        start_time = self._start_times[ordinal]
+        end_time = self._end_times[ordinal]
+        if end_time > 0 and start_time > 0:
+            return end_time - start_time
+        return 0
+
+    def _export_node(self, ordinal: int) -> Dict[str, Any]:
+        """
+        Export the status of a node.
+        
+        Args:
+            ordinal: The ordinal of the node.
+            
+        Returns:
+            A dictionary containing the node status information.
+        """
+        status = _NODE_STATUSES[self._codes[ordinal]]
+        return {
+            "id": self._ordinals.node_id(ordinal),
+            "status": status.name if status else "unknown",
+            "terminated": self._codes[ordinal] >= _SUCCEEDED,
+            "startTime": self._start_times[ordinal],
+            "endTime": self._end_times[ordinal],
+            "timeCost": self._time_cost(ordinal)
+        }
+
     def node_status(self, node_id: str) -> INodeStatus:
         """
         Get the status of a node.
@@ -322,9 +445,16 @@ class WorkflowRuntimeStatusCenter(IStatusCenter):
         Returns:
             The node status.
         """
-        if node_id not in self._node_statuses:
-            self._node_statuses[node_id] = WorkflowRuntimeNodeStatus(node_id)
-        return self._node_statuses[node_id]
+        ordinal = self._ordinals.ordinal(node_id)
+        if ordinal >= len(self._codes):
+            self._grow(ordinal)
+        if self._codes[ordinal] == 0:
+            self._codes[ordinal] = _IDLE
+            self._start_times[ordinal] = int(time.time() * 1000)
+            self._tracked.append(ordinal)
+            for listener in self._listeners:
+                listener(node_id)
+        return WorkflowRuntimeNodeStatus(self, node_id, ordinal)
 
     def get_status_node_ids(self, status: str) -> List[str]:
         """
@@ -336,10 +466,11 @@ class WorkflowRuntimeStatusCenter(IStatusCenter):
         Returns:
             The list of node IDs.
         """
+        code = _NODE_STATUS_CODES.get(getattr(status, "value", status))
         return [
-            node_id
-            for node_id, node_status in self._node_statuses.items()
-            if node_status._status == status
+            self._ordinals.node_id(ordinal)
+            for ordinal in self._tracked
+            if self._codes[ordinal] == code
         ]
     
     def export(self) -> Dict[str, Any]:
@@ -350,13 +481,7 @@ class WorkflowRuntimeStatusCenter(IStatusCenter):
             The exported status center data.
         """
         return {
-            "workflow": self.workflow.export() if hasattr(self.workflow, 'export') and callable(self.workflow.export) else {
-                "status": getattr(self.workflow, '_status', "unknown"),
-                "terminated": getattr(self.workflow, '_status', "") in [WorkflowStatus.Succeeded, WorkflowStatus.Failed, WorkflowStatus.Cancelled],
-                "startTime": getattr(self.workflow, '_start_time', 0),
-                "endTime": getattr(self.workflow, '_end_time', 0),
-                "timeCost": getattr(self.workflow, '_end_time', 0) - getattr(self.workflow, '_start_time', 0) if getattr(self.workflow, '_end_time', 0) > 0 else 0
-            },
+            "workflow": self.workflow.export(),
             "nodes": self.export_node_status()
         }
 
@@ -367,18 +492,7 @@ class WorkflowRuntimeStatusCenter(IStatusCenter):
         Returns:
             A dictionary mapping node IDs to node status information.
         """
-        result = {}
-        for node_id, node_status in self._node_statuses.items():
-            if hasattr(node_status, 'export') and callable(node_status.export):
-                result[node_id] = node_status.export()
-            else:
-                # Fallback if export method is not available
-                result[node_id] = {
-                    "id": node_id,
-                    "status": getattr(node_status, '_status', "unknown"),
-                    "terminated": getattr(node_status, '_status', "") in [WorkflowStatus.Succeeded, WorkflowStatus.Failed, WorkflowStatus.Cancelled],
-                    "startTime": getattr(node_status, '_start_time', 0),
-                    "endTime": getattr(node_status, '_end_time', 0),
-                    "timeCost": getattr(node_status, '_end_time', 0) - getattr(node_status, '_start_time', 0) if getattr(node_status, '_end_time', 0) > 0 else 0
-                }
-        return result
+        return {
+            self._ordinals.node_id(ordinal): self._export_node(ordinal)
+            for ordinal in self._tracked
+        }
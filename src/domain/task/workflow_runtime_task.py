@@ -4,7 +4,7 @@ This module contains the implementation of the workflow runtime task.
 """
 import asyncio
 import logging
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
 from ...interface.context import IContext
 from ...interface.task import ITask, TaskParams
@@ -67,6 +67,8 @@ class WorkflowRuntimeTask(ITask):
         
         # Chain the processing promise with completion and error handlers
         self._processing_result = None
+        # The background task running the processing, None if it completed synchronously
+        self._completion: Optional[asyncio.Task] = None
         try:
             # Handle different types of processing objects
             if asyncio.iscoroutine(self._processing):
@@ -89,7 +91,7 @@ class WorkflowRuntimeTask(ITask):
                         handle_error(e)
                 
                 # Schedule the coroutine to run in the background
-                asyncio.create_task(run_coroutine())
+                self._completion = asyncio.create_task(run_coroutine())
             elif callable(self._processing):
                 # If it's a callable, call it
                 try:
@@ -111,7 +113,7 @@ class WorkflowRuntimeTask(ITask):
                                 self._context.status_center.workflow.fail()
                                 handle_error(e)
                         
-                        asyncio.create_task(handle_coroutine_result())
+                        self._completion = asyncio.create_task(handle_coroutine_result())
                     else:
                         self._processing_result = result
                         if hasattr(result, 'then'):  # If it's a Promise-like object
@@ -224,6 +226,22 @@ class WorkflowRuntimeTask(ITask):
         """
         return self._processing_result
     
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the task to complete, without cancelling it when the timeout expires.
+        
+        Args:
+            timeout: The maximum number of seconds to wait, or None to wait until the task completes.
+            
+        Returns:
+            True if the task has completed, False if the timeout expired first.
+        """
+        if self._completion is None:
+            return True
+        if not self._completion.done():
+            await asyncio.wait((self._completion,), timeout=timeout)
+        return self._completion.done()
+    
     def cancel(self) -> None:
         """
         Cancel the task execution.
@@ -0,0 +1,7 @@
+"""
+Usage module for the workflow runtime.
+This module contains the implementation of the workflow usage center.
+"""
+from .workflow_runtime_usage_center import WorkflowRuntimeUsageCenter
+
+__all__ = ['WorkflowRuntimeUsageCenter']
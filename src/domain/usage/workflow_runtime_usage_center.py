@@ -0,0 +1,119 @@
+"""
+Implementation of the workflow runtime usage center.
+
+The usage center accumulates the token usage reported by LLM nodes, per node
+and for the whole task. Sub-contexts share the usage center of their parent,
+so the usage of nodes inside loops is rolled up into the same task totals.
+
+A task can be given a token budget. Once the total tokens used go above the
+budget, the usage center reports it as exceeded and the engine aborts the
+workflow.
+"""
+from typing import Any, Dict, Optional
+
+from ...interface.context import IUsageCenter
+
+
+def _empty_usage() -> Dict[str, int]:
+    return {"promptTokens": 0, "completionTokens": 0, "totalTokens": 0}
+
+
+class WorkflowRuntimeUsageCenter(IUsageCenter):
+    """
+    Implementation of the usage center.
+    This class accumulates the token usage of the workflow.
+    """
+
+    def __init__(self):
+        """
+        Initialize a new instance of the WorkflowRuntimeUsageCenter class.
+        """
+        self._budget: Optional[int] = None
+        self._total: Dict[str, int] = _empty_usage()
+        self._nodes: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def budget(self) -> Optional[int]:
+        """
+        Get the token budget of the task.
+        
+        Returns:
+            The maximum number of total tokens, or None if the task has no budget.
+        """
+        return self._budget
+
+    @property
+    def exceeded(self) -> bool:
+        """
+        Check whether the token budget has been exceeded.
+        
+        Returns:
+            True if the total tokens used are above the budget, False otherwise.
+        """
+        return self._budget is not None and self._total["totalTokens"] > self._budget
+
+    def init(self, budget: Optional[int] = None) -> None:
+        """
+        Initialize the usage center.
+        
+        Args:
+            budget: The optional token budget of the task.
+            
+        Raises:
+            ValueError: If the budget is negative.
+        """
+        if budget is not None and budget < 0:
+            raise ValueError(f"Token budget must not be negative, got {budget}")
+        self._budget = budget
+        self._total = _empty_usage()
+        self._nodes = {}
+
+    def dispose(self) -> None:
+        """
+        Dispose the usage center and release resources.
+        """
+        # Because the data is not persisted, do not clear the usage
+        pass
+
+    def add(self, node_id: str, usage: Dict[str, int]) -> None:
+        """
+        Add the token usage of a node execution.
+        
+        Args:
+            node_id: The ID of the node.
+            usage: The token usage with promptTokens, completionTokens and totalTokens.
+        """
+        node_usage = self._nodes.get(node_id)
+        if node_usage is None:
+            node_usage = _empty_usage()
+            self._nodes[node_id] = node_usage
+        for key in self._total:
+            value = usage.get(key, 0)
+            node_usage[key] += value
+            self._total[key] += value
+
+    def node_usage(self, node_id: str) -> Optional[Dict[str, int]]:
+        """
+        Get the accumulated token usage of a node.
+        
+        Args:
+            node_id: The ID of the node.
+            
+        Returns:
+            The token usage of the node, or None if the node used no tokens.
+        """
+        node_usage = self._nodes.get(node_id)
+        return dict(node_usage) if node_usage is not None else None
+
+    def export(self) -> Dict[str, Any]:
+        """
+        Export the token usage of the task.
+        
+        Returns:
+            The task totals, the budget and whether it has been exceeded.
+        """
+        return {
+            **self._total,
+            "budget": self._budget,
+            "budgetExceeded": self.exceeded,
+        }
@@ -7,13 +7,24 @@ a parent-child relationship, where a child variable store can inherit variables
 from its parent. This is useful for creating sub-contexts that need access to
 variables from their parent context, while also having their own isolated variable
 scope.
+
+The stores form a flat scope chain: a child only holds its own overrides, and a
+lookup walks the chain iteratively instead of recursing into each parent.
+
+The runtime type of every variable is inferred once when it is written, and the
+types of nested values are memoized per path until the variable is written again,
+so resolving a reference does not inspect the value on every read.
 """
-from typing import Any, Dict, List, Mapping, Optional, TypedDict, Union, cast
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, TypedDict, Union, cast
 
 from ...interface.context import IVariableStore, IVariableParseResult
 from ...interface.node import WorkflowVariableType
+from ...infrastructure.spill import SpilledValue
 from ...infrastructure.utils import uuid, WorkflowRuntimeType
 
+# A value with its runtime type and the runtime type of its items
+ParsedValue = Tuple[Any, WorkflowVariableType, Optional[WorkflowVariableType]]
+
 
 class IVariable(TypedDict, total=False):
     """Interface for a variable in the workflow runtime."""
@@ -50,10 +61,103 @@ class WorkflowRuntimeVariable:
         }
 
 
+class WorkflowRuntimeVariableTypes:
+    """
+    The runtime types of a variable and of the values nested in it.
+    
+    The type of the variable is inferred when the variable is written. The types
+    of nested values are inferred on the first read of a path and memoized until
+    the variable is written again, which replaces this object.
+    """
+
+    __slots__ = ("_variable", "_parsed", "_paths")
+
+    def __init__(self, variable: IVariable):
+        """
+        Initialize a new instance of the WorkflowRuntimeVariableTypes class.
+        
+        Args:
+            variable: The variable.
+        """
+        self._variable = variable
+        self._paths: Dict[Tuple[str, ...], Optional[ParsedValue]] = {}
+        value = variable["value"]
+        # Spilled values are decoded on every read instead of being kept alive here
+        self._parsed = None if type(value) is SpilledValue else WorkflowRuntimeVariableTypes.infer(value)
+
+    @staticmethod
+    def infer(value: Any) -> Optional[ParsedValue]:
+        """
+        Infer the runtime type of a value and of its items.
+        
+        Args:
+            value: The value.
+            
+        Returns:
+            The value, its type and the type of its items, or None if the type cannot be determined.
+        """
+        value_type = WorkflowRuntimeType.get_workflow_type(value)
+        if not value_type:
+            return None
+        items_type = None
+        if value_type == WorkflowVariableType.Array:
+            # For empty arrays, set items_type to String by default
+            items_type = WorkflowRuntimeType.get_workflow_type(value[0]) if len(value) > 0 else WorkflowVariableType.String
+        return value, value_type, items_type
+
+    def parse(self, path: Tuple[str, ...]) -> Optional[ParsedValue]:
+        """
+        Get the value at a path together with its runtime type.
+        
+        Args:
+            path: The path of the nested value, or an empty tuple for the variable itself.
+            
+        Returns:
+            The value, its type and the type of its items, or None if the path does not exist.
+        """
+        parsed = self._parsed
+        if parsed is None:
+            value = self._variable["value"]
+            if type(value) is not SpilledValue:
+                return None
+            return self._parse_path(value.resolve(), path)
+        if not path:
+            return parsed
+        try:
+            return self._paths[path]
+        except KeyError:
+            parsed = self._paths[path] = self._parse_path(parsed[0], path)
+            return parsed
+
+    @staticmethod
+    def _parse_path(value: Any, path: Tuple[str, ...]) -> Optional[ParsedValue]:
+        """
+        Walk a path into a value and infer the type of the nested value.
+        
+        Args:
+            value: The value of the variable.
+            path: The path of the nested value.
+            
+        Returns:
+            The nested value, its type and the type of its items, or None if the path does not exist.
+        """
+        for path_part in path:
+            if not isinstance(value, dict) or path_part not in value:
+                return None
+            value = value[path_part]
+        return WorkflowRuntimeVariableTypes.infer(value)
+
+
 class WorkflowRuntimeVariableStore(IVariableStore):
     """
     Implementation of the variable store.
     This class provides storage and access to variables used in the workflow.
+    
+    Each store is one scope of a flat scope chain. It only holds its own
+    variables, keyed by (nodeID, key), and keeps the tuple of stores from itself
+    up to the root. A lookup probes each scope once, from the innermost
+    outwards, and returns the value and type together. Next to each variable, a
+    scope keeps its runtime types, which are replaced whenever it is written.
     """
 
     def __init__(self):
@@ -62,20 +166,27 @@ class WorkflowRuntimeVariableStore(IVariableStore):
         """
         self.id: str = uuid()
         self._parent: Optional[WorkflowRuntimeVariableStore] = None
-        self.store: Dict[str, Dict[str, IVariable]] = {}
+        self._variables: Dict[Tuple[str, str], IVariable] = {}
+        self._chain: Tuple[Dict[Tuple[str, str], IVariable], ...] = (self._variables,)
+        self._types: Dict[Tuple[str, str], WorkflowRuntimeVariableTypes] = {}
+        self._type_chain: Tuple[Dict[Tuple[str, str], WorkflowRuntimeVariableTypes], ...] = (self._types,)
 
     def init(self) -> None:
         """
         Initialize the variable store.
         """
-        self.store = {}
+        self._variables.clear()
+        self._types.clear()
 
     def dispose(self) -> None:
         """
         Dispose the variable store and release resources.
         """
-        self.store.clear()
+        self._variables.clear()
+        self._types.clear()
         self._parent = None
+        self._chain = (self._variables,)
+        self._type_chain = (self._types,)
 
     def set_parent(self, parent: IVariableStore) -> None:
         """
@@ -85,6 +196,65 @@ class WorkflowRuntimeVariableStore(IVariableStore):
             parent: The parent variable store.
         """
         self._parent = cast(WorkflowRuntimeVariableStore, parent)
+        self._chain = (self._variables,) + self._parent._chain
+        self._type_chain = (self._types,) + self._parent._type_chain
+
+    def lookup(self, key: str, node_id: str = "default") -> Optional[IVariable]:
+        """
+        Look up a variable in this store and its parents.
+        
+        The returned variable is the stored record and must not be modified.
+        
+        Args:
+            key: The variable key.
+            node_id: The node ID. Defaults to "default".
+            
+        Returns:
+            The variable with its value, type and itemsType, or None if not found.
+        """
+        variable_id = (node_id, key)
+        for variables in self._chain:
+            variable = variables.get(variable_id)
+            if variable is not None:
+                return variable
+        return None
+
+    def parse_variable(self, key: str, node_id: str = "default", path: Sequence[str] = ()) -> Optional[ParsedValue]:
+        """
+        Look up a variable, or a value nested in it, together with its runtime type.
+        
+        The types are inferred when the variable is written, or on the first read
+        of a path, so repeated reads do not inspect the value again. Spilled values
+        are decoded on every read.
+        
+        Args:
+            key: The variable key.
+            node_id: The node ID. Defaults to "default".
+            path: The path of the nested value. Defaults to the variable itself.
+            
+        Returns:
+            The value, its type and the type of its items, or None if the variable
+            or the path does not exist or its type cannot be determined.
+        """
+        variable_id = (node_id, key)
+        for types in self._type_chain:
+            variable_types = types.get(variable_id)
+            if variable_types is not None:
+                return variable_types.parse(tuple(path))
+        return None
+
+    @property
+    def store(self) -> Dict[str, Dict[str, IVariable]]:
+        """
+        Get the variables of this scope grouped by node ID.
+        
+        Returns:
+            A dictionary mapping node IDs to their variables.
+        """
+        store: Dict[str, Dict[str, IVariable]] = {}
+        for (node_id, key), variable in self._variables.items():
+            store.setdefault(node_id, {})[key] = variable
+        return store
 
     def global_get(self, node_id: str) -> Optional[Dict[str, IVariable]]:
         """
@@ -94,12 +264,13 @@ class WorkflowRuntimeVariableStore(IVariableStore):
             node_id: The node ID.
             
         Returns:
-            The node's variable store, or None if not found.
+            The node's variables from the innermost scope that has any, or None if not found.
         """
-        store = self.store.get(node_id)
-        if not store and self._parent:
-            return self._parent.global_get(node_id)
-        return store
+        for variables in self._chain:
+            node_store = {key: variable for (owner_id, key), variable in variables.items() if owner_id == node_id}
+            if node_store:
+                return node_store
+        return None
 
     def set_variable(self, params: Dict[str, Any]) -> None:
         """
@@ -114,12 +285,6 @@ class WorkflowRuntimeVariableStore(IVariableStore):
         var_type = params["type"]
         items_type = params.get("itemsType")
         
-        if node_id not in self.store:
-            # Create node store
-            self.store[node_id] = {}
-        
-        node_store = self.store[node_id]
-        # Create variable store
         variable = WorkflowRuntimeVariable.create({
             "nodeID": node_id,
             "key": key,
@@ -127,7 +292,8 @@ class WorkflowRuntimeVariableStore(IVariableStore):
             "type": var_type,
             "itemsType": items_type
         })
-        node_store[key] = variable
+        self._variables[(node_id, key)] = variable
+        self._types[(node_id, key)] = WorkflowRuntimeVariableTypes(variable)
 
     def set_value(self, params: Dict[str, Any]) -> None:
         """
@@ -141,35 +307,31 @@ class WorkflowRuntimeVariableStore(IVariableStore):
         variable_path = params.get("variablePath")
         value = params["value"]
         
-        if node_id not in self.store:
-            # Create node store
-            self.store[node_id] = {}
-        
-        node_store = self.store[node_id]
-        if variable_key not in node_store:
-            # Create variable store
+        variable = self._variables.get((node_id, variable_key))
+        if variable is None:
             variable = WorkflowRuntimeVariable.create({
                 "nodeID": node_id,
                 "key": variable_key,
                 "value": {},
                 "type": WorkflowVariableType.Object
             })
-            node_store[variable_key] = variable
+            self._variables[(node_id, variable_key)] = variable
         
-        variable = node_store[variable_key]
         if not variable_path:
             variable["value"] = value
-            return
-        
-        # Set value at path
-        current = variable["value"]
-        for i, path_part in enumerate(variable_path):
-            if i == len(variable_path) - 1:
-                current[path_part] = value
-            else:
-                if path_part not in current or not isinstance(current[path_part], dict):
-                    current[path_part] = {}
-                current = current[path_part]
+        else:
+            # Set value at path
+            current = variable["value"]
+            for i, path_part in enumerate(variable_path):
+                if i == len(variable_path) - 1:
+                    current[path_part] = value
+                else:
+                    if path_part not in current or not isinstance(current[path_part], dict):
+                        current[path_part] = {}
+                    current = current[path_part]
+        
+        # The write may change the type of any path, so infer the types again
+        self._types[(node_id, variable_key)] = WorkflowRuntimeVariableTypes(variable)
 
     def get_value(self, params: Dict[str, Any]) -> Optional[IVariableParseResult]:
         """
@@ -185,41 +347,32 @@ class WorkflowRuntimeVariableStore(IVariableStore):
         variable_key = params["variableKey"]
         variable_path = params.get("variablePath")
         
-        node_store = self.global_get(node_id)
-        if not node_store or variable_key not in node_store:
-            return None
-        
-        variable = node_store[variable_key]
         if not variable_path or len(variable_path) == 0:
+            variable = self.lookup(variable_key, node_id)
+            if variable is None:
+                return None
             return {
                 "value": variable["value"],
                 "type": variable["type"],
                 "itemsType": variable.get("itemsType")
             }
         
-        # Get value at path
-        current = variable["value"]
-        for path_part in variable_path:
-            if not isinstance(current, dict) or path_part not in current:
-                return None
-            current = current[path_part]
-        
-        var_type = WorkflowRuntimeType.get_workflow_type(current)
-        if not var_type:
+        parsed = self.parse_variable(variable_key, node_id, variable_path)
+        if parsed is None:
             return None
+        value, var_type, items_type = parsed
         
-        if var_type == WorkflowVariableType.Array and isinstance(current, list) and len(current) > 0:
-            items_type = WorkflowRuntimeType.get_workflow_type(current[0])
+        if var_type == WorkflowVariableType.Array and isinstance(value, list) and len(value) > 0:
             if not items_type:
                 return None
             return {
-                "value": current,
+                "value": value,
                 "type": var_type,
                 "itemsType": items_type
             }
         
         return {
-            "value": current,
+            "value": value,
             "type": var_type
         }
 
@@ -235,15 +388,8 @@ class WorkflowRuntimeVariableStore(IVariableStore):
             The variable value.
         """
         # Assume variables are stored in a default node
-        default_node = "default"
-        node_store = self.global_get(default_node)
-        if node_store and key in node_store:
-            return node_store[key]["value"]
-        
-        if self._parent:
-            return self._parent.get(key)
-        
-        return None
+        variable = self.lookup(key)
+        return variable["value"] if variable is not None else None
 
     def set(self, key: str, value: Any) -> None:
         """
@@ -277,15 +423,7 @@ class WorkflowRuntimeVariableStore(IVariableStore):
             True if the variable exists, False otherwise.
         """
         # Assume variables are stored in a default node
-        default_node = "default"
-        node_store = self.global_get(default_node)
-        if node_store and key in node_store:
-            return True
-        
-        if self._parent:
-            return self._parent.has(key)
-        
-        return False
+        return self.lookup(key) is not None
 
     def delete(self, key: str) -> None:
         """
@@ -295,9 +433,8 @@ class WorkflowRuntimeVariableStore(IVariableStore):
             key: The variable key.
         """
         # Assume variables are stored in a default node
-        default_node = "default"
-        if default_node in self.store and key in self.store[default_node]:
-            del self.store[default_node][key]
+        self._variables.pop(("default", key), None)
+        self._types.pop(("default", key), None)
             
     def has_variable(self, key: str, node_id: str = "default") -> bool:
         """
@@ -310,16 +447,7 @@ class WorkflowRuntimeVariableStore(IVariableStore):
         Returns:
             True if the variable exists, False otherwise.
         """
-        # Check if the node exists in this store
-        node_store = self.global_get(node_id)
-        if node_store and key in node_store:
-            return True
-        
-        # Check in parent store if not found
-        if self._parent:
-            return self._parent.has_variable(key, node_id)
-        
-        return False
+        return self.lookup(key, node_id) is not None
         
     def get_variable(self, key: str, node_id: str = "default") -> Any:
         """
@@ -332,13 +460,5 @@ class WorkflowRuntimeVariableStore(IVariableStore):
         Returns:
             The variable value.
         """
-        # Get from this store
-        node_store = self.global_get(node_id)
-        if node_store and key in node_store:
-            return node_store[key]["value"]
-        
-        # Get from parent store if not found
-        if self._parent:
-            return self._parent.get_variable(key, node_id)
-        
-        return None
+        variable = self.lookup(key, node_id)
+        return variable["value"] if variable is not None else None
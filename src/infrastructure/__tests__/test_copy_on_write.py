@@ -0,0 +1,118 @@
+"""
+Tests for the copy-on-write views of workflow values.
+"""
+import copy
+import json
+import unittest
+
+from ..copy_on_write import CopyOnWriteDict, CopyOnWriteList, unwrap
+from ..utils.jsonable import to_jsonable
+from ..utils.runtime_type import WorkflowRuntimeType
+from ...interface.node import WorkflowVariableType
+
+
+class TestCopyOnWrite(unittest.TestCase):
+    """Test cases for the copy-on-write views."""
+
+    def setUp(self):
+        """Set up shared data with nested containers."""
+        self.records = [{"id": 1, "tags": ["a"]}, {"id": 2, "tags": ["b"]}]
+        self.base = {"records": self.records, "meta": {"name": "batch"}, "count": 2}
+
+    def test_unchanged_data_is_shared(self):
+        """Test that reading through a view copies nothing."""
+        view = CopyOnWriteDict(self.base)
+        self.assertEqual(view["records"][0]["tags"][0], "a")
+        self.assertEqual(dict(view.items())["count"], 2)
+        self.assertIs(view.unwrap(), self.base)
+        self.assertIs(unwrap({"all": view}["all"]), self.base)
+
+    def test_nested_writes_copy_only_the_written_path(self):
+        """Test that a nested write copies its containers and leaves the shared data alone."""
+        view = CopyOnWriteDict(self.base)
+        view["records"][0]["tags"].append("c")
+        view["meta"]["name"] = "changed"
+
+        self.assertEqual(self.records[0]["tags"], ["a"])
+        self.assertEqual(self.base["meta"], {"name": "batch"})
+        self.assertEqual(view["records"][0]["tags"], ["a", "c"])
+
+        result = view.unwrap()
+        self.assertIsNot(result, self.base)
+        self.assertEqual(result["records"][0], {"id": 1, "tags": ["a", "c"]})
+        self.assertEqual(result["meta"], {"name": "changed"})
+        # Containers that were not written stay shared
+        self.assertIs(result["records"][1], self.records[1])
+
+    def test_top_level_writes(self):
+        """Test setting and deleting keys, and assigning views to other keys."""
+        view = CopyOnWriteDict(self.base)
+        view["copy"] = view["meta"]
+        view["copy"]["name"] = "aliased"
+        del view["count"]
+        view.setdefault("extra", {"nested": [view["records"]]})
+
+        self.assertEqual(self.base["count"], 2)
+        self.assertNotIn("extra", self.base)
+        result = view.unwrap()
+        self.assertNotIn("count", result)
+        self.assertEqual(result["copy"], {"name": "aliased"})
+        self.assertEqual(result["meta"], {"name": "aliased"})
+        self.assertIs(result["extra"]["nested"][0], self.records)
+
+    def test_views_are_plain_containers(self):
+        """Test that views pass for dicts and lists in type checks, serialization and copies."""
+        view = CopyOnWriteDict(self.base)
+        view["records"][0]["tags"].append("c")
+
+        self.assertIsInstance(view, dict)
+        self.assertIsInstance(view["records"], list)
+        self.assertEqual(WorkflowRuntimeType.get_workflow_type(view), WorkflowVariableType.Object)
+        self.assertEqual(WorkflowRuntimeType.get_workflow_type(view["records"]), WorkflowVariableType.Array)
+        self.assertEqual(json.loads(json.dumps(view))["records"][0]["tags"], ["a", "c"])
+        self.assertIs(type(to_jsonable(view)), dict)
+        self.assertIs(type(copy.deepcopy(view)["records"]), list)
+
+        # Copies hand out views of nested containers, so writes through them stay private
+        dict(view)["meta"]["name"] = "changed"
+        {**view}["records"][1]["id"] = 20
+        self.assertEqual(self.base["meta"], {"name": "batch"})
+        self.assertEqual(self.records[1]["id"], 2)
+        self.assertEqual(view["meta"], {"name": "changed"})
+
+    def test_unwrap_only_looks_for_recorded_views(self):
+        """Test that outputs are matched against the views handed out under the root view."""
+        view = CopyOnWriteDict(self.base)
+        stray = CopyOnWriteDict({"x": 1})
+        fresh = [{"row": i, "stray": stray} for i in range(3)]
+        outputs = {"rows": fresh, "inputs": view}
+        # Without nested views the outputs are not walked, only the root is replaced
+        result = unwrap(outputs, view)
+        self.assertIs(result["rows"], fresh)
+        self.assertIs(result["rows"][0]["stray"], stray)
+        self.assertIs(result["inputs"], self.base)
+
+        meta = view["meta"]
+        meta["name"] = "changed"
+        result = unwrap({"rows": fresh, "nested": [{"meta": meta}]}, view)
+        self.assertIs(result["rows"], fresh)
+        self.assertIs(type(result["nested"][0]["meta"]), dict)
+        self.assertEqual(result["nested"][0]["meta"], {"name": "changed"})
+
+    def test_list_moves(self):
+        """Test insertions, deletions and sorting that move items of a list view."""
+        view = CopyOnWriteList(self.records)
+        view[1]["id"] = 20
+        view.insert(0, {"id": 0, "tags": []})
+        del view[2]
+        view.sort(key=lambda record: -record["id"])
+
+        self.assertEqual([record["id"] for record in self.records], [1, 2])
+        self.assertEqual(view.unwrap(), [{"id": 1, "tags": ["a"]}, {"id": 0, "tags": []}])
+        self.assertEqual(view, [{"id": 1, "tags": ["a"]}, {"id": 0, "tags": []}])
+        self.assertEqual(view[-1]["id"], 0)
+        self.assertEqual(view[:1], [{"id": 1, "tags": ["a"]}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests for the spill store.
+This module contains tests for spilling large values to memory-mapped scratch files.
+"""
+import unittest
+from array import array
+
+from ...interface.node import WorkflowVariableType
+from ..spill import SpillLog, SpillStore, SpilledList, SpilledRecords, SpilledValue, resolve_spilled
+from ..utils import WorkflowRuntimeType, to_jsonable
+
+
+class TestSpillStore(unittest.TestCase):
+    """Test cases for the spill store."""
+
+    def setUp(self):
+        """Set up a spill store that spills everything above 1 KiB."""
+        self.spill_store = SpillStore(threshold_bytes=1024)
+        self.records = [{"id": i, "name": f"record {i}"} for i in range(1000)]
+
+    def test_small_values_are_kept(self):
+        """Test that values below the threshold are returned as they are."""
+        value = [1, 2, 3]
+        self.assertIs(self.spill_store.spill(value), value)
+        self.assertIs(SpillStore().spill(self.records), self.records)
+
+    def test_spilled_list(self):
+        """Test that spilled lists decode items on access and compare equal to the original."""
+        spilled = self.spill_store.spill(self.records)
+        self.assertIsInstance(spilled, SpilledList)
+        self.assertGreater(self.spill_store.spilled_bytes, 0)
+        self.assertEqual(len(spilled), 1000)
+        self.assertEqual(spilled[0], {"id": 0, "name": "record 0"})
+        self.assertEqual(spilled[-1]["id"], 999)
+        self.assertEqual(spilled, self.records)
+        with self.assertRaises(IndexError):
+            spilled[1000]
+
+    def test_slices_share_the_buffer(self):
+        """Test that slices are spilled lists over the same mapping."""
+        spilled = self.spill_store.spill(self.records)
+        window = spilled[10:20]
+        self.assertIsInstance(window, SpilledList)
+        self.assertEqual(window.to_list(), self.records[10:20])
+        self.assertEqual(window[2:4].to_list(), self.records[12:14])
+        self.assertEqual(spilled[::100], self.records[::100])
+
+    def test_spill_log(self):
+        """Test that log records are read back by their offsets after the log is sealed."""
+        log = SpillLog()
+        offsets = [log.append(record) for record in self.records[:10]]
+        # Appending a changed value again leaves the old record behind
+        offsets[3] = log.append({"id": 3, "name": "renamed"})
+        buffer = log.seal()
+        with self.assertRaises(ValueError):
+            log.append({})
+
+        records = SpilledRecords(buffer, array('Q', offsets))
+        self.assertEqual(len(records), 10)
+        self.assertEqual(records[3], {"id": 3, "name": "renamed"})
+        self.assertEqual(records[-1], self.records[9])
+        self.assertEqual(list(records[:3]), self.records[:3])
+        self.assertIsInstance(records[:3], SpilledRecords)
+
+    def test_spilled_value(self):
+        """Test that other values are decoded in full when resolved."""
+        text = "x" * 4096
+        spilled = self.spill_store.spill(text)
+        self.assertIsInstance(spilled, SpilledValue)
+        self.assertEqual(resolve_spilled(spilled), text)
+        self.assertEqual(WorkflowRuntimeType.get_workflow_type(spilled), WorkflowVariableType.String)
+
+    def test_to_jsonable(self):
+        """Test that spilled values are decoded at the API boundary and other values are not copied."""
+        plain = {"query": "hello", "items": [1, 2]}
+        self.assertIs(to_jsonable(plain), plain)
+        converted = to_jsonable({"records": self.spill_store.spill(self.records), "query": "hello"})
+        self.assertEqual(converted, {"records": self.records, "query": "hello"})
+        self.assertIs(type(converted["records"]), list)
+
+    def test_negative_threshold(self):
+        """Test that negative thresholds are rejected."""
+        with self.assertRaises(ValueError):
+            SpillStore(threshold_bytes=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Tests for the SQLite task store.
+This module contains tests for writing the records of finished tasks behind the
+caller in batches and reading them back.
+"""
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from ..task_store import SQLiteTaskStore
+
+
+def make_entry(task_id, finished_at=1700000000.0):
+    """Make the record of a finished task."""
+    return {
+        "taskID": task_id,
+        "status": "succeeded",
+        "version": 7,
+        "outputs": {"answer": f"answer of {task_id}"},
+        "report": b"\x78\x01compressed",
+        "nodeTypes": {"llm_0": "llm"},
+        "terminalEvent": {"type": "workflow_terminated", "status": "succeeded", "version": 7},
+        "finishedAt": finished_at,
+    }
+
+
+class FastRetrySQLiteTaskStore(SQLiteTaskStore):
+    """A store that gives up waiting for a locked database and retries quickly."""
+
+    BUSY_TIMEOUT_MS = 10
+    RETRY_BACKOFF_SECONDS = 0.01
+
+
+class TestSQLiteTaskStore(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the SQLite task store."""
+
+    def setUp(self):
+        """Create a database in a temporary directory."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "tasks.db")
+
+    def open_store(self, **kwargs):
+        """Open a store that is closed after the test."""
+        store = SQLiteTaskStore(self.path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    async def test_records_survive_reopening(self):
+        """Test that records are written in WAL mode and read back by a new store."""
+        store = self.open_store()
+        for i in range(10):
+            store.put(make_entry(f"task-{i}"))
+        await store.flush()
+        store.close()
+
+        reopened = self.open_store()
+        self.assertEqual(await reopened.get("task-3"), make_entry("task-3"))
+        self.assertIsNone(await reopened.get("unknown"))
+        with sqlite3.connect(self.path) as connection:
+            self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    async def test_pending_records_are_served(self):
+        """Test that a record is found before it is written, and writes are batched."""
+        store = self.open_store(batch_size=4, flush_interval=60)
+        for i in range(10):
+            store.put(make_entry(f"task-{i}"))
+        self.assertEqual((await store.get("task-9"))["outputs"], {"answer": "answer of task-9"})
+
+        await store.flush()
+        metrics = store.metrics()
+        self.assertEqual(metrics["written"], 10)
+        self.assertEqual(metrics["batches"], 3)
+        self.assertEqual(metrics["pending"], 0)
+        self.assertEqual(metrics["errors"], 0)
+
+    async def test_failed_batches_stay_pending_and_are_retried(self):
+        """Test that records of a batch that failed on a locked database are kept and written later."""
+        store = FastRetrySQLiteTaskStore(self.path)
+        self.addCleanup(store.close)
+        blocker = sqlite3.connect(self.path, isolation_level=None)
+        self.addCleanup(blocker.close)
+        blocker.execute("BEGIN IMMEDIATE")
+        store.put(make_entry("task-1"))
+        for _ in range(200):
+            if store.metrics()["errors"]:
+                break
+            await asyncio.sleep(0.01)
+
+        metrics = store.metrics()
+        self.assertGreater(metrics["errors"], 0)
+        self.assertEqual(metrics["pending"], 1)
+        self.assertEqual(await store.get("task-1"), make_entry("task-1"))
+
+        blocker.execute("ROLLBACK")
+        await store.flush()
+        metrics = store.metrics()
+        self.assertEqual(metrics["written"], 1)
+        self.assertEqual(metrics["pending"], 0)
+        store.close()
+        self.assertEqual(await self.open_store().get("task-1"), make_entry("task-1"))
+
+    async def test_retention(self):
+        """Test that records of tasks that finished before the retention are deleted."""
+        store = self.open_store(retention_seconds=60)
+        store.put(make_entry("old", time.time() - 120))
+        store.put(make_entry("new", time.time()))
+        await store.flush()
+
+        self.assertIsNone(await store.get("old"))
+        self.assertIsNotNone(await store.get("new"))
+
+    async def test_claims(self):
+        """Test that a claim is replaced by the record of its task and carries cancel requests."""
+        store = self.open_store()
+        other = self.open_store()
+        store.claim("task-1", "worker-a")
+        await store.flush()
+
+        owner = await other.owner("task-1")
+        self.assertEqual(owner["workerID"], "worker-a")
+        self.assertIsNotNone(owner["heartbeatAt"])
+        self.assertTrue(await other.request_cancel("task-1"))
+        self.assertEqual(await other.heartbeat("worker-b"), [])
+        self.assertEqual(await store.heartbeat("worker-a"), ["task-1"])
+        self.assertEqual(await store.heartbeat("worker-a"), [])
+
+        store.put(make_entry("task-1"))
+        await store.flush()
+        self.assertIsNone(await other.owner("task-1"))
+        self.assertFalse(await other.request_cancel("task-1"))
+        self.assertEqual(store.metrics()["claimed"], 1)
+
+    async def test_invalid_options_and_closed_store(self):
+        """Test that invalid options are rejected and a closed store takes no records."""
+        with self.assertRaises(ValueError):
+            SQLiteTaskStore(self.path, batch_size=0)
+        with self.assertRaises(ValueError):
+            SQLiteTaskStore(self.path, retention_seconds=-1)
+
+        store = self.open_store()
+        store.close()
+        with self.assertRaises(RuntimeError):
+            store.put(make_entry("late"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Tests for typed compact arrays.
+This module contains tests for converting lists to typed arrays and back.
+"""
+import unittest
+from array import array
+
+from ...interface.node import WorkflowVariableType
+from ..spill import SpillStore
+from ..typed_array import StringArray, compact_array, is_typed_array
+from ..utils import WorkflowRuntimeType, to_jsonable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestTypedArray(unittest.TestCase):
+    """Test cases for typed arrays."""
+
+    def test_compact_numbers(self):
+        """Test that homogeneous number lists become flat arrays."""
+        integers = compact_array([1, 2, 3])
+        floats = compact_array([0.5, 1.5])
+        self.assertEqual((type(integers), integers.typecode), (array, 'q'))
+        self.assertEqual((type(floats), floats.typecode), (array, 'd'))
+        self.assertEqual(integers.tolist(), [1, 2, 3])
+
+    def test_lists_that_stay_lists(self):
+        """Test that empty, mixed, boolean and oversized lists are not converted."""
+        for values in ([], [1, 2.5], [True, False], [1, "a"], [2 ** 70], [{"a": 1}]):
+            self.assertIs(compact_array(values), values)
+
+    def test_string_array(self):
+        """Test that string lists are stored in offset and data buffers."""
+        strings = ["alpha", "", "βeta", "gamma"]
+        string_array = compact_array(strings)
+        self.assertIsInstance(string_array, StringArray)
+        self.assertEqual(len(string_array), 4)
+        self.assertEqual(string_array[2], "βeta")
+        self.assertEqual(string_array[-1], "gamma")
+        self.assertEqual(string_array, strings)
+        self.assertIsInstance(string_array[1:3], StringArray)
+        self.assertEqual(string_array[1:3].tolist(), ["", "βeta"])
+        self.assertIn("gamma", string_array)
+        with self.assertRaises(IndexError):
+            string_array[4]
+
+    def test_workflow_types(self):
+        """Test that typed arrays are array variables with typed items."""
+        for values in ([1, 2], [0.5], ["a"]):
+            typed = compact_array(values)
+            self.assertTrue(is_typed_array(typed))
+            self.assertEqual(WorkflowRuntimeType.get_workflow_type(typed), WorkflowVariableType.Array)
+        self.assertEqual(WorkflowRuntimeType.get_workflow_type(compact_array([1])[0]), WorkflowVariableType.Integer)
+
+    def test_to_jsonable(self):
+        """Test that typed arrays become lists at the API boundary."""
+        converted = to_jsonable({"scores": compact_array([0.5, 1.5]), "names": compact_array(["a", "b"])})
+        self.assertEqual(converted, {"scores": [0.5, 1.5], "names": ["a", "b"]})
+        self.assertIs(type(converted["scores"]), list)
+
+    def test_spill_estimate(self):
+        """Test that the spill store sizes typed arrays from their buffers."""
+        typed = compact_array([0.5] * 1000)
+        self.assertIs(SpillStore(threshold_bytes=8000).spill(typed), typed)
+        self.assertIsNot(SpillStore(threshold_bytes=7999).spill(typed), typed)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_numpy_arrays(self):
+        """Test that NumPy arrays and scalars are array variables and convert to JSON."""
+        values = numpy.arange(3, dtype=numpy.int64)
+        self.assertEqual(WorkflowRuntimeType.get_workflow_type(values), WorkflowVariableType.Array)
+        self.assertEqual(WorkflowRuntimeType.get_workflow_type(values[0]), WorkflowVariableType.Integer)
+        self.assertEqual(to_jsonable({"values": values, "first": values[0]}), {"values": [0, 1, 2], "first": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
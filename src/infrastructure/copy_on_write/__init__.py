@@ -0,0 +1,7 @@
+"""
+Copy-on-write module for the workflow runtime.
+This module contains the copy-on-write views of the values handed to executors.
+"""
+from .copy_on_write import CopyOnWriteDict, CopyOnWriteList, copy_on_write, unwrap
+
+__all__ = ['CopyOnWriteDict', 'CopyOnWriteList', 'copy_on_write', 'unwrap']
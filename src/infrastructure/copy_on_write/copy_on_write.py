@@ -0,0 +1,822 @@
+"""
+Copy-on-write views of workflow values.
+
+Node inputs are shared with the outputs of upstream nodes, the variable store
+and the snapshots of the report. Executors receive copy-on-write views of them
+instead. The views are `dict` and `list` subclasses, so executors can check
+their types, serialize them and pass them to any code expecting plain values.
+Each view holds a shallow copy of the container it wraps, so the shared
+container is never modified. Nested dictionaries and lists are wrapped when they
+are read, and stored in their parent in place of the shared container, so the
+data of a view always reflects its writes. `unwrap` turns the views back into
+plain values. It returns the shared container for every view that was not
+written.
+
+The view handed to an executor records every nested view created under it, so
+unwrapping the outputs of the executor only looks for those views, by identity,
+and does not walk the outputs at all if the executor read no nested container.
+"""
+import copy
+from collections.abc import ItemsView, ValuesView
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+
+def copy_on_write(value: Any, views: Optional[Dict[int, Any]] = None) -> Any:
+    """
+    Wrap a dictionary or a list in a copy-on-write view.
+
+    Args:
+        value: The value to wrap.
+        views: The views created under the same root view, by ID, which the new
+            view is added to, or None if it is a root view.
+
+    Returns:
+        The view, or the value itself if it is not a plain dictionary or list.
+    """
+    value_type = type(value)
+    if value_type is dict:
+        view = CopyOnWriteDict(value, views)
+    elif value_type is list:
+        view = CopyOnWriteList(value, views)
+    else:
+        return value
+    if views is not None:
+        views[id(view)] = view
+    return view
+
+
+def unwrap(value: Any, root: Optional["CopyOnWriteDict"] = None) -> Any:
+    """
+    Turn copy-on-write views into plain values.
+
+    Views that were not written return the data they wrap. Plain dictionaries and
+    lists are only copied if they hold a view that has to be replaced.
+
+    Args:
+        value: The value, which may be or contain copy-on-write views.
+        root: The root view the value was computed from. When given, only the
+            root and the nested views recorded by it are replaced, and the value
+            is not walked if the root handed out no nested view. The root itself
+            is then only looked for at the top level of the value.
+
+    Returns:
+        The plain value.
+    """
+    if _is_view(value):
+        return value.unwrap()
+    if root is None:
+        return _unwrap_all(value)
+    if not root._views:
+        if type(value) is dict and any(item is root for item in value.values()):
+            return {key: root.unwrap() if item is root else item for key, item in value.items()}
+        return value
+    return _unwrap_recorded(value, root)
+
+
+def _unwrap_recorded(value: Any, root: "CopyOnWriteDict") -> Any:
+    """
+    Replace the root view and the views recorded by it with plain values.
+
+    Args:
+        value: The value, which may contain the views.
+        root: The root view.
+
+    Returns:
+        The plain value.
+    """
+    if value is root or root._views.get(id(value)) is value:
+        return value.unwrap()
+    value_type = type(value)
+    if value_type is dict:
+        converted = None
+        for key, item in value.items():
+            converted_item = _unwrap_recorded(item, root)
+            if converted_item is not item:
+                if converted is None:
+                    converted = dict(value)
+                converted[key] = converted_item
+        return value if converted is None else converted
+    if value_type is list:
+        converted = None
+        for index, item in enumerate(value):
+            converted_item = _unwrap_recorded(item, root)
+            if converted_item is not item:
+                if converted is None:
+                    converted = list(value)
+                converted[index] = converted_item
+        return value if converted is None else converted
+    return value
+
+
+def _unwrap_all(value: Any) -> Any:
+    """
+    Replace every copy-on-write view in a value with plain values.
+
+    Args:
+        value: The value, which may contain views.
+
+    Returns:
+        The plain value.
+    """
+    value_type = type(value)
+    if value_type is CopyOnWriteDict or value_type is CopyOnWriteList:
+        return value.unwrap()
+    if value_type is dict:
+        converted = None
+        for key, item in value.items():
+            converted_item = _unwrap_all(item)
+            if converted_item is not item:
+                if converted is None:
+                    converted = dict(value)
+                converted[key] = converted_item
+        return value if converted is None else converted
+    if value_type is list:
+        converted = None
+        for index, item in enumerate(value):
+            converted_item = _unwrap_all(item)
+            if converted_item is not item:
+                if converted is None:
+                    converted = list(value)
+                converted[index] = converted_item
+        return value if converted is None else converted
+    return value
+
+
+def _is_view(value: Any) -> bool:
+    """
+    Check if a value is a copy-on-write view.
+
+    Args:
+        value: The value to check.
+
+    Returns:
+        True if the value is a copy-on-write view.
+    """
+    value_type = type(value)
+    return value_type is CopyOnWriteDict or value_type is CopyOnWriteList
+
+
+class CopyOnWriteDict(dict):
+    """
+    A copy-on-write view of a dictionary.
+
+    The view holds a shallow copy of the dictionary. Nested containers are
+    returned as views of their own, stored in place of the shared containers, so
+    reading a key twice returns the same view and its writes are kept. Methods
+    that would hand out the shared containers are overridden to wrap them.
+    """
+
+    __slots__ = ("_base", "_written", "_children", "_assigned", "_views")
+
+    def __init__(self, base: Dict[Any, Any], views: Optional[Dict[int, Any]] = None):
+        """
+        Initialize a new instance of the CopyOnWriteDict class.
+
+        Args:
+            base: The shared dictionary, which is never modified.
+            views: The views created under the same root view, by ID, or None if
+                this is a root view.
+        """
+        super().__init__(base)
+        self._base = base
+        self._written = False
+        self._children: Dict[Any, Any] = {}
+        self._assigned: Set[Any] = set()
+        # Nested views handed out under the root view, shared by all of them
+        self._views: Dict[int, Any] = {} if views is None else views
+
+    def __getitem__(self, key: Any) -> Any:
+        """
+        Get a value, wrapping nested containers.
+
+        Args:
+            key: The key.
+
+        Returns:
+            The value.
+        """
+        value = dict.__getitem__(self, key)
+        child = copy_on_write(value, self._views)
+        if child is not value:
+            dict.__setitem__(self, key, child)
+            self._children[key] = child
+        return child
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        """
+        Set a value.
+
+        Args:
+            key: The key.
+            value: The value.
+        """
+        self._written = True
+        dict.__setitem__(self, key, value)
+        if _is_view(value):
+            self._children[key] = value
+            self._assigned.discard(key)
+        else:
+            self._children.pop(key, None)
+            # Assigned values may hold views and are unwrapped in full
+            self._assigned.add(key)
+
+    def __delitem__(self, key: Any) -> None:
+        """
+        Delete a value.
+
+        Args:
+            key: The key.
+        """
+        self._written = True
+        dict.__delitem__(self, key)
+        self._children.pop(key, None)
+        self._assigned.discard(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Iterate over the keys.
+
+        Overriding the iterator makes `dict(view)` and `{**view}` read the values
+        through `__getitem__`, so they get views of nested containers.
+
+        Returns:
+            An iterator over the keys.
+        """
+        return iter(dict.keys(self))
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """
+        Get a value, or a default if the key does not exist.
+
+        Args:
+            key: The key.
+            default: The default value.
+
+        Returns:
+            The value, or the default.
+        """
+        return self[key] if key in self else default
+
+    def items(self) -> ItemsView:
+        """
+        Get the items, wrapping nested containers.
+
+        Returns:
+            A view of the items.
+        """
+        return ItemsView(self)
+
+    def values(self) -> ValuesView:
+        """
+        Get the values, wrapping nested containers.
+
+        Returns:
+            A view of the values.
+        """
+        return ValuesView(self)
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        """
+        Remove a key and get its value.
+
+        Args:
+            key: The key.
+            default: The value returned if the key does not exist.
+
+        Returns:
+            The value.
+
+        Raises:
+            KeyError: If the key does not exist and no default is given.
+        """
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self) -> Any:
+        """
+        Remove the last inserted key and get its item.
+
+        Returns:
+            The key and its value.
+
+        Raises:
+            KeyError: If the dictionary is empty.
+        """
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+        key = next(reversed(dict.keys(self)))
+        return key, self.pop(key)
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        """
+        Get a value, setting it to a default if the key does not exist.
+
+        Args:
+            key: The key.
+            default: The default value.
+
+        Returns:
+            The value.
+        """
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Set the items of another mapping or iterable of pairs.
+
+        Args:
+            *args: The mapping or iterable of pairs.
+            **kwargs: More items.
+        """
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self) -> None:
+        """
+        Remove every key.
+        """
+        self._written = True
+        dict.clear(self)
+        self._children.clear()
+        self._assigned.clear()
+
+    def copy(self) -> Dict[Any, Any]:
+        """
+        Get a shallow copy.
+
+        Returns:
+            A plain dictionary of the items, with nested containers as views.
+        """
+        return dict(self.items())
+
+    def __or__(self, other: Any) -> Dict[Any, Any]:
+        """
+        Merge with another dictionary.
+
+        Args:
+            other: The other dictionary.
+
+        Returns:
+            A plain dictionary of the items of both, with nested containers as views.
+        """
+        if not isinstance(other, dict):
+            return NotImplemented
+        merged = self.copy()
+        merged.update(other)
+        return merged
+
+    def __ror__(self, other: Any) -> Dict[Any, Any]:
+        """
+        Merge another dictionary with this one.
+
+        Args:
+            other: The other dictionary.
+
+        Returns:
+            A plain dictionary of the items of both, with nested containers as views.
+        """
+        if not isinstance(other, dict):
+            return NotImplemented
+        merged = dict(other)
+        merged.update(self.items())
+        return merged
+
+    def __ior__(self, other: Any) -> "CopyOnWriteDict":
+        """
+        Set the items of another mapping.
+
+        Args:
+            other: The other mapping.
+
+        Returns:
+            The view.
+        """
+        self.update(other)
+        return self
+
+    def __copy__(self) -> Dict[Any, Any]:
+        """
+        Get a shallow copy for `copy.copy`.
+
+        Returns:
+            A plain dictionary of the items, with nested containers as views.
+        """
+        return self.copy()
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Dict[Any, Any]:
+        """
+        Get a deep copy for `copy.deepcopy`.
+
+        Args:
+            memo: The objects already copied.
+
+        Returns:
+            A plain deep copy of the data.
+        """
+        return copy.deepcopy(self.unwrap(), memo)
+
+    def __reduce_ex__(self, protocol: Any) -> Any:
+        """
+        Pickle the view as a plain dictionary.
+
+        Args:
+            protocol: The pickle protocol.
+
+        Returns:
+            The reduction of the plain data.
+        """
+        return dict, (self.unwrap(),)
+
+    def unwrap(self) -> Dict[Any, Any]:
+        """
+        Get the data of the view as a plain dictionary.
+
+        Returns:
+            The shared dictionary if nothing in it was written, otherwise a copy
+            that shares every container that was not written.
+        """
+        if not self._written:
+            converted = None
+            for key, child in self._children.items():
+                value = child.unwrap()
+                if value is not self._base[key]:
+                    if converted is None:
+                        converted = dict(self._base)
+                    converted[key] = value
+            return self._base if converted is None else converted
+
+        converted = dict.copy(self)
+        for key, child in self._children.items():
+            converted[key] = child.unwrap()
+        for key in self._assigned:
+            converted[key] = _unwrap_all(converted[key])
+        return converted
+
+
+class CopyOnWriteList(list):
+    """
+    A copy-on-write view of a list.
+
+    The view holds a shallow copy of the list. Nested containers are returned as
+    views of their own, stored in place of the shared containers and remembered
+    by index until an insertion or deletion moves the items. Methods that would
+    hand out the shared containers are overridden to wrap them.
+    """
+
+    __slots__ = ("_base", "_written", "_children", "_assigned", "_moved", "_views")
+
+    def __init__(self, base: List[Any], views: Optional[Dict[int, Any]] = None):
+        """
+        Initialize a new instance of the CopyOnWriteList class.
+
+        Args:
+            base: The shared list, which is never modified.
+            views: The views created under the same root view, by ID, or None if
+                this is a root view.
+        """
+        super().__init__(base)
+        self._base = base
+        self._written = False
+        self._children: Dict[int, Any] = {}
+        self._assigned: Set[int] = set()
+        # Whether items were moved, after which the data is unwrapped in full
+        self._moved = False
+        # Nested views handed out under the root view, shared by all of them
+        self._views: Dict[int, Any] = {} if views is None else views
+
+    def _move(self) -> None:
+        """
+        Prepare for a write that moves items, after which indexes of views are unknown.
+        """
+        self._written = True
+        self._children.clear()
+        self._assigned.clear()
+        self._moved = True
+
+    def _track(self, index: int, value: Any) -> None:
+        """
+        Remember an item written at an index.
+
+        Args:
+            index: The index of the item.
+            value: The item.
+        """
+        self._written = True
+        if _is_view(value):
+            self._children[index] = value
+            self._assigned.discard(index)
+        else:
+            self._children.pop(index, None)
+            # Assigned items may hold views and are unwrapped in full
+            self._assigned.add(index)
+
+    def __getitem__(self, index: Any) -> Any:
+        """
+        Get an item or a slice, wrapping nested containers.
+
+        Args:
+            index: The index of the item, or a slice.
+
+        Returns:
+            The item, or a new list of the sliced items.
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        value = list.__getitem__(self, index)
+        child = copy_on_write(value, self._views)
+        if child is not value:
+            if index < 0:
+                index += len(self)
+            list.__setitem__(self, index, child)
+            self._children[index] = child
+        return child
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        """
+        Set an item or a slice.
+
+        Args:
+            index: The index of the item, or a slice.
+            value: The item, or the items of the slice.
+        """
+        if isinstance(index, slice):
+            self._move()
+            list.__setitem__(self, index, value)
+            return
+        list.__setitem__(self, index, value)
+        self._track(index + len(self) if index < 0 else index, value)
+
+    def __delitem__(self, index: Any) -> None:
+        """
+        Delete an item or a slice.
+
+        Args:
+            index: The index of the item, or a slice.
+        """
+        self._move()
+        list.__delitem__(self, index)
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Iterate over the items, wrapping nested containers.
+
+        Returns:
+            An iterator over the items.
+        """
+        for index in range(len(self)):
+            yield self[index]
+
+    def __reversed__(self) -> Iterator[Any]:
+        """
+        Iterate over the items in reverse order, wrapping nested containers.
+
+        Returns:
+            An iterator over the items.
+        """
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+
+    def append(self, value: Any) -> None:
+        """
+        Append an item.
+
+        Args:
+            value: The item.
+        """
+        list.append(self, value)
+        self._track(len(self) - 1, value)
+
+    def extend(self, values: Any) -> None:
+        """
+        Append the items of an iterable.
+
+        Args:
+            values: The items.
+        """
+        for value in list(values):
+            self.append(value)
+
+    def __iadd__(self, values: Any) -> "CopyOnWriteList":
+        """
+        Append the items of an iterable.
+
+        Args:
+            values: The items.
+
+        Returns:
+            The view.
+        """
+        self.extend(values)
+        return self
+
+    def insert(self, index: int, value: Any) -> None:
+        """
+        Insert an item.
+
+        Args:
+            index: The index to insert at.
+            value: The item.
+        """
+        if index >= len(self):
+            # Appending does not move any item
+            self.append(value)
+            return
+        self._move()
+        list.insert(self, index, value)
+
+    def pop(self, index: int = -1) -> Any:
+        """
+        Remove an item and get it.
+
+        Args:
+            index: The index of the item.
+
+        Returns:
+            The item.
+        """
+        value = self[index]
+        if index < 0:
+            index += len(self)
+        if index == len(self) - 1:
+            # Popping the last item does not move any item
+            self._written = True
+            list.pop(self)
+            self._children.pop(index, None)
+            self._assigned.discard(index)
+        else:
+            self._move()
+            list.pop(self, index)
+        return value
+
+    def remove(self, value: Any) -> None:
+        """
+        Remove the first item equal to a value.
+
+        Args:
+            value: The value.
+
+        Raises:
+            ValueError: If no item is equal to the value.
+        """
+        del self[self.index(value)]
+
+    def clear(self) -> None:
+        """
+        Remove every item.
+        """
+        self._move()
+        list.clear(self)
+
+    def sort(self, key: Any = None, reverse: bool = False) -> None:
+        """
+        Sort the items in place, passing views of nested containers to the key function.
+
+        Args:
+            key: The function computing the sort key of an item.
+            reverse: Whether to sort in descending order.
+        """
+        items = list(self)
+        items.sort(key=key, reverse=reverse)
+        self._move()
+        list.__setitem__(self, slice(None), items)
+
+    def reverse(self) -> None:
+        """
+        Reverse the items in place.
+        """
+        self._move()
+        list.reverse(self)
+
+    def copy(self) -> List[Any]:
+        """
+        Get a shallow copy.
+
+        Returns:
+            A plain list of the items, with nested containers as views.
+        """
+        return list(self)
+
+    def __add__(self, other: Any) -> List[Any]:
+        """
+        Concatenate with another list.
+
+        Args:
+            other: The other list.
+
+        Returns:
+            A plain list of the items of both, with nested containers as views.
+        """
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(self) + list(other)
+
+    def __radd__(self, other: Any) -> List[Any]:
+        """
+        Concatenate another list with this one.
+
+        Args:
+            other: The other list.
+
+        Returns:
+            A plain list of the items of both, with nested containers as views.
+        """
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(other) + list(self)
+
+    def __mul__(self, count: Any) -> List[Any]:
+        """
+        Repeat the items.
+
+        Args:
+            count: The number of repetitions.
+
+        Returns:
+            A plain list of the repeated items, with nested containers as views.
+        """
+        return list(self) * count
+
+    __rmul__ = __mul__
+
+    def __imul__(self, count: Any) -> "CopyOnWriteList":
+        """
+        Repeat the items in place.
+
+        Args:
+            count: The number of repetitions.
+
+        Returns:
+            The view.
+        """
+        items = list(self) * count
+        self._move()
+        list.__setitem__(self, slice(None), items)
+        return self
+
+    def __copy__(self) -> List[Any]:
+        """
+        Get a shallow copy for `copy.copy`.
+
+        Returns:
+            A plain list of the items, with nested containers as views.
+        """
+        return self.copy()
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> List[Any]:
+        """
+        Get a deep copy for `copy.deepcopy`.
+
+        Args:
+            memo: The objects already copied.
+
+        Returns:
+            A plain deep copy of the data.
+        """
+        return copy.deepcopy(self.unwrap(), memo)
+
+    def __reduce_ex__(self, protocol: Any) -> Any:
+        """
+        Pickle the view as a plain list.
+
+        Args:
+            protocol: The pickle protocol.
+
+        Returns:
+            The reduction of the plain data.
+        """
+        return list, (self.unwrap(),)
+
+    def unwrap(self) -> List[Any]:
+        """
+        Get the data of the view as a plain list.
+
+        Returns:
+            The shared list if nothing in it was written, otherwise a copy that
+            shares every container that was not written.
+        """
+        if not self._written:
+            converted = None
+            for index, child in self._children.items():
+                value = child.unwrap()
+                if value is not self._base[index]:
+                    if converted is None:
+                        converted = list(self._base)
+                    converted[index] = value
+            return self._base if converted is None else converted
+
+        converted = list.copy(self)
+        if self._moved:
+            return [_unwrap_all(item) for item in converted]
+        for index, child in self._children.items():
+            converted[index] = child.unwrap()
+        for index in self._assigned:
+            converted[index] = _unwrap_all(converted[index])
+        return converted
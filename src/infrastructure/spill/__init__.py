@@ -0,0 +1,9 @@
+"""
+Spill module for the workflow runtime.
+This module contains the out-of-core spill store for large values.
+"""
+from .spill_store import (
+    SpillLog, SpillStore, SpilledList, SpilledRecords, SpilledValue, estimate_size, resolve_spilled
+)
+
+__all__ = ['SpillLog', 'SpillStore', 'SpilledList', 'SpilledRecords', 'SpilledValue', 'estimate_size', 'resolve_spilled']
@@ -0,0 +1,541 @@
+"""
+Out-of-core spill store for large values.
+
+Values whose estimated size exceeds a threshold are serialized into a scratch
+file that is memory-mapped and replaced with a lightweight handle. The scratch
+file is unlinked as soon as it is created, so its pages are returned when the
+last handle referencing them is garbage collected, and the kernel can evict them
+under memory pressure instead of keeping the value as Python objects.
+
+Lists become a `SpilledList`, a read-only sequence that decodes items on access
+and slices without copying. Other values become a `SpilledValue` that is
+decoded in full when it is resolved.
+
+Values that are produced one at a time can be appended to a `SpillLog` as they
+are produced instead, each record prefixed with its length. A value can be
+appended again after it changed, and the latest record of it wins. Sealing the
+log maps it into memory, and `SpilledRecords` reads the records at the offsets
+that were kept.
+
+Spilled values are pickled as the values they hold, so containers of them can be
+spilled again.
+"""
+import pickle
+import struct
+import tempfile
+from array import array
+from collections.abc import Sequence
+from mmap import ACCESS_READ, mmap
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ...interface.node import WorkflowVariableType
+
+# Number of items sampled to estimate the size of a container
+_SAMPLE_SIZE = 16
+
+# Length prefix of a spill log record
+_RECORD_PREFIX = struct.Struct("<Q")
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the serialized size of a value without serializing it in full.
+
+    Args:
+        value: The value to estimate.
+
+    Returns:
+        The estimated size in bytes.
+    """
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, array):
+        return value.itemsize * len(value)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        # Typed arrays and NumPy arrays know the size of their buffers
+        return nbytes
+    if isinstance(value, list):
+        if not value:
+            return 0
+        sample = value[:_SAMPLE_SIZE]
+        return len(pickle.dumps(sample, pickle.HIGHEST_PROTOCOL)) * len(value) // len(sample)
+    if isinstance(value, dict):
+        if not value:
+            return 0
+        sample = dict(item for item, _ in zip(value.items(), range(_SAMPLE_SIZE)))
+        return len(pickle.dumps(sample, pickle.HIGHEST_PROTOCOL)) * len(value) // len(sample)
+    return 0
+
+
+def _map_scratch_file(chunks: Iterator[bytes], directory: Optional[str]) -> Tuple[memoryview, int]:
+    """
+    Write chunks to an unlinked scratch file and map it into memory.
+
+    Args:
+        chunks: The chunks to write.
+        directory: The directory of the scratch file, or None for the system default.
+
+    Returns:
+        A read-only view of the mapped file and its size in bytes.
+    """
+    with tempfile.TemporaryFile(dir=directory) as scratch_file:
+        size = 0
+        for chunk in chunks:
+            scratch_file.write(chunk)
+            size += len(chunk)
+        scratch_file.flush()
+        if size == 0:
+            return memoryview(b""), 0
+        # The mapping keeps the data alive after the file is closed
+        return memoryview(mmap(scratch_file.fileno(), size, access=ACCESS_READ)), size
+
+
+class SpilledList(Sequence):
+    """
+    A list spilled to a memory-mapped scratch file.
+
+    Items are decoded when they are accessed. Slices with a step of one share the
+    mapped buffer and return a new `SpilledList` without copying.
+    """
+
+    __slots__ = ("_buffer", "_offsets", "_start", "_stop")
+
+    def __init__(self, buffer: memoryview, offsets: array, start: int = 0, stop: Optional[int] = None):
+        """
+        Initialize a new instance of the SpilledList class.
+
+        Args:
+            buffer: The mapped buffer holding the serialized items.
+            offsets: The offsets of the items in the buffer, followed by the end offset.
+            start: The index of the first item of this list.
+            stop: The index after the last item of this list, or None for all items.
+        """
+        self._buffer = buffer
+        self._offsets = offsets
+        self._start = start
+        self._stop = len(offsets) - 1 if stop is None else stop
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Get the serialized size of the items.
+
+        Returns:
+            The size in bytes.
+        """
+        return self._offsets[self._stop] - self._offsets[self._start]
+
+    def __len__(self) -> int:
+        """
+        Get the number of items.
+
+        Returns:
+            The number of items.
+        """
+        return self._stop - self._start
+
+    def __getitem__(self, index: Any) -> Any:
+        """
+        Get an item or a slice.
+
+        Args:
+            index: The index of the item, or a slice.
+
+        Returns:
+            The decoded item, or the sliced list.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return SpilledList(self._buffer, self._offsets, self._start + start, self._start + max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("SpilledList index out of range")
+        position = self._start + index
+        return pickle.loads(self._buffer[self._offsets[position]:self._offsets[position + 1]])
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Iterate over the decoded items.
+
+        Returns:
+            An iterator over the items.
+        """
+        buffer = self._buffer
+        offsets = self._offsets
+        for position in range(self._start, self._stop):
+            yield pickle.loads(buffer[offsets[position]:offsets[position + 1]])
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Compare with another list.
+
+        Args:
+            other: The other list.
+
+        Returns:
+            True if both lists hold equal items in the same order.
+        """
+        if not isinstance(other, (list, SpilledList)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        """
+        Get the representation of the list.
+
+        Returns:
+            The representation, without decoding the items.
+        """
+        return f"SpilledList(len={len(self)}, nbytes={self.nbytes})"
+
+    def to_list(self) -> List[Any]:
+        """
+        Decode all items into a Python list.
+
+        Returns:
+            The items as a list.
+        """
+        return list(self)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """
+        Pickle the list as a plain list, since the mapping belongs to this process.
+
+        Returns:
+            The constructor and arguments of the decoded list.
+        """
+        return list, (self.to_list(),)
+
+
+class SpilledRecords(Sequence):
+    """
+    Records of a sealed spill log, read by their offsets.
+
+    Records are decoded when they are accessed. Only the offsets are held in
+    memory, so the records can be in any order in the log.
+    """
+
+    __slots__ = ("_buffer", "_offsets")
+
+    def __init__(self, buffer: memoryview, offsets: array):
+        """
+        Initialize a new instance of the SpilledRecords class.
+
+        Args:
+            buffer: The mapped buffer of the sealed log.
+            offsets: The offsets of the length prefixes of the records in the buffer.
+        """
+        self._buffer = buffer
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        """
+        Get the number of records.
+
+        Returns:
+            The number of records.
+        """
+        return len(self._offsets)
+
+    def __getitem__(self, index: Any) -> Any:
+        """
+        Get a record or a slice.
+
+        Args:
+            index: The index of the record, or a slice.
+
+        Returns:
+            The decoded record, or the sliced records over the same buffer.
+        """
+        if isinstance(index, slice):
+            return SpilledRecords(self._buffer, self._offsets[index])
+        offset = self._offsets[index]
+        start = offset + _RECORD_PREFIX.size
+        (size,) = _RECORD_PREFIX.unpack_from(self._buffer, offset)
+        return pickle.loads(self._buffer[start:start + size])
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Iterate over the decoded records.
+
+        Returns:
+            An iterator over the records.
+        """
+        for index in range(len(self._offsets)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        """
+        Get the representation of the records.
+
+        Returns:
+            The representation, without decoding the records.
+        """
+        return f"SpilledRecords(len={len(self)})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """
+        Pickle the records as a plain list, since the mapping belongs to this process.
+
+        Returns:
+            The constructor and arguments of the decoded list.
+        """
+        return list, (list(self),)
+
+
+class SpillLog:
+    """
+    An append-only log of values in an unlinked scratch file.
+
+    Every record is the pickled value prefixed with its length. Appending writes
+    through a file buffer, so values are serialized one at a time as they are
+    produced. The log is mapped into memory once it is sealed.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize a new instance of the SpillLog class.
+
+        Args:
+            directory: The directory of the scratch file, or None for the system temporary directory.
+        """
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        """
+        Get the size of the log.
+
+        Returns:
+            The number of bytes appended.
+        """
+        return self._size
+
+    def append(self, value: Any) -> int:
+        """
+        Append a value to the log.
+
+        Args:
+            value: The value to append.
+
+        Returns:
+            The offset of the record.
+
+        Raises:
+            ValueError: If the log was sealed.
+        """
+        if self._file is None:
+            raise ValueError("Cannot append to a sealed spill log")
+        chunk = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        offset = self._size
+        self._file.write(_RECORD_PREFIX.pack(len(chunk)))
+        self._file.write(chunk)
+        self._size += _RECORD_PREFIX.size + len(chunk)
+        return offset
+
+    def seal(self) -> memoryview:
+        """
+        Close the log for appending and map it into memory.
+
+        Returns:
+            A read-only view of the mapped log.
+
+        Raises:
+            ValueError: If the log was sealed.
+        """
+        if self._file is None:
+            raise ValueError("Spill log was already sealed")
+        scratch_file, self._file = self._file, None
+        with scratch_file:
+            scratch_file.flush()
+            if self._size == 0:
+                return memoryview(b"")
+            # The mapping keeps the data alive after the file is closed
+            return memoryview(mmap(scratch_file.fileno(), self._size, access=ACCESS_READ))
+
+
+class SpilledValue:
+    """
+    A value spilled to a memory-mapped scratch file.
+
+    The value is decoded in full when it is resolved.
+    """
+
+    __slots__ = ("_buffer", "_workflow_type")
+
+    def __init__(self, buffer: memoryview, workflow_type: Optional[WorkflowVariableType]):
+        """
+        Initialize a new instance of the SpilledValue class.
+
+        Args:
+            buffer: The mapped buffer holding the serialized value.
+            workflow_type: The workflow type of the value.
+        """
+        self._buffer = buffer
+        self._workflow_type = workflow_type
+
+    @property
+    def workflow_type(self) -> Optional[WorkflowVariableType]:
+        """
+        Get the workflow type of the value.
+
+        Returns:
+            The workflow type of the value.
+        """
+        return self._workflow_type
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Get the serialized size of the value.
+
+        Returns:
+            The size in bytes.
+        """
+        return len(self._buffer)
+
+    def resolve(self) -> Any:
+        """
+        Decode the value.
+
+        Returns:
+            The decoded value.
+        """
+        return pickle.loads(self._buffer)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """
+        Pickle the value as the value it holds, without decoding it.
+
+        Returns:
+            The function and arguments decoding the value.
+        """
+        return pickle.loads, (bytes(self._buffer),)
+
+    def __repr__(self) -> str:
+        """
+        Get the representation of the value.
+
+        Returns:
+            The representation, without decoding the value.
+        """
+        return f"SpilledValue(type={self._workflow_type}, nbytes={self.nbytes})"
+
+
+def resolve_spilled(value: Any) -> Any:
+    """
+    Resolve a spilled value that has to be decoded in full.
+
+    Spilled lists are returned as they are, since they are read lazily.
+
+    Args:
+        value: The value, which may be a spilled value handle.
+
+    Returns:
+        The decoded value, or the value itself if it is not a spilled value.
+    """
+    if type(value) is SpilledValue:
+        return value.resolve()
+    return value
+
+
+class SpillStore:
+    """
+    Spill store for large values.
+
+    Values larger than the threshold are moved to memory-mapped scratch files.
+    Without a threshold, values are never spilled.
+    """
+
+    def __init__(self, threshold_bytes: Optional[int] = None, directory: Optional[str] = None):
+        """
+        Initialize a new instance of the SpillStore class.
+
+        Args:
+            threshold_bytes: The estimated size above which values are spilled, or None to disable spilling.
+            directory: The directory of the scratch files, or None for the system temporary directory.
+
+        Raises:
+            ValueError: If the threshold is negative.
+        """
+        if threshold_bytes is not None and threshold_bytes < 0:
+            raise ValueError(f"Spill threshold must not be negative, got {threshold_bytes}")
+        self._threshold_bytes = threshold_bytes
+        self._directory = directory
+        self._spilled_bytes = 0
+
+    @property
+    def threshold_bytes(self) -> Optional[int]:
+        """
+        Get the spill threshold.
+
+        Returns:
+            The estimated size above which values are spilled, or None if spilling is disabled.
+        """
+        return self._threshold_bytes
+
+    @property
+    def spilled_bytes(self) -> int:
+        """
+        Get the number of bytes written to scratch files.
+
+        Returns:
+            The number of bytes written.
+        """
+        return self._spilled_bytes
+
+    def spill(self, value: Any) -> Any:
+        """
+        Spill a value if it is larger than the threshold.
+
+        Args:
+            value: The value to spill.
+
+        Returns:
+            A handle to the spilled value, or the value itself if it is not spilled.
+        """
+        if self._threshold_bytes is None or isinstance(value, (SpilledList, SpilledValue)):
+            return value
+        if estimate_size(value) <= self._threshold_bytes:
+            return value
+
+        if isinstance(value, list):
+            offsets = array('Q', [0])
+
+            def chunks() -> Iterator[bytes]:
+                for item in value:
+                    chunk = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+                    offsets.append(offsets[-1] + len(chunk))
+                    yield chunk
+
+            buffer, size = _map_scratch_file(chunks(), self._directory)
+            self._spilled_bytes += size
+            return SpilledList(buffer, offsets)
+
+        from ..utils.runtime_type import WorkflowRuntimeType
+        buffer, size = _map_scratch_file(
+            iter([pickle.dumps(value, pickle.HIGHEST_PROTOCOL)]), self._directory
+        )
+        self._spilled_bytes += size
+        return SpilledValue(buffer, WorkflowRuntimeType.get_workflow_type(value))
+
+    def spill_all(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Spill the values of a dictionary that are larger than the threshold.
+
+        Args:
+            values: The values, for example the workflow inputs.
+
+        Returns:
+            A dictionary with the same keys and the spilled values replaced by handles.
+        """
+        if self._threshold_bytes is None:
+            return values
+        return {key: self.spill(value) for key, value in values.items()}
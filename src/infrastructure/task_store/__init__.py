@@ -0,0 +1,7 @@
+"""
+Task store module for the workflow runtime.
+This module contains the persistent stores of finished tasks.
+"""
+from .sqlite_task_store import SQLiteTaskStore
+
+__all__ = ['SQLiteTaskStore']
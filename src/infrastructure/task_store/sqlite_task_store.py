@@ -0,0 +1,601 @@
+"""
+SQLite task store.
+
+Records of finished tasks are written to a SQLite database in WAL mode, so
+readers never wait for the writer and a crash loses at most the records that
+were not committed yet.
+
+Writes are batched behind the caller: `put` only queues the record and returns,
+and a writer thread commits the queued records in one transaction per batch,
+once `batch_size` records are queued or `flush_interval` seconds after the first
+of them. Records that are queued but not committed yet are served from memory,
+so a lookup right after `put` finds them. Lookups of committed records run in a
+worker thread, so neither writes nor reads block the event loop.
+
+Several worker processes can share one database. Claims of running tasks are
+written behind like records, to a table mapping each running task to its
+worker, and the record of a task replaces its claim in the same transaction.
+Workers heartbeat into a table of workers, and cancel requests for a task are
+flags on its claim that its worker takes with its next heartbeat. Writers of
+different processes wait for each other for up to `BUSY_TIMEOUT_MS`.
+
+A batch that fails with an operational error, such as a database locked for
+longer than that, stays pending and is retried after a backoff that doubles from
+`RETRY_BACKOFF_SECONDS` up to `MAX_RETRY_BACKOFF_SECONDS`. Its records leave
+memory only once they are committed. Batches that can never be written, such as
+records missing a field, are dropped and logged.
+
+With a retention, records of tasks that finished longer ago, and claims of tasks
+that started longer ago, are deleted by the writer thread, at most once per
+`PRUNE_INTERVAL_SECONDS`.
+"""
+import asyncio
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from ...interface.task import ITaskStore, TaskOwnerEntry, TaskStoreEntry
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    outputs TEXT NOT NULL,
+    report BLOB NOT NULL,
+    node_types TEXT NOT NULL,
+    terminal_event TEXT,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_finished_at ON tasks (finished_at);
+CREATE TABLE IF NOT EXISTS task_owners (
+    task_id TEXT PRIMARY KEY,
+    worker_id TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS task_owners_worker ON task_owners (worker_id, cancel_requested);
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    heartbeat_at REAL NOT NULL
+);
+"""
+
+_INSERT = (
+    "INSERT OR REPLACE INTO tasks "
+    "(task_id, status, version, outputs, report, node_types, terminal_event, finished_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+_SELECT = (
+    "SELECT task_id, status, version, outputs, report, node_types, terminal_event, finished_at "
+    "FROM tasks WHERE task_id = ?"
+)
+
+_CLAIM = "INSERT OR REPLACE INTO task_owners (task_id, worker_id, started_at) VALUES (?, ?, ?)"
+
+_RELEASE = "DELETE FROM task_owners WHERE task_id = ?"
+
+_SELECT_OWNER = (
+    "SELECT task_owners.task_id, task_owners.worker_id, task_owners.started_at, workers.heartbeat_at "
+    "FROM task_owners LEFT JOIN workers ON workers.worker_id = task_owners.worker_id "
+    "WHERE task_owners.task_id = ?"
+)
+
+_HEARTBEAT = "INSERT OR REPLACE INTO workers (worker_id, heartbeat_at) VALUES (?, ?)"
+
+# Queued to stop the writer thread
+_STOP = object()
+
+
+class _Claim(NamedTuple):
+    """
+    A queued claim of a running task.
+    """
+    task_id: str
+    worker_id: str
+    started_at: float
+
+
+class _Flush(NamedTuple):
+    """
+    A queued flush, resolved once everything queued before it is committed.
+    """
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+
+
+def _dumps(value: Any) -> str:
+    """
+    Serialize a value as JSON.
+
+    Args:
+        value: The value.
+
+    Returns:
+        The JSON text.
+    """
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    """
+    Resolve a flush unless its caller stopped waiting.
+
+    Args:
+        future: The future of the flush.
+    """
+    if not future.done():
+        future.set_result(None)
+
+
+class SQLiteTaskStore(ITaskStore):
+    """
+    Task store backed by a SQLite database, written behind the caller in batches.
+    """
+
+    DEFAULT_BATCH_SIZE = 256
+    DEFAULT_FLUSH_INTERVAL = 0.05
+
+    # Seconds between deletions of records beyond the retention
+    PRUNE_INTERVAL_SECONDS = 60.0
+
+    # Milliseconds a connection waits for the writers of other processes
+    BUSY_TIMEOUT_MS = 5000
+
+    # Seconds before a failed batch is retried, doubled after every failure
+    RETRY_BACKOFF_SECONDS = 0.05
+    MAX_RETRY_BACKOFF_SECONDS = 5.0
+
+    # Attempts at writing a failing batch once the store is closing
+    CLOSE_ATTEMPTS = 3
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        retention_seconds: Optional[float] = None
+    ):
+        """
+        Initialize a new instance of the SQLiteTaskStore class.
+
+        Creates the database and its tables if they do not exist.
+
+        Args:
+            path: The path of the database file.
+            batch_size: The maximum number of records committed in one transaction.
+            flush_interval: The number of seconds the writer waits for more records
+                before it commits a batch.
+            retention_seconds: The number of seconds records are kept after their
+                task finished, or None to keep them forever.
+
+        Raises:
+            ValueError: If the batch size is less than 1, or the flush interval or
+                the retention is negative.
+        """
+        if batch_size < 1:
+            raise ValueError(f"Task store batch size must be at least 1, got {batch_size}")
+        if flush_interval < 0:
+            raise ValueError(f"Task store flush interval must not be negative, got {flush_interval}")
+        if retention_seconds is not None and retention_seconds < 0:
+            raise ValueError(f"Task store retention must not be negative, got {retention_seconds}")
+        self._path = path
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._retention_seconds = retention_seconds
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        # Records that are queued or being written, by task ID
+        self._pending: Dict[str, TaskStoreEntry] = {}
+        self._lock = threading.Lock()
+        self._written = 0
+        self._claimed = 0
+        self._batches = 0
+        self._errors = 0
+        self._closed = False
+
+        writer = self._connect()
+        writer.executescript(_SCHEMA)
+        # Connection for the calls that wait for their result, used from worker threads
+        self._connection = self._connect()
+        self._connection_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._run, args=(writer,), name="sqlite-task-store", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a connection to the database in WAL mode.
+
+        Returns:
+            The connection, usable from any thread.
+        """
+        connection = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        connection.execute(f"PRAGMA busy_timeout={self.BUSY_TIMEOUT_MS}")
+        connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode a commit is durable once the WAL is synced at checkpoints
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def put(self, entry: TaskStoreEntry) -> None:
+        """
+        Queue the record of a finished task for writing.
+
+        Args:
+            entry: The record of the task.
+
+        Raises:
+            RuntimeError: If the store is closed.
+        """
+        if self._closed:
+            raise RuntimeError("Task store is closed")
+        with self._lock:
+            self._pending[entry["taskID"]] = entry
+        self._queue.put(entry)
+
+    def claim(self, task_id: str, worker_id: str) -> None:
+        """
+        Queue the claim of a running task for writing.
+
+        Args:
+            task_id: The ID of the task.
+            worker_id: The ID of the worker running the task.
+
+        Raises:
+            RuntimeError: If the store is closed.
+        """
+        if self._closed:
+            raise RuntimeError("Task store is closed")
+        self._queue.put(_Claim(task_id, worker_id, time.time()))
+
+    async def get(self, task_id: str) -> Optional[TaskStoreEntry]:
+        """
+        Get the record of a finished task.
+
+        Args:
+            task_id: The ID of the task.
+
+        Returns:
+            The record, or None if there is none.
+        """
+        with self._lock:
+            entry = self._pending.get(task_id)
+        if entry is not None:
+            return entry
+        return await asyncio.get_running_loop().run_in_executor(None, self._read, task_id)
+
+    async def owner(self, task_id: str) -> Optional[TaskOwnerEntry]:
+        """
+        Get the owner of a running task.
+
+        Args:
+            task_id: The ID of the task.
+
+        Returns:
+            The owner, or None if no committed claim of the task remains.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self._read_owner, task_id)
+
+    async def request_cancel(self, task_id: str) -> bool:
+        """
+        Flag the claim of a running task for cancellation.
+
+        Args:
+            task_id: The ID of the task.
+
+        Returns:
+            True if the task has a claim, False otherwise.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self._request_cancel, task_id)
+
+    async def heartbeat(self, worker_id: str) -> List[str]:
+        """
+        Record that a worker is alive and take the cancel requests for its tasks.
+
+        Args:
+            worker_id: The ID of the worker.
+
+        Returns:
+            The IDs of the tasks of the worker that were flagged for cancellation.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self._heartbeat, worker_id)
+
+    async def flush(self) -> None:
+        """
+        Wait until every record and claim queued so far has been committed.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_Flush(loop, future))
+        await future
+
+    def close(self) -> None:
+        """
+        Commit the queued records, stop the writer thread and close the database.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        with self._connection_lock:
+            self._connection.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get the metrics of the store.
+
+        Returns:
+            The numbers of records written, of claims written, of committed
+            batches, of records pending and of failed attempts at writing a batch.
+        """
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "written": self._written,
+            "claimed": self._claimed,
+            "batches": self._batches,
+            "pending": pending,
+            "errors": self._errors,
+        }
+
+    def _read(self, task_id: str) -> Optional[TaskStoreEntry]:
+        """
+        Read the record of a task from the database.
+
+        Args:
+            task_id: The ID of the task.
+
+        Returns:
+            The record, or None if there is none.
+        """
+        with self._connection_lock:
+            row = self._connection.execute(_SELECT, (task_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "taskID": row[0],
+            "status": row[1],
+            "version": row[2],
+            "outputs": json.loads(row[3]),
+            "report": row[4],
+            "nodeTypes": json.loads(row[5]),
+            "terminalEvent": None if row[6] is None else json.loads(row[6]),
+            "finishedAt": row[7],
+        }
+
+    def _read_owner(self, task_id: str) -> Optional[TaskOwnerEntry]:
+        """
+        Read the claim of a task and the heartbeat of its worker from the database.
+
+        Args:
+            task_id: The ID of the task.
+
+        Returns:
+            The owner, or None if there is no claim.
+        """
+        with self._connection_lock:
+            row = self._connection.execute(_SELECT_OWNER, (task_id,)).fetchone()
+        if row is None:
+            return None
+        return {"taskID": row[0], "workerID": row[1], "startedAt": row[2], "heartbeatAt": row[3]}
+
+    def _request_cancel(self, task_id: str) -> bool:
+        """
+        Flag the claim of a task for cancellation in the database.
+
+        Args:
+            task_id: The ID of the task.
+
+        Returns:
+            True if a claim was flagged.
+        """
+        with self._connection_lock:
+            cursor = self._connection.execute(
+                "UPDATE task_owners SET cancel_requested = 1 WHERE task_id = ?", (task_id,)
+            )
+        return cursor.rowcount > 0
+
+    def _heartbeat(self, worker_id: str) -> List[str]:
+        """
+        Write the heartbeat of a worker and clear the cancel flags of its tasks.
+
+        Args:
+            worker_id: The ID of the worker.
+
+        Returns:
+            The IDs of the tasks whose flags were cleared.
+        """
+        with self._connection_lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(_HEARTBEAT, (worker_id, time.time()))
+                task_ids = [row[0] for row in connection.execute(
+                    "SELECT task_id FROM task_owners WHERE worker_id = ? AND cancel_requested = 1", (worker_id,)
+                )]
+                connection.execute(
+                    "UPDATE task_owners SET cancel_requested = 0 WHERE worker_id = ? AND cancel_requested = 1",
+                    (worker_id,)
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return task_ids
+
+    def _run(self, connection: sqlite3.Connection) -> None:
+        """
+        Commit the queued records and claims in batches until the store is closed.
+
+        Args:
+            connection: The connection of the writer thread.
+        """
+        last_pruned = 0.0
+        stopping = False
+        while not stopping:
+            batch: List[TaskStoreEntry] = []
+            claims: List[_Claim] = []
+            flushed: List[_Flush] = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self._flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                if isinstance(item, _Flush):
+                    # A flush commits what is queued without waiting for more records
+                    flushed.append(item)
+                    break
+                if isinstance(item, _Claim):
+                    claims.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) + len(claims) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if batch or claims:
+                self._write(connection, batch, claims)
+            if self._retention_seconds is not None and time.monotonic() - last_pruned >= self.PRUNE_INTERVAL_SECONDS:
+                last_pruned = time.monotonic()
+                self._prune(connection)
+            for flush in flushed:
+                try:
+                    flush.loop.call_soon_threadsafe(_resolve, flush.future)
+                except RuntimeError:
+                    # The loop of the caller was closed while it waited
+                    pass
+        connection.close()
+
+    def _write(self, connection: sqlite3.Connection, batch: List[TaskStoreEntry], claims: List[_Claim]) -> None:
+        """
+        Commit a batch of records and claims, retrying it until it is committed.
+
+        The records stay pending while the batch is retried. A batch that fails
+        with anything but an operational error is dropped, as is a failing batch
+        once the store is closing and `CLOSE_ATTEMPTS` attempts failed.
+
+        Args:
+            connection: The connection of the writer thread.
+            batch: The records.
+            claims: The claims.
+        """
+        try:
+            rows = [
+                (
+                    entry["taskID"],
+                    entry["status"],
+                    entry["version"],
+                    _dumps(entry["outputs"]),
+                    entry["report"],
+                    _dumps(entry["nodeTypes"]),
+                    None if entry["terminalEvent"] is None else _dumps(entry["terminalEvent"]),
+                    entry["finishedAt"],
+                )
+                for entry in batch
+            ]
+        except Exception as e:
+            rows = None
+            self._errors += 1
+            logging.error(f"Error serializing {len(batch)} task records for {self._path}, dropping them: {e}")
+
+        backoff = self.RETRY_BACKOFF_SECONDS
+        attempts = 0
+        while rows is not None:
+            attempts += 1
+            try:
+                self._commit(connection, rows, batch, claims)
+                break
+            except sqlite3.OperationalError as e:
+                self._rollback(connection)
+                self._errors += 1
+                if self._closed and attempts >= self.CLOSE_ATTEMPTS:
+                    logging.error(
+                        f"Error writing {len(batch)} task records and {len(claims)} claims to {self._path}, "
+                        f"dropping them after {attempts} attempts: {e}"
+                    )
+                    break
+                logging.warning(
+                    f"Error writing {len(batch)} task records and {len(claims)} claims to {self._path}, "
+                    f"retrying in {backoff:.2f}s: {e}"
+                )
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.MAX_RETRY_BACKOFF_SECONDS)
+            except Exception as e:
+                self._rollback(connection)
+                self._errors += 1
+                logging.error(
+                    f"Error writing {len(batch)} task records and {len(claims)} claims to {self._path}, "
+                    f"dropping them: {e}"
+                )
+                break
+        with self._lock:
+            for entry in batch:
+                if self._pending.get(entry["taskID"]) is entry:
+                    del self._pending[entry["taskID"]]
+
+    def _commit(
+        self,
+        connection: sqlite3.Connection,
+        rows: List[tuple],
+        batch: List[TaskStoreEntry],
+        claims: List[_Claim]
+    ) -> None:
+        """
+        Write a batch of records and claims in one transaction.
+
+        Claims are written first, so the record of a task claimed in the same
+        batch still replaces its claim.
+
+        Args:
+            connection: The connection of the writer thread.
+            rows: The rows of the records.
+            batch: The records.
+            claims: The claims.
+        """
+        connection.execute("BEGIN IMMEDIATE")
+        if claims:
+            connection.executemany(_CLAIM, claims)
+            # Claiming a task shows its worker is alive
+            connection.executemany(_HEARTBEAT, {claim.worker_id: claim.started_at for claim in claims}.items())
+        connection.executemany(_INSERT, rows)
+        connection.executemany(_RELEASE, [(entry["taskID"],) for entry in batch])
+        connection.execute("COMMIT")
+        self._written += len(batch)
+        self._claimed += len(claims)
+        self._batches += 1
+
+    def _rollback(self, connection: sqlite3.Connection) -> None:
+        """
+        Roll back the transaction of a failed batch, if it is still open.
+
+        Args:
+            connection: The connection of the writer thread.
+        """
+        try:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+        except sqlite3.Error as e:
+            logging.error(f"Error rolling back a batch in {self._path}: {e}")
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        """
+        Delete the records and claims of tasks that finished or started before the retention.
+
+        Args:
+            connection: The connection of the writer thread.
+        """
+        expired_at = time.time() - self._retention_seconds
+        try:
+            connection.execute("DELETE FROM tasks WHERE finished_at < ?", (expired_at,))
+            # Claims that old belong to workers that died before their tasks finished
+            connection.execute("DELETE FROM task_owners WHERE started_at < ?", (expired_at,))
+        except Exception as e:
+            logging.error(f"Error pruning task records in {self._path}: {e}")
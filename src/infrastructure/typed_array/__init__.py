@@ -0,0 +1,7 @@
+"""
+Typed array module for the workflow runtime.
+This module contains compact array representations for array variables.
+"""
+from .typed_array import StringArray, compact_array, is_numpy_array, is_typed_array
+
+__all__ = ['StringArray', 'compact_array', 'is_numpy_array', 'is_typed_array']
@@ -0,0 +1,199 @@
+"""
+Typed compact arrays for workflow array variables.
+
+A list of a million numbers is a million boxed Python objects. Homogeneous
+lists can instead be stored in flat buffers: integers in `array('q')`, floats in
+`array('d')` and strings in a `StringArray`, which keeps the UTF-8 bytes of all
+strings in one data buffer with an offsets buffer, like an Arrow string array.
+NumPy arrays produced by executors are accepted as array variables as well,
+without importing NumPy unless the caller already has.
+
+Typed arrays are converted back to lists only at the API boundary.
+"""
+import sys
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate
+from typing import Any, Iterable, Iterator, List, Optional
+
+
+class StringArray(Sequence):
+    """
+    An immutable array of strings stored in an offsets buffer and a data buffer.
+
+    Slices with a step of one share the buffers and return a new `StringArray`
+    without copying.
+    """
+
+    __slots__ = ("_data", "_offsets", "_start", "_stop")
+
+    def __init__(self, data: bytes, offsets: array, start: int = 0, stop: Optional[int] = None):
+        """
+        Initialize a new instance of the StringArray class.
+
+        Args:
+            data: The UTF-8 bytes of all strings, concatenated.
+            offsets: The offsets of the strings in the data, followed by the end offset.
+            start: The index of the first string of this array.
+            stop: The index after the last string of this array, or None for all strings.
+        """
+        self._data = data
+        self._offsets = offsets
+        self._start = start
+        self._stop = len(offsets) - 1 if stop is None else stop
+
+    @staticmethod
+    def from_strings(strings: Iterable[str]) -> 'StringArray':
+        """
+        Build a string array.
+
+        Args:
+            strings: The strings.
+
+        Returns:
+            The string array.
+        """
+        chunks = [string.encode("utf-8") for string in strings]
+        offsets = array('q', accumulate(map(len, chunks), initial=0))
+        return StringArray(b"".join(chunks), offsets)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Get the size of the buffers used by this array.
+
+        Returns:
+            The size in bytes.
+        """
+        return self._offsets[self._stop] - self._offsets[self._start] + (len(self) + 1) * self._offsets.itemsize
+
+    def __len__(self) -> int:
+        """
+        Get the number of strings.
+
+        Returns:
+            The number of strings.
+        """
+        return self._stop - self._start
+
+    def __getitem__(self, index: Any) -> Any:
+        """
+        Get a string or a slice.
+
+        Args:
+            index: The index of the string, or a slice.
+
+        Returns:
+            The string, or the sliced array.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return StringArray(self._data, self._offsets, self._start + start, self._start + max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("StringArray index out of range")
+        position = self._start + index
+        return self._data[self._offsets[position]:self._offsets[position + 1]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterate over the strings.
+
+        Returns:
+            An iterator over the strings.
+        """
+        data = self._data
+        offsets = self._offsets
+        for position in range(self._start, self._stop):
+            yield data[offsets[position]:offsets[position + 1]].decode("utf-8")
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Compare with another sequence of strings.
+
+        Args:
+            other: The other sequence.
+
+        Returns:
+            True if both hold equal strings in the same order.
+        """
+        if not isinstance(other, (list, StringArray)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        """
+        Get the representation of the array.
+
+        Returns:
+            The representation, without decoding the strings.
+        """
+        return f"StringArray(len={len(self)}, nbytes={self.nbytes})"
+
+    def tolist(self) -> List[str]:
+        """
+        Decode all strings into a Python list.
+
+        Returns:
+            The strings as a list.
+        """
+        return list(self)
+
+
+def is_numpy_array(value: Any) -> bool:
+    """
+    Check if a value is a NumPy array, without importing NumPy.
+
+    Args:
+        value: The value to check.
+
+    Returns:
+        True if the value is a NumPy array.
+    """
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def is_typed_array(value: Any) -> bool:
+    """
+    Check if a value is a typed array.
+
+    Args:
+        value: The value to check.
+
+    Returns:
+        True if the value is an `array.array`, a `StringArray` or a NumPy array.
+    """
+    return isinstance(value, (array, StringArray)) or is_numpy_array(value)
+
+
+def compact_array(values: List[Any]) -> Any:
+    """
+    Convert a homogeneous list into a typed array.
+
+    Lists of integers become `array('q')`, lists of floats become `array('d')`
+    and lists of strings become a `StringArray`. Empty lists, lists of booleans,
+    mixed lists and integers beyond 64 bits are returned as they are.
+
+    Args:
+        values: The list to convert.
+
+    Returns:
+        The typed array, or the list itself if it cannot be converted.
+    """
+    if not values:
+        return values
+    item_type = type(values[0])
+    if item_type not in (int, float, str) or any(type(value) is not item_type for value in values):
+        return values
+    if item_type is str:
+        return StringArray.from_strings(values)
+    try:
+        return array('q' if item_type is int else 'd', values)
+    except OverflowError:
+        return values
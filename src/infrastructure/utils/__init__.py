@@ -3,6 +3,8 @@ Utility functions for the workflow runtime.
 """
 from .delay import delay
 from .uuid import uuid
+from .monotonic_id import monotonic_id
 from .runtime_type import WorkflowRuntimeType
+from .jsonable import to_jsonable
 
-__all__ = ['delay', 'uuid', 'WorkflowRuntimeType']
\ No newline at end of file
+__all__ = ['delay', 'uuid', 'monotonic_id', 'WorkflowRuntimeType', 'to_jsonable']
\ No newline at end of file
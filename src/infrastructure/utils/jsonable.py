@@ -0,0 +1,63 @@
+"""
+JSON conversion utility for the API boundary.
+"""
+import numbers
+from typing import Any
+
+from ..copy_on_write import CopyOnWriteDict, CopyOnWriteList
+from ..spill import SpilledList, SpilledValue
+from ..typed_array import is_typed_array
+
+_JSON_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def to_jsonable(value: Any) -> Any:
+    """
+    Convert runtime values into plain JSON-compatible values.
+    
+    Spilled values are decoded, copy-on-write views are unwrapped, typed arrays
+    and tuples become lists and NumPy scalars become Python numbers. Containers that hold nothing to convert are
+    returned as they are, without copying.
+    
+    Args:
+        value: The value to convert.
+        
+    Returns:
+        The converted value.
+    """
+    value_type = type(value)
+    if value_type in _JSON_SCALAR_TYPES:
+        return value
+    if value_type is SpilledList:
+        return [to_jsonable(item) for item in value]
+    if value_type is SpilledValue:
+        return to_jsonable(value.resolve())
+    if value_type is CopyOnWriteDict or value_type is CopyOnWriteList:
+        return to_jsonable(value.unwrap())
+    if value_type is dict:
+        converted = None
+        for key, item in value.items():
+            converted_item = to_jsonable(item)
+            if converted_item is not item:
+                if converted is None:
+                    converted = dict(value)
+                converted[key] = converted_item
+        return value if converted is None else converted
+    if value_type is list or value_type is tuple:
+        converted = None
+        for index, item in enumerate(value):
+            converted_item = to_jsonable(item)
+            if converted_item is not item:
+                if converted is None:
+                    converted = list(value)
+                converted[index] = converted_item
+        if converted is not None:
+            return converted
+        return list(value) if value_type is tuple else value
+    if is_typed_array(value):
+        return value.tolist()
+    if isinstance(value, numbers.Integral) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    return value
@@ -0,0 +1,19 @@
+"""
+Monotonic ID generation utility.
+"""
+import itertools
+
+_counter = itertools.count(1)
+
+
+def monotonic_id() -> int:
+    """
+    Generates the next ID of a process-wide increasing sequence.
+    
+    The IDs are unique within the process and much cheaper to create and
+    store than UUIDs, which makes them suitable for high-volume records.
+    
+    Returns:
+        The next ID of the sequence.
+    """
+    return next(_counter)
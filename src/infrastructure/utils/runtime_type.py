@@ -1,8 +1,11 @@
 """
 Utility functions for determining and comparing workflow variable types.
 """
+import numbers
 from typing import Any, Optional
 from ...interface.node import WorkflowVariableType
+from ..spill import SpilledList, SpilledValue
+from ..typed_array import is_typed_array
 
 
 class WorkflowRuntimeType:
@@ -46,6 +49,24 @@ class WorkflowRuntimeType:
         if isinstance(value, dict):
             return WorkflowVariableType.Object
         
+        # 处理溢出到磁盘的值
+        if isinstance(value, SpilledList):
+            return WorkflowVariableType.Array
+        
+        if isinstance(value, SpilledValue):
+            return value.workflow_type
+        
+        # 处理紧凑类型数组和 NumPy 数组
+        if is_typed_array(value):
+            return WorkflowVariableType.Array
+        
+        # 处理 NumPy 等提供的数值标量
+        if isinstance(value, numbers.Integral):
+            return WorkflowVariableType.Integer
+        
+        if isinstance(value, numbers.Real):
+            return WorkflowVariableType.Number
+        
         return None
     
     @staticmethod
@@ -7,13 +7,14 @@ This module exports all interfaces for the workflow runtime.
 from .engine import IEngine
 
 # Task interfaces
-from .task import ITask, TaskParams
+from .task import ITask, TaskParams, ITaskStore, TaskStoreEntry, TaskOwnerEntry
 
 # Context interfaces
 from .context import (
     IContext, IVariableStore, IDocument, IState, IIOCenter,
     IStatusCenter, IWorkflowStatus, INodeStatus, ISnapshotCenter,
-    ISnapshot, IReporter, IReport, ContextData, IContainer
+    ISnapshot, IReporter, IReport, IUsageCenter, IEvent, IEventSubscription,
+    IEventBus, ContextData, IContainer
 )
 
 # Node interfaces
@@ -32,8 +33,8 @@ from .executor import (
 from .schema import (
     WorkflowSchema, NodeSchema, PortSchema, EdgeSchema,
     InvokeParams, WorkflowOutputs, TaskRunInput, TaskRunOutput,
-    TaskReportInput, TaskResultInput, TaskCancelInput,
-    WorkflowStatus, FlowGramAPIName
+    TaskReportInput, TaskResultInput, TaskCancelInput, TaskEventsInput,
+    WorkflowStatus, WorkflowEventType, FlowGramAPIName
 )
 
 # Validation interfaces
@@ -68,12 +69,13 @@ __all__ = [
     "IEngine",
     
     # Task interfaces
-    "ITask", "TaskParams",
+    "ITask", "TaskParams", "ITaskStore", "TaskStoreEntry", "TaskOwnerEntry",
     
     # Context interfaces
     "IContext", "IVariableStore", "IDocument", "IState",
     "IIOCenter", "IStatusCenter", "IWorkflowStatus", "INodeStatus",
     "ISnapshotCenter", "ISnapshot", "IReporter", "IReport",
+    "IUsageCenter", "IEvent", "IEventSubscription", "IEventBus",
     "ContextData", "IContainer",
     
     # Node interfaces
@@ -87,8 +89,8 @@ __all__ = [
     # Schema interfaces
     "WorkflowSchema", "NodeSchema", "PortSchema", "EdgeSchema",
     "InvokeParams", "WorkflowOutputs", "TaskRunInput", "TaskRunOutput",
-    "TaskReportInput", "TaskResultInput", "TaskCancelInput",
-    "WorkflowStatus", "FlowGramAPIName",
+    "TaskReportInput", "TaskResultInput", "TaskCancelInput", "TaskEventsInput",
+    "WorkflowStatus", "WorkflowEventType", "FlowGramAPIName",
     
     # Validation interfaces
     "IValidation", "ValidationResult",
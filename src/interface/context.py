@@ -2,7 +2,7 @@
 Context interfaces for the workflow runtime.
 This module contains the interfaces for workflow runtime context.
 """
-from typing import Any, Dict, List, Optional, TypeVar, Generic, Callable, TypedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TypeVar, Generic, Callable, TypedDict
 from abc import ABC, abstractmethod
 
 from .schema import InvokeParams
@@ -133,6 +133,37 @@ class IVariableStore(ABC):
             parent: The parent variable store.
         """
         pass
+    
+    @abstractmethod
+    def lookup(self, key: str, node_id: str = "default") -> Optional[Dict[str, Any]]:
+        """
+        Look up a variable in this store and its parents.
+        
+        Args:
+            key: The variable key.
+            node_id: The node ID. Defaults to "default".
+            
+        Returns:
+            The variable with its value, type and itemsType, or None if not found.
+        """
+        pass
+    
+    @abstractmethod
+    def parse_variable(
+        self, key: str, node_id: str = "default", path: Sequence[str] = ()
+    ) -> Optional[Tuple[Any, WorkflowVariableType, Optional[WorkflowVariableType]]]:
+        """
+        Look up a variable, or a value nested in it, together with its runtime type.
+        
+        Args:
+            key: The variable key.
+            node_id: The node ID. Defaults to "default".
+            path: The path of the nested value. Defaults to the variable itself.
+            
+        Returns:
+            The value, its type and the type of its items, or None if not found.
+        """
+        pass
 
 
 class IState(ABC):
@@ -142,10 +173,25 @@ class IState(ABC):
     The state manages the execution state of the workflow.
     """
     
+    @property
     @abstractmethod
-    def init(self) -> None:
+    def retain_outputs(self) -> bool:
+        """
+        Check whether node outputs are kept until the state is disposed.
+        
+        Returns:
+            True if node outputs are retained, False if they are released after their last consumer.
+        """
+        pass
+    
+    @abstractmethod
+    def init(self, retain_outputs: bool = False) -> None:
         """
         Initialize the state.
+        
+        Args:
+            retain_outputs: Whether node outputs are kept until the state is disposed,
+                instead of being released once all their consumers have run.
         """
         pass
     
@@ -180,6 +226,16 @@ class IState(ABC):
         """
         pass
     
+    @abstractmethod
+    def release_inputs(self, node: 'INode') -> None:
+        """
+        Release the outputs that a node consumed, if no other consumer still needs them.
+        
+        Args:
+            node: The node that has finished.
+        """
+        pass
+    
     @abstractmethod
     def add_executed_node(self, node: 'INode') -> None:
         """
@@ -266,6 +322,88 @@ class IIOCenter(ABC):
         pass
 
 
+class IUsageCenter(ABC):
+    """
+    Interface for usage center.
+    
+    The usage center accumulates the token usage of the workflow and enforces
+    the optional token budget of the task.
+    """
+    
+    @property
+    @abstractmethod
+    def budget(self) -> Optional[int]:
+        """
+        Get the token budget of the task.
+        
+        Returns:
+            The maximum number of total tokens, or None if the task has no budget.
+        """
+        pass
+    
+    @property
+    @abstractmethod
+    def exceeded(self) -> bool:
+        """
+        Check whether the token budget has been exceeded.
+        
+        Returns:
+            True if the total tokens used are above the budget, False otherwise.
+        """
+        pass
+    
+    @abstractmethod
+    def init(self, budget: Optional[int] = None) -> None:
+        """
+        Initialize the usage center.
+        
+        Args:
+            budget: The optional token budget of the task.
+        """
+        pass
+    
+    @abstractmethod
+    def dispose(self) -> None:
+        """
+        Dispose the usage center and release resources.
+        """
+        pass
+    
+    @abstractmethod
+    def add(self, node_id: str, usage: Dict[str, int]) -> None:
+        """
+        Add the token usage of a node execution.
+        
+        Args:
+            node_id: The ID of the node.
+            usage: The token usage with promptTokens, completionTokens and totalTokens.
+        """
+        pass
+    
+    @abstractmethod
+    def node_usage(self, node_id: str) -> Optional[Dict[str, int]]:
+        """
+        Get the accumulated token usage of a node.
+        
+        Args:
+            node_id: The ID of the node.
+            
+        Returns:
+            The token usage of the node, or None if the node used no tokens.
+        """
+        pass
+    
+    @abstractmethod
+    def export(self) -> Dict[str, Any]:
+        """
+        Export the token usage of the task.
+        
+        Returns:
+            The task totals, the budget and whether it has been exceeded.
+        """
+        pass
+
+
 class IStatusCenter(ABC):
     """
     Interface for status center.
@@ -285,9 +423,12 @@ class IStatusCenter(ABC):
         pass
     
     @abstractmethod
-    def init(self) -> None:
+    def init(self, document: Optional[IDocument] = None) -> None:
         """
         Initialize the status center.
+        
+        Args:
+            document: The workflow document whose node ordinals index the node statuses.
         """
         pass
     
@@ -323,6 +464,17 @@ class IStatusCenter(ABC):
             The list of node IDs.
         """
         pass
+    
+    @abstractmethod
+    def add_listener(self, listener: Callable[[Optional[str]], None]) -> None:
+        """
+        Add a listener for status changes.
+        
+        Args:
+            listener: Called with the node ID when a node status changes, and with
+                None when the workflow status changes.
+        """
+        pass
 
 
 class IWorkflowStatus(ABC):
@@ -379,6 +531,8 @@ class INodeStatus(ABC):
     The node status manages the status of a node.
     """
     
+    __slots__ = ()
+    
     @abstractmethod
     def process(self) -> None:
         """
@@ -416,9 +570,12 @@ class ISnapshotCenter(ABC):
     """
     
     @abstractmethod
-    def init(self) -> None:
+    def init(self, options: Optional[Dict[str, Any]] = None) -> None:
         """
         Initialize the snapshot center.
+        
+        Args:
+            options: The snapshot options of the task, or None to record every node run in full.
         """
         pass
     
@@ -441,6 +598,86 @@ class ISnapshotCenter(ABC):
             The created snapshot.
         """
         pass
+    
+    @property
+    @abstractmethod
+    def offloaded(self) -> bool:
+        """
+        Check if snapshots were offloaded.
+        
+        Returns:
+            True if snapshots were written to a scratch file.
+        """
+        pass
+    
+    @abstractmethod
+    def node_ids(self) -> List[str]:
+        """
+        Get the IDs of the nodes that have snapshots.
+        
+        Returns:
+            The node IDs, in the order the nodes were first recorded.
+        """
+        pass
+    
+    @abstractmethod
+    def node_snapshots(self, node_id: str) -> Sequence['ISnapshot']:
+        """
+        Get the snapshots of a node.
+        
+        Args:
+            node_id: The node ID.
+            
+        Returns:
+            The snapshots of the node in creation order. Offloaded snapshots are
+            decoded only when they are exported.
+        """
+        pass
+    
+    @abstractmethod
+    def count(self, node_id: str) -> int:
+        """
+        Count the snapshots of a node.
+        
+        Args:
+            node_id: The node ID.
+            
+        Returns:
+            The number of snapshots of the node.
+        """
+        pass
+    
+    @abstractmethod
+    def export_node(
+        self,
+        node_id: str,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Export a page of the snapshots of a node.
+        
+        Args:
+            node_id: The node ID.
+            after: The ID of the snapshot to start after, or None to start at the first.
+            limit: The maximum number of snapshots, or None for all.
+            
+        Returns:
+            The snapshot data in creation order, and the cursor of the next page,
+            or None if there are no more snapshots.
+        """
+        pass
+    
+    @abstractmethod
+    def add_listener(self, listener: Callable[[str, 'ISnapshot', bool], None]) -> None:
+        """
+        Add a listener for snapshot changes.
+        
+        Args:
+            listener: Called with the node ID, the snapshot and whether the snapshot
+                was removed, whenever a snapshot is recorded, updated or removed.
+        """
+        pass
 
 
 class ISnapshot(ABC):
@@ -450,6 +687,8 @@ class ISnapshot(ABC):
     A snapshot represents the state of a node execution.
     """
     
+    __slots__ = ()
+    
     @abstractmethod
     def add_data(self, data: Dict[str, Any]) -> None:
         """
@@ -491,6 +730,44 @@ class IReporter(ABC):
             The exported report.
         """
         pass
+    
+    @property
+    @abstractmethod
+    def version(self) -> int:
+        """
+        Get the version of the report.
+        
+        Returns:
+            The version, which increases whenever a status or a snapshot changes.
+        """
+        pass
+    
+    @abstractmethod
+    def export_since(self, since: int) -> Dict[str, Any]:
+        """
+        Export the changes of the report since a version.
+        
+        Args:
+            since: The version the caller has seen.
+            
+        Returns:
+            The report delta.
+        """
+        pass
+    
+    @abstractmethod
+    def freeze(self, inputs: Dict[str, Any], outputs: Dict[str, Any]) -> 'IReporter':
+        """
+        Freeze the final report of a finished task.
+        
+        Args:
+            inputs: The workflow inputs.
+            outputs: The workflow outputs.
+            
+        Returns:
+            A reporter serving the final report without the context of the task.
+        """
+        pass
 
 
 class IReport(ABC):
@@ -502,6 +779,152 @@ class IReport(ABC):
     pass
 
 
+class IEvent(ABC):
+    """
+    Interface for events of the event bus.
+    
+    An event is built once and shared by every subscriber of the task.
+    """
+    
+    @property
+    @abstractmethod
+    def type(self) -> str:
+        """
+        Get the type of the event.
+        
+        Returns:
+            The event type.
+        """
+        pass
+    
+    @property
+    @abstractmethod
+    def data(self) -> Dict[str, Any]:
+        """
+        Get the data of the event.
+        
+        Returns:
+            The event data, which must not be modified.
+        """
+        pass
+    
+    @property
+    @abstractmethod
+    def json(self) -> str:
+        """
+        Get the event data serialized as JSON.
+        
+        Returns:
+            The JSON text, serialized once for all subscribers.
+        """
+        pass
+
+
+class IEventSubscription(ABC):
+    """
+    Interface for subscriptions to the event bus.
+    
+    A subscription is an asynchronous iterator over the events published after
+    it was created. It ends when the event bus is closed.
+    """
+    
+    @abstractmethod
+    def __aiter__(self) -> 'IEventSubscription':
+        """
+        Get the asynchronous iterator over the events.
+        
+        Returns:
+            The subscription itself.
+        """
+        pass
+    
+    @abstractmethod
+    async def __anext__(self) -> IEvent:
+        """
+        Wait for the next event.
+        
+        Returns:
+            The next event.
+            
+        Raises:
+            StopAsyncIteration: If the event bus is closed and all events were received.
+        """
+        pass
+    
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Stop receiving events.
+        """
+        pass
+
+
+class IEventBus(ABC):
+    """
+    Interface for event bus.
+    
+    The event bus publishes the status changes of a task to its subscribers.
+    """
+    
+    @abstractmethod
+    def init(self) -> None:
+        """
+        Initialize the event bus.
+        """
+        pass
+    
+    @abstractmethod
+    def dispose(self) -> None:
+        """
+        Dispose the event bus and end all subscriptions.
+        """
+        pass
+    
+    @property
+    @abstractmethod
+    def closed(self) -> bool:
+        """
+        Check whether the event bus is closed.
+        
+        Returns:
+            True if no more events will be published.
+        """
+        pass
+    
+    @abstractmethod
+    def subscribe(self, buffer_size: Optional[int] = None) -> IEventSubscription:
+        """
+        Subscribe to the events of the task.
+        
+        Args:
+            buffer_size: The number of events buffered for the subscriber, or None for the default.
+            
+        Returns:
+            The subscription.
+        """
+        pass
+    
+    @abstractmethod
+    def publish(self, data: Dict[str, Any]) -> None:
+        """
+        Publish an event to all subscribers.
+        
+        Args:
+            data: The event data, with the event type under "type".
+        """
+        pass
+    
+    @abstractmethod
+    def freeze(self) -> 'IEventBus':
+        """
+        Freeze the event bus of a finished task.
+        
+        Returns:
+            A closed event bus serving the workflow_terminated event without the context of the task.
+        """
+        pass
+
+
 T = TypeVar('T')
 
 class IContext(ABC):
@@ -588,6 +1011,28 @@ class IContext(ABC):
         """
         pass
     
+    @property
+    @abstractmethod
+    def usage_center(self) -> IUsageCenter:
+        """
+        Get the usage center.
+        
+        Returns:
+            The usage center.
+        """
+        pass
+    
+    @property
+    @abstractmethod
+    def event_bus(self) -> IEventBus:
+        """
+        Get the event bus.
+        
+        Returns:
+            The event bus.
+        """
+        pass
+    
     @abstractmethod
     def init(self, params: InvokeParams) -> None:
         """
@@ -631,7 +1076,9 @@ class ContextData:
         io_center: IIOCenter,
         snapshot_center: ISnapshotCenter,
         status_center: IStatusCenter,
-        reporter: IReporter
+        reporter: IReporter,
+        usage_center: IUsageCenter,
+        event_bus: IEventBus
     ):
         """
         Initialize context data.
@@ -644,6 +1091,8 @@ class ContextData:
             snapshot_center: The snapshot center.
             status_center: The status center.
             reporter: The reporter.
+            usage_center: The usage center.
+            event_bus: The event bus.
         """
         self.document = document
         self.variable_store = variable_store
@@ -652,6 +1101,8 @@ class ContextData:
         self.snapshot_center = snapshot_center
         self.status_center = status_center
         self.reporter = reporter
+        self.usage_center = usage_center
+        self.event_bus = event_bus
 
 
 class IContainer(Generic[T], ABC):
@@ -39,16 +39,24 @@ class ExecutionResult:
     This class represents the result of executing a node.
     """
     
-    def __init__(self, outputs: Dict[str, Any], branch: Optional[str] = None):
+    def __init__(
+        self,
+        outputs: Dict[str, Any],
+        branch: Optional[str] = None,
+        usage: Optional[Dict[str, int]] = None
+    ):
         """
         Initialize execution result.
         
         Args:
             outputs: The outputs of the node execution.
             branch: The branch to follow (for condition nodes).
+            usage: The token usage of the node execution (for LLM nodes), with
+                promptTokens, completionTokens and totalTokens.
         """
         self.outputs = outputs
         self.branch = branch
+        self.usage = usage
 
 
 class IExecutor(ABC):
@@ -43,6 +43,8 @@ class IPort(ABC):
     A port represents an input or output point of a node.
     """
     
+    __slots__ = ()
+    
     @property
     @abstractmethod
     def id(self) -> str:
@@ -95,6 +97,8 @@ class IEdge(ABC):
     An edge represents a connection between two ports.
     """
     
+    __slots__ = ()
+    
     @property
     @abstractmethod
     def id(self) -> str:
@@ -136,6 +140,8 @@ class IPorts(ABC):
     This interface provides access to the input and output ports of a node.
     """
     
+    __slots__ = ()
+    
     @property
     @abstractmethod
     def inputs(self) -> Dict[str, IPort]:
@@ -166,6 +172,8 @@ class INode(ABC):
     A node represents a processing unit in a workflow.
     """
     
+    __slots__ = ()
+    
     @property
     @abstractmethod
     def id(self) -> str:
@@ -51,41 +51,134 @@ class WorkflowSchema(TypedDict):
     edges: List[EdgeSchema]
 
 
-class TaskRunInput(TypedDict):
+class SnapshotOptions(TypedDict, total=False):
     """
-    Input for task run API.
+    Snapshot options of a task run.
+    
+    Attributes:
+        mode: "full" records every node run (default), "metadata" records runs
+            without inputs and outputs, "sampled" records a sample of
+            the runs of every node and "off" records nothing.
+        sampleEvery: In sampled mode, record every N-th run of a node.
+        sampleFirst: In sampled mode, record the first K runs of a node.
+        sampleLast: In sampled mode, keep the last K runs of a node.
+        maxPayloadBytes: Input and output values whose estimated size exceeds
+            this many bytes are replaced with a truncation marker.
+        offload: Append the snapshots to a spill log in a scratch file as they
+            are recorded, and keep only their log offsets in memory once the
+            task is disposed. Workflow level only.
+        nodes: Options of single nodes by node ID, overriding the options above.
+    """
+    mode: str
+    sampleEvery: int
+    sampleFirst: int
+    sampleLast: int
+    maxPayloadBytes: int
+    offload: bool
+    nodes: Dict[str, 'SnapshotOptions']
+
+
+class TaskRunOptions(TypedDict, total=False):
+    """
+    Options for task run API.
     
-    This class represents the input for the task run API.
+    Attributes:
+        tokenBudget: The maximum number of total tokens the task may use.
+        retainOutputs: Keep node outputs until the task is disposed, instead of
+            releasing them once all their consumers have run.
+        compactArrays: Store input lists of integers, floats or strings as typed arrays.
+        spillThresholdBytes: Inputs whose estimated size exceeds this many bytes
+            are moved to memory-mapped scratch files.
+        snapshot: Which node runs are recorded as snapshots, and how much of them.
     """
+    tokenBudget: int
+    retainOutputs: bool
+    compactArrays: bool
+    spillThresholdBytes: int
+    snapshot: SnapshotOptions
+
+
+class _TaskRunRequiredInput(TypedDict):
     schema: str
     inputs: Dict[str, Any]
 
 
-class TaskRunOutput(TypedDict):
+class TaskRunInput(_TaskRunRequiredInput, total=False):
+    """
+    Input for task run API.
+    
+    This class represents the input for the task run API. With sync, the API
+    waits up to wait milliseconds for the task to terminate and returns its outputs.
+    """
+    options: Optional[TaskRunOptions]
+    sync: Optional[bool]
+    wait: Optional[int]
+
+
+class _TaskRunRequiredOutput(TypedDict):
+    taskID: str
+
+
+class TaskRunOutput(_TaskRunRequiredOutput, total=False):
     """
     Output for task run API.
     
-    This class represents the output for the task run API.
+    This class represents the output for the task run API. Synchronous runs
+    also return whether the task terminated in time, with its status and outputs.
     """
+    terminated: bool
+    status: str
+    outputs: Dict[str, Any]
+
+
+class _TaskReportRequiredInput(TypedDict):
     taskID: str
 
 
-class TaskReportInput(TypedDict):
+class TaskReportInput(_TaskReportRequiredInput, total=False):
     """
     Input for task report API.
     
     This class represents the input for the task report API.
+    
+    Attributes:
+        since: Return only what changed since this report version.
+        ifNoneMatch: The report version the caller already has. If the report
+            is still at this version, only the version is returned.
+        nodeIDs: Report only these nodes.
+        statuses: Report only nodes with these statuses.
+        types: Report only nodes of these types.
+        fields: The node report fields to include, for example only statuses
+            and timings without snapshots.
+        snapshotFields: The snapshot fields to include, for example without
+            inputs and outputs.
+        cursor: Start the snapshots of each node after this snapshot ID, the
+            `nextCursor` of the previous page.
+        limit: The maximum number of snapshots per node.
     """
+    since: Optional[int]
+    ifNoneMatch: Optional[int]
+    nodeIDs: Optional[List[str]]
+    statuses: Optional[List[str]]
+    types: Optional[List[str]]
+    fields: Optional[List[str]]
+    snapshotFields: Optional[List[str]]
+    cursor: Optional[str]
+    limit: Optional[int]
+
+
+class _TaskResultRequiredInput(TypedDict):
     taskID: str
 
 
-class TaskResultInput(TypedDict):
+class TaskResultInput(_TaskResultRequiredInput, total=False):
     """
     Input for task result API.
     
-    This class represents the input for the task result API.
+    This class represents the input for the task result API. With wait, the API
+    waits up to wait milliseconds for a running task to terminate.
     """
-    taskID: str
+    wait: Optional[int]
 
 
 class TaskCancelInput(TypedDict):
@@ -97,6 +190,20 @@ class TaskCancelInput(TypedDict):
     taskID: str
 
 
+class _TaskEventsRequiredInput(TypedDict):
+    taskID: str
+
+
+class TaskEventsInput(_TaskEventsRequiredInput, total=False):
+    """
+    Input for task events API.
+    
+    This class represents the input for the task events API. The buffer size
+    bounds the events kept for a subscriber that falls behind.
+    """
+    bufferSize: Optional[int]
+
+
 class InvokeParams:
     """
     Parameters for invoking a workflow.
@@ -104,16 +211,23 @@ class InvokeParams:
     This class represents the parameters for invoking a workflow.
     """
     
-    def __init__(self, schema: Union[str, Dict[str, Any]], inputs: Dict[str, Any]):
+    def __init__(
+        self,
+        schema: Union[str, Dict[str, Any]],
+        inputs: Dict[str, Any],
+        options: Optional[TaskRunOptions] = None
+    ):
         """
         Initialize invoke parameters.
         
         Args:
             schema: The workflow schema, either as a JSON string or a dictionary.
             inputs: The workflow inputs.
+            options: Optional task options, such as the token budget.
         """
         self.schema = schema
         self.inputs = inputs
+        self.options = options
 
 
 class WorkflowOutputs(TypedDict):
@@ -137,6 +251,21 @@ class WorkflowStatus(str, Enum):
     Cancelled = "cancelled"
 
 
+class WorkflowEventType(str, Enum):
+    """
+    Enum for workflow event types.
+    
+    This enum represents the types of events published to the subscribers of a task.
+    """
+    NodeStarted = "node_started"
+    NodeSucceeded = "node_succeeded"
+    NodeFailed = "node_failed"
+    NodeCancelled = "node_cancelled"
+    WorkflowStarted = "workflow_started"
+    WorkflowTerminated = "workflow_terminated"
+    EventsDropped = "events_dropped"
+
+
 class FlowGramAPIName(str, Enum):
     """
     Enum for FlowGram API names.
@@ -147,5 +276,8 @@ class FlowGramAPIName(str, Enum):
     TaskReport = "taskReport"
     TaskResult = "taskResult"
     TaskCancel = "taskCancel"
+    TaskEvents = "taskEvents"
+    LLMMetrics = "llmMetrics"
+    TaskMetrics = "taskMetrics"
     ServerInfo = "serverInfo"
     Validation = "validation"
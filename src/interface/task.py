@@ -1,8 +1,8 @@
 """
 Task interfaces for the workflow runtime.
-This module contains the interfaces for workflow runtime tasks.
+This module contains the interfaces for workflow runtime tasks and task stores.
 """
-from typing import Any, Dict, Optional, Callable
+from typing import Any, Dict, List, Optional, Callable, TypedDict
 from abc import ABC, abstractmethod
 
 
@@ -57,6 +57,19 @@ class ITask(ABC):
         """
         pass
     
+    @abstractmethod
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the task to complete.
+        
+        Args:
+            timeout: The maximum number of seconds to wait, or None to wait until the task completes.
+            
+        Returns:
+            True if the task has completed, False if the timeout expired first.
+        """
+        pass
+    
     @abstractmethod
     def cancel(self) -> None:
         """
@@ -106,5 +119,148 @@ class TaskParams:
         self.processing = processing
 
 
+class TaskStoreEntry(TypedDict):
+    """
+    The persisted record of a finished task.
+    """
+    taskID: str
+    status: str
+    version: int
+    outputs: Dict[str, Any]
+    # The final report as compressed JSON, as dumped by the frozen reporter
+    report: bytes
+    nodeTypes: Dict[str, str]
+    terminalEvent: Optional[Dict[str, Any]]
+    # The time the task finished, in seconds since the epoch
+    finishedAt: float
+
+
+class TaskOwnerEntry(TypedDict):
+    """
+    The owner of a running task in a task store shared by several workers.
+    """
+    taskID: str
+    workerID: str
+    # The time the task was claimed, in seconds since the epoch
+    startedAt: float
+    # The last time the worker was seen alive, in seconds since the epoch, or None if never
+    heartbeatAt: Optional[float]
+
+
+class ITaskStore(ABC):
+    """
+    Interface for task stores.
+    
+    A task store persists the records of finished tasks, so their results and
+    reports survive a restart of the process and can be served once they are no
+    longer held in memory.
+    
+    A store shared by several worker processes also records which worker runs
+    each task, so any worker can find the owner of a running task and ask it
+    to cancel the task.
+    """
+    
+    @abstractmethod
+    def put(self, entry: TaskStoreEntry) -> None:
+        """
+        Store the record of a finished task, replacing any previous record.
+        
+        The entry may be written later, but the call must not block on I/O.
+        
+        Args:
+            entry: The record of the task.
+        """
+        pass
+    
+    @abstractmethod
+    async def get(self, task_id: str) -> Optional[TaskStoreEntry]:
+        """
+        Get the record of a finished task.
+        
+        Args:
+            task_id: The ID of the task.
+            
+        Returns:
+            The record, including one that was put but not written yet, or None if there is none.
+        """
+        pass
+    
+    @abstractmethod
+    def claim(self, task_id: str, worker_id: str) -> None:
+        """
+        Record that a worker runs a task, until the record of the task is put.
+        
+        The claim may be written later, but the call must not block on I/O.
+        
+        Args:
+            task_id: The ID of the task.
+            worker_id: The ID of the worker running the task.
+        """
+        pass
+    
+    @abstractmethod
+    async def owner(self, task_id: str) -> Optional[TaskOwnerEntry]:
+        """
+        Get the owner of a running task.
+        
+        Args:
+            task_id: The ID of the task.
+            
+        Returns:
+            The owner, or None if no worker has claimed the task or the task has finished.
+        """
+        pass
+    
+    @abstractmethod
+    async def request_cancel(self, task_id: str) -> bool:
+        """
+        Ask the owner of a running task to cancel it.
+        
+        Args:
+            task_id: The ID of the task.
+            
+        Returns:
+            True if the task is running and its owner will be asked, False otherwise.
+        """
+        pass
+    
+    @abstractmethod
+    async def heartbeat(self, worker_id: str) -> List[str]:
+        """
+        Record that a worker is alive and take the cancel requests for its tasks.
+        
+        Args:
+            worker_id: The ID of the worker.
+            
+        Returns:
+            The IDs of the tasks of the worker that other workers asked to cancel.
+        """
+        pass
+    
+    @abstractmethod
+    async def flush(self) -> None:
+        """
+        Wait until every record put and every task claimed so far has been written.
+        """
+        pass
+    
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Write the pending records and release the store.
+        """
+        pass
+    
+    @abstractmethod
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get the metrics of the store.
+        
+        Returns:
+            The numbers of records written and pending, and of failed writes.
+        """
+        pass
+
+
 # Forward reference for IContext
 from .context import IContext
@@ -0,0 +1,115 @@
+"""
+Tests for LLM micro-batching.
+This module runs the batcher against an in-process stand-in server.
+"""
+import asyncio
+import unittest
+from typing import Any, Dict, List
+
+import httpx
+from fastapi import FastAPI
+
+from src.nodes.llm.llm_client import LLMClient
+from src.nodes.llm.llm_batcher import LLMBatcher
+
+
+def completion(content: str) -> Dict[str, Any]:
+    """Build a chat-completion response body."""
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+def create_stand_in_server(batch_sizes: List[int], with_batch_endpoint: bool = True) -> FastAPI:
+    """Create a stand-in server that echoes the user prompt."""
+    app = FastAPI()
+
+    @app.post("/api/v3/chat/completions")
+    async def chat_completions(body: Dict[str, Any]):
+        return completion(f"echo: {body['messages'][-1]['content']}")
+
+    if with_batch_endpoint:
+        @app.post("/api/v3/batch/chat/completions")
+        async def batch_chat_completions(body: Dict[str, Any]):
+            batch_sizes.append(len(body["requests"]))
+            responses = []
+            for request in body["requests"]:
+                prompt = request["messages"][-1]["content"]
+                if prompt == "fail":
+                    responses.append({"error": {"message": "bad prompt"}})
+                else:
+                    responses.append(completion(f"echo: {prompt}"))
+            return {"responses": responses}
+
+    return app
+
+
+class TestLLMBatcher(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the LLM batcher."""
+
+    def create_client(self, app: FastAPI, host: str = "http://stand-in/api/v3") -> LLMClient:
+        """Create a client that targets the stand-in server."""
+        return LLMClient(
+            model_name="test-model",
+            api_key="test-key",
+            api_host=host,
+            transport=httpx.ASGITransport(app=app)
+        )
+
+    async def test_concurrent_prompts_share_a_batch(self):
+        """Test that concurrent prompts are sent in one batch and fanned back in order."""
+        batch_sizes: List[int] = []
+        client = self.create_client(create_stand_in_server(batch_sizes))
+        batcher = LLMBatcher(max_batch_size=4, max_wait_ms=50)
+
+        results = await asyncio.gather(*[
+            batcher.submit(client, f"prompt {i}") for i in range(4)
+        ])
+
+        self.assertEqual(results, [f"echo: prompt {i}" for i in range(4)])
+        self.assertEqual(batch_sizes, [4])
+        self.assertEqual(batcher.stats(), {"batches": 1, "prompts": 4})
+
+    async def test_time_window_flushes_partial_batch(self):
+        """Test that a partial batch is sent when the time window ends."""
+        batch_sizes: List[int] = []
+        client = self.create_client(create_stand_in_server(batch_sizes))
+        batcher = LLMBatcher(max_batch_size=100, max_wait_ms=5)
+
+        results = await asyncio.gather(*[
+            batcher.submit(client, f"prompt {i}") for i in range(3)
+        ])
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(batch_sizes, [3])
+
+    async def test_item_errors_are_isolated(self):
+        """Test that an error for one prompt does not fail the others."""
+        client = self.create_client(create_stand_in_server([]))
+        batcher = LLMBatcher(max_batch_size=2, max_wait_ms=50)
+
+        results = await asyncio.gather(
+            batcher.submit(client, "ok"),
+            batcher.submit(client, "fail"),
+            return_exceptions=True
+        )
+
+        self.assertEqual(results[0], "echo: ok")
+        self.assertIsInstance(results[1], Exception)
+
+    async def test_falls_back_without_batch_endpoint(self):
+        """Test that prompts are sent individually when the server has no batch endpoint."""
+        client = self.create_client(
+            create_stand_in_server([], with_batch_endpoint=False),
+            host="http://no-batch-stand-in/api/v3"
+        )
+        batcher = LLMBatcher(max_batch_size=2, max_wait_ms=50)
+
+        results = await asyncio.gather(
+            batcher.submit(client, "a"),
+            batcher.submit(client, "b")
+        )
+
+        self.assertEqual(results, ["echo: a", "echo: b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Tests for hedged LLM requests.
+This module contains tests for the latency histogram and the hedging policy.
+"""
+import asyncio
+import unittest
+
+from src.nodes.llm.latency_histogram import LatencyHistogram
+from src.nodes.llm.hedging import HedgingPolicy
+
+
+def warm_histogram(latency: float, samples: int = 20) -> LatencyHistogram:
+    """Create a histogram filled with the same latency sample."""
+    histogram = LatencyHistogram()
+    for _ in range(samples):
+        histogram.record(latency)
+    return histogram
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test cases for the latency histogram."""
+
+    def test_percentile(self):
+        """Test that percentiles are computed over the recorded samples."""
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile(95))
+        for latency in range(1, 101):
+            histogram.record(latency / 100)
+        self.assertEqual(histogram.percentile(50), 0.5)
+        self.assertEqual(histogram.percentile(95), 0.95)
+        self.assertEqual(histogram.percentile(100), 1.0)
+
+    def test_rolling_window(self):
+        """Test that old samples are evicted from the window."""
+        histogram = LatencyHistogram(window_size=3)
+        for latency in [10.0, 1.0, 2.0, 3.0]:
+            histogram.record(latency)
+        self.assertEqual(histogram.count, 3)
+        self.assertEqual(histogram.percentile(100), 3.0)
+
+
+class TestHedgingPolicy(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the hedging policy."""
+
+    async def test_no_hedge_without_history(self):
+        """Test that requests are not hedged before enough samples exist."""
+        policy = HedgingPolicy(min_samples=20, budget_percent=100)
+        calls = []
+
+        async def request():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        result = await policy.run(request, LatencyHistogram())
+        self.assertEqual(result, "ok")
+        self.assertEqual(len(calls), 1)
+
+    async def test_hedge_wins_and_loser_is_cancelled(self):
+        """Test that a slow primary is hedged and cancelled when the hedge wins."""
+        policy = HedgingPolicy(percentile=95, budget_percent=100)
+        delays = [1.0, 0.01]
+        cancelled = []
+
+        async def request():
+            delay = delays.pop(0)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            return delay
+
+        histogram = warm_histogram(0.01)
+        result = await policy.run(request, histogram)
+        await asyncio.sleep(0)
+        self.assertEqual(result, 0.01)
+        self.assertEqual(cancelled, [1.0])
+        self.assertEqual(policy.stats(), {"requests": 1, "hedges": 1})
+        # The cancelled primary is recorded with the time it ran as a lower bound
+        self.assertEqual(histogram.count, 21)
+        self.assertGreater(histogram.percentile(100), 0.02)
+
+    async def test_budget_caps_hedges(self):
+        """Test that the budget limits the number of hedges."""
+        policy = HedgingPolicy(percentile=50, budget_percent=50)
+        histogram = warm_histogram(0.001)
+
+        async def request():
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        for _ in range(4):
+            await policy.run(request, histogram)
+        self.assertEqual(policy.stats(), {"requests": 4, "hedges": 2})
+
+    async def test_failed_primary_falls_back_to_hedge(self):
+        """Test that a failing request does not win over a successful one."""
+        policy = HedgingPolicy(percentile=95, budget_percent=100)
+        attempts = []
+
+        async def request():
+            attempts.append(1)
+            if len(attempts) == 1:
+                await asyncio.sleep(0.03)
+                raise ValueError("upstream error")
+            await asyncio.sleep(0.05)
+            return "hedged"
+
+        result = await policy.run(request, warm_histogram(0.01))
+        self.assertEqual(result, "hedged")
+
+
+if __name__ == "__main__":
+    unittest.main()
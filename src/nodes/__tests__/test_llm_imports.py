@@ -0,0 +1,32 @@
+"""
+Tests for the import cost of the LLM node.
+This module checks that LangChain stays off the startup path.
+"""
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+class TestLLMImports(unittest.TestCase):
+    """Test cases for LLM node imports."""
+
+    def test_runtime_import_does_not_load_langchain(self):
+        """Test that importing the runtime does not import LangChain."""
+        result = subprocess.run(
+            [
+                sys.executable, "-c",
+                "import sys, src; print(sorted(m for m in sys.modules if m.startswith('langchain')))"
+            ],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+"""
+Tests for the mock LLM server.
+This module runs LLMClient against the in-process mock server.
+"""
+import asyncio
+import gc
+import json
+import random
+import time
+import unittest
+import weakref
+
+import httpx
+
+from src.nodes.llm.llm_client import LLMClient
+from src.nodes.llm.mock_llm_server import (
+    LatencyDistribution,
+    MockLLMServer,
+    MockLLMServerConfig,
+    create_mock_llm_app,
+)
+
+
+def create_client(config: MockLLMServerConfig) -> LLMClient:
+    """Create a client that targets an in-process mock server."""
+    return LLMClient(
+        model_name="mock-model",
+        api_key="test-key",
+        api_host="http://mock-llm-server/api/v3",
+        temperature=0.5,
+        transport=httpx.ASGITransport(app=create_mock_llm_app(config))
+    )
+
+
+class TestLatencyDistribution(unittest.TestCase):
+    """Test cases for latency distributions."""
+
+    def test_samples_are_never_negative(self):
+        """Test that samples are clamped to zero."""
+        distribution = LatencyDistribution("normal", mean_ms=1, stddev_ms=100)
+        rng = random.Random(1)
+        self.assertTrue(all(distribution.sample(rng) >= 0 for _ in range(100)))
+
+    def test_unknown_distribution(self):
+        """Test that unknown distributions are rejected."""
+        with self.assertRaises(ValueError):
+            LatencyDistribution("bimodal")
+
+
+class TestMockLLMServer(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the mock LLM server."""
+
+    async def test_chat_completion(self):
+        """Test that the server answers chat completions like the mock LLM."""
+        client = create_client(MockLLMServerConfig())
+        result = await client.generate(prompt="How are you?", system_prompt="Be brief.")
+        self.assertIn("my name is mock-model", result)
+        self.assertIn('prompt is "How are you?"', result)
+
+    async def test_usage(self):
+        """Test that the usage block is returned with the response and aggregated per model and host."""
+        client = create_client(MockLLMServerConfig())
+        before = {(m["model"], m["host"]): m for m in LLMClient.usage_metrics()}.get(("mock-model", client.api_host))
+        result = await client.generate(prompt="How are you?")
+        
+        self.assertEqual(result.usage["promptTokens"], 3)
+        self.assertEqual(
+            result.usage["totalTokens"],
+            result.usage["promptTokens"] + result.usage["completionTokens"]
+        )
+        after = {(m["model"], m["host"]): m for m in LLMClient.usage_metrics()}[("mock-model", client.api_host)]
+        self.assertEqual(after["requests"], (before["requests"] if before else 0) + 1)
+        self.assertEqual(after["totalTokens"], (before["totalTokens"] if before else 0) + result.usage["totalTokens"])
+
+    async def test_latency(self):
+        """Test that responses are delayed by the latency distribution."""
+        client = create_client(MockLLMServerConfig(latency=LatencyDistribution("fixed", ms=50)))
+        started_at = time.perf_counter()
+        await client.generate(prompt="hello")
+        self.assertGreaterEqual(time.perf_counter() - started_at, 0.05)
+
+    async def test_rate_limit_injection(self):
+        """Test that 429 errors are injected with a Retry-After header."""
+        app = create_mock_llm_app(MockLLMServerConfig(rate_limit_rate=1.0, retry_after_seconds=3))
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://mock") as http:
+            response = await http.post("/api/v3/chat/completions", json={"model": "m", "messages": []})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "3")
+
+    async def test_error_injection(self):
+        """Test that server errors surface as LLMClient errors."""
+        client = create_client(MockLLMServerConfig(error_rate=1.0))
+        with self.assertRaises(Exception) as raised:
+            await client.generate(prompt="hello")
+        self.assertIn("500", str(raised.exception))
+
+    async def test_streaming(self):
+        """Test that streamed chunks add up to the full completion."""
+        app = create_mock_llm_app(MockLLMServerConfig(tokens_per_second=1000))
+        body = {"model": "m", "stream": True, "messages": [{"role": "user", "content": "hi there"}]}
+        chunks = []
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://mock") as http:
+            async with http.stream("POST", "/api/v3/chat/completions", json=body) as response:
+                async for line in response.aiter_lines():
+                    if line.startswith("data: ") and line != "data: [DONE]":
+                        chunks.append(json.loads(line[len("data: "):]))
+        content = "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks)
+        self.assertIn('prompt is "hi there"', content)
+        self.assertEqual(chunks[-1]["choices"][0]["finish_reason"], "stop")
+
+    async def test_batch_endpoint(self):
+        """Test that the batch endpoint answers every request in order."""
+        client = create_client(MockLLMServerConfig())
+        results = await client.generate_batch([("first", None), ("second", None)])
+        self.assertIn('prompt is "first"', results[0])
+        self.assertIn('prompt is "second"', results[1])
+
+    async def test_background_server(self):
+        """Test that the background server accepts real connections."""
+        with MockLLMServer(MockLLMServerConfig()) as server:
+            client = LLMClient(model_name="mock-model", api_key="k", api_host=server.api_host)
+            result = await client.generate(prompt="over the network")
+            self.assertIn("over the network", result)
+            self.assertEqual(server.stats["requests"], 1)
+
+
+
+class TestPooledHTTPClient(unittest.TestCase):
+    """Test cases for the HTTP clients pooled per event loop."""
+
+    def test_pooled_clients_are_closed_with_their_loops(self):
+        """Test that the pooled client is closed when its loop shuts down and the loop is released."""
+        loops, clients = [], []
+        with MockLLMServer(MockLLMServerConfig()) as server:
+            async def generate():
+                client = LLMClient(model_name="mock-model", api_key="k", api_host=server.api_host)
+                await client.generate(prompt="hello")
+                loop = asyncio.get_running_loop()
+                loops.append(weakref.ref(loop))
+                clients.append(LLMClient._http_clients[loop][0])
+
+            for _ in range(3):
+                asyncio.run(generate())
+        self.assertTrue(all(client.is_closed for client in clients))
+        self.assertEqual(len(LLMClient._http_clients), 0)
+        gc.collect()
+        self.assertTrue(all(loop() is None for loop in loops))
+
+    def test_aclose_pooled(self):
+        """Test that closing the pooled client of the running loop lets the next request pool a new one."""
+        with MockLLMServer(MockLLMServerConfig()) as server:
+            async def generate_twice():
+                client = LLMClient(model_name="mock-model", api_key="k", api_host=server.api_host)
+                await client.generate(prompt="first")
+                pooled = LLMClient._http_clients[asyncio.get_running_loop()][0]
+                await LLMClient.aclose_pooled()
+                self.assertTrue(pooled.is_closed)
+                self.assertNotIn(asyncio.get_running_loop(), LLMClient._http_clients)
+                self.assertIn("second", await client.generate(prompt="second"))
+
+            asyncio.run(generate_twice())
+        self.assertEqual(len(LLMClient._http_clients), 0)
+
+if __name__ == "__main__":
+    unittest.main()
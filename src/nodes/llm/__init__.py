@@ -2,5 +2,8 @@
 LLM node executor module.
 """
 from .llm_executor import LLMExecutor
+from .hedging import HedgingPolicy
+from .latency_histogram import LatencyHistogram
+from .llm_batcher import LLMBatcher
 
-__all__ = ['LLMExecutor']
\ No newline at end of file
+__all__ = ['LLMExecutor', 'HedgingPolicy', 'LatencyHistogram', 'LLMBatcher']
\ No newline at end of file
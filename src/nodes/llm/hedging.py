@@ -0,0 +1,114 @@
+"""
+Hedged request policy for LLM calls.
+This module sends a duplicate request when the first one is slower than usual.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from .latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class HedgingPolicy:
+    """
+    Policy for hedging slow LLM requests.
+
+    If a request has not finished by the configured percentile of recent
+    latency, a duplicate request is sent and the first successful response
+    wins. The losing request is cancelled. Hedges are capped by a budget
+    expressed as a percentage of primary requests.
+
+    Clients record the latency of requests that succeed. A primary request
+    cancelled because its hedge won is recorded here instead, with the time
+    it ran as a lower bound of its latency, so the slow tail that triggered
+    the hedge stays in the histogram.
+    """
+
+    def __init__(self, percentile: float = 95.0, budget_percent: float = 10.0, min_samples: int = 20):
+        """
+        Initialize a new hedging policy.
+
+        Args:
+            percentile: The latency percentile after which a hedge is sent.
+            budget_percent: The maximum extra load, as a percentage of primary requests.
+            min_samples: The number of latency samples required before hedging starts.
+        """
+        self.percentile = percentile
+        self.budget_percent = budget_percent
+        self.min_samples = min_samples
+        self._requests = 0
+        self._hedges = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the hedging statistics.
+
+        Returns:
+            A dictionary with the number of primary requests and hedges sent.
+        """
+        return {
+            "requests": self._requests,
+            "hedges": self._hedges,
+        }
+
+    def _has_budget(self) -> bool:
+        """
+        Check if another hedge fits in the budget.
+
+        Returns:
+            True if a hedge can be sent, False otherwise.
+        """
+        return (self._hedges + 1) * 100 <= self._requests * self.budget_percent
+
+    async def run(self, request: Callable[[], Awaitable[T]], histogram: LatencyHistogram) -> T:
+        """
+        Run a request with hedging.
+
+        Args:
+            request: A factory that starts a new request each time it is called.
+            histogram: The latency histogram for the request's model and host.
+
+        Returns:
+            The result of the first successful request.
+
+        Raises:
+            Exception: If every request sent fails.
+        """
+        self._requests += 1
+        hedge_delay = histogram.percentile(self.percentile) if histogram.count >= self.min_samples else None
+
+        started_at = time.perf_counter()
+        primary = asyncio.ensure_future(request())
+        tasks = [primary]
+        try:
+            if hedge_delay is None:
+                return await primary
+
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if done or not self._has_budget():
+                return await primary
+
+            self._hedges += 1
+            logger.debug(f"Hedging LLM request after {hedge_delay:.3f}s")
+            tasks.append(asyncio.ensure_future(request()))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+
+            # Every request failed, surface the error of the primary request
+            return primary.result()
+        finally:
+            if not primary.done():
+                histogram.record(time.perf_counter() - started_at)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
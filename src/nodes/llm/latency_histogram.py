@@ -0,0 +1,66 @@
+"""
+Rolling latency histogram for LLM requests.
+This module keeps recent request latencies so callers can ask for percentiles.
+"""
+import bisect
+import math
+from collections import deque
+from typing import Deque, List, Optional
+
+
+class LatencyHistogram:
+    """
+    Rolling histogram of request latencies.
+
+    Only the most recent samples are kept, so percentiles follow the current
+    behaviour of the upstream service rather than its whole history.
+    """
+
+    def __init__(self, window_size: int = 200):
+        """
+        Initialize a new latency histogram.
+
+        Args:
+            window_size: The maximum number of recent samples to keep.
+        """
+        self._samples: Deque[float] = deque(maxlen=window_size)
+        self._sorted: List[float] = []
+
+    @property
+    def count(self) -> int:
+        """
+        Get the number of samples currently in the window.
+
+        Returns:
+            The number of samples.
+        """
+        return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        """
+        Record a latency sample.
+
+        Args:
+            latency: The request latency in seconds.
+        """
+        if len(self._samples) == self._samples.maxlen:
+            evicted = self._samples[0]
+            del self._sorted[bisect.bisect_left(self._sorted, evicted)]
+        self._samples.append(latency)
+        bisect.insort(self._sorted, latency)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        Get a percentile of the recorded latencies.
+
+        Args:
+            percentile: The percentile to compute, between 0 and 100.
+
+        Returns:
+            The latency in seconds, or None if no samples were recorded.
+        """
+        if not self._sorted:
+            return None
+        index = math.ceil(percentile / 100 * len(self._sorted)) - 1
+        index = min(len(self._sorted) - 1, max(0, index))
+        return self._sorted[index]
@@ -0,0 +1,143 @@
+"""
+Micro-batching layer for LLM calls.
+This module collects concurrent prompts for the same model and host and sends them together.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .llm_client import LLMClient, LLMResponse
+
+logger = logging.getLogger(__name__)
+
+BatchKey = Tuple[str, str, str, Any]
+
+
+class _PendingBatch:
+    """
+    A batch of prompts waiting to be sent.
+    """
+
+    def __init__(self, client: LLMClient):
+        """
+        Initialize a new pending batch.
+
+        Args:
+            client: The client used to send the batch.
+        """
+        self.client = client
+        self.items: List[Tuple[str, Optional[str], asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class LLMBatcher:
+    """
+    Micro-batcher for LLM calls.
+
+    Prompts submitted concurrently for the same model, host, API key and
+    temperature are collected for a short time window, or until the maximum
+    batch size is reached, and sent through `LLMClient.generate_batch`. The
+    results are then fanned back to the waiting callers.
+    """
+
+    def __init__(self, max_batch_size: int = 16, max_wait_ms: int = 10):
+        """
+        Initialize a new batcher.
+
+        Args:
+            max_batch_size: The maximum number of prompts sent in one batch.
+            max_wait_ms: The maximum time a prompt waits for other prompts to join its batch.
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: Dict[BatchKey, _PendingBatch] = {}
+        self._in_flight: Set[asyncio.Task] = set()
+        self._batches = 0
+        self._prompts = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the batching statistics.
+
+        Returns:
+            A dictionary with the number of batches and prompts sent.
+        """
+        return {
+            "batches": self._batches,
+            "prompts": self._prompts,
+        }
+
+    async def submit(self, client: LLMClient, prompt: str, system_prompt: Optional[str] = None) -> LLMResponse:
+        """
+        Submit a prompt and wait for its result.
+
+        Args:
+            client: The client configured with the model, host and credentials to use.
+            prompt: The user prompt to generate from.
+            system_prompt: Optional system prompt to set the context.
+
+        Returns:
+            The generated text response, carrying its token usage.
+        """
+        loop = asyncio.get_running_loop()
+        key: BatchKey = (client.model_name, client.api_host, client.api_key, client.temperature)
+
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = _PendingBatch(client)
+            batch.timer = loop.call_later(self.max_wait_ms / 1000, self._flush, key)
+            self._pending[key] = batch
+
+        future = loop.create_future()
+        batch.items.append((prompt, system_prompt, future))
+        if len(batch.items) >= self.max_batch_size:
+            self._flush(key)
+
+        return await future
+
+    def _flush(self, key: BatchKey) -> None:
+        """
+        Send the pending batch for a key.
+
+        Args:
+            key: The batch key.
+        """
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer:
+            batch.timer.cancel()
+
+        task = asyncio.ensure_future(self._send(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, batch: _PendingBatch) -> None:
+        """
+        Send a batch and resolve the waiting futures.
+
+        Args:
+            batch: The batch to send.
+        """
+        self._batches += 1
+        self._prompts += len(batch.items)
+        logger.debug(f"Sending LLM batch of {len(batch.items)} prompts to {batch.client.api_host}")
+
+        try:
+            results = await batch.client.generate_batch([
+                (prompt, system_prompt) for prompt, system_prompt, _ in batch.items
+            ])
+        except Exception as e:
+            for _, _, future in batch.items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), result in zip(batch.items, results):
+            if future.done():
+                # The waiting node was cancelled
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
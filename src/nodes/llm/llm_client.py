@@ -1,27 +1,70 @@
 """
 Implementation of a real LLM client that makes API calls to LLM services.
 """
-import json
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Dict, Any, List, Optional, Set, Tuple, Union
 
 import httpx
 
+from .latency_histogram import LatencyHistogram
+
 logger = logging.getLogger(__name__)
 
+
+class LLMResponse(str):
+    """
+    Text generated by an LLM service.
+    
+    The response behaves like the generated string and also carries the token
+    usage reported by the service, if any.
+    """
+    
+    usage: Optional[Dict[str, int]]
+    
+    def __new__(cls, content: str, usage: Optional[Dict[str, int]] = None) -> 'LLMResponse':
+        """
+        Create a new LLM response.
+        
+        Args:
+            content: The generated text.
+            usage: The token usage with promptTokens, completionTokens and totalTokens.
+        """
+        response = super().__new__(cls, content)
+        response.usage = usage
+        return response
+
+
 class LLMClient:
     """
     A client for making API calls to LLM services.
     This client is designed to be used with the LLM executor.
     """
     
+    # Rolling latency histograms shared by all clients, keyed by (model, host)
+    _latency_histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+    
+    # Hosts that answered the batch endpoint with 404/405, shared by all clients
+    _batch_unsupported_hosts: Set[str] = set()
+    
+    # Running token usage shared by all clients, keyed by (model, host)
+    _usage_totals: Dict[Tuple[str, str], Dict[str, int]] = {}
+    
+    # Pooled HTTP clients shared by all clients, one per event loop, with the async
+    # generator that closes the client when the loop shuts down. Building an
+    # httpx.AsyncClient creates a new SSL context, which costs tens of milliseconds
+    _http_clients: Dict[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, AsyncGenerator[None, None]]] = {}
+    
     def __init__(
         self, 
         model_name: str, 
         api_key: str, 
         api_host: str, 
         temperature: float = 0.7,
-        timeout: int = 60
+        timeout: int = 60,
+        transport: Optional[httpx.AsyncBaseTransport] = None
     ):
         """
         Initialize a new LLM client.
@@ -32,12 +75,14 @@ class LLMClient:
             api_host: The host URL of the API service.
             temperature: The temperature to use for generation.
             timeout: The timeout for API requests in seconds.
+            transport: Optional HTTP transport, e.g. to target an in-process stand-in server.
         """
         self.model_name = model_name
         self.api_key = api_key
         self.api_host = api_host
         self.temperature = temperature
         self.timeout = timeout
+        self.transport = transport
         
         # Normalize API host URL
         if not self.api_host.endswith('/'):
@@ -49,52 +94,256 @@ class LLMClient:
         
         logger.debug(f"Initialized LLM client with model: {model_name}, host: {api_host}")
     
-    async def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+    @classmethod
+    def latency_histogram(cls, model_name: str, api_host: str) -> LatencyHistogram:
         """
-        Generate text using the LLM API.
+        Get the rolling latency histogram for a model and host.
+        
+        Args:
+            model_name: The name of the model.
+            api_host: The normalized host URL of the API service.
+            
+        Returns:
+            The latency histogram, created on first use.
+        """
+        key = (model_name, api_host)
+        histogram = cls._latency_histograms.get(key)
+        if histogram is None:
+            histogram = LatencyHistogram()
+            cls._latency_histograms[key] = histogram
+        return histogram
+    
+    @classmethod
+    def record_usage(cls, model_name: str, api_host: str, usage: Optional[Dict[str, int]]) -> None:
+        """
+        Add the usage of a request to the running aggregates of a model and host.
+        
+        Args:
+            model_name: The name of the model.
+            api_host: The normalized host URL of the API service.
+            usage: The token usage of the request, or None if the service did not report it.
+        """
+        key = (model_name, api_host)
+        totals = cls._usage_totals.get(key)
+        if totals is None:
+            totals = {"requests": 0, "promptTokens": 0, "completionTokens": 0, "totalTokens": 0}
+            cls._usage_totals[key] = totals
+        totals["requests"] += 1
+        if usage:
+            totals["promptTokens"] += usage["promptTokens"]
+            totals["completionTokens"] += usage["completionTokens"]
+            totals["totalTokens"] += usage["totalTokens"]
+    
+    @classmethod
+    def usage_metrics(cls) -> List[Dict[str, Any]]:
+        """
+        Get the running token usage aggregates.
+        
+        Returns:
+            One entry per model and host with the number of requests and tokens used.
+        """
+        return [
+            {"model": model_name, "host": api_host, **totals}
+            for (model_name, api_host), totals in cls._usage_totals.items()
+        ]
+    
+    @asynccontextmanager
+    async def _http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Get an HTTP client for a request.
+        
+        Clients with a custom transport get a dedicated HTTP client. Otherwise
+        the pooled client of the running event loop is reused.
+        
+        Yields:
+            The HTTP client.
+        """
+        if self.transport is not None:
+            async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
+                yield client
+            return
+        
+        loop = asyncio.get_running_loop()
+        entry = self._http_clients.get(loop)
+        if entry is None or entry[0].is_closed:
+            self._drop_closed_loops()
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+            )
+            guard = self._close_on_shutdown(loop, client)
+            # Starting the generator registers it with the loop, which closes it on shutdown
+            await guard.__anext__()
+            entry = self._http_clients[loop] = (client, guard)
+        yield entry[0]
+    
+    @classmethod
+    async def _close_on_shutdown(
+        cls, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient
+    ) -> AsyncGenerator[None, None]:
+        """
+        Hold a pooled HTTP client until the generator is closed.
+        
+        `asyncio.run` and `IsolatedAsyncioTestCase` close the async generators of
+        a loop with `shutdown_asyncgens` before they close the loop, so the
+        pooled client is closed while its loop still runs.
+        
+        Args:
+            loop: The event loop of the client.
+            client: The pooled HTTP client.
+            
+        Yields:
+            Nothing, once the client is pooled.
+        """
+        try:
+            yield
+        finally:
+            entry = cls._http_clients.get(loop)
+            if entry is not None and entry[0] is client:
+                del cls._http_clients[loop]
+            await client.aclose()
+    
+    @classmethod
+    def _drop_closed_loops(cls) -> None:
+        """
+        Drop the pooled HTTP clients of event loops that were closed without shutting down their generators.
+        """
+        for loop in [loop for loop in cls._http_clients if loop.is_closed()]:
+            del cls._http_clients[loop]
+    
+    @classmethod
+    async def aclose_pooled(cls) -> None:
+        """
+        Close the pooled HTTP client of the running event loop.
+        
+        The application calls it when it shuts down. A later request pools a new client.
+        """
+        cls._drop_closed_loops()
+        entry = cls._http_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[1].aclose()
+    
+    def _build_payload(self, prompt: str, system_prompt: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the chat-completion payload for a prompt.
         
         Args:
             prompt: The user prompt to generate from.
             system_prompt: Optional system prompt to set the context.
             
         Returns:
-            The generated text response.
-            
-        Raises:
-            Exception: If the API call fails or returns an error.
+            The request payload.
         """
-        # Prepare messages
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
         
-        # Prepare request payload
-        payload = {
+        return {
             "model": self.model_name,
             "messages": messages,
             "temperature": self.temperature
         }
+    
+    def _build_headers(self) -> Dict[str, str]:
+        """
+        Build the request headers.
         
-        # Prepare headers
-        headers = {
+        Returns:
+            The request headers.
+        """
+        return {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
         }
+    
+    @staticmethod
+    def _extract_content(response_data: Dict[str, Any]) -> str:
+        """
+        Extract the generated text from a chat-completion response.
+        
+        Args:
+            response_data: The parsed response body.
+            
+        Returns:
+            The generated text.
+            
+        Raises:
+            Exception: If the response does not contain any choice.
+        """
+        if "choices" in response_data and len(response_data["choices"]) > 0:
+            message = response_data["choices"][0].get("message", {})
+            return message.get("content", "")
+        raise Exception(f"Invalid response format: {response_data}")
+    
+    @staticmethod
+    def _extract_usage(response_data: Dict[str, Any]) -> Optional[Dict[str, int]]:
+        """
+        Extract the token usage from a chat-completion response.
+        
+        Args:
+            response_data: The parsed response body.
+            
+        Returns:
+            The token usage with promptTokens, completionTokens and totalTokens,
+            or None if the response has no usage block.
+        """
+        usage = response_data.get("usage")
+        if not isinstance(usage, dict):
+            return None
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        total_tokens = int(usage.get("total_tokens") or prompt_tokens + completion_tokens)
+        return {
+            "promptTokens": prompt_tokens,
+            "completionTokens": completion_tokens,
+            "totalTokens": total_tokens,
+        }
+    
+    def _build_response(self, response_data: Dict[str, Any]) -> LLMResponse:
+        """
+        Build the response for a chat completion and record its usage.
         
-        # Prepare URL
+        Args:
+            response_data: The parsed response body.
+            
+        Returns:
+            The generated text with its token usage.
+        """
+        response = LLMResponse(self._extract_content(response_data), self._extract_usage(response_data))
+        self.record_usage(self.model_name, self.api_host, response.usage)
+        return response
+    
+    async def generate(self, prompt: str, system_prompt: Optional[str] = None) -> LLMResponse:
+        """
+        Generate text using the LLM API.
+        
+        Args:
+            prompt: The user prompt to generate from.
+            system_prompt: Optional system prompt to set the context.
+            
+        Returns:
+            The generated text response, carrying the token usage reported by the service.
+            
+        Raises:
+            Exception: If the API call fails or returns an error.
+        """
+        payload = self._build_payload(prompt, system_prompt)
+        headers = self._build_headers()
         url = f"{self.api_host}api/v3/chat/completions"
         
         logger.debug(f"Sending request to {url}")
         logger.debug(f"Request payload: {payload}")
         
+        started_at = time.perf_counter()
         try:
             # Make the API call
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with self._http_client() as client:
                 response = await client.post(
                     url,
                     headers=headers,
-                    json=payload
+                    json=payload,
+                    timeout=self.timeout
                 )
                 
                 # Check if the request was successful
@@ -104,13 +353,10 @@ class LLMClient:
                 response_data = response.json()
                 logger.debug(f"Response data: {response_data}")
                 
-                # Extract the generated text
-                if "choices" in response_data and len(response_data["choices"]) > 0:
-                    message = response_data["choices"][0].get("message", {})
-                    content = message.get("content", "")
-                    return content
-                else:
-                    raise Exception(f"Invalid response format: {response_data}")
+                # Extract the generated text and token usage
+                content = self._build_response(response_data)
+                self.latency_histogram(self.model_name, self.api_host).record(time.perf_counter() - started_at)
+                return content
                 
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error occurred: {e.response.status_code} - {e.response.text}")
@@ -120,4 +366,76 @@ class LLMClient:
             raise Exception(f"API request failed: {str(e)}")
         except Exception as e:
             logger.error(f"An error occurred: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+    
+    async def generate_batch(self, prompts: List[Tuple[str, Optional[str]]]) -> List[Union[LLMResponse, Exception]]:
+        """
+        Generate text for several prompts in a single request.
+        
+        The prompts are sent to the batch endpoint of the service. If the
+        service does not provide one, the prompts are sent as concurrent
+        individual requests instead.
+        
+        Args:
+            prompts: A list of (prompt, system_prompt) pairs.
+            
+        Returns:
+            The generated text for each prompt, or the exception raised for it, in order.
+            
+        Raises:
+            Exception: If the batch request itself fails.
+        """
+        if self.api_host in self._batch_unsupported_hosts:
+            return await self._generate_each(prompts)
+        
+        payload = {
+            "requests": [self._build_payload(prompt, system_prompt) for prompt, system_prompt in prompts]
+        }
+        url = f"{self.api_host}api/v3/batch/chat/completions"
+        logger.debug(f"Sending batch of {len(prompts)} requests to {url}")
+        
+        try:
+            async with self._http_client() as client:
+                response = await client.post(url, headers=self._build_headers(), json=payload, timeout=self.timeout)
+                if response.status_code in (404, 405):
+                    logger.info(f"Batch endpoint not available on {self.api_host}, sending individual requests")
+                    self._batch_unsupported_hosts.add(self.api_host)
+                    return await self._generate_each(prompts)
+                response.raise_for_status()
+                response_data = response.json()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error occurred: {e.response.status_code} - {e.response.text}")
+            raise Exception(f"API request failed with status code {e.response.status_code}: {e.response.text}")
+        except httpx.RequestError as e:
+            logger.error(f"Request error occurred: {str(e)}")
+            raise Exception(f"API request failed: {str(e)}")
+        
+        responses = response_data.get("responses", [])
+        if len(responses) != len(prompts):
+            raise Exception(f"Invalid batch response format: expected {len(prompts)} responses, got {len(responses)}")
+        
+        results: List[Union[LLMResponse, Exception]] = []
+        for item in responses:
+            if "error" in item:
+                results.append(Exception(f"API request failed: {item['error']}"))
+                continue
+            try:
+                results.append(self._build_response(item))
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    async def _generate_each(self, prompts: List[Tuple[str, Optional[str]]]) -> List[Union[LLMResponse, Exception]]:
+        """
+        Generate text for several prompts with concurrent individual requests.
+        
+        Args:
+            prompts: A list of (prompt, system_prompt) pairs.
+            
+        Returns:
+            The generated text for each prompt, or the exception raised for it, in order.
+        """
+        return await asyncio.gather(*[
+            self.generate(prompt=prompt, system_prompt=system_prompt)
+            for prompt, system_prompt in prompts
+        ], return_exceptions=True)
@@ -5,9 +5,6 @@ This module provides the executor for LLM (Language Learning Model) nodes.
 from typing import Any, Dict, List, Optional, TypedDict, Union
 import logging
 
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage, BaseMessage
-
 from ...interface.executor import INodeExecutor, ExecutionContext, ExecutionResult
 from ...interface.node import FlowGramNode
 
@@ -15,6 +12,8 @@ from ...interface.node import FlowGramNode
 from .mock_llm import MockChatOpenAI
 # Import our real LLM client implementation
 from .llm_client import LLMClient
+from .hedging import HedgingPolicy
+from .llm_batcher import LLMBatcher
 
 logger = logging.getLogger(__name__)
 
@@ -44,9 +43,20 @@ class LLMExecutor(INodeExecutor):
     Executor for LLM nodes.
     
     This executor handles the execution of LLM nodes in a workflow.
-    It uses LangChain's ChatOpenAI to interact with language models.
+    It uses LLMClient to call OpenAI-compatible chat-completion APIs.
     """
     
+    def __init__(self, hedging_policy: Optional[HedgingPolicy] = None, batcher: Optional[LLMBatcher] = None):
+        """
+        Initialize a new LLM executor.
+        
+        Args:
+            hedging_policy: Optional policy for hedging slow requests. Hedging is disabled by default.
+            batcher: Optional micro-batcher for concurrent prompts. Batched requests are not hedged.
+        """
+        self._hedging_policy = hedging_policy
+        self._batcher = batcher
+    
     @property
     def type(self) -> str:
         """
@@ -65,7 +75,7 @@ class LLMExecutor(INodeExecutor):
             context: The execution context containing the node, inputs, runtime, and container.
             
         Returns:
-            The execution result containing the LLM response.
+            The execution result containing the LLM response and its token usage.
         """
         inputs = context.inputs  # type: LLMExecutorInputs
         self._check_inputs(inputs)
@@ -87,14 +97,15 @@ class LLMExecutor(INodeExecutor):
                 openai_api_base=api_host
             )
             
-            messages: List[BaseMessage] = []
+            messages: List[Dict[str, str]] = []
             
             if system_prompt:
-                messages.append(SystemMessage(content=system_prompt))
-            messages.append(HumanMessage(content=prompt))
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
             
             api_message = await model.ainvoke(messages)
             result = api_message.content
+            usage = None
         else:
             # Use our real LLM client for actual API calls
             logger.debug(f"Using real LLM client for {model_name} with host {api_host}")
@@ -106,15 +117,27 @@ class LLMExecutor(INodeExecutor):
                     temperature=temperature
                 )
                 
-                result = await llm_client.generate(prompt=prompt, system_prompt=system_prompt)
+                if self._batcher:
+                    result = await self._batcher.submit(llm_client, prompt, system_prompt)
+                elif self._hedging_policy:
+                    histogram = LLMClient.latency_histogram(model_name, llm_client.api_host)
+                    result = await self._hedging_policy.run(
+                        lambda: llm_client.generate(prompt=prompt, system_prompt=system_prompt),
+                        histogram
+                    )
+                else:
+                    result = await llm_client.generate(prompt=prompt, system_prompt=system_prompt)
                 logger.debug(f"LLM client returned result: {result[:50]}...")
+                usage = result.usage
+                result = str(result)
             except Exception as e:
                 logger.error(f"Error calling LLM API: {str(e)}")
                 raise ValueError(f"LLM API call failed: {str(e)}")
         return ExecutionResult(
             outputs={
                 "result": result
-            }
+            },
+            usage=usage
         )
     
     def _check_inputs(self, inputs: LLMExecutorInputs) -> None:
@@ -2,12 +2,13 @@
 Mock LLM implementation for testing.
 """
 from typing import List, Dict, Any, Optional
-from langchain_core.messages import BaseMessage
-from langchain_core.outputs import ChatGeneration, ChatResult
 
 class MockChatOpenAI:
     """
     Mock implementation of ChatOpenAI for testing.
+    
+    Messages are plain chat-completion dictionaries (`{"role": ..., "content": ...}`),
+    so the mock path does not need LangChain.
     """
     
     def __init__(self, model_name: str, temperature: float, api_key: str, openai_api_base: str):
@@ -29,7 +30,7 @@ class MockChatOpenAI:
         self.api_key = api_key
         self.openai_api_base = openai_api_base
     
-    async def ainvoke(self, messages: List[BaseMessage]) -> BaseMessage:
+    async def ainvoke(self, messages: List[Dict[str, str]]) -> 'MockAIMessage':
         """
         Invoke the LLM with the given messages and return a response.
         
@@ -43,10 +44,10 @@ class MockChatOpenAI:
         prompt = ""
         
         for message in messages:
-            if message.type == "system":
-                system_prompt = message.content
-            elif message.type == "human":
-                prompt = message.content
+            if message["role"] == "system":
+                system_prompt = message["content"]
+            elif message["role"] == "user":
+                prompt = message["content"]
         
         # Create a mock response that matches the expected format in the tests
         # Format temperature as a simple float, not as a dictionary representation
@@ -57,7 +58,7 @@ class MockChatOpenAI:
         return MockAIMessage(content=response)
 
 
-class MockAIMessage(BaseMessage):
+class MockAIMessage:
     """
     Mock implementation of an AI message.
     """
@@ -71,4 +72,4 @@ class MockAIMessage(BaseMessage):
         Args:
             content: The content of the message.
         """
-        super().__init__(content=content)
+        self.content = content
@@ -0,0 +1,434 @@
+"""
+Local OpenAI-compatible stub server for load testing LLM workflows.
+
+The server answers chat-completion requests on the same paths `LLMClient`
+uses, with configurable latency distributions, error and 429 injection,
+streaming and token-rate simulation. It is built on FastAPI and uvicorn.
+
+Run it standalone:
+    python -m src.nodes.llm.mock_llm_server --port 4100 --latency lognormal --median-ms 300 --sigma 0.6
+
+or start it in-process for benchmarks:
+    with MockLLMServer(MockLLMServerConfig(...)) as server:
+        api_host = server.api_host
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+class LatencyDistribution:
+    """
+    Latency distribution used to delay responses.
+
+    Supported kinds and their parameters (all in milliseconds unless noted):
+    - fixed: ms
+    - uniform: min_ms, max_ms
+    - normal: mean_ms, stddev_ms
+    - lognormal: median_ms, sigma (unitless)
+    - exponential: mean_ms
+    """
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+    def __init__(self, kind: str = "fixed", **params: float):
+        """
+        Initialize a new latency distribution.
+
+        Args:
+            kind: The kind of distribution.
+            **params: The parameters of the distribution.
+
+        Raises:
+            ValueError: If the kind is not supported.
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unsupported latency distribution: {kind}")
+        self.kind = kind
+        self.params = params
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        Draw a latency sample.
+
+        Args:
+            rng: The random number generator to use.
+
+        Returns:
+            The latency in seconds, never negative.
+        """
+        params = self.params
+        if self.kind == "fixed":
+            ms = params.get("ms", 0)
+        elif self.kind == "uniform":
+            ms = rng.uniform(params.get("min_ms", 0), params.get("max_ms", 0))
+        elif self.kind == "normal":
+            ms = rng.gauss(params.get("mean_ms", 0), params.get("stddev_ms", 0))
+        elif self.kind == "lognormal":
+            median_ms = params.get("median_ms", 0)
+            ms = rng.lognormvariate(math.log(median_ms), params.get("sigma", 0)) if median_ms > 0 else 0
+        else:
+            mean_ms = params.get("mean_ms", 0)
+            ms = rng.expovariate(1 / mean_ms) if mean_ms > 0 else 0
+        return max(0.0, ms) / 1000
+
+    def export(self) -> Dict[str, Any]:
+        """
+        Export the distribution.
+
+        Returns:
+            A dictionary with the kind and parameters.
+        """
+        return {"kind": self.kind, **self.params}
+
+
+class MockLLMServerConfig:
+    """
+    Configuration of the mock LLM server.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[LatencyDistribution] = None,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after_seconds: int = 1,
+        tokens_per_second: Optional[float] = None,
+        completion_tokens: Optional[int] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize a new mock server configuration.
+
+        Args:
+            latency: The distribution of the time to first token. Defaults to no latency.
+            error_rate: The fraction of requests answered with a 500 error.
+            rate_limit_rate: The fraction of requests answered with a 429 error.
+            retry_after_seconds: The Retry-After value sent with 429 errors.
+            tokens_per_second: The simulated generation speed. None generates instantly.
+            completion_tokens: Pads every completion to this many tokens, if set.
+            seed: Seed for the random number generator, for reproducible runs.
+        """
+        self.latency = latency or LatencyDistribution("fixed", ms=0)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.seed = seed
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: The text.
+
+    Returns:
+        The number of whitespace-separated words, used as a token estimate.
+    """
+    return len(text.split())
+
+
+def create_mock_llm_app(config: Optional[MockLLMServerConfig] = None) -> FastAPI:
+    """
+    Create the mock LLM server application.
+
+    Args:
+        config: The server configuration.
+
+    Returns:
+        The FastAPI application.
+    """
+    config = config or MockLLMServerConfig()
+    rng = random.Random(config.seed)
+    stats = {"requests": 0, "errors": 0, "rate_limited": 0, "batches": 0}
+    app = FastAPI(title="Mock LLM server")
+    app.state.config = config
+    app.state.stats = stats
+
+    def build_content(body: Dict[str, Any]) -> str:
+        system_prompt = "You are a helpful AI assistant."
+        prompt = ""
+        for message in body.get("messages", []):
+            if message.get("role") == "system":
+                system_prompt = message.get("content", "")
+            elif message.get("role") == "user":
+                prompt = message.get("content", "")
+        content = (
+            f"Hi, I'm an AI assistant, my name is {body.get('model')}, temperature is {body.get('temperature')}, "
+            f"system prompt is \"{system_prompt}\", prompt is \"{prompt}\""
+        )
+        if config.completion_tokens and count_tokens(content) < config.completion_tokens:
+            content += " lorem" * (config.completion_tokens - count_tokens(content))
+        return content
+
+    def build_usage(body: Dict[str, Any], content: str) -> Dict[str, int]:
+        prompt_tokens = sum(count_tokens(message.get("content", "")) for message in body.get("messages", []))
+        completion_tokens = count_tokens(content)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def build_completion(body: Dict[str, Any], content: str) -> Dict[str, Any]:
+        stats["requests"] += 1
+        return {
+            "id": f"chatcmpl-mock-{stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": build_usage(body, content),
+        }
+
+    def generation_time(content: str) -> float:
+        if not config.tokens_per_second:
+            return 0.0
+        return count_tokens(content) / config.tokens_per_second
+
+    def injected_error() -> Optional[JSONResponse]:
+        draw = rng.random()
+        if draw < config.rate_limit_rate:
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}},
+                headers={"Retry-After": str(config.retry_after_seconds)},
+            )
+        if draw < config.rate_limit_rate + config.error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "Injected server error", "type": "server_error"}},
+            )
+        return None
+
+    async def stream_completion(body: Dict[str, Any], content: str):
+        stats["requests"] += 1
+        words = content.split(" ")
+        delay = 1 / config.tokens_per_second if config.tokens_per_second else 0
+        for index, word in enumerate(words):
+            chunk = {
+                "object": "chat.completion.chunk",
+                "model": body.get("model"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if index == 0 else " " + word},
+                    "finish_reason": None,
+                }],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            if delay:
+                await asyncio.sleep(delay)
+        final = {
+            "object": "chat.completion.chunk",
+            "model": body.get("model"),
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "usage": build_usage(body, content),
+        }
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(config.latency.sample(rng))
+        error = injected_error()
+        if error is not None:
+            return error
+
+        content = build_content(body)
+        if body.get("stream"):
+            return StreamingResponse(stream_completion(body, content), media_type="text/event-stream")
+
+        await asyncio.sleep(generation_time(content))
+        return build_completion(body, content)
+
+    async def batch_chat_completions(request: Request):
+        body = await request.json()
+        stats["batches"] += 1
+        await asyncio.sleep(config.latency.sample(rng))
+        error = injected_error()
+        if error is not None:
+            return error
+
+        contents = [build_content(item) for item in body.get("requests", [])]
+        # Items of a batch are generated in parallel, the slowest one sets the pace
+        await asyncio.sleep(max((generation_time(content) for content in contents), default=0))
+        return {
+            "responses": [
+                build_completion(item, content)
+                for item, content in zip(body.get("requests", []), contents)
+            ]
+        }
+
+    for prefix in ("/api/v3", "/v1"):
+        app.add_api_route(f"{prefix}/chat/completions", chat_completions, methods=["POST"])
+        app.add_api_route(f"{prefix}/batch/chat/completions", batch_chat_completions, methods=["POST"])
+
+    @app.get("/mock/stats")
+    async def get_stats():
+        return {**stats, "latency": config.latency.export()}
+
+    return app
+
+
+class MockLLMServer:
+    """
+    Mock LLM server running in a background thread.
+
+    Intended as a fixture for throughput and tail-latency benchmarks.
+    """
+
+    def __init__(self, config: Optional[MockLLMServerConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize a new background server.
+
+        Args:
+            config: The server configuration.
+            host: The interface to listen on.
+            port: The port to listen on. 0 picks a free port.
+        """
+        self.app = create_mock_llm_app(config)
+        self.host = host
+        self.port = port or self._free_port(host)
+        self._server = uvicorn.Server(uvicorn.Config(
+            self.app,
+            host=self.host,
+            port=self.port,
+            log_level="warning",
+            backlog=4096,
+        ))
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _free_port(host: str) -> int:
+        """
+        Find a free TCP port.
+
+        Args:
+            host: The interface to bind.
+
+        Returns:
+            The port number.
+        """
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind((host, 0))
+            return sock.getsockname()[1]
+
+    @property
+    def api_host(self) -> str:
+        """
+        Get the API host to configure on LLM nodes.
+
+        Returns:
+            The base URL of the server.
+        """
+        return f"http://{self.host}:{self.port}/api/v3"
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the request statistics of the server.
+
+        Returns:
+            The request, error, rate-limit and batch counters.
+        """
+        return dict(self.app.state.stats)
+
+    def start(self, timeout: float = 10.0) -> None:
+        """
+        Start the server and wait until it accepts connections.
+
+        Args:
+            timeout: The maximum time to wait in seconds.
+
+        Raises:
+            RuntimeError: If the server did not start in time.
+        """
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Mock LLM server did not start in time")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        """
+        Stop the server.
+        """
+        self._server.should_exit = True
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'MockLLMServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Run the mock LLM server from the command line.
+
+    Args:
+        argv: The command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4100)
+    parser.add_argument("--latency", choices=LatencyDistribution.KINDS, default="fixed")
+    parser.add_argument("--ms", type=float, default=0)
+    parser.add_argument("--min-ms", type=float, default=0)
+    parser.add_argument("--max-ms", type=float, default=0)
+    parser.add_argument("--mean-ms", type=float, default=0)
+    parser.add_argument("--stddev-ms", type=float, default=0)
+    parser.add_argument("--median-ms", type=float, default=0)
+    parser.add_argument("--sigma", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--completion-tokens", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    params = {
+        "fixed": {"ms": args.ms},
+        "uniform": {"min_ms": args.min_ms, "max_ms": args.max_ms},
+        "normal": {"mean_ms": args.mean_ms, "stddev_ms": args.stddev_ms},
+        "lognormal": {"median_ms": args.median_ms, "sigma": args.sigma},
+        "exponential": {"mean_ms": args.mean_ms},
+    }[args.latency]
+    config = MockLLMServerConfig(
+        latency=LatencyDistribution(args.latency, **params),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        seed=args.seed,
+    )
+    uvicorn.run(create_mock_llm_app(config), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
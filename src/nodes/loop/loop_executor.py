@@ -8,6 +8,8 @@ import asyncio
 from ...interface.executor import INodeExecutor, ExecutionContext, ExecutionResult
 from ...interface.node import FlowGramNode, WorkflowVariableType
 from ...interface.engine import IEngine
+from ...infrastructure.spill import SpilledList
+from ...infrastructure.typed_array import is_typed_array
 
 
 class LoopArray(List[Any]):
@@ -53,7 +55,6 @@ class LoopExecutor(INodeExecutor):
         Returns:
             The execution result.
         """
-        loop_node_id = context.node.id
         loop_array_result = context.runtime.state.parse_ref(context.node.data["batchFor"])
         self._check_loop_array(loop_array_result)
         
@@ -74,29 +75,56 @@ class LoopExecutor(INodeExecutor):
             sub_nodes = [node for node in all_nodes if any(prev.id == context.node.id for prev in node.prev)]
             start_sub_nodes = [node for node in sub_nodes if len([p for p in node.prev if p.id != context.node.id]) == 0]
         
-        if not loop_array or not start_sub_nodes:
+        if len(loop_array) == 0 or not start_sub_nodes:
             return ExecutionResult(outputs={})
         
+        # Iterations run one at a time unless the node allows more, so that
+        # concurrent LLM calls can be micro-batched
+        concurrency = max(1, int(context.node.data.get("concurrency", 1) or 1))
+        
         # Not use Array method to make error stack more concise, and better performance
-        for i in range(len(loop_array)):
-            loop_item = loop_array[i]
-            sub_context = context.runtime.sub()
-            sub_context.variable_store.set_variable({
-                "nodeID": f"{loop_node_id}_locals",
-                "key": "item",
-                "type": items_type,
-                "value": loop_item
-            })
-            
+        for window_start in range(0, len(loop_array), concurrency):
+            window_end = min(window_start + concurrency, len(loop_array))
             await asyncio.gather(*[
-                engine.execute_node({
-                    "context": sub_context,
-                    "node": node
-                }) for node in start_sub_nodes
+                self._execute_iteration(context, engine, start_sub_nodes, loop_array[i], items_type)
+                for i in range(window_start, window_end)
             ])
         
         return ExecutionResult(outputs={})
     
+    async def _execute_iteration(
+        self,
+        context: ExecutionContext,
+        engine: IEngine,
+        start_sub_nodes: List[Any],
+        loop_item: Any,
+        items_type: WorkflowVariableType
+    ) -> None:
+        """
+        Execute the loop body for one item.
+        
+        Args:
+            context: The execution context of the loop node.
+            engine: The engine used to execute the sub nodes.
+            start_sub_nodes: The first nodes of the loop body.
+            loop_item: The current loop item.
+            items_type: The type of the loop items.
+        """
+        sub_context = context.runtime.sub()
+        sub_context.variable_store.set_variable({
+            "nodeID": f"{context.node.id}_locals",
+            "key": "item",
+            "type": items_type,
+            "value": loop_item
+        })
+        
+        await asyncio.gather(*[
+            engine.execute_node({
+                "context": sub_context,
+                "node": node
+            }) for node in start_sub_nodes
+        ])
+    
     def _check_loop_array(self, loop_array_result: Optional[Any]) -> None:
         """
         Check if the loop array is valid.
@@ -108,7 +136,11 @@ class LoopExecutor(INodeExecutor):
             ValueError: If the loop array is invalid.
         """
         loop_array = loop_array_result["value"] if loop_array_result else None
-        if not loop_array or not isinstance(loop_array, list):
+        # Spilled lists, typed arrays and NumPy arrays are accepted as well as lists,
+        # which is why emptiness is checked with len() rather than truthiness
+        if loop_array is None or not isinstance(loop_array, (list, SpilledList)) and not is_typed_array(loop_array):
+            raise ValueError("batchFor is required")
+        if len(loop_array) == 0:
             raise ValueError("batchFor is required")
         
         loop_array_type = loop_array_result["type"]